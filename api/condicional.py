@@ -0,0 +1,168 @@
+"""
+Peticiones condicionales (ETag / Last-Modified) en los recursos de la API.
+
+Los validadores no salen del cuerpo de la respuesta sino del registro de
+cambios (core.sincronizacion) del modelo del ViewSet y de los modelos que
+lee su serializador. El ETag fuerte tiene dos partes: un hash de la URL, el
+usuario, el formato y la fecha (hay campos que dependen del día, como la
+edad de un lote), y el token de cada recurso, "<versión>.<transacción>",
+como los de cambios_desde():
+
+    GET /api/razas/                      -> 200, ETag: "9f2c...-41.90817"
+    GET /api/razas/ If-None-Match: "9f2c...-41.90817"  -> 304
+
+Las versiones se asignan al escribir, no al confirmar, así que "no hay una
+versión mayor" no basta: una transacción abierta al armar el ETag puede
+confirmar después una versión menor. Por eso el If-None-Match se compara
+con filtro_cambios() y no con la versión máxima actual: si ningún recurso
+tiene cambios posteriores a su token la respuesta es 304 con una sola
+consulta y sin consultar ni serializar filas. Por la misma razón se envía
+Last-Modified pero no se atiende If-Modified-Since.
+
+Los modelos que el serializador lee sin declararlo en su `source` (una
+anotación calculada desde otra tabla) se agregan en `modelos_version_extra`
+del ViewSet.
+"""
+import hashlib
+import operator
+from datetime import date
+from functools import lru_cache, reduce
+
+from django.apps import apps
+from django.db.models import Q
+from django.http import HttpResponseNotModified
+from django.utils.cache import patch_cache_control
+from django.utils.http import http_date, parse_etags
+
+from core.sincronizacion import DEPENDENCIAS, filtro_cambios, leer_token, recurso, transacciones_pendientes
+
+from .consultas import plan_relaciones
+
+
+def _modelo_versionado(modelo):
+    """Modelo cuya versión cambia cuando cambia `modelo` (su contenedor si se muestra anidado)."""
+    contenedor = DEPENDENCIAS.get(modelo._meta.label)
+    return apps.get_model(contenedor[0]) if contenedor else modelo
+
+
+@lru_cache(maxsize=None)
+def modelos_versionados(modelo, serializer_class, extra=()):
+    """Recursos de RegistroCambio de los que depende la respuesta de `serializer_class`."""
+    modelos = {modelo}
+    select, prefetch = plan_relaciones(serializer_class)
+    for ruta in select + prefetch:
+        actual = modelo
+        for atributo in ruta.split('__'):
+            campo = next(
+                (f for f in actual._meta.get_fields()
+                 if (f.get_accessor_name() if f.auto_created and not f.concrete else f.name) == atributo),
+                None
+            )
+            if campo is None or campo.related_model is None:
+                break
+            actual = campo.related_model
+            modelos.add(actual)
+    modelos.update(apps.get_model(etiqueta) for etiqueta in extra)
+    return tuple(sorted({recurso(_modelo_versionado(m)) for m in modelos}))
+
+
+def versiones(recursos):
+    """[(recurso, versión, fecha)] del último cambio de cada recurso (versión 0 si no tiene)."""
+    from core.models import RegistroCambio
+
+    resultado = []
+    for nombre in recursos:
+        ultimo = RegistroCambio.objects.filter(recurso=nombre).order_by('-version').values_list(
+            'version', 'fecha'
+        ).first()
+        resultado.append((nombre, *(ultimo or (0, None))))
+    return resultado
+
+
+def sin_cambios(tokens):
+    """True si ningún recurso de `tokens` ({recurso: (versión, transacción)}) cambió después de su token."""
+    from core.models import RegistroCambio
+
+    filtro = reduce(operator.or_, (
+        Q(recurso=nombre) & filtro_cambios(version, marca) for nombre, (version, marca) in tokens.items()
+    ))
+    return not RegistroCambio.objects.filter(filtro).exists()
+
+
+class VersionesMixin:
+    """
+    Mixin para ViewSets de modelo: list() y retrieve() responden con ETag y
+    Last-Modified, y con 304 si el cliente ya tiene la versión actual.
+    """
+    modelos_version_extra = ()
+
+    def recursos_versionados(self):
+        return modelos_versionados(
+            self.get_queryset().model, self.get_serializer_class(), tuple(self.modelos_version_extra)
+        )
+
+    def firma(self, request, recursos):
+        """Parte del ETag que no depende de los cambios."""
+        return hashlib.sha1('|'.join([
+            request.get_full_path(),
+            str(request.user.pk),
+            request.accepted_renderer.format,
+            date.today().isoformat(),
+            *recursos,
+        ]).encode()).hexdigest()
+
+    def validadores(self, request):
+        """(etag, last_modified) de la respuesta a `request`."""
+        recursos = self.recursos_versionados()
+        # La transacción del token se toma antes de leer las versiones, como en cambios_desde()
+        marca, _ = transacciones_pendientes()
+        estado = versiones(recursos)
+        tokens = '-'.join(f'{version}.{marca}' for _, version, _ in estado)
+        fechas = [fecha for _, _, fecha in estado if fecha is not None]
+        etag = f'"{self.firma(request, recursos)}-{tokens}"'
+        return etag, max(fechas).timestamp() if fechas else None
+
+    def etag_vigente(self, request):
+        """El ETag de If-None-Match que sigue valiendo para `request`, o None."""
+        if request.method not in ('GET', 'HEAD'):
+            return None
+        recursos = self.recursos_versionados()
+        firma = self.firma(request, recursos)
+        for etag in parse_etags(request.META.get('HTTP_IF_NONE_MATCH', '')):
+            valor = etag.removeprefix('W/').strip('"')
+            prefijo, _, tokens = valor.partition('-')
+            if prefijo != firma:
+                continue
+            try:
+                tokens = [leer_token(token) for token in tokens.split('-')]
+            except ValueError:
+                continue
+            if len(tokens) == len(recursos) and all(len(token) == 2 for token in tokens):
+                if sin_cambios(dict(zip(recursos, tokens))):
+                    return f'"{valor}"'
+        return None
+
+    def _condicional(self, request, vista, *args, **kwargs):
+        etag = self.etag_vigente(request)
+        if etag is not None:
+            respuesta = HttpResponseNotModified()
+            respuesta['ETag'] = etag
+            patch_cache_control(respuesta, private=True, no_cache=True)
+            return respuesta
+
+        etag, last_modified = self.validadores(request)
+        respuesta = vista(request, *args, **kwargs)
+        if respuesta.status_code == 200:
+            respuesta['ETag'] = etag
+            if last_modified is not None:
+                respuesta['Last-Modified'] = http_date(last_modified)
+            # El cliente revalida siempre; la caché de páginas compartida no
+            # la guarda (UpdateCacheMiddleware ignora las respuestas privadas)
+            patch_cache_control(respuesta, private=True, no_cache=True)
+        return respuesta
+
+    def list(self, request, *args, **kwargs):
+        return self._condicional(request, super().list, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self._condicional(request, super().retrieve, *args, **kwargs)
@@ -0,0 +1,111 @@
+"""
+Planificación de select_related/prefetch_related a partir de los serializadores.
+
+plan_relaciones() recorre los campos de un serializador y sigue el `source`
+de cada uno sobre los modelos: las claves foráneas y uno a uno hacia adelante
+van a select_related, y las relaciones inversas o muchos a muchos (y todo lo
+que cuelga de ellas) a prefetch_related. Los serializadores anidados se
+recorren igual, con la ruta de su campo como prefijo.
+
+Lo que no se deduce del `source` (un SerializerMethodField que lee
+obj.encargado, o un `__str__` que usa otra relación) se declara en el Meta
+del serializador con la misma sintaxis de puntos:
+
+    class Meta:
+        model = Lote
+        relaciones_extra = ['galpon.granja']
+
+ConsultaPlanificadaMixin aplica el plan en get_queryset() de un ViewSet, de
+modo que la cantidad de consultas de un listado no crece con las filas.
+"""
+from functools import lru_cache
+
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import serializers
+from rest_framework.relations import ManyRelatedField, RelatedField
+
+
+def _seguir_ruta(model, atributos, ruta, en_prefetch, select, prefetch):
+    """
+    Sigue `atributos` desde `model` y registra las relaciones recorridas.
+    Devuelve (modelo final, ruta, en_prefetch), con modelo None si la ruta
+    termina en un atributo que no es una relación.
+    """
+    for atributo in atributos:
+        try:
+            campo = model._meta.get_field(atributo)
+        except FieldDoesNotExist:
+            return None, ruta, en_prefetch
+        if not campo.is_relation:
+            return None, ruta, en_prefetch
+
+        nombre = campo.get_accessor_name() if campo.auto_created and not campo.concrete else campo.name
+        ruta = f'{ruta}__{nombre}' if ruta else nombre
+        if campo.related_model is None:
+            # GenericForeignKey: solo se puede precargar
+            prefetch.add(ruta)
+            return None, ruta, True
+        if campo.many_to_many or campo.one_to_many:
+            en_prefetch = True
+        (prefetch if en_prefetch else select).add(ruta)
+        model = campo.related_model
+    return model, ruta, en_prefetch
+
+
+def _recorrer(serializer, model, ruta, en_prefetch, select, prefetch):
+    for campo in serializer.fields.values():
+        if campo.write_only:
+            continue
+        if campo.source == '*':
+            if isinstance(campo, serializers.BaseSerializer):
+                _recorrer(campo, model, ruta, en_prefetch, select, prefetch)
+            continue
+
+        atributos = campo.source_attrs
+        # Un PrimaryKeyRelatedField solo lee la columna <campo>_id
+        if isinstance(campo, RelatedField) and campo.use_pk_only_optimization() and len(atributos) == 1:
+            continue
+
+        destino, ruta_campo, prefetch_campo = _seguir_ruta(model, atributos, ruta, en_prefetch, select, prefetch)
+        if destino is None:
+            continue
+        hijo = campo.child if isinstance(campo, serializers.ListSerializer) else campo
+        if isinstance(hijo, serializers.BaseSerializer):
+            _recorrer(hijo, destino, ruta_campo, prefetch_campo, select, prefetch)
+        elif isinstance(campo, ManyRelatedField):
+            prefetch.add(ruta_campo)
+
+    meta = getattr(serializer, 'Meta', None)
+    for fuente in getattr(meta, 'relaciones_extra', ()):
+        _seguir_ruta(model, fuente.split('.'), ruta, en_prefetch, select, prefetch)
+
+
+@lru_cache(maxsize=None)
+def plan_relaciones(serializer_class):
+    """
+    (select_related, prefetch_related) que necesita `serializer_class` para
+    serializar instancias de su Meta.model sin consultas por fila.
+    """
+    select, prefetch = set(), set()
+    _recorrer(serializer_class(), serializer_class.Meta.model, '', False, select, prefetch)
+    return sorted(select), sorted(prefetch)
+
+
+def planificar_consulta(queryset, serializer_class):
+    """Aplica a `queryset` el plan de relaciones de `serializer_class`."""
+    select, prefetch = plan_relaciones(serializer_class)
+    if select:
+        queryset = queryset.select_related(*select)
+    if prefetch:
+        queryset = queryset.prefetch_related(*prefetch)
+    return queryset
+
+
+class ConsultaPlanificadaMixin:
+    """
+    Mixin para ViewSets de modelo: get_queryset() incluye las relaciones que
+    lee el serializador de la acción.
+    """
+
+    def get_queryset(self):
+        return planificar_consulta(super().get_queryset(), self.get_serializer_class())
@@ -0,0 +1,81 @@
+"""
+FilterSets de la API.
+
+Los recursos de producción comparten los mismos parámetros: `desde` y
+`hasta` (fechas inclusive) sobre su fecha principal y `lote`, `galpon` y
+`granja` por id, siguiendo la relación que corresponda a cada modelo.
+"""
+from django_filters import rest_framework as filters
+from rest_framework.filters import OrderingFilter
+
+from produccion.models import Granja, Galpon, Lote, SeguimientoDiario, MortalidadDiaria, MortalidadSemanal
+
+
+class OrderingEstable(OrderingFilter):
+    """
+    OrderingFilter que agrega el id como último criterio cuando el cliente
+    ordena por un campo no único, para que la paginación por cursor no
+    repita ni saltee filas empatadas.
+    """
+
+    def get_ordering(self, request, queryset, view):
+        ordering = super().get_ordering(request, queryset, view)
+        if ordering is None:
+            return ordering
+        ordering = list(ordering)
+        if not {'id', '-id', 'pk', '-pk'} & set(ordering):
+            ordering.append('-id' if ordering and ordering[0].startswith('-') else 'id')
+        return ordering
+
+
+class GranjaFilter(filters.FilterSet):
+    class Meta:
+        model = Granja
+        fields = ['estado', 'empresa']
+
+
+class GalponFilter(filters.FilterSet):
+    class Meta:
+        model = Galpon
+        fields = ['granja', 'tipo_galpon']
+
+
+class LoteFilter(filters.FilterSet):
+    desde = filters.DateFilter(field_name='fecha_inicio', lookup_expr='gte')
+    hasta = filters.DateFilter(field_name='fecha_inicio', lookup_expr='lte')
+    granja = filters.NumberFilter(field_name='galpon__granja')
+
+    class Meta:
+        model = Lote
+        fields = ['galpon', 'raza', 'estado']
+
+
+class SeguimientoDiarioFilter(filters.FilterSet):
+    desde = filters.DateFilter(field_name='fecha_seguimiento', lookup_expr='gte')
+    hasta = filters.DateFilter(field_name='fecha_seguimiento', lookup_expr='lte')
+    galpon = filters.NumberFilter(field_name='lote__galpon')
+    granja = filters.NumberFilter(field_name='lote__galpon__granja')
+
+    class Meta:
+        model = SeguimientoDiario
+        fields = ['lote', 'fecha_seguimiento', 'tipo_seguimiento']
+
+
+class MortalidadDiariaFilter(filters.FilterSet):
+    desde = filters.DateFilter(field_name='fecha', lookup_expr='gte')
+    hasta = filters.DateFilter(field_name='fecha', lookup_expr='lte')
+    galpon = filters.NumberFilter(field_name='lote__galpon')
+    granja = filters.NumberFilter(field_name='lote__galpon__granja')
+
+    class Meta:
+        model = MortalidadDiaria
+        fields = ['lote', 'fecha']
+
+
+class MortalidadSemanalFilter(filters.FilterSet):
+    galpon = filters.NumberFilter(field_name='lote__galpon')
+    granja = filters.NumberFilter(field_name='lote__galpon__granja')
+
+    class Meta:
+        model = MortalidadSemanal
+        fields = ['lote', 'semana', 'anio']
@@ -0,0 +1,117 @@
+"""
+Aplicación en bloque de operaciones de escritura (/api/batch/).
+
+Un cliente que trabajó sin conexión envía en una sola solicitud la lista
+ordenada de sus altas, modificaciones y bajas sobre cualquier recurso del
+router de la API:
+
+    {"operaciones": [
+        {"recurso": "lotes", "op": "create", "temp_id": "$lote1", "data": {...}},
+        {"recurso": "seguimientos", "op": "create", "data": {"lote": "$lote1", ...}},
+        {"recurso": "galpones", "op": "update", "id": 4, "data": {"capacidad_aves": 6000}},
+        {"recurso": "lotes", "op": "delete", "id": 7}
+    ]}
+
+Cada operación pasa por el ViewSet de su recurso (serializador, permisos y
+perform_create/perform_update/perform_destroy), de modo que valida y
+registra cambios igual que la llamada individual. Las altas pueden llevar un
+id temporal que empieza con "$"; en las operaciones siguientes ese valor, en
+"id" o dentro de "data", se reemplaza por el id real. Todo se aplica en una
+transacción: si una operación falla no queda ninguna aplicada.
+"""
+from django.db import transaction
+from django.http import Http404
+from rest_framework import exceptions, status
+
+MAX_OPERACIONES_POR_SOLICITUD = 1000
+PREFIJO_TEMPORAL = '$'
+OPERACIONES = {'create': 'create', 'update': 'partial_update', 'delete': 'destroy'}
+
+
+class ErrorOperacion(Exception):
+    """Una operación del bloque no se pudo aplicar; el bloque se revierte."""
+
+    def __init__(self, indice, codigo, detalle):
+        super().__init__(detalle)
+        self.indice = indice
+        self.codigo = codigo
+        self.detalle = detalle
+
+
+def _resolver(valor, ids):
+    """Reemplaza en `valor` (y sus listas o diccionarios) los ids temporales ya creados."""
+    if isinstance(valor, str) and valor.startswith(PREFIJO_TEMPORAL):
+        return ids.get(valor, valor)
+    if isinstance(valor, list):
+        return [_resolver(item, ids) for item in valor]
+    if isinstance(valor, dict):
+        return {clave: _resolver(item, ids) for clave, item in valor.items()}
+    return valor
+
+
+def _vistas_por_recurso():
+    from .urls import router
+
+    return {prefijo: viewset for prefijo, viewset, _ in router.registry}
+
+
+def _aplicar(vistas, request, indice, operacion, ids):
+    if not isinstance(operacion, dict):
+        raise ErrorOperacion(indice, status.HTTP_400_BAD_REQUEST, "Cada operación debe ser un objeto")
+    recurso, op = operacion.get('recurso'), operacion.get('op')
+    if recurso not in vistas or not hasattr(vistas[recurso], 'get_serializer'):
+        raise ErrorOperacion(indice, status.HTTP_400_BAD_REQUEST, f"Recurso desconocido: {recurso}")
+    if op not in OPERACIONES:
+        raise ErrorOperacion(indice, status.HTTP_400_BAD_REQUEST, f"Operación desconocida: {op}")
+
+    vista = vistas[recurso](request=request, args=(), kwargs={}, format_kwarg=None, action=OPERACIONES[op])
+    datos = _resolver(operacion.get('data') or {}, ids)
+    resultado = {'indice': indice, 'recurso': recurso, 'op': op}
+
+    vista.check_permissions(request)
+    if op == 'create':
+        temp_id = operacion.get('temp_id')
+        if temp_id is not None and (not str(temp_id).startswith(PREFIJO_TEMPORAL) or temp_id in ids):
+            raise ErrorOperacion(
+                indice, status.HTTP_400_BAD_REQUEST,
+                f"temp_id debe empezar con '{PREFIJO_TEMPORAL}' y no repetirse: {temp_id}"
+            )
+        serializer = vista.get_serializer(data=datos)
+        serializer.is_valid(raise_exception=True)
+        vista.perform_create(serializer)
+        if temp_id is not None:
+            ids[temp_id] = serializer.instance.pk
+            resultado['temp_id'] = temp_id
+        return dict(resultado, status=status.HTTP_201_CREATED, id=serializer.instance.pk, data=serializer.data)
+
+    vista.kwargs = {vista.lookup_url_kwarg or vista.lookup_field: _resolver(operacion.get('id'), ids)}
+    instancia = vista.get_object()
+    if op == 'delete':
+        objeto_id = instancia.pk
+        vista.perform_destroy(instancia)
+        return dict(resultado, status=status.HTTP_204_NO_CONTENT, id=objeto_id)
+
+    serializer = vista.get_serializer(instancia, data=datos, partial=True)
+    serializer.is_valid(raise_exception=True)
+    vista.perform_update(serializer)
+    return dict(resultado, status=status.HTTP_200_OK, id=instancia.pk, data=serializer.data)
+
+
+def aplicar_operaciones(request, operaciones):
+    """
+    Aplica `operaciones` en orden y en una transacción con los permisos del
+    usuario de `request`. Devuelve {'resultados': [...], 'ids': {temp_id: id}}
+    o lanza ErrorOperacion con el índice de la que falló.
+    """
+    vistas = _vistas_por_recurso()
+    ids = {}
+    resultados = []
+    with transaction.atomic():
+        for indice, operacion in enumerate(operaciones):
+            try:
+                resultados.append(_aplicar(vistas, request, indice, operacion, ids))
+            except exceptions.APIException as e:
+                raise ErrorOperacion(indice, e.status_code, e.detail)
+            except Http404:
+                raise ErrorOperacion(indice, status.HTTP_404_NOT_FOUND, "No encontrado")
+    return {'resultados': resultados, 'ids': ids}
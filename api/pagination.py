@@ -0,0 +1,22 @@
+"""
+Paginación por cursor (keyset) de la API.
+
+En lugar de OFFSET, cada página se pide a partir del valor del primer campo
+de ordenamiento de la última fila entregada, de modo que avanzar por un
+historial largo cuesta lo mismo en la primera página que en la última y las
+filas insertadas mientras se recorre no desplazan a las siguientes. Cada
+ViewSet define un `ordering` que empieza por un campo indexado y termina en
+el id como desempate.
+"""
+from django.conf import settings
+from rest_framework.pagination import CursorPagination
+
+
+class PaginacionCursor(CursorPagination):
+    """
+    Cursor opaco en `?cursor=`, con `?page_size=` elegible por el cliente
+    hasta settings.API_MAX_PAGE_SIZE. La respuesta tiene next, previous y results.
+    """
+    page_size_query_param = 'page_size'
+    max_page_size = getattr(settings, 'API_MAX_PAGE_SIZE', 1000)
+    ordering = '-id'
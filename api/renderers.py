@@ -0,0 +1,45 @@
+"""
+Formato columnar de los listados de la API para enlaces lentos.
+
+Un cliente que envía `Accept: application/vnd.granja.columnar+json` (o pide
+?format=columnar) recibe las listas de filas con los nombres de campo una
+sola vez:
+
+    {"next": "...", "previous": null,
+     "results": {"columns": ["id", "fecha_seguimiento", ...],
+                 "rows": [[1, "2026-01-05", ...], [2, "2026-01-06", ...]]}}
+
+Solo cambian las listas de objetos (la respuesta entera o su "results");
+el detalle de un objeto, los errores y las demás claves quedan igual que en
+JSON. Junto con GZipMiddleware un historial largo de seguimientos ocupa una
+fracción del JSON original.
+"""
+from rest_framework.renderers import JSONRenderer
+
+
+def a_columnas(filas):
+    """Convierte una lista de diccionarios en {'columns': [...], 'rows': [[...]]}."""
+    columnas = []
+    vistas = set()
+    for fila in filas:
+        for clave in fila:
+            if clave not in vistas:
+                vistas.add(clave)
+                columnas.append(clave)
+    return {'columns': columnas, 'rows': [[fila.get(columna) for columna in columnas] for fila in filas]}
+
+
+def _es_lista_de_objetos(valor):
+    return isinstance(valor, list) and all(isinstance(fila, dict) for fila in valor)
+
+
+class ColumnarJSONRenderer(JSONRenderer):
+    media_type = 'application/vnd.granja.columnar+json'
+    format = 'columnar'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if _es_lista_de_objetos(data):
+            data = a_columnas(data)
+        elif isinstance(data, dict) and _es_lista_de_objetos(data.get('results')):
+            data = dict(data, results=a_columnas(data['results']))
+        return super().render(data, accepted_media_type, renderer_context)
@@ -38,6 +38,7 @@ class BotConversationSerializer(serializers.ModelSerializer):
     class Meta:
         model = BotConversation
         fields = ['id', 'user', 'user_name', 'start_time', 'end_time', 'feedback_rating', 'messages']
+        relaciones_extra = ['user']
     
     def get_user_name(self, obj):
         if obj.user:
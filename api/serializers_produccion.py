@@ -8,6 +8,7 @@ class GranjaSerializer(serializers.ModelSerializer):
     class Meta:
         model = Granja
         fields = '__all__'
+        relaciones_extra = ['encargado']
     
     def get_encargado_nombre(self, obj):
         if obj.encargado:
@@ -23,6 +24,7 @@ class GalponSerializer(serializers.ModelSerializer):
     class Meta:
         model = Galpon
         fields = '__all__'
+        relaciones_extra = ['responsable']
     
     def get_responsable_nombre(self, obj):
         if obj.responsable:
@@ -34,21 +36,24 @@ class LoteSerializer(serializers.ModelSerializer):
     galpon_info = serializers.ReadOnlyField(source='galpon.__str__')
     raza_nombre = serializers.ReadOnlyField(source='raza.nombre')
     alimento_nombre = serializers.ReadOnlyField(source='alimento.nombre', default='')
-    estado_display = serializers.ReadOnlyField(source='get_estado_lote_display')
+    estado_display = serializers.ReadOnlyField(source='get_estado_display')
     edad_actual = serializers.SerializerMethodField()
     
     class Meta:
         model = Lote
         fields = '__all__'
+        # Galpon.__str__ muestra el nombre de la granja
+        relaciones_extra = ['galpon.granja']
     
     def get_edad_actual(self, obj):
-        return obj.calcular_edad_actual()
+        return obj.calcular_edad_actual
 
 
 class SeguimientoDiarioSerializer(serializers.ModelSerializer):
     lote_codigo = serializers.ReadOnlyField(source='lote.codigo_lote')
     tipo_seguimiento_display = serializers.ReadOnlyField(source='get_tipo_seguimiento_display')
-    aves_presentes_count = serializers.SerializerMethodField()
+    # Aves vivas del día: la anotación de SeguimientoDiario.objects.con_aves_vivas()
+    aves_presentes_count = serializers.IntegerField(source='aves_presentes', read_only=True)
     mortalidad_dia = serializers.SerializerMethodField()
     huevos_total = serializers.SerializerMethodField()
     
@@ -56,9 +61,6 @@ class SeguimientoDiarioSerializer(serializers.ModelSerializer):
         model = SeguimientoDiario
         fields = '__all__'
     
-    def get_aves_presentes_count(self, obj):
-        return obj.aves_presentes()
-    
     def get_mortalidad_dia(self, obj):
         return obj.mortalidad_del_dia()
     
@@ -31,6 +31,7 @@ class ArticleListSerializer(serializers.ModelSerializer):
         fields = ['id', 'title', 'slug', 'category', 'category_name', 
                  'author', 'author_name', 'created_at', 'updated_at', 
                  'is_published', 'views']
+        relaciones_extra = ['author']
     
     def get_author_name(self, obj):
         if obj.author:
@@ -48,6 +49,7 @@ class ArticleDetailSerializer(serializers.ModelSerializer):
         fields = ['id', 'title', 'slug', 'content', 'category', 'category_name',
                  'author', 'author_name', 'created_at', 'updated_at', 
                  'is_published', 'views', 'attachments']
+        relaciones_extra = ['author']
     
     def get_author_name(self, obj):
         if obj.author:
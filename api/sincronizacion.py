@@ -0,0 +1,47 @@
+"""
+Modo de cambios (?since=<token>) de los listados de la API.
+
+Con `since` el listado no pagina la tabla sino el registro de cambios
+(core.sincronizacion): devuelve las filas modificadas después del token que
+el cliente sigue viendo con sus filtros, los ids borrados o que dejaron de
+verse, y el token nuevo. Si `more` es true quedan más cambios y se piden
+con el token devuelto. El token 0 entrega todas las filas. El token es
+opaco para el cliente, que puede recibir otra vez algún cambio que ya tenía
+(ver core.sincronizacion).
+
+    GET /api/lotes/?since=0
+    {"results": [...], "deleted": [], "since": "1532.90817", "more": false}
+"""
+from django.utils.cache import add_never_cache_headers
+from rest_framework import status
+from rest_framework.response import Response
+
+from core.sincronizacion import cambios_desde, leer_token
+
+
+class CambiosDesdeMixin:
+    """Agrega el modo ?since=<token> a list() de un ViewSet de modelo sincronizado."""
+
+    def list(self, request, *args, **kwargs):
+        token = request.query_params.get('since')
+        if token is None:
+            return super().list(request, *args, **kwargs)
+        try:
+            leer_token(token)
+        except ValueError:
+            return Response({'since': ['Token de sincronización inválido.']}, status=status.HTTP_400_BAD_REQUEST)
+
+        limite = self.paginator.get_page_size(request) if self.paginator else None
+        modificados, eliminados, nuevo_token, hay_mas = cambios_desde(self.get_queryset().model, token, limite)
+        visibles = list(self.filter_queryset(self.get_queryset()).filter(pk__in=modificados))
+        ids_visibles = {objeto.pk for objeto in visibles}
+        respuesta = Response({
+            'results': self.get_serializer(visibles, many=True).data,
+            'deleted': sorted(eliminados + [pk for pk in modificados if pk not in ids_visibles]),
+            'since': nuevo_token,
+            'more': hay_mas,
+        })
+        # La misma URL responde distinto a medida que llegan cambios: que no
+        # la guarde la caché de páginas (UpdateCacheMiddleware)
+        add_never_cache_headers(respuesta)
+        return respuesta
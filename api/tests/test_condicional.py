@@ -0,0 +1,102 @@
+"""
+Tests for ETag / Last-Modified conditional requests on the API.
+"""
+from unittest import skipUnless
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from api.condicional import modelos_versionados
+from api.serializers_produccion import GranjaSerializer
+from avicola.models import Empresa
+from core.models import RegistroCambio
+from inventario.models import Raza
+from produccion.models import Granja
+
+
+class PeticionesCondicionalesTest(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.empresa = Empresa.objects.create(
+            nombre="Empresa de Prueba",
+            rif="J-123456789",
+            direccion="Dirección de prueba"
+        )
+        cls.raza = Raza.objects.create(nombre="Ponedora", tipo_raza="PONEDORA", descripcion="Raza de postura")
+        cls.granja = Granja.objects.create(
+            empresa=cls.empresa,
+            codigo_granja="GRANJA-001",
+            nombre="Granja de Prueba",
+            direccion="Ubicación de prueba"
+        )
+
+    def test_unchanged_list_returns_304_without_serializing(self):
+        """A matching If-None-Match costs only the version lookups"""
+        url = reverse('api:raza-list')
+        respuesta = self.client.get(url)
+        self.assertEqual(respuesta.status_code, 200)
+        etag = respuesta['ETag']
+        self.assertTrue(etag.startswith('"'))
+        self.assertIn('Last-Modified', respuesta)
+        self.assertIn('private', respuesta['Cache-Control'])
+
+        with CaptureQueriesContext(connection) as consultas:
+            respuesta = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(respuesta.status_code, 304)
+        self.assertEqual(respuesta['ETag'], etag)
+        self.assertEqual(respuesta.content, b'')
+        self.assertFalse(any('inventario_raza' in q['sql'] for q in consultas.captured_queries))
+
+    def test_change_in_table_or_related_table_changes_etag(self):
+        """Saving the model or a model its serializer reads gives a new ETag"""
+        url = reverse('api:granja-list')
+        etag = self.client.get(url)['ETag']
+
+        self.empresa.nombre = "Empresa Renombrada"
+        self.empresa.save()
+        respuesta = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertNotEqual(respuesta['ETag'], etag)
+
+        etag = respuesta['ETag']
+        self.granja.delete()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_detail_and_query_string_have_their_own_etag(self):
+        lista = self.client.get(reverse('api:granja-list'))['ETag']
+        detalle = self.client.get(reverse('api:granja-detail', args=[self.granja.pk]))
+        self.assertEqual(detalle.status_code, 200)
+        self.assertNotEqual(detalle['ETag'], lista)
+        self.assertNotEqual(self.client.get(reverse('api:granja-list'), {'page_size': 5})['ETag'], lista)
+        self.assertEqual(
+            self.client.get(
+                reverse('api:granja-detail', args=[self.granja.pk]), HTTP_IF_NONE_MATCH=detalle['ETag']
+            ).status_code,
+            304
+        )
+
+    @skipUnless(connection.vendor == 'postgresql', "Transacciones concurrentes solo en PostgreSQL")
+    def test_late_commit_with_lower_version_changes_etag(self):
+        """A change from a transaction running when the ETag was made invalidates it"""
+        url = reverse('api:raza-list')
+        etag = self.client.get(url)['ETag']
+        marca = etag.strip('"').split('-')[1].split('.')[1]
+
+        # Como si otra transacción, abierta al armar el ETag, confirmara ahora
+        RegistroCambio.objects.filter(recurso='inventario.raza', objeto_id=self.raza.pk).update(
+            transaccion=int(marca) + 1
+        )
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_if_modified_since_alone_is_not_trusted(self):
+        url = reverse('api:raza-list')
+        last_modified = self.client.get(url)['Last-Modified']
+        self.assertEqual(self.client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified).status_code, 200)
+
+    def test_versioned_resources_follow_serializer_relations(self):
+        self.assertEqual(
+            modelos_versionados(Granja, GranjaSerializer),
+            ('avicola.empresa', 'avicola.userprofile', 'produccion.granja')
+        )
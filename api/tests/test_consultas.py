@@ -0,0 +1,151 @@
+"""
+Tests for the select_related/prefetch_related planning of API list endpoints.
+"""
+from datetime import date, timedelta
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from api.consultas import plan_relaciones
+from api.serializers_bot import BotConversationSerializer
+from api.serializers_produccion import LoteSerializer, SeguimientoDiarioSerializer
+from avicola.models import Empresa
+from bot.models import BotConversation, BotIntent, BotMessage
+from inventario.models import Raza, Proveedor, Insumo
+from produccion.models import Granja, Galpon, Lote, SeguimientoDiario, MortalidadDiaria, MortalidadSemanal
+from wiki.models import Category, Article
+
+User = get_user_model()
+
+
+class PlanRelacionesTest(APITestCase):
+    def test_plan_follows_sources_and_extra_relations(self):
+        """Forward relations are joined and reverse ones prefetched, nested serializers included"""
+        self.assertEqual(plan_relaciones(LoteSerializer), (['alimento', 'galpon', 'galpon__granja', 'raza'], []))
+        self.assertEqual(plan_relaciones(SeguimientoDiarioSerializer), (['lote'], []))
+        self.assertEqual(
+            plan_relaciones(BotConversationSerializer),
+            (['user'], ['messages', 'messages__detected_intent'])
+        )
+
+
+class ConsultasConstantesTest(APITestCase):
+    """Each list endpoint runs the same number of queries for one row as for several."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = User.objects.create_user(username='admin', password='clave', is_staff=True)
+        cls.empresa = Empresa.objects.create(
+            nombre="Empresa de Prueba",
+            rif="J-123456789",
+            direccion="Dirección de prueba"
+        )
+        cls.raza = Raza.objects.create(nombre="Ponedora", tipo_raza="PONEDORA", descripcion="Raza de postura")
+        cls.proveedor = Proveedor.objects.create(
+            rif="J-987654321",
+            nombre="Proveedor de Prueba",
+            contacto_principal="Contacto de prueba",
+            telefono="1234567890"
+        )
+
+    def setUp(self):
+        self.client.force_authenticate(self.usuario)
+
+    def crear_granja(self, i):
+        return Granja.objects.create(
+            empresa=self.empresa,
+            codigo_granja=f"GRANJA-{i:03}",
+            nombre=f"Granja {i}",
+            direccion="Ubicación de prueba",
+            encargado=self.usuario
+        )
+
+    def crear_galpon(self, i):
+        return Galpon.objects.create(
+            granja=self.crear_granja(i), numero_galpon=f"GALPON-{i:03}", capacidad_aves=5000, responsable=self.usuario
+        )
+
+    def crear_lote(self, i):
+        return Lote.objects.create(
+            galpon=self.crear_galpon(i),
+            raza=self.raza,
+            fecha_inicio=date(2026, 1, 1),
+            cantidad_inicial_aves=1000,
+            codigo_lote=f"LOTE-{i:03}"
+        )
+
+    def assertConsultasConstantes(self, nombre_url, crear_fila, filas=4):
+        """Query count of the list endpoint after one row equals the count after `filas` rows."""
+        url = reverse(f'api:{nombre_url}')
+        crear_fila(0)
+        with CaptureQueriesContext(connection) as una:
+            respuesta = self.client.get(url)
+        self.assertEqual(len(respuesta.data['results']), 1)
+
+        for i in range(1, filas):
+            crear_fila(i)
+        with CaptureQueriesContext(connection) as varias:
+            respuesta = self.client.get(url)
+        self.assertEqual(len(respuesta.data['results']), filas)
+        self.assertEqual(
+            len(varias), len(una),
+            '\n'.join(consulta['sql'] for consulta in varias.captured_queries)
+        )
+
+    def test_granjas(self):
+        self.assertConsultasConstantes('granja-list', self.crear_granja)
+
+    def test_galpones(self):
+        self.assertConsultasConstantes('galpon-list', self.crear_galpon)
+
+    def test_lotes(self):
+        self.assertConsultasConstantes('lote-list', self.crear_lote)
+
+    def test_seguimientos(self):
+        self.assertConsultasConstantes('seguimientodiario-list', lambda i: SeguimientoDiario.objects.create(
+            lote=self.crear_lote(i),
+            fecha_seguimiento=date(2026, 1, 1) + timedelta(days=i),
+            peso_promedio_ave=1,
+            consumo_alimento_kg=100
+        ))
+
+    def test_mortalidad_diaria(self):
+        self.assertConsultasConstantes('mortalidaddiaria-list', lambda i: MortalidadDiaria.objects.create(
+            lote=self.crear_lote(i), fecha=date(2026, 1, 1), cantidad_muertes=i
+        ))
+
+    def test_mortalidad_semanal(self):
+        self.assertConsultasConstantes('mortalidadsemanal-list', lambda i: MortalidadSemanal.objects.create(
+            lote=self.crear_lote(i), semana=1, anio=2026, total_muertes=i, porcentaje_mortalidad=0
+        ))
+
+    def test_insumos(self):
+        self.assertConsultasConstantes('insumo-list', lambda i: Insumo.objects.create(
+            nombre=f"Insumo {i}",
+            tipo_insumo="OTRO",
+            unidad_medida="kg",
+            precio_unitario=1,
+            proveedor=self.proveedor
+        ))
+
+    def test_wiki_articles(self):
+        self.assertConsultasConstantes('article-list', lambda i: Article.objects.create(
+            title=f"Artículo {i}",
+            slug=f"articulo-{i}",
+            content="Contenido",
+            category=Category.objects.create(name=f"Categoría {i}", slug=f"categoria-{i}"),
+            author=self.usuario
+        ))
+
+    def test_bot_conversations(self):
+        intencion = BotIntent.objects.create(name="saludo")
+
+        def crear_conversacion(i):
+            conversacion = BotConversation.objects.create(user=self.usuario)
+            for sender in ('USER', 'BOT'):
+                BotMessage.objects.create(conversation=conversacion, sender=sender, text="Hola", detected_intent=intencion)
+
+        self.assertConsultasConstantes('bot-conversation-list', crear_conversacion)
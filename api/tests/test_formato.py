@@ -0,0 +1,62 @@
+"""
+Tests for the columnar list format and gzip compression of API responses.
+"""
+import gzip
+import json
+
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from api.renderers import ColumnarJSONRenderer
+from avicola.models import Empresa
+from produccion.models import Granja, Galpon
+
+
+class FormatoCompactoTest(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        empresa = Empresa.objects.create(
+            nombre="Empresa de Prueba",
+            rif="J-123456789",
+            direccion="Dirección de prueba"
+        )
+        granja = Granja.objects.create(
+            empresa=empresa,
+            codigo_granja="GRANJA-001",
+            nombre="Granja de Prueba",
+            direccion="Ubicación de prueba"
+        )
+        cls.galpones = Galpon.objects.bulk_create(
+            Galpon(granja=granja, numero_galpon=f"G-{i:03}", capacidad_aves=5000) for i in range(300)
+        )
+
+    def get(self, url, **extra):
+        return self.client.get(url, {'page_size': 1000}, **extra)
+
+    def test_columnar_list_has_the_same_rows(self):
+        url = reverse('api:galpon-list')
+        filas = self.get(url).json()['results']
+
+        respuesta = self.get(url, HTTP_ACCEPT=ColumnarJSONRenderer.media_type)
+        self.assertEqual(respuesta['Content-Type'], ColumnarJSONRenderer.media_type)
+        compacto = respuesta.json()['results']
+        self.assertEqual(compacto['columns'], list(filas[0]))
+        self.assertEqual([dict(zip(compacto['columns'], fila)) for fila in compacto['rows']], filas)
+
+    def test_detail_is_unchanged(self):
+        url = reverse('api:galpon-detail', args=[self.galpones[0].pk])
+        self.assertEqual(
+            self.client.get(url, HTTP_ACCEPT=ColumnarJSONRenderer.media_type).json(),
+            self.client.get(url).json()
+        )
+
+    def test_gzip_and_columnar_shrink_large_lists(self):
+        """Compressed columnar output is a small fraction of the plain JSON list"""
+        url = reverse('api:galpon-list')
+        plano = self.get(url).content
+        respuesta = self.get(url, HTTP_ACCEPT=ColumnarJSONRenderer.media_type, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(respuesta['Content-Encoding'], 'gzip')
+        self.assertEqual(
+            len(json.loads(gzip.decompress(respuesta.content))['results']['rows']), len(self.galpones)
+        )
+        self.assertLess(len(respuesta.content) * 10, len(plano))
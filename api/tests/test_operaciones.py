@@ -0,0 +1,118 @@
+"""
+Tests for the transactional batch endpoint (/api/batch/).
+"""
+from datetime import date
+
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from api.operaciones import MAX_OPERACIONES_POR_SOLICITUD
+from avicola.models import Empresa
+from inventario.models import Raza
+from produccion.models import Granja, Galpon, Lote, SeguimientoDiario
+
+
+class OperacionesTest(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = get_user_model().objects.create_user(username='operador', password='clave')
+        cls.empresa = Empresa.objects.create(
+            nombre="Empresa de Prueba",
+            rif="J-123456789",
+            direccion="Dirección de prueba"
+        )
+        cls.raza = Raza.objects.create(nombre="Ponedora", tipo_raza="PONEDORA", descripcion="Raza de postura")
+        cls.granja = Granja.objects.create(
+            empresa=cls.empresa,
+            codigo_granja="GRANJA-001",
+            nombre="Granja de Prueba",
+            direccion="Ubicación de prueba"
+        )
+        cls.galpon = Galpon.objects.create(granja=cls.granja, numero_galpon="G-1", capacidad_aves=5000)
+
+    def setUp(self):
+        self.client.force_authenticate(self.usuario)
+
+    def enviar(self, operaciones):
+        return self.client.post(reverse('api:batch'), {'operaciones': operaciones}, format='json')
+
+    def alta_lote(self, temp_id, codigo):
+        return {
+            'recurso': 'lotes', 'op': 'create', 'temp_id': temp_id,
+            'data': {
+                'galpon': self.galpon.pk, 'raza': self.raza.pk, 'codigo_lote': codigo,
+                'fecha_inicio': '2026-01-01', 'cantidad_inicial_aves': 1000,
+            },
+        }
+
+    def alta_seguimiento(self, lote):
+        return {
+            'recurso': 'seguimientos', 'op': 'create',
+            'data': {
+                'lote': lote, 'fecha_seguimiento': '2026-01-05',
+                'peso_promedio_ave': '1.50', 'consumo_alimento_kg': '110.00',
+            },
+        }
+
+    def test_temporary_ids_are_resolved_in_later_operations(self):
+        """A row created in the batch can be referenced, updated and deleted by its temp id"""
+        respuesta = self.enviar([
+            self.alta_lote('$lote', 'LOTE-001'),
+            self.alta_seguimiento('$lote'),
+            {'recurso': 'lotes', 'op': 'update', 'id': '$lote', 'data': {'cantidad_inicial_aves': 1200}},
+            self.alta_lote('$otro', 'LOTE-002'),
+            {'recurso': 'lotes', 'op': 'delete', 'id': '$otro'},
+            {'recurso': 'galpones', 'op': 'update', 'id': self.galpon.pk, 'data': {'capacidad_aves': 6000}},
+        ])
+
+        self.assertEqual(respuesta.status_code, 200)
+        lote = Lote.objects.get(codigo_lote='LOTE-001')
+        self.assertEqual(respuesta.data['ids']['$lote'], lote.pk)
+        self.assertEqual(lote.cantidad_inicial_aves, 1200)
+        self.assertEqual(SeguimientoDiario.objects.get().lote, lote)
+        self.assertFalse(Lote.objects.filter(codigo_lote='LOTE-002').exists())
+        self.assertEqual(Galpon.objects.get(pk=self.galpon.pk).capacidad_aves, 6000)
+        self.assertEqual(
+            [(r['indice'], r['status']) for r in respuesta.data['resultados']],
+            [(0, 201), (1, 201), (2, 200), (3, 201), (4, 204), (5, 200)]
+        )
+
+    def test_failing_operation_rolls_back_the_batch(self):
+        """An invalid operation reports its index and leaves nothing applied"""
+        respuesta = self.enviar([
+            self.alta_lote('$lote', 'LOTE-001'),
+            {'recurso': 'seguimientos', 'op': 'create', 'data': {'lote': '$lote'}},
+        ])
+        self.assertEqual(respuesta.status_code, 400)
+        self.assertEqual(respuesta.data['error']['indice'], 1)
+        self.assertIn('fecha_seguimiento', respuesta.data['error']['detalle'])
+        self.assertFalse(Lote.objects.exists())
+
+        respuesta = self.enviar([
+            self.alta_lote('$lote', 'LOTE-001'),
+            {'recurso': 'galpones', 'op': 'delete', 'id': 999999},
+        ])
+        self.assertEqual((respuesta.status_code, respuesta.data['error']['indice']), (404, 1))
+        self.assertFalse(Lote.objects.exists())
+
+    def test_resource_permissions_apply(self):
+        """Each operation is checked with its ViewSet's permissions"""
+        respuesta = self.enviar([{'recurso': 'usuarios', 'op': 'delete', 'id': self.usuario.pk}])
+        self.assertEqual(respuesta.status_code, 403)
+        self.assertTrue(get_user_model().objects.filter(pk=self.usuario.pk).exists())
+
+    def test_invalid_requests(self):
+        self.assertEqual(self.enviar([{'recurso': 'nada', 'op': 'create'}]).status_code, 400)
+        self.assertEqual(self.enviar([{'recurso': 'lotes', 'op': 'upsert'}]).status_code, 400)
+        self.assertEqual(
+            self.client.post(reverse('api:batch'), [], format='json').status_code, 400
+        )
+        self.assertEqual(
+            self.enviar([{'recurso': 'lotes', 'op': 'delete', 'id': 1}] * (MAX_OPERACIONES_POR_SOLICITUD + 1)).status_code,
+            413
+        )
+
+    def test_requires_authentication(self):
+        self.client.force_authenticate(None)
+        self.assertEqual(self.enviar([]).status_code, 401)
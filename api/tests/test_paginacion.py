@@ -0,0 +1,118 @@
+"""
+Tests for cursor pagination and production filters of the API.
+"""
+from datetime import date, timedelta
+from unittest import mock
+
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from api.pagination import PaginacionCursor
+from avicola.models import Empresa
+from inventario.models import Raza
+from produccion.models import Granja, Galpon, Lote, SeguimientoDiario, MortalidadDiaria
+
+
+class PaginacionCursorTest(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.empresa = Empresa.objects.create(
+            nombre="Empresa de Prueba",
+            rif="J-123456789",
+            direccion="Dirección de prueba"
+        )
+        cls.raza = Raza.objects.create(
+            nombre="Ponedora",
+            tipo_raza="PONEDORA",
+            descripcion="Raza de postura"
+        )
+        cls.granjas = [
+            Granja.objects.create(
+                empresa=cls.empresa,
+                codigo_granja=f"GRANJA-00{i}",
+                nombre=f"Granja {i}",
+                direccion="Ubicación de prueba"
+            )
+            for i in range(2)
+        ]
+        cls.galpones = [
+            Galpon.objects.create(granja=granja, numero_galpon="GALPON-001", capacidad_aves=5000)
+            for granja in cls.granjas
+        ]
+        cls.lotes = [
+            Lote.objects.create(
+                galpon=galpon,
+                raza=cls.raza,
+                fecha_inicio=date(2026, 1, 1),
+                cantidad_inicial_aves=1000,
+                codigo_lote=f"LOTE-00{i}"
+            )
+            for i, galpon in enumerate(cls.galpones)
+        ]
+        # 10 días con un seguimiento por lote: cada fecha se repite
+        cls.inicio = date(2026, 1, 1)
+        for dia in range(10):
+            for lote in cls.lotes:
+                SeguimientoDiario.objects.create(
+                    lote=lote,
+                    fecha_seguimiento=cls.inicio + timedelta(days=dia),
+                    peso_promedio_ave=1,
+                    consumo_alimento_kg=100
+                )
+                MortalidadDiaria.objects.create(
+                    lote=lote, fecha=cls.inicio + timedelta(days=dia), cantidad_muertes=dia
+                )
+
+    def recorrer(self, url, **params):
+        """Follow the `next` links and return every page's results."""
+        paginas = []
+        respuesta = self.client.get(url, params)
+        while True:
+            self.assertEqual(respuesta.status_code, 200)
+            paginas.append(respuesta.data['results'])
+            if not respuesta.data['next']:
+                return paginas
+            respuesta = self.client.get(respuesta.data['next'])
+
+    def test_cursor_walks_every_row_once(self):
+        """Pages follow the indexed date with the id breaking ties between lotes"""
+        paginas = self.recorrer(reverse('api:seguimientodiario-list'), page_size=3)
+
+        filas = [fila for pagina in paginas for fila in pagina]
+        self.assertEqual(len(paginas), 7)
+        self.assertEqual(len(filas), 20)
+        esperado = list(SeguimientoDiario.objects.order_by('-fecha_seguimiento', '-id').values_list('id', flat=True))
+        self.assertEqual([fila['id'] for fila in filas], esperado)
+        self.assertNotIn('count', self.client.get(reverse('api:seguimientodiario-list')).data)
+
+    def test_client_ordering_by_non_unique_field(self):
+        """Ordering by a repeated value still returns every row exactly once"""
+        paginas = self.recorrer(reverse('api:mortalidaddiaria-list'), page_size=3, ordering='fecha')
+
+        ids = [fila['id'] for pagina in paginas for fila in pagina]
+        self.assertEqual(ids, list(MortalidadDiaria.objects.order_by('fecha', 'id').values_list('id', flat=True)))
+
+    def test_page_size_is_capped(self):
+        """The client page size cannot exceed max_page_size"""
+        with mock.patch.object(PaginacionCursor, 'max_page_size', 5):
+            respuesta = self.client.get(reverse('api:seguimientodiario-list'), {'page_size': 50})
+        self.assertEqual(len(respuesta.data['results']), 5)
+
+    def test_filters_by_date_range_galpon_and_granja(self):
+        """Production resources share desde/hasta, lote, galpon and granja filters"""
+        url = reverse('api:seguimientodiario-list')
+        respuesta = self.client.get(url, {
+            'desde': '2026-01-03', 'hasta': '2026-01-05', 'granja': self.granjas[1].pk, 'page_size': 100
+        })
+        self.assertEqual(
+            {(fila['lote'], fila['fecha_seguimiento']) for fila in respuesta.data['results']},
+            {(self.lotes[1].pk, f'2026-01-0{dia}') for dia in (3, 4, 5)}
+        )
+
+        respuesta = self.client.get(reverse('api:mortalidaddiaria-list'), {
+            'galpon': self.galpones[0].pk, 'desde': '2026-01-09'
+        })
+        self.assertEqual(len(respuesta.data['results']), 2)
+
+        respuesta = self.client.get(reverse('api:lote-list'), {'granja': self.granjas[0].pk})
+        self.assertEqual([fila['id'] for fila in respuesta.data['results']], [self.lotes[0].pk])
@@ -0,0 +1,173 @@
+"""
+Tests for the changes-since mode (?since=<token>) of the API.
+"""
+from datetime import date
+from unittest import skipUnless
+
+from django.db import connection
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from avicola.models import Empresa
+from core.models import RegistroCambio
+from core.sincronizacion import version_actual
+from faq.models import FAQCategory, FAQ
+from inventario.models import Raza
+from produccion.models import Granja, Galpon, Lote, MortalidadDiaria, MortalidadSemanal, SeguimientoDiario
+
+
+class CambiosDesdeTest(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.empresa = Empresa.objects.create(
+            nombre="Empresa de Prueba",
+            rif="J-123456789",
+            direccion="Dirección de prueba"
+        )
+        cls.raza = Raza.objects.create(nombre="Ponedora", tipo_raza="PONEDORA", descripcion="Raza de postura")
+        cls.granja = Granja.objects.create(
+            empresa=cls.empresa,
+            codigo_granja="GRANJA-001",
+            nombre="Granja de Prueba",
+            direccion="Ubicación de prueba"
+        )
+
+    def crear_galpon(self, numero):
+        return Galpon.objects.create(granja=self.granja, numero_galpon=numero, capacidad_aves=5000)
+
+    def cambios(self, nombre_url, since, **params):
+        respuesta = self.client.get(reverse(f'api:{nombre_url}'), {'since': since, **params})
+        self.assertEqual(respuesta.status_code, 200)
+        return respuesta.data
+
+    def test_since_zero_returns_every_row_and_a_token(self):
+        """Token 0 returns the whole table; the next call with the new token returns nothing"""
+        galpones = [self.crear_galpon(f"G-{i}") for i in range(3)]
+
+        datos = self.cambios('galpon-list', 0)
+        self.assertEqual([fila['id'] for fila in datos['results']], [galpon.pk for galpon in galpones])
+        self.assertEqual(datos['deleted'], [])
+        self.assertFalse(datos['more'])
+        self.assertEqual(datos['since'].split('.')[0], str(version_actual(Galpon)))
+
+        vacio = self.cambios('galpon-list', datos['since'])
+        self.assertEqual((vacio['results'], vacio['deleted']), ([], []))
+        self.assertEqual(vacio['since'].split('.')[0], str(version_actual(Galpon)))
+
+    def test_updates_and_deletes_after_token(self):
+        """Only rows changed after the token come back, deletions as tombstones"""
+        primero, segundo, tercero = (self.crear_galpon(f"G-{i}") for i in range(3))
+        token = self.cambios('galpon-list', 0)['since']
+
+        segundo.capacidad_aves = 6000
+        segundo.save()
+        tercero_id = tercero.pk
+        tercero.delete()
+        nuevo = self.crear_galpon("G-9")
+
+        datos = self.cambios('galpon-list', token)
+        self.assertEqual([fila['id'] for fila in datos['results']], [segundo.pk, nuevo.pk])
+        self.assertEqual(datos['results'][0]['capacidad_aves'], 6000)
+        self.assertEqual(datos['deleted'], [tercero_id])
+        # Una fila por objeto: volver a guardarlo reemplaza su versión
+        self.assertEqual(RegistroCambio.objects.filter(recurso='produccion.galpon').count(), 4)
+
+    def test_changes_are_paged_by_version(self):
+        """With more changes than the page size, `more` asks for another round"""
+        for i in range(5):
+            self.crear_galpon(f"G-{i}")
+
+        vistos, token, rondas = [], 0, 0
+        while True:
+            datos = self.cambios('galpon-list', token, page_size=2)
+            vistos += [fila['id'] for fila in datos['results']]
+            token, rondas = datos['since'], rondas + 1
+            if not datos['more']:
+                break
+        self.assertEqual(rondas, 3)
+        self.assertEqual(sorted(vistos), list(Galpon.objects.order_by('pk').values_list('pk', flat=True)))
+
+    def test_rows_leaving_the_filter_are_reported_deleted(self):
+        """A changed row the client can no longer see is sent as deleted"""
+        categoria = FAQCategory.objects.create(name="General", slug="general")
+        faq = FAQ.objects.create(category=categoria, question="¿Qué?", answer="Eso.", is_published=True)
+        token = self.cambios('faq-list', 0)['since']
+
+        faq.is_published = False
+        faq.save()
+
+        datos = self.cambios('faq-list', token)
+        self.assertEqual((datos['results'], datos['deleted']), ([], [faq.pk]))
+        # La categoría, que anida sus preguntas, también cambia
+        self.assertEqual(
+            [fila['id'] for fila in self.cambios('faqcategory-list', token)['results']], [categoria.pk]
+        )
+
+    def test_weekly_mortality_updated_in_bulk_is_tracked(self):
+        """Weekly rows maintained with UPDATE/upsert also get new versions"""
+        lote = Lote.objects.create(
+            galpon=self.crear_galpon("G-1"),
+            raza=self.raza,
+            fecha_inicio=date(2026, 1, 1),
+            cantidad_inicial_aves=1000,
+            codigo_lote="LOTE-001"
+        )
+        MortalidadDiaria.objects.create(lote=lote, fecha=date(2026, 1, 5), cantidad_muertes=3)
+        token = self.cambios('mortalidadsemanal-list', 0)['since']
+
+        MortalidadDiaria.objects.create(lote=lote, fecha=date(2026, 1, 6), cantidad_muertes=2)
+
+        datos = self.cambios('mortalidadsemanal-list', token)
+        semana = MortalidadSemanal.objects.get(lote=lote)
+        self.assertEqual([(fila['id'], fila['total_muertes']) for fila in datos['results']], [(semana.pk, 5)])
+
+    def test_daily_mortality_marks_later_daily_records(self):
+        """Live birds of a daily record change with mortality, so records from that day on are sent again"""
+        lote = Lote.objects.create(
+            galpon=self.crear_galpon("G-1"),
+            raza=self.raza,
+            fecha_inicio=date(2026, 1, 1),
+            cantidad_inicial_aves=1000,
+            codigo_lote="LOTE-001"
+        )
+        anterior, posterior = (
+            SeguimientoDiario.objects.create(
+                lote=lote, fecha_seguimiento=date(2026, 1, dia), peso_promedio_ave=1.5, consumo_alimento_kg=100
+            )
+            for dia in (4, 6)
+        )
+        token = self.cambios('seguimientodiario-list', 0)['since']
+
+        mortalidad = MortalidadDiaria.objects.create(lote=lote, fecha=date(2026, 1, 5), cantidad_muertes=3)
+        datos = self.cambios('seguimientodiario-list', token)
+        self.assertEqual(
+            [(fila['id'], fila['aves_presentes_count']) for fila in datos['results']], [(posterior.pk, 997)]
+        )
+
+        token = datos['since']
+        mortalidad.fecha = date(2026, 1, 3)
+        mortalidad.save()
+        datos = self.cambios('seguimientodiario-list', token)
+        self.assertEqual(
+            sorted((fila['id'], fila['aves_presentes_count']) for fila in datos['results']),
+            [(anterior.pk, 997), (posterior.pk, 997)]
+        )
+
+    @skipUnless(connection.vendor == 'postgresql', "Transacciones concurrentes solo en PostgreSQL")
+    def test_changes_of_unfinished_transactions_are_sent_again(self):
+        """A change from a transaction running when the token was made is sent even with a lower version"""
+        primero, segundo = self.crear_galpon("G-1"), self.crear_galpon("G-2")
+        token = self.cambios('galpon-list', 0)['since']
+        _, marca = token.split('.')
+
+        # Como si otra transacción, abierta al emitir el token, confirmara ahora
+        RegistroCambio.objects.filter(recurso='produccion.galpon', objeto_id=primero.pk).update(
+            transaccion=int(marca) + 1
+        )
+        datos = self.cambios('galpon-list', token)
+        self.assertEqual([fila['id'] for fila in datos['results']], [primero.pk])
+
+    def test_invalid_token(self):
+        for token in ('abc', '-1', '1.2.3', '5.'):
+            respuesta = self.client.get(reverse('api:galpon-list'), {'since': token})
+            self.assertEqual(respuesta.status_code, 400)
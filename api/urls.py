@@ -11,7 +11,7 @@ from .views import (
     AlimentoViewSet, VacunaViewSet, InsumoViewSet, 
     GuiaDesempenoRazaViewSet, CategoryViewSet, ArticleViewSet,
     FAQCategoryViewSet, FAQViewSet, BotConversationViewSet,
-    EstadisticasViewSet, ComparacionRazasView
+    EstadisticasViewSet, ComparacionRazasView, IngestaLecturasView, OperacionesView
 )
 
 # Configuración del router para la API
@@ -46,6 +46,12 @@ urlpatterns = [
     path('token/', TokenObtainPairView.as_view(), name='token_obtain_pair'),
     path('token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
     
+    # Ingesta masiva de lecturas de sensores
+    path('sensores/lecturas/ingesta/', IngestaLecturasView.as_view(), name='sensores-ingesta'),
+    
+    # Altas, modificaciones y bajas en bloque (sincronización offline)
+    path('batch/', OperacionesView.as_view(), name='batch'),
+    
     # Rutas para comparación de razas
     path('comparacion-razas/', ComparacionRazasView.as_view(), name='comparacion-razas-lista'),
     path('comparacion-razas/<str:raza_id>/<str:lote_id>/', ComparacionRazasView.as_view(), name='comparacion-razas-detalle'),
@@ -2,7 +2,7 @@ from rest_framework import viewsets, permissions, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework.filters import SearchFilter, OrderingFilter
+from rest_framework.filters import SearchFilter
 from rest_framework.views import APIView
 
 from avicola.models import UserProfile
@@ -12,6 +12,14 @@ from wiki.models import Category, Article, Attachment
 from faq.models import FAQCategory, FAQ
 from bot.models import BotIntent, BotConversation, BotMessage
 
+from .condicional import VersionesMixin
+from .consultas import ConsultaPlanificadaMixin
+from .sincronizacion import CambiosDesdeMixin
+from .filters import (
+    OrderingEstable, GranjaFilter, GalponFilter, LoteFilter,
+    SeguimientoDiarioFilter, MortalidadDiariaFilter, MortalidadSemanalFilter
+)
+
 # Importar serializadores de usuario
 from .serializers import UserSerializer
 
@@ -33,6 +41,12 @@ from .serializers_faq import FAQCategorySerializer, FAQSerializer
 from .serializers_bot import BotConversationSerializer, BotMessageSerializer, BotMessageCreateSerializer
 from .serializers_estadisticas import EstadisticasSerializer
 
+# Importar ingesta de sensores
+from sensores.ingesta import ErrorIngesta, MAX_LECTURAS_POR_SOLICITUD, ingerir_lecturas, parsear_lecturas
+
+# Importar operaciones en bloque
+from .operaciones import ErrorOperacion, MAX_OPERACIONES_POR_SOLICITUD, aplicar_operaciones
+
 # Importar funciones de estadísticas
 from core.estadisticas import obtener_estadisticas_dashboard, obtener_estadisticas_produccion, obtener_estadisticas_mortalidad, obtener_estadisticas_ventas, obtener_distribucion_tipos_huevo, obtener_resumen_inventario
 
@@ -42,111 +56,125 @@ import os
 from django.conf import settings
 
 
-class UserViewSet(viewsets.ModelViewSet):
+class UserViewSet(CambiosDesdeMixin, VersionesMixin, ConsultaPlanificadaMixin, viewsets.ModelViewSet):
     """
     API endpoint para visualizar y editar usuarios.
     """
     queryset = UserProfile.objects.all().order_by('-date_joined')
     serializer_class = UserSerializer
     permission_classes = [permissions.IsAdminUser]
-    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
+    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingEstable]
     search_fields = ['username', 'email', 'first_name', 'last_name']
     ordering_fields = ['username', 'date_joined']
+    ordering = ['-date_joined', '-id']
 
 
-class RazaViewSet(viewsets.ModelViewSet):
+class RazaViewSet(CambiosDesdeMixin, VersionesMixin, ConsultaPlanificadaMixin, viewsets.ModelViewSet):
     """
     API endpoint para visualizar y editar razas de aves.
     """
     queryset = Raza.objects.all()
     serializer_class = RazaSerializer
-    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
+    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingEstable]
     search_fields = ['nombre', 'tipo_raza', 'descripcion']
     filterset_fields = ['tipo_raza']
     ordering_fields = ['nombre']
+    ordering = ['id']
 
 
-class AlimentoViewSet(viewsets.ModelViewSet):
+class AlimentoViewSet(CambiosDesdeMixin, VersionesMixin, ConsultaPlanificadaMixin, viewsets.ModelViewSet):
     """
     API endpoint para visualizar y editar alimentos.
     """
     queryset = Alimento.objects.all()
     serializer_class = AlimentoSerializer
-    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
+    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingEstable]
     search_fields = ['nombre', 'descripcion', 'tipo_alimento']
     filterset_fields = ['etapa', 'tipo_alimento']
     ordering_fields = ['nombre']
+    ordering = ['id']
 
 
-class GranjaViewSet(viewsets.ModelViewSet):
+class GranjaViewSet(CambiosDesdeMixin, VersionesMixin, ConsultaPlanificadaMixin, viewsets.ModelViewSet):
     """
     API endpoint para visualizar y editar granjas.
     """
     queryset = Granja.objects.all()
     serializer_class = GranjaSerializer
-    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
+    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingEstable]
     search_fields = ['nombre', 'codigo_granja', 'direccion']
-    filterset_fields = ['estado']
+    filterset_class = GranjaFilter
     ordering_fields = ['nombre', 'codigo_granja']
+    ordering = ['id']
 
 
-class GalponViewSet(viewsets.ModelViewSet):
+class GalponViewSet(CambiosDesdeMixin, VersionesMixin, ConsultaPlanificadaMixin, viewsets.ModelViewSet):
     """
     API endpoint para visualizar y editar galpones.
     """
     queryset = Galpon.objects.all()
     serializer_class = GalponSerializer
-    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
+    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingEstable]
     search_fields = ['numero_galpon']
-    filterset_fields = ['granja', 'tipo_galpon']
-    ordering_fields = ['granja', 'numero_galpon']
+    filterset_class = GalponFilter
+    ordering_fields = ['granja_id', 'numero_galpon']
+    ordering = ['id']
 
 
-class LoteViewSet(viewsets.ModelViewSet):
+class LoteViewSet(CambiosDesdeMixin, VersionesMixin, ConsultaPlanificadaMixin, viewsets.ModelViewSet):
     """
     API endpoint para visualizar y editar lotes.
     """
     queryset = Lote.objects.all()
     serializer_class = LoteSerializer
-    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
+    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingEstable]
     search_fields = ['codigo_lote']
-    filterset_fields = ['galpon', 'raza', 'estado']
-    ordering_fields = ['fecha_ingreso', 'codigo_lote']
+    filterset_class = LoteFilter
+    ordering_fields = ['fecha_inicio', 'codigo_lote']
+    ordering = ['-fecha_inicio', '-id']
 
 
-class SeguimientoDiarioViewSet(viewsets.ModelViewSet):
+class SeguimientoDiarioViewSet(CambiosDesdeMixin, VersionesMixin, ConsultaPlanificadaMixin, viewsets.ModelViewSet):
     """
     API endpoint para visualizar y editar seguimientos diarios.
     """
-    queryset = SeguimientoDiario.objects.all()
+    # aves_presentes_count lee la anotación aves_vivas; sin ella hace una
+    # consulta por fila
+    queryset = SeguimientoDiario.objects.con_aves_vivas()
     serializer_class = SeguimientoDiarioSerializer
-    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
-    filterset_fields = ['lote', 'fecha_seguimiento', 'tipo_seguimiento']
+    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingEstable]
+    filterset_class = SeguimientoDiarioFilter
     ordering_fields = ['fecha_seguimiento']
+    ordering = ['-fecha_seguimiento', '-id']
+    # aves_presentes_count (aves_vivas) sale del resumen diario, que también
+    # cambia con la mortalidad
+    modelos_version_extra = ['produccion.MortalidadDiaria']
 
 
 # Vistas para Wiki
-class CategoryViewSet(viewsets.ModelViewSet):
+class CategoryViewSet(CambiosDesdeMixin, VersionesMixin, ConsultaPlanificadaMixin, viewsets.ModelViewSet):
     """
     API endpoint para visualizar y editar categorías de la Wiki.
     """
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
-    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
+    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingEstable]
     search_fields = ['name', 'description']
     ordering_fields = ['order', 'name']
+    ordering = ['id']
     lookup_field = 'slug'
 
 
-class ArticleViewSet(viewsets.ModelViewSet):
+class ArticleViewSet(CambiosDesdeMixin, VersionesMixin, ConsultaPlanificadaMixin, viewsets.ModelViewSet):
     """
     API endpoint para visualizar y editar artículos de la Wiki.
     """
     queryset = Article.objects.all()
-    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
+    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingEstable]
     search_fields = ['title', 'content']
     filterset_fields = ['category', 'is_published']
     ordering_fields = ['updated_at', 'title']
+    ordering = ['-updated_at', '-id']
     lookup_field = 'slug'
     
     def get_serializer_class(self):
@@ -164,50 +192,56 @@ class ArticleViewSet(viewsets.ModelViewSet):
 
 
 # Vistas para FAQ
-class FAQCategoryViewSet(viewsets.ModelViewSet):
+class FAQCategoryViewSet(CambiosDesdeMixin, VersionesMixin, ConsultaPlanificadaMixin, viewsets.ModelViewSet):
     """
     API endpoint para visualizar y editar categorías de FAQ.
     """
     queryset = FAQCategory.objects.all()
     serializer_class = FAQCategorySerializer
-    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
+    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingEstable]
     search_fields = ['name', 'description']
     ordering_fields = ['order', 'name']
+    ordering = ['id']
     lookup_field = 'slug'
 
 
-class FAQViewSet(viewsets.ModelViewSet):
+class FAQViewSet(CambiosDesdeMixin, VersionesMixin, ConsultaPlanificadaMixin, viewsets.ModelViewSet):
     """
     API endpoint para visualizar y editar preguntas frecuentes.
     """
     queryset = FAQ.objects.all()
     serializer_class = FAQSerializer
-    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
+    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingEstable]
     search_fields = ['question', 'answer']
     filterset_fields = ['category', 'is_published']
     ordering_fields = ['order', 'question']
+    ordering = ['id']
     
     def get_queryset(self):
+        queryset = super().get_queryset()
         # Solo mostrar FAQs publicadas para usuarios no administradores
         if self.request.user.is_staff:
-            return FAQ.objects.all()
-        return FAQ.objects.filter(is_published=True)
+            return queryset
+        return queryset.filter(is_published=True)
 
 
 # Vistas para Bot
-class BotConversationViewSet(viewsets.ModelViewSet):
+class BotConversationViewSet(CambiosDesdeMixin, VersionesMixin, ConsultaPlanificadaMixin, viewsets.ModelViewSet):
     """
     API endpoint para gestionar conversaciones con el bot.
     """
+    queryset = BotConversation.objects.all()
     serializer_class = BotConversationSerializer
-    filter_backends = [DjangoFilterBackend, OrderingFilter]
+    filter_backends = [DjangoFilterBackend, OrderingEstable]
     ordering_fields = ['start_time']
+    ordering = ['-start_time', '-id']
     
     def get_queryset(self):
+        queryset = super().get_queryset()
         # Los usuarios solo pueden ver sus propias conversaciones
         if self.request.user.is_staff:
-            return BotConversation.objects.all()
-        return BotConversation.objects.filter(user=self.request.user)
+            return queryset
+        return queryset.filter(user=self.request.user)
     
     def perform_create(self, serializer):
         # Asignar el usuario actual como propietario de la conversación
@@ -241,73 +275,79 @@ class BotConversationViewSet(viewsets.ModelViewSet):
 
 
 # ViewSets adicionales para Inventario
-class ProveedorViewSet(viewsets.ModelViewSet):
+class ProveedorViewSet(CambiosDesdeMixin, VersionesMixin, ConsultaPlanificadaMixin, viewsets.ModelViewSet):
     """
     API endpoint para visualizar y editar proveedores.
     """
     queryset = Proveedor.objects.all()
     serializer_class = ProveedorSerializer
-    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
+    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingEstable]
     search_fields = ['nombre', 'rif', 'contacto_principal']
     ordering_fields = ['nombre']
+    ordering = ['id']
 
 
-class VacunaViewSet(viewsets.ModelViewSet):
+class VacunaViewSet(CambiosDesdeMixin, VersionesMixin, ConsultaPlanificadaMixin, viewsets.ModelViewSet):
     """
     API endpoint para visualizar y editar vacunas.
     """
     queryset = Vacuna.objects.all()
     serializer_class = VacunaSerializer
-    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
+    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingEstable]
     search_fields = ['nombre_comercial', 'enfermedad_objetivo']
     filterset_fields = ['proveedor']
     ordering_fields = ['nombre_comercial']
+    ordering = ['id']
 
 
-class InsumoViewSet(viewsets.ModelViewSet):
+class InsumoViewSet(CambiosDesdeMixin, VersionesMixin, ConsultaPlanificadaMixin, viewsets.ModelViewSet):
     """
     API endpoint para visualizar y editar insumos.
     """
     queryset = Insumo.objects.all()
     serializer_class = InsumoSerializer
-    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
+    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingEstable]
     search_fields = ['nombre', 'descripcion']
     filterset_fields = ['tipo_insumo', 'proveedor']
     ordering_fields = ['nombre']
+    ordering = ['id']
 
 
-class GuiaDesempenoRazaViewSet(viewsets.ModelViewSet):
+class GuiaDesempenoRazaViewSet(CambiosDesdeMixin, VersionesMixin, ConsultaPlanificadaMixin, viewsets.ModelViewSet):
     """
     API endpoint para visualizar y editar guías de desempeño por raza.
     """
     queryset = GuiaDesempenoRaza.objects.all()
     serializer_class = GuiaDesempenoRazaSerializer
-    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
+    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingEstable]
     filterset_fields = ['raza', 'dia_edad']
-    ordering_fields = ['raza', 'dia_edad']
+    ordering_fields = ['raza_id', 'dia_edad']
+    ordering = ['id']
 
 
 # ViewSets adicionales para Producción
-class MortalidadDiariaViewSet(viewsets.ModelViewSet):
+class MortalidadDiariaViewSet(CambiosDesdeMixin, VersionesMixin, ConsultaPlanificadaMixin, viewsets.ModelViewSet):
     """
     API endpoint para visualizar y editar registros de mortalidad diaria.
     """
     queryset = MortalidadDiaria.objects.all()
     serializer_class = MortalidadDiariaSerializer
-    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
-    filterset_fields = ['lote', 'fecha']
-    ordering_fields = ['-fecha']
+    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingEstable]
+    filterset_class = MortalidadDiariaFilter
+    ordering_fields = ['fecha']
+    ordering = ['-fecha', '-id']
 
 
-class MortalidadSemanalViewSet(viewsets.ModelViewSet):
+class MortalidadSemanalViewSet(CambiosDesdeMixin, VersionesMixin, ConsultaPlanificadaMixin, viewsets.ModelViewSet):
     """
     API endpoint para visualizar y editar registros de mortalidad semanal.
     """
     queryset = MortalidadSemanal.objects.all()
     serializer_class = MortalidadSemanalSerializer
-    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
-    filterset_fields = ['lote', 'semana', 'anio']
-    ordering_fields = ['-anio', '-semana']
+    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingEstable]
+    filterset_class = MortalidadSemanalFilter
+    ordering_fields = ['anio', 'semana']
+    ordering = ['-id']
 
 
 # ViewSet para Estadísticas
@@ -423,6 +463,63 @@ class EstadisticasViewSet(viewsets.ViewSet):
         return Response(serializer.data)
 
 
+class IngestaLecturasView(APIView):
+    """
+    API endpoint para la ingesta masiva de lecturas de sensores desde un gateway.
+    
+    Acepta una lista JSON (o {"lecturas": [...]}), JSON lines
+    (application/x-ndjson) o CSV compacto (text/csv) con lecturas de
+    cualquier cantidad de sensores identificados por su código.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    
+    def post(self, request):
+        try:
+            filas = parsear_lecturas(request.body, request.content_type)
+        except ErrorIngesta as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        
+        if len(filas) > MAX_LECTURAS_POR_SOLICITUD:
+            return Response(
+                {"error": f"Máximo {MAX_LECTURAS_POR_SOLICITUD} lecturas por solicitud"},
+                status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+            )
+        
+        resultado = ingerir_lecturas(filas)
+        if resultado['errores'] and not resultado['guardadas']:
+            return Response(resultado, status=status.HTTP_400_BAD_REQUEST)
+        return Response(resultado, status=status.HTTP_201_CREATED)
+
+
+class OperacionesView(APIView):
+    """
+    API endpoint para aplicar en una transacción una lista ordenada de altas,
+    modificaciones y bajas sobre los recursos de la API ({"operaciones": [...]}).
+
+    Las altas pueden llevar un temp_id ("$...") que las operaciones siguientes
+    usan en lugar del id real. Si una falla no se aplica ninguna y la respuesta
+    lleva el código y el índice de la que falló.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request):
+        operaciones = request.data.get('operaciones') if isinstance(request.data, dict) else None
+        if not isinstance(operaciones, list):
+            return Response({"error": "Se espera {\"operaciones\": [...]}"}, status=status.HTTP_400_BAD_REQUEST)
+
+        if len(operaciones) > MAX_OPERACIONES_POR_SOLICITUD:
+            return Response(
+                {"error": f"Máximo {MAX_OPERACIONES_POR_SOLICITUD} operaciones por solicitud"},
+                status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+            )
+
+        try:
+            resultado = aplicar_operaciones(request, operaciones)
+        except ErrorOperacion as e:
+            return Response({"error": {"indice": e.indice, "detalle": e.detalle}}, status=e.codigo)
+        return Response(resultado, status=status.HTTP_200_OK)
+
+
 # Vista para Comparación de Razas
 class ComparacionRazasView(APIView):
     """
@@ -8,7 +8,7 @@ from django.utils import timezone
 from datetime import timedelta
 import json
 
-from produccion.models import Lote, SeguimientoDiario, MortalidadDiaria
+from produccion.models import Lote, SeguimientoDiario, MortalidadDiaria, ResumenDiarioLote
 from inventario.models import ConsumoAlimento, AplicacionVacuna
 
 @login_required
@@ -20,30 +20,33 @@ def graficos(request):
     hoy = timezone.now().date()
     inicio_mes = hoy.replace(day=1)
     
-    # Datos de producción de huevos (últimos 30 días)
+    # Las series diarias se leen del resumen materializado por lote
+    # (produccion.ResumenDiarioLote) en lugar de los registros de origen
     fecha_limite = hoy - timedelta(days=30)
-    produccion_huevos = SeguimientoDiario.objects.filter(
-        fecha_seguimiento__gte=fecha_limite,
+    resumen = ResumenDiarioLote.objects.filter(fecha__gte=fecha_limite)
+    
+    # Datos de producción de huevos (últimos 30 días)
+    produccion_huevos = resumen.filter(
         huevos_totales__gt=0
-    ).values('fecha_seguimiento').annotate(
+    ).values('fecha').annotate(
         total_huevos=Sum('huevos_totales'),
         huevos_rotos=Sum('huevos_rotos'),
         huevos_sucios=Sum('huevos_sucios')
-    ).order_by('fecha_seguimiento')
+    ).order_by('fecha')
     
     # Datos de mortalidad (últimos 30 días)
-    mortalidad = MortalidadDiaria.objects.filter(
-        fecha__gte=fecha_limite
+    mortalidad = resumen.filter(
+        mortalidad__isnull=False
     ).values('fecha').annotate(
-        total_muertes=Sum('cantidad_muertes')
+        total_muertes=Sum('mortalidad')
     ).order_by('fecha')
     
     # Datos de consumo de alimento (últimos 30 días)
-    consumo_alimento = ConsumoAlimento.objects.filter(
-        fecha_consumo__gte=fecha_limite
-    ).values('fecha_consumo').annotate(
-        total_kg=Sum('cantidad_kg')
-    ).order_by('fecha_consumo')
+    consumo_alimento = resumen.filter(
+        consumo_alimento_kg__isnull=False
+    ).values('fecha').annotate(
+        total_kg=Sum('consumo_alimento_kg')
+    ).order_by('fecha')
     
     # Preparar datos para los gráficos
     datos_graficos = {
@@ -54,7 +57,7 @@ def graficos(request):
     
     for p in produccion_huevos:
         datos_graficos['produccion_huevos'].append({
-            'fecha': p['fecha_seguimiento'].strftime('%Y-%m-%d'),
+            'fecha': p['fecha'].strftime('%Y-%m-%d'),
             'total': float(p['total_huevos'] or 0),
             'rotos': float(p['huevos_rotos'] or 0),
             'sucios': float(p['huevos_sucios'] or 0)
@@ -68,7 +71,7 @@ def graficos(request):
     
     for c in consumo_alimento:
         datos_graficos['consumo_alimento'].append({
-            'fecha': c['fecha_consumo'].strftime('%Y-%m-%d'),
+            'fecha': c['fecha'].strftime('%Y-%m-%d'),
             'kg': float(c['total_kg'] or 0)
         })
     
@@ -3,7 +3,9 @@ from django.contrib.auth.decorators import login_required, permission_required
 from django.db.models import Count, Q, Sum, F, Avg
 from django.utils import timezone
 from datetime import timedelta
+from decimal import Decimal
 from produccion.models import Galpon, Lote, SeguimientoDiario, ConsumoEnergia
+from produccion.energia import eficiencia_energetica
 from ventas.models import Venta, InventarioHuevos
 
 @login_required
@@ -16,7 +18,7 @@ def dashboard_supervisor(request):
     
     # Obtener galpones con información de lotes activos
     galpones = Galpon.objects.annotate(
-        lotes_activos=Count('lote', filter=Q(lote__estado__in=['INICIAL', 'CRECIMIENTO', 'PRODUCCION']), distinct=True)
+        lotes_activos=Count('lotes', filter=Q(lotes__estado__in=['INICIAL', 'CRECIMIENTO', 'PRODUCCION']), distinct=True)
     ).select_related('granja')
     
     # Obtener todos los lotes (activos e inactivos)
@@ -37,24 +39,23 @@ def dashboard_supervisor(request):
         total_mortalidad=Sum('mortalidad')
     )
     
-    # Obtener estadísticas de energía
-    consumo_hoy = ConsumoEnergia.objects.filter(
-        fecha_registro=hoy
-    ).aggregate(
+    # Obtener estadísticas de energía: totales y eficiencia por galpón del mes,
+    # agrupados en la base de datos
+    eficiencia_mes = eficiencia_energetica('mes', desde=inicio_mes, hasta=hoy)
+    consumo_hoy = ConsumoEnergia.objects.filter(fecha_registro=hoy).aggregate(
         total_consumo=Sum('consumo_kwh')
     )
+    consumo_mes = sum((fila['consumo_kwh'] for fila in eficiencia_mes), Decimal(0))
     
-    consumo_mes = ConsumoEnergia.objects.filter(
-        fecha_registro__month=hoy.month,
-        fecha_registro__year=hoy.year
-    ).aggregate(
-        total_consumo=Sum('consumo_kwh')
-    )
+    nombres_galpon = {galpon.pk: str(galpon) for galpon in galpones}
+    for fila in eficiencia_mes:
+        fila['galpon'] = nombres_galpon.get(fila['galpon_id'])
     
     estadisticas_energia = {
         'consumo_diario': consumo_hoy['total_consumo'] or 0,
-        'consumo_mensual': consumo_mes['total_consumo'] or 0,
-        'costo_estimado': (consumo_mes['total_consumo'] or 0) * 0.15  # Ajustar según tarifa
+        'consumo_mensual': consumo_mes,
+        'costo_estimado': consumo_mes * Decimal('0.15'),  # Ajustar según tarifa
+        'eficiencia_galpones': eficiencia_mes,
     }
     
     # Obtener estadísticas de ventas
@@ -1,10 +1,10 @@
-from django.db.models import Count, Sum, Avg
+from django.db.models import Count, Sum, Avg, Q
 from django.db.models.functions import TruncDay, TruncWeek, TruncMonth
 from django.utils import timezone
 from datetime import timedelta
 
-from produccion.models import SeguimientoDiario, Lote, MortalidadDiaria
-from ventas.models import Venta, DetalleVenta
+from produccion.models import SeguimientoDiario, Lote, MortalidadDiaria, ResumenDiarioLote
+from ventas.models import Venta, DetalleVenta, TipoHuevo
 from inventario.models import Alimento, Vacuna
 
 def obtener_estadisticas_produccion(periodo='semana'):
@@ -30,12 +30,14 @@ def obtener_estadisticas_produccion(periodo='semana'):
         truncate_func = TruncMonth
         fecha_format = '%b %Y'
     
-    # Obtener datos de producción de huevos
-    datos_produccion = SeguimientoDiario.objects.filter(
-        fecha_seguimiento__gte=fecha_inicio,
-        fecha_seguimiento__lte=fecha_actual
+    # Obtener datos de producción de huevos desde el resumen diario por lote
+    # (huevos_totales es NULL en los días sin seguimiento)
+    datos_produccion = ResumenDiarioLote.objects.filter(
+        fecha__gte=fecha_inicio,
+        fecha__lte=fecha_actual,
+        huevos_totales__isnull=False
     ).annotate(
-        periodo=truncate_func('fecha_seguimiento')
+        periodo=truncate_func('fecha')
     ).values('periodo').annotate(
         total_huevos=Sum('huevos_totales')
     ).order_by('periodo')
@@ -179,15 +181,11 @@ def obtener_distribucion_tipos_huevo():
     labels = []
     datos = []
     
+    # El display value del choice field se resuelve sin consultar cada TipoHuevo
+    clasificaciones = dict(TipoHuevo.CLASIFICACION_CHOICES)
+    
     for item in datos_tipos_huevo:
-        # Obtener el display value del choice field
-        from ventas.models import TipoHuevo
-        try:
-            tipo_huevo = TipoHuevo.objects.get(clasificacion=item['tipo_huevo__clasificacion'])
-            label = tipo_huevo.get_clasificacion_display()
-        except TipoHuevo.DoesNotExist:
-            label = item['tipo_huevo__clasificacion']
-            
+        label = clasificaciones.get(item['tipo_huevo__clasificacion'], item['tipo_huevo__clasificacion'])
         labels.append(label)
         datos.append(item['total'])
     
@@ -208,10 +206,13 @@ def obtener_resumen_inventario():
     vacunas = Vacuna.objects.all()
     total_vacunas = vacunas.count()
     
-    # Obtener datos de lotes
-    lotes = Lote.objects.all()
-    total_lotes = lotes.count()
-    lotes_activos = lotes.filter(estado='activo').count()
+    # Obtener datos de lotes (total y activos en una sola consulta)
+    lotes = Lote.objects.aggregate(
+        total=Count('id'),
+        activos=Count('id', filter=Q(estado='activo'))
+    )
+    total_lotes = lotes['total']
+    lotes_activos = lotes['activos']
     
     return {
         'total_alimentos': total_alimentos,
@@ -305,14 +306,125 @@ def obtener_estadisticas_engorde(periodo='semana', lote_id=None, galpon_id=None)
         'datos_relacion_energia_proteina': datos_relacion_energia_proteina
     }
 
-def obtener_estadisticas_por_galpon(periodo='semana'):
+
+# Campos promediados en las series de engorde: (campo de origen, clave de la serie)
+CAMPOS_ENGORDE = [
+    ('seguimiento_diario__peso_promedio_ave', 'datos_peso'),
+    ('ganancia_diaria_peso', 'datos_ganancia'),
+    ('conversion_alimenticia', 'datos_conversion'),
+    ('eficiencia_energetica', 'datos_eficiencia_energetica'),
+    ('eficiencia_proteica', 'datos_eficiencia_proteica'),
+    ('relacion_energia_proteina', 'datos_relacion_energia_proteina'),
+]
+
+def _rango_periodo(periodo, dias=7):
     """
-    Obtiene estadísticas comparativas por galpón.
+    Devuelve (fecha_inicio, fecha_actual, función de truncado, formato de etiqueta)
+    para el período. `dias` es la cantidad de días del período 'dia'.
     """
-    from produccion.models import Galpon
+    fecha_actual = timezone.now().date()
     
-    # Obtener todos los galpones activos
-    galpones = Galpon.objects.filter(lotes__estado='PRODUCCION').distinct()
+    if periodo == 'dia':
+        return fecha_actual - timedelta(days=dias - 1), fecha_actual, TruncDay, '%d/%m'
+    elif periodo == 'semana':
+        # Últimas 8 semanas
+        return fecha_actual - timedelta(weeks=7), fecha_actual, TruncWeek, 'Sem %W'
+    # Últimos 6 meses
+    return (fecha_actual - timedelta(days=180)).replace(day=1), fecha_actual, TruncMonth, '%b %Y'
+
+def _seguimientos_agrupados(periodo):
+    """
+    Agrupa SeguimientoDiario por galpón y período en una sola consulta.
+    Cada fila trae la producción y mortalidad del período y la mortalidad de
+    los últimos 30 días, de modo que las series globales y las de cada galpón
+    se arman en memoria sin volver a consultar.
+    """
+    fecha_inicio, fecha_actual, truncate_func, _ = _rango_periodo(periodo)
+    hace_30_dias = fecha_actual - timedelta(days=30)
+    en_rango = Q(fecha_seguimiento__gte=fecha_inicio, fecha_seguimiento__lte=fecha_actual)
+    
+    return SeguimientoDiario.objects.filter(
+        fecha_seguimiento__gte=min(fecha_inicio, hace_30_dias)
+    ).annotate(
+        periodo=truncate_func('fecha_seguimiento')
+    ).values('lote__galpon', 'periodo').annotate(
+        total_huevos=Sum('huevos_totales', filter=en_rango),
+        total_mortalidad=Sum('mortalidad', filter=en_rango & Q(mortalidad__gt=0)),
+        mortalidad_30_dias=Sum('mortalidad', filter=Q(fecha_seguimiento__gte=hace_30_dias, mortalidad__gt=0))
+    ).order_by('periodo')
+
+def _engorde_agrupado(periodo):
+    """
+    Agrupa SeguimientoEngorde por galpón y período en una sola consulta.
+    Se guardan sumas y conteos en lugar de promedios para poder combinar los
+    grupos por período o por galpón con el mismo resultado que un Avg.
+    """
+    from produccion.models import SeguimientoEngorde
+    
+    fecha_inicio, fecha_actual, truncate_func, _ = _rango_periodo(periodo, dias=14)
+    
+    agregados = {}
+    for i, (campo, _) in enumerate(CAMPOS_ENGORDE):
+        agregados[f'suma_{i}'] = Sum(campo)
+        agregados[f'conteo_{i}'] = Count(campo)
+    
+    return SeguimientoEngorde.objects.filter(
+        seguimiento_diario__fecha_seguimiento__gte=fecha_inicio,
+        seguimiento_diario__fecha_seguimiento__lte=fecha_actual
+    ).annotate(
+        periodo=truncate_func('seguimiento_diario__fecha_seguimiento')
+    ).values('seguimiento_diario__lote__galpon', 'periodo').annotate(
+        **agregados
+    ).order_by('periodo')
+
+def _promedio(suma, conteo):
+    return float(suma) / conteo if conteo and suma else 0
+
+def _serie_por_periodo(filas, clave, fecha_format):
+    """
+    Suma `clave` de las filas agrupadas por galpón y período, omitiendo los
+    períodos sin datos (igual que la consulta agrupada solo por período).
+    """
+    totales = {}
+    for fila in filas:
+        if fila[clave] is not None:
+            totales[fila['periodo']] = totales.get(fila['periodo'], 0) + fila[clave]
+    
+    periodos = sorted(totales)
+    return {
+        'labels': [p.strftime(fecha_format) for p in periodos],
+        'datos': [totales[p] for p in periodos]
+    }
+
+def _serie_engorde(filas, fecha_format):
+    """Combina las filas de _engorde_agrupado en la serie global por período."""
+    acumulado = {}
+    for fila in filas:
+        totales = acumulado.setdefault(fila['periodo'], [0] * (2 * len(CAMPOS_ENGORDE)))
+        for i in range(len(CAMPOS_ENGORDE)):
+            totales[2 * i] += fila[f'suma_{i}'] or 0
+            totales[2 * i + 1] += fila[f'conteo_{i}']
+    
+    periodos = sorted(acumulado)
+    resultado = {'labels': [p.strftime(fecha_format) for p in periodos]}
+    for i, (_, clave) in enumerate(CAMPOS_ENGORDE):
+        resultado[clave] = [
+            _promedio(acumulado[p][2 * i], acumulado[p][2 * i + 1]) for p in periodos
+        ]
+    return resultado
+
+def _comparativo_galpones(galpones, filas_engorde, mortalidad_por_galpon):
+    """
+    Arma las estadísticas comparativas por galpón a partir de datos ya agrupados.
+    El valor de cada galpón es el promedio de sus promedios por período.
+    """
+    promedios_por_galpon = {}
+    for fila in filas_engorde:
+        promedios = promedios_por_galpon.setdefault(
+            fila['seguimiento_diario__lote__galpon'], [[] for _ in CAMPOS_ENGORDE]
+        )
+        for i in range(len(CAMPOS_ENGORDE)):
+            promedios[i].append(_promedio(fila[f'suma_{i}'], fila[f'conteo_{i}']))
     
     resultado = {
         'labels': [],
@@ -326,86 +438,66 @@ def obtener_estadisticas_por_galpon(periodo='semana'):
     }
     
     for galpon in galpones:
-        # Añadir etiqueta del galpón
         resultado['labels'].append(f"Galpón {galpon.numero_galpon}")
         
-        # Obtener estadísticas de engorde para este galpón
-        stats_engorde = obtener_estadisticas_engorde(periodo, galpon_id=galpon.id)
-        
-        # Calcular promedios para este galpón
-        if stats_engorde['datos_peso']:
-            resultado['datos_peso'].append(sum(stats_engorde['datos_peso']) / len(stats_engorde['datos_peso']))
-        else:
-            resultado['datos_peso'].append(0)
-            
-        if stats_engorde['datos_ganancia']:
-            resultado['datos_ganancia'].append(sum(stats_engorde['datos_ganancia']) / len(stats_engorde['datos_ganancia']))
-        else:
-            resultado['datos_ganancia'].append(0)
-            
-        if stats_engorde['datos_conversion']:
-            resultado['datos_conversion'].append(sum(stats_engorde['datos_conversion']) / len(stats_engorde['datos_conversion']))
-        else:
-            resultado['datos_conversion'].append(0)
-        
-        # Eficiencia energética y nutricional
-        if 'datos_eficiencia_energetica' in stats_engorde and stats_engorde['datos_eficiencia_energetica']:
-            resultado['datos_eficiencia_energetica'].append(sum(stats_engorde['datos_eficiencia_energetica']) / len(stats_engorde['datos_eficiencia_energetica']))
-        else:
-            resultado['datos_eficiencia_energetica'].append(0)
-            
-        if 'datos_eficiencia_proteica' in stats_engorde and stats_engorde['datos_eficiencia_proteica']:
-            resultado['datos_eficiencia_proteica'].append(sum(stats_engorde['datos_eficiencia_proteica']) / len(stats_engorde['datos_eficiencia_proteica']))
-        else:
-            resultado['datos_eficiencia_proteica'].append(0)
-            
-        if 'datos_relacion_energia_proteina' in stats_engorde and stats_engorde['datos_relacion_energia_proteina']:
-            resultado['datos_relacion_energia_proteina'].append(sum(stats_engorde['datos_relacion_energia_proteina']) / len(stats_engorde['datos_relacion_energia_proteina']))
-        else:
-            resultado['datos_relacion_energia_proteina'].append(0)
+        promedios = promedios_por_galpon.get(galpon.id, [[] for _ in CAMPOS_ENGORDE])
+        for i, (_, clave) in enumerate(CAMPOS_ENGORDE):
+            valores = promedios[i]
+            resultado[clave].append(sum(valores) / len(valores) if valores else 0)
         
-        # Obtener mortalidad para este galpón
-        mortalidad = SeguimientoDiario.objects.filter(
-            lote__galpon=galpon,
-            fecha_seguimiento__gte=timezone.now().date() - timedelta(days=30),
-            mortalidad__gt=0
-        ).aggregate(total=Sum('mortalidad'))['total'] or 0
-        
-        resultado['datos_mortalidad'].append(mortalidad)
+        resultado['datos_mortalidad'].append(mortalidad_por_galpon.get(galpon.id, 0))
     
     return resultado
 
-def obtener_estadisticas_dashboard():
+def _galpones_en_produccion():
+    from produccion.models import Galpon
+    
+    return list(Galpon.objects.filter(lotes__estado='PRODUCCION').distinct())
+
+def obtener_estadisticas_por_galpon(periodo='semana'):
     """
-    Obtiene todas las estadísticas necesarias para el dashboard.
+    Obtiene estadísticas comparativas por galpón.
+    Usa un número fijo de consultas sin importar la cantidad de galpones.
     """
-    # Producción de huevos (últimas 4 semanas)
-    produccion = obtener_estadisticas_produccion('semana')
+    galpones = _galpones_en_produccion()
     
-    # Mortalidad (últimas 4 semanas)
-    mortalidad = obtener_estadisticas_mortalidad('semana')
-    
-    # Ventas (últimos 6 meses)
-    ventas = obtener_estadisticas_ventas('mes')
+    # Mortalidad de los últimos 30 días agrupada por galpón
+    mortalidad_por_galpon = dict(SeguimientoDiario.objects.filter(
+        fecha_seguimiento__gte=timezone.now().date() - timedelta(days=30),
+        mortalidad__gt=0
+    ).values('lote__galpon').annotate(
+        total=Sum('mortalidad')
+    ).values_list('lote__galpon', 'total'))
     
-    # Distribución de tipos de huevo
-    tipos_huevo = obtener_distribucion_tipos_huevo()
+    return _comparativo_galpones(galpones, _engorde_agrupado(periodo), mortalidad_por_galpon)
+
+def obtener_estadisticas_dashboard():
+    """
+    Obtiene todas las estadísticas necesarias para el dashboard.
+    Cada tabla de origen se recorre una sola vez, agrupada por galpón y
+    período, y las series se arman en memoria a partir de esas filas.
+    """
+    _, _, _, formato_semana = _rango_periodo('semana')
     
-    # Resumen de inventario
-    inventario = obtener_resumen_inventario()
+    # Producción, mortalidad (últimas 8 semanas) y mortalidad por galpón
+    seguimientos = list(_seguimientos_agrupados('semana'))
     
-    # Estadísticas de engorde
-    engorde = obtener_estadisticas_engorde('semana')
+    mortalidad_por_galpon = {}
+    for fila in seguimientos:
+        if fila['mortalidad_30_dias']:
+            galpon_id = fila['lote__galpon']
+            mortalidad_por_galpon[galpon_id] = mortalidad_por_galpon.get(galpon_id, 0) + fila['mortalidad_30_dias']
     
-    # Estadísticas por galpón
-    por_galpon = obtener_estadisticas_por_galpon('semana')
+    # Estadísticas de engorde, globales y por galpón
+    engorde = list(_engorde_agrupado('semana'))
     
     return {
-        'produccion': produccion,
-        'mortalidad': mortalidad,
-        'ventas': ventas,
-        'tipos_huevo': tipos_huevo,
-        'inventario': inventario,
-        'engorde': engorde,
-        'por_galpon': por_galpon
+        'produccion': _serie_por_periodo(seguimientos, 'total_huevos', formato_semana),
+        'mortalidad': _serie_por_periodo(seguimientos, 'total_mortalidad', formato_semana),
+        # Ventas (últimos 6 meses)
+        'ventas': obtener_estadisticas_ventas('mes'),
+        'tipos_huevo': obtener_distribucion_tipos_huevo(),
+        'inventario': obtener_resumen_inventario(),
+        'engorde': _serie_engorde(engorde, formato_semana),
+        'por_galpon': _comparativo_galpones(_galpones_en_produccion(), engorde, mortalidad_por_galpon)
     }
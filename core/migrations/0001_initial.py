@@ -0,0 +1,30 @@
+# Generated by Django 5.2.1 on 2026-10-18 10:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RegistroCambio',
+            fields=[
+                ('version', models.BigAutoField(primary_key=True, serialize=False)),
+                ('recurso', models.CharField(max_length=100, verbose_name='Modelo')),
+                ('objeto_id', models.BigIntegerField(verbose_name='ID del Objeto')),
+                ('eliminado', models.BooleanField(default=False, verbose_name='Eliminado')),
+                ('fecha', models.DateTimeField(auto_now=True, verbose_name='Fecha del Cambio')),
+            ],
+            options={
+                'verbose_name': 'Registro de Cambio',
+                'verbose_name_plural': 'Registro de Cambios',
+                'indexes': [models.Index(fields=['recurso', 'version'], name='core_regist_recurso_460d6e_idx')],
+                'constraints': [models.UniqueConstraint(fields=('recurso', 'objeto_id'), name='registro_cambio_objeto_unico')],
+            },
+        ),
+    ]
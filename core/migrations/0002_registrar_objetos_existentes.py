@@ -0,0 +1,51 @@
+from django.db import migrations
+
+
+MODELOS = [
+    ('avicola', 'UserProfile'),
+    ('produccion', 'Granja'), ('produccion', 'Galpon'), ('produccion', 'Lote'),
+    ('produccion', 'SeguimientoDiario'), ('produccion', 'MortalidadDiaria'), ('produccion', 'MortalidadSemanal'),
+    ('inventario', 'Proveedor'), ('inventario', 'Raza'), ('inventario', 'Alimento'),
+    ('inventario', 'Vacuna'), ('inventario', 'Insumo'), ('inventario', 'GuiaDesempenoRaza'),
+    ('wiki', 'Category'), ('wiki', 'Article'),
+    ('faq', 'FAQCategory'), ('faq', 'FAQ'),
+    ('bot', 'BotConversation'),
+]
+
+
+def registrar_existentes(apps, schema_editor):
+    """
+    Give every existing row of the synced models a first version, so that a
+    client asking for changes since version 0 receives the whole table.
+    """
+    RegistroCambio = apps.get_model('core', 'RegistroCambio')
+
+    for app_label, nombre in MODELOS:
+        modelo = apps.get_model(app_label, nombre)
+        recurso = f'{app_label}.{nombre.lower()}'
+        ids = modelo.objects.order_by('pk').values_list('pk', flat=True).iterator(chunk_size=2000)
+        RegistroCambio.objects.bulk_create(
+            (RegistroCambio(recurso=recurso, objeto_id=pk) for pk in ids),
+            batch_size=2000
+        )
+
+
+def borrar_registro(apps, schema_editor):
+    apps.get_model('core', 'RegistroCambio').objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+        ('avicola', '0002_alter_userprofile_groups_and_more'),
+        ('produccion', '0017_indices_paginacion_api'),
+        ('inventario', '0002_initial'),
+        ('wiki', '0001_initial'),
+        ('faq', '0001_initial'),
+        ('bot', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(registrar_existentes, borrar_registro),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.1 on 2026-10-18 10:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_registrar_objetos_existentes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='registrocambio',
+            name='transaccion',
+            field=models.BigIntegerField(blank=True, null=True, verbose_name='Transacción'),
+        ),
+        migrations.AddIndex(
+            model_name='registrocambio',
+            index=models.Index(fields=['recurso', 'transaccion'], name='core_regist_recurso_f12270_idx'),
+        ),
+    ]
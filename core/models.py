@@ -1,3 +1,34 @@
 from django.db import models
 
-# Create your models here.
+
+class RegistroCambio(models.Model):
+    """
+    Última versión de cada fila de los modelos sincronizados con los clientes
+    (core.sincronizacion). Cada alta, modificación o baja da a la fila del
+    objeto una versión nueva; las bajas quedan como lápidas (eliminado=True)
+    para que los clientes borren su copia.
+    """
+    version = models.BigAutoField(primary_key=True)
+    recurso = models.CharField(max_length=100, verbose_name="Modelo")
+    objeto_id = models.BigIntegerField(verbose_name="ID del Objeto")
+    eliminado = models.BooleanField(default=False, verbose_name="Eliminado")
+    fecha = models.DateTimeField(auto_now=True, verbose_name="Fecha del Cambio")
+    # Id de la transacción que hizo el cambio (solo PostgreSQL): las versiones
+    # se asignan al escribir y no al confirmar, así que una transacción lenta
+    # puede confirmar versiones menores que otras que un cliente ya recibió
+    transaccion = models.BigIntegerField(null=True, blank=True, verbose_name="Transacción")
+
+    class Meta:
+        verbose_name = "Registro de Cambio"
+        verbose_name_plural = "Registro de Cambios"
+        constraints = [
+            models.UniqueConstraint(fields=['recurso', 'objeto_id'], name='registro_cambio_objeto_unico'),
+        ]
+        indexes = [
+            models.Index(fields=['recurso', 'version']),
+            models.Index(fields=['recurso', 'transaccion']),
+        ]
+
+    def __str__(self):
+        accion = "baja" if self.eliminado else "cambio"
+        return f"{self.recurso} #{self.objeto_id} ({accion} v{self.version})"
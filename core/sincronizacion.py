@@ -0,0 +1,215 @@
+"""
+Seguimiento de cambios para la sincronización incremental de los clientes.
+
+Cada alta, modificación o baja de un modelo de MODELOS_SINCRONIZADOS deja en
+RegistroCambio una fila por objeto con una versión creciente (las bajas como
+lápidas). Un cliente guarda el token que le devolvió cambios_desde() y pide
+con él solo lo que cambió después; el token 0 equivale a todo.
+
+Las versiones se asignan al escribir, no al confirmar: una transacción lenta
+puede confirmar versiones menores que las que un cliente ya recibió. Por eso
+en PostgreSQL el token es "<versión>.<transacción>": además de las versiones
+mayores se vuelven a entregar los cambios de las transacciones que no habían
+terminado al armarlo (RegistroCambio.transaccion), aunque algunos ya se
+hayan enviado; el cliente los aplica de nuevo sin efecto. En SQLite las
+escrituras no son concurrentes y la transacción del token es 0.
+
+Las señales cubren save() y delete(); el código que modifica filas
+sincronizadas con QuerySet.update() o bulk_create() debe llamar a
+registrar_cambios() con los ids afectados. Los objetos que se muestran
+anidados en otro (los mensajes de una conversación, las preguntas de una
+categoría) marcan también a su contenedor, según DEPENDENCIAS. Los campos
+calculados desde otra tabla los registra la app que los mantiene (las aves
+presentes de los seguimientos cambian con la mortalidad: produccion/signals.py).
+"""
+from django.apps import apps
+from django.db import connection
+from django.db.models import Max, Model, Q
+from django.utils import timezone
+
+MODELOS_SINCRONIZADOS = [
+    'avicola.UserProfile', 'avicola.Empresa',
+    'produccion.Granja', 'produccion.Galpon', 'produccion.Lote',
+    'produccion.SeguimientoDiario', 'produccion.MortalidadDiaria', 'produccion.MortalidadSemanal',
+    'inventario.Proveedor', 'inventario.Raza', 'inventario.Alimento',
+    'inventario.Vacuna', 'inventario.Insumo', 'inventario.GuiaDesempenoRaza',
+    'wiki.Category', 'wiki.Article',
+    'faq.FAQCategory', 'faq.FAQ',
+    'bot.BotConversation', 'bot.BotIntent',
+]
+
+# Modelo anidado -> (modelo contenedor, campo con el id del contenedor)
+DEPENDENCIAS = {
+    'bot.BotMessage': ('bot.BotConversation', 'conversation_id'),
+    'faq.FAQ': ('faq.FAQCategory', 'category_id'),
+    'wiki.Category': ('wiki.Category', 'parent_id'),
+    'wiki.Attachment': ('wiki.Article', 'article_id'),
+}
+
+
+def recurso(modelo):
+    """Nombre con el que `modelo` (clase o etiqueta 'app.Modelo') figura en RegistroCambio."""
+    if isinstance(modelo, str):
+        modelo = apps.get_model(modelo)
+    return modelo._meta.label_lower
+
+
+def registrar_cambios(modelo, ids, eliminado=False):
+    """
+    Da una versión nueva a los objetos `ids` de `modelo`, como modificados o,
+    con `eliminado`, como borrados. En PostgreSQL es un solo INSERT … ON
+    CONFLICT: si otra transacción está registrando los mismos objetos espera
+    a que termine y actualiza sus filas en vez de violar la restricción única.
+    En SQLite, que no tiene escrituras concurrentes, borra las filas y las
+    vuelve a crear. Usa a lo sumo dos consultas sin importar cuántos ids.
+    """
+    from .models import RegistroCambio
+
+    ids = sorted({int(pk) for pk in ids if pk is not None})
+    if not ids:
+        return
+    nombre = recurso(modelo)
+
+    if connection.vendor == 'postgresql':
+        # En orden de id, para que dos transacciones con objetos en común los
+        # bloqueen en el mismo orden
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'INSERT INTO "{RegistroCambio._meta.db_table}" (recurso, objeto_id, eliminado, fecha, transaccion) '
+                'SELECT %s, objeto_id, %s, %s, pg_current_xact_id()::text::bigint '
+                'FROM unnest(%s::bigint[]) AS objeto_id ORDER BY objeto_id '
+                'ON CONFLICT (recurso, objeto_id) DO UPDATE SET version = EXCLUDED.version, '
+                'eliminado = EXCLUDED.eliminado, fecha = EXCLUDED.fecha, transaccion = EXCLUDED.transaccion',
+                [nombre, eliminado, timezone.now(), ids]
+            )
+        return
+
+    RegistroCambio.objects.filter(recurso=nombre, objeto_id__in=ids).delete()
+    RegistroCambio.objects.bulk_create(
+        RegistroCambio(recurso=nombre, objeto_id=pk, eliminado=eliminado) for pk in ids
+    )
+
+
+def version_actual(modelo):
+    """Mayor versión registrada de `modelo` (0 si no tiene cambios)."""
+    from .models import RegistroCambio
+
+    return RegistroCambio.objects.filter(recurso=recurso(modelo)).aggregate(
+        version=Max('version')
+    )['version'] or 0
+
+
+def transacciones_pendientes():
+    """
+    (marca, propia) en PostgreSQL: toda transacción con id menor que `marca`
+    ya terminó, salvo la actual, cuyo id es `propia` (None si todavía no
+    escribió); las que empiecen después tendrán ids mayores. En otras bases
+    de datos (0, None).
+    """
+    if connection.vendor != 'postgresql':
+        return 0, None
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT coalesce((SELECT min(x::text::bigint) FROM pg_snapshot_xip(s) AS x), '
+            'pg_snapshot_xmax(s)::text::bigint), pg_current_xact_id_if_assigned()::text::bigint '
+            'FROM pg_current_snapshot() AS s'
+        )
+        return cursor.fetchone()
+
+
+def leer_token(token):
+    """
+    Partes de un token de cambios_desde(): (versión, transacción) o, a mitad
+    de una ronda paginada, (versión, transacción, última versión devuelta,
+    transacción del token final). Los tokens de un solo número, como "0",
+    son una versión con transacción 0. ValueError si no es válido.
+    """
+    try:
+        partes = [int(parte) for parte in str(token).split('.')]
+    except ValueError:
+        partes = []
+    if len(partes) not in (1, 2, 4) or any(parte < 0 for parte in partes):
+        raise ValueError(f"Token de sincronización inválido: {token!r}")
+    return tuple(partes + [0] * (2 - len(partes)))
+
+
+def filtro_cambios(version, marca, propia=None):
+    """
+    Q de las filas de RegistroCambio posteriores al token (version, marca):
+    versiones mayores y cambios de transacciones con id desde `marca`. Los de
+    la transacción actual (`propia`) ya los ve y quedan en la versión.
+    """
+    filtro = Q(version__gt=version)
+    if marca:
+        recientes = Q(transaccion__gte=marca)
+        if propia is not None:
+            recientes &= ~Q(transaccion=propia)
+        filtro |= recientes
+    return filtro
+
+
+def cambios_desde(modelo, token, limite=None):
+    """
+    Cambios de `modelo` posteriores a `token` (ver leer_token()), en orden de
+    versión y a lo sumo `limite`: (ids modificados, ids eliminados, token
+    nuevo, True si quedan más). ValueError si el token no es válido.
+
+    La transacción del token nuevo se toma antes de leer los cambios y, si
+    la ronda ocupa varias páginas, en la primera: lo que confirme mientras
+    tanto con una versión ya recorrida se entrega en la ronda siguiente.
+    """
+    from .models import RegistroCambio
+
+    version, marca, *continuacion = leer_token(token)
+    marca_nueva, propia = transacciones_pendientes()
+    posicion = None
+    if continuacion:
+        posicion, marca_nueva = continuacion
+
+    cambios = RegistroCambio.objects.filter(filtro_cambios(version, marca, propia), recurso=recurso(modelo))
+    if posicion is not None:
+        cambios = cambios.filter(version__gt=posicion)
+    cambios = cambios.order_by('version').values_list('version', 'objeto_id', 'eliminado')
+    if limite is not None:
+        cambios = cambios[:limite + 1]
+    cambios = list(cambios)
+
+    hay_mas = limite is not None and len(cambios) > limite
+    if hay_mas:
+        cambios = cambios[:limite]
+    modificados = [objeto_id for _, objeto_id, eliminado in cambios if not eliminado]
+    eliminados = [objeto_id for _, objeto_id, eliminado in cambios if eliminado]
+    if hay_mas:
+        token = f'{version}.{marca}.{cambios[-1][0]}.{marca_nueva}'
+    else:
+        token = f'{max([version, posicion or 0] + [v for v, _, _ in cambios])}.{marca_nueva}'
+    return modificados, eliminados, token, hay_mas
+
+
+def _cambio_guardado(sender, instance, **kwargs):
+    registrar_cambios(sender, [instance.pk])
+
+
+def _cambio_eliminado(sender, instance, **kwargs):
+    registrar_cambios(sender, [instance.pk], eliminado=True)
+
+
+def _cambio_anidado(sender, instance, **kwargs):
+    contenedor, campo = DEPENDENCIAS[sender._meta.label]
+    origen = kwargs.get('origin')
+    if isinstance(origen, Model) and origen._meta.label == contenedor and origen.pk == getattr(instance, campo):
+        # Borrado en cascada del contenedor, que ya queda como lápida
+        return
+    registrar_cambios(contenedor, [getattr(instance, campo)])
+
+
+def conectar_senales():
+    """Conecta el registro de cambios a los modelos sincronizados (CoreConfig.ready)."""
+    from django.db.models.signals import post_delete, post_save
+
+    for etiqueta in MODELOS_SINCRONIZADOS:
+        post_save.connect(_cambio_guardado, sender=etiqueta, dispatch_uid=f'sincronizacion_guardado_{etiqueta}')
+        post_delete.connect(_cambio_eliminado, sender=etiqueta, dispatch_uid=f'sincronizacion_eliminado_{etiqueta}')
+    for etiqueta in DEPENDENCIAS:
+        for senal in (post_save, post_delete):
+            senal.connect(_cambio_anidado, sender=etiqueta, dispatch_uid=f'sincronizacion_anidado_{etiqueta}')
@@ -0,0 +1,94 @@
+"""
+Tests for the dashboard statistics engine in core.estadisticas.
+"""
+from datetime import timedelta
+
+from django.test import TestCase
+from django.utils import timezone
+
+from avicola.models import Empresa
+from inventario.models import Raza
+from produccion.models import Granja, Galpon, Lote, SeguimientoDiario, SeguimientoEngorde
+from core.estadisticas import obtener_estadisticas_dashboard, obtener_estadisticas_por_galpon
+
+
+class EstadisticasDashboardTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        empresa = Empresa.objects.create(
+            nombre="Empresa de Prueba",
+            rif="J-123456789",
+            direccion="Dirección de prueba"
+        )
+        cls.raza = Raza.objects.create(
+            nombre="Híbrido de Engorde",
+            tipo_raza="ENGORDE",
+            descripcion="Raza para engorde"
+        )
+        cls.granja = Granja.objects.create(
+            empresa=empresa,
+            codigo_granja="GRANJA-001",
+            nombre="Granja de Prueba",
+            direccion="Ubicación de prueba"
+        )
+        cls.hoy = timezone.now().date()
+
+    def crear_galpon(self, numero, peso, mortalidad):
+        """Crea un galpón en producción con un seguimiento de engorde de ayer."""
+        galpon = Galpon.objects.create(
+            granja=self.granja,
+            numero_galpon=numero,
+            capacidad_aves=5000
+        )
+        lote = Lote.objects.create(
+            galpon=galpon,
+            raza=self.raza,
+            fecha_inicio=self.hoy - timedelta(days=30),
+            cantidad_inicial_aves=5000,
+            estado="PRODUCCION",
+            codigo_lote=f"LOTE-{numero}"
+        )
+        seguimiento = SeguimientoDiario.objects.create(
+            lote=lote,
+            fecha_seguimiento=self.hoy - timedelta(days=1),
+            tipo_seguimiento="ENGORDE",
+            huevos_totales=100,
+            peso_promedio_ave=peso,
+            consumo_alimento_kg=500,
+            mortalidad=mortalidad
+        )
+        SeguimientoEngorde.objects.create(
+            seguimiento_diario=seguimiento,
+            ganancia_diaria_peso=50,
+            conversion_alimenticia=2,
+            uniformidad="BUENA",
+            indice_productividad=1
+        )
+        return galpon
+
+    def test_dashboard_query_count_independent_of_galpones(self):
+        """The dashboard issues the same number of queries for 1 or 5 galpones"""
+        self.crear_galpon("1", 1.5, 3)
+        with self.assertNumQueries(8):
+            obtener_estadisticas_dashboard()
+
+        for numero in range(2, 6):
+            self.crear_galpon(str(numero), 2.0, 1)
+        with self.assertNumQueries(8):
+            estadisticas = obtener_estadisticas_dashboard()
+
+        self.assertEqual(len(estadisticas['por_galpon']['labels']), 5)
+        self.assertEqual(sum(estadisticas['produccion']['datos']), 500)
+        self.assertEqual(sum(estadisticas['mortalidad']['datos']), 7)
+
+    def test_por_galpon_series(self):
+        """Per-galpón series match each galpón's own tracking records"""
+        self.crear_galpon("1", 1.5, 3)
+        self.crear_galpon("2", 2.5, 0)
+
+        resultado = obtener_estadisticas_por_galpon('semana')
+
+        self.assertEqual(resultado['labels'], ["Galpón 1", "Galpón 2"])
+        self.assertEqual(resultado['datos_peso'], [1.5, 2.5])
+        self.assertEqual(resultado['datos_mortalidad'], [3, 0])
+        self.assertEqual(resultado['datos_conversion'], [2.0, 2.0])
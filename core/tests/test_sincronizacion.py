@@ -0,0 +1,66 @@
+"""
+Tests for the change log in core.sincronizacion under concurrent transactions.
+"""
+import threading
+from unittest import skipUnless
+
+from django.db import connection, transaction
+from django.test import TransactionTestCase
+
+from core.models import RegistroCambio
+from core.sincronizacion import cambios_desde, registrar_cambios
+
+
+@skipUnless(connection.vendor == 'postgresql', "Transacciones concurrentes solo en PostgreSQL")
+class RegistroCambiosConcurrenteTest(TransactionTestCase):
+    def en_otra_transaccion(self, ids):
+        """
+        Registra `ids` de Galpon en otra conexión y deja la transacción
+        abierta hasta llamar a la función devuelta, que la confirma.
+        """
+        registrado, confirmar = threading.Event(), threading.Event()
+
+        def trabajar():
+            try:
+                with transaction.atomic():
+                    registrar_cambios('produccion.Galpon', ids)
+                    registrado.set()
+                    confirmar.wait(10)
+            finally:
+                connection.close()
+
+        hilo = threading.Thread(target=trabajar)
+        hilo.start()
+        self.assertTrue(registrado.wait(10))
+
+        def terminar():
+            confirmar.set()
+            hilo.join(10)
+        return terminar
+
+    def test_same_object_from_two_transactions(self):
+        """The second transaction waits for the first and updates the row instead of failing"""
+        terminar = self.en_otra_transaccion([1, 2])
+        temporizador = threading.Timer(0.2, terminar)
+        temporizador.start()
+        registrar_cambios('produccion.Galpon', [2, 3])
+        temporizador.join()
+
+        self.assertEqual(
+            sorted(RegistroCambio.objects.filter(recurso='produccion.galpon').values_list('objeto_id', flat=True)),
+            [1, 2, 3]
+        )
+
+    def test_late_commit_with_lower_version_is_not_lost(self):
+        """A change committed after a token with a higher version was issued still reaches the client"""
+        terminar = self.en_otra_transaccion([1])
+        registrar_cambios('produccion.Galpon', [2])
+
+        modificados, _, token, _ = cambios_desde('produccion.Galpon', '0')
+        self.assertEqual(modificados, [2])
+
+        terminar()
+        # El 2 se repite: confirmó mientras la transacción del 1 seguía abierta
+        modificados, _, token, _ = cambios_desde('produccion.Galpon', token)
+        self.assertEqual(modificados, [1, 2])
+        self.assertEqual(cambios_desde('produccion.Galpon', token)[0], [])
@@ -243,6 +243,12 @@ os.makedirs(MEDIA_ROOT, exist_ok=True)
 # Default primary key field type
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# Lecturas de sensores: meses de lecturas crudas que conserva el comando
+# gestionar_particiones (None: sin límite). Con la tabla particionada es la
+# única retención de las lecturas crudas; sin particionar también se aplica
+# la de cada TipoSensor (compactar_lecturas)
+SENSORES_RETENCION_LECTURAS_MESES = 24
+
 # Admin customization
 ADMIN_SITE_HEADER = "App Granja - Administración"
 ADMIN_SITE_TITLE = "App Granja"
@@ -334,11 +340,19 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.AllowAny',  # Cambiar a IsAuthenticated en producción
     ],
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
-    'PAGE_SIZE': 10,
+    'DEFAULT_PAGINATION_CLASS': 'api.pagination.PaginacionCursor',
+    'PAGE_SIZE': 100,
     'DEFAULT_FILTER_BACKENDS': ['django_filters.rest_framework.DjangoFilterBackend'],
+    'DEFAULT_RENDERER_CLASSES': [
+        'rest_framework.renderers.JSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+        'api.renderers.ColumnarJSONRenderer',  # Listados compactos para la app de escritorio
+    ],
 }
 
+# Máximo de filas por página que un cliente puede pedir con ?page_size=
+API_MAX_PAGE_SIZE = 1000
+
 # JWT Settings
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(minutes=60),
@@ -424,6 +438,7 @@ CACHES = {
 # Cache middleware
 MIDDLEWARE = [
     'django.middleware.cache.UpdateCacheMiddleware',
+    'django.middleware.gzip.GZipMiddleware',  # Comprime las respuestas si el cliente acepta gzip
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
@@ -27,6 +27,7 @@ urlpatterns = [
     path('admin/', admin.site.urls),
     path('avicola/', include(('avicola.urls', 'avicola'), namespace='avicola')),  # Avicola app
     path('reportes/', include(('reportes.urls', 'reportes'), namespace='reportes')),  # Reportes app
+    path('api/', include('api.urls', namespace='api')),  # REST API
     
     # Include auth URLs for any remaining auth patterns
     path('accounts/', include('django.contrib.auth.urls')),  # For any other auth URLs
@@ -47,16 +47,16 @@ def seguimiento_lote(request, lote_id):
         lote = get_object_or_404(Lote, id=lote_id)
         
         # Obtener los seguimientos de la base de datos (ordenados por fecha ascendente)
+        # con la conversión alimenticia calculada en la misma consulta
         seguimientos = SeguimientoDiario.objects.filter(
             lote=lote
-        ).select_related('lote', 'registrado_por').order_by('fecha_seguimiento')
+        ).con_conversion().select_related('lote', 'registrado_por').order_by('fecha_seguimiento')
         
         # Formatear los datos para la plantilla
         seguimientos_vista = []
         for seguimiento in seguimientos:
-            # Calcular la conversión alimenticia (kg alimento / kg peso ganado)
-            # Esto es un ejemplo, ajusta según tu lógica de negocio
-            conversion = seguimiento.consumo_alimento_kg / (seguimiento.peso_promedio_ave * 1000) if seguimiento.peso_promedio_ave > 0 else 0
+            # Conversión alimenticia (kg alimento / kg peso ganado), 0 si no aplica
+            conversion = seguimiento.conversion_alimenticia or 0
             
             seguimientos_vista.append({
                 'id': seguimiento.id,
@@ -1,6 +1,55 @@
+from datetime import date, datetime, timedelta
+
 from django.db import models
+from django.db.models import Case, Count, F, FloatField, Sum, When
+from django.db.models.functions import Cast, ExtractHour, ExtractMinute, ExtractSecond, TruncDay, TruncMonth, TruncWeek
 from django.conf import settings
 
+# Agrupaciones de totales_por_periodo()
+TRUNCAR_PERIODO = {
+    'dia': TruncDay,
+    'semana': TruncWeek,
+    'mes': TruncMonth,
+}
+
+
+def _segundos_del_dia(campo):
+    return ExtractHour(campo) * 3600 + ExtractMinute(campo) * 60 + ExtractSecond(campo)
+
+
+class ConsumoEnergiaQuerySet(models.QuerySet):
+    def con_intervalo(self):
+        """
+        Anota `horas` (duración del intervalo; si hora_fin no es posterior a
+        hora_inicio termina al día siguiente) y `potencia_promedio_kw`,
+        calculadas en la base de datos.
+        """
+        diferencia = _segundos_del_dia('hora_fin') - _segundos_del_dia('hora_inicio')
+        segundos = Case(
+            When(hora_fin__lte=F('hora_inicio'), then=diferencia + 86400),
+            default=diferencia
+        )
+        return self.annotate(
+            horas=Cast(segundos, FloatField()) / 3600
+        ).annotate(
+            potencia_promedio_kw=Cast('consumo_kwh', FloatField()) / F('horas')
+        )
+
+    def totales_por_periodo(self, periodo='dia'):
+        """
+        kWh, horas registradas y cantidad de registros por galpón y período
+        ('dia', 'semana' ISO o 'mes'), como filas con galpon_id, periodo
+        (fecha de inicio), consumo_kwh, horas_registradas y registros.
+        """
+        return self.con_intervalo().annotate(
+            periodo=TRUNCAR_PERIODO[periodo]('fecha_registro')
+        ).order_by().values('galpon_id', 'periodo').annotate(
+            consumo_kwh=Sum('consumo_kwh'),
+            horas_registradas=Sum('horas'),
+            registros=Count('id')
+        ).order_by('galpon_id', 'periodo')
+
+
 class ConsumoEnergia(models.Model):
     """
     Modelo para registrar el consumo de energía de los galpones.
@@ -44,6 +93,8 @@ class ConsumoEnergia(models.Model):
     fecha_creacion = models.DateTimeField(auto_now_add=True, verbose_name="Fecha de Creación")
     fecha_actualizacion = models.DateTimeField(auto_now=True, verbose_name="Última Actualización")
 
+    objects = ConsumoEnergiaQuerySet.as_manager()
+
     class Meta:
         verbose_name = "Consumo de Energía"
         verbose_name_plural = "Consumos de Energía"
@@ -56,19 +107,16 @@ class ConsumoEnergia(models.Model):
     @property
     def duracion_horas(self):
         """Calcula la duración en horas entre hora_inicio y hora_fin"""
-        from datetime import datetime, date
-        
         if not all([self.hora_inicio, self.hora_fin]):
             return 0
             
-        # Crear objetos datetime para hoy con las horas correspondientes
-        hoy = date.today()
-        inicio = datetime.combine(hoy, self.hora_inicio)
-        fin = datetime.combine(hoy, self.hora_fin)
+        # Solo importa la diferencia: cualquier día sirve de referencia
+        inicio = datetime.combine(date.min, self.hora_inicio)
+        fin = datetime.combine(date.min, self.hora_fin)
         
         # Si la hora de fin es menor que la de inicio, asumir que es al día siguiente
         if fin <= inicio:
-            fin = datetime.combine(hoy.replace(day=hoy.day + 1), self.hora_fin)
+            fin += timedelta(days=1)
         
         # Calcular diferencia en horas
         diferencia = fin - inicio
@@ -0,0 +1,107 @@
+"""
+Indicadores de eficiencia energética por galpón.
+
+El consumo sale de ConsumoEnergia agrupado en la base de datos
+(ConsumoEnergiaQuerySet.totales_por_periodo) y la producción del resumen
+diario por lote (ResumenDiarioLote): huevos del período y kg de peso vivo
+ganados, es decir la variación del peso promedio por las aves vivas al final
+del período, respecto del último peso registrado antes de él.
+"""
+from collections import defaultdict
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db.models import OuterRef, Subquery, Sum
+
+from .consumo_energia import TRUNCAR_PERIODO
+
+
+def inicio_periodo(fecha, periodo):
+    """Primer día del período ('dia', 'semana' ISO o 'mes') que contiene `fecha`."""
+    if periodo == 'semana':
+        return fecha - timedelta(days=fecha.weekday())
+    if periodo == 'mes':
+        return fecha.replace(day=1)
+    return fecha
+
+
+def _peso_vivo_ganado(resumenes, desde, periodo):
+    """
+    {(galpon_id, periodo): kg de peso vivo ganados} desde las filas de
+    ResumenDiarioLote con peso registrado. Cada lote parte de su último peso
+    anterior al período o, si no lo hay, del primero dentro de él.
+    """
+    from .models import ResumenDiarioLote
+
+    filas = resumenes.filter(peso_promedio_ave__isnull=False)
+    if desde is not None:
+        con_peso = ResumenDiarioLote.objects.filter(peso_promedio_ave__isnull=False)
+        filas |= con_peso.filter(
+            lote_id__in=resumenes.values('lote_id'),
+            fecha=Subquery(
+                con_peso.filter(lote_id=OuterRef('lote_id'), fecha__lt=desde).order_by('-fecha').values('fecha')[:1]
+            )
+        )
+    filas = filas.order_by('lote_id', 'fecha').values_list(
+        'lote_id', 'galpon_id', 'fecha', 'peso_promedio_ave', 'aves_vivas'
+    )
+
+    ultimo_peso = {}
+    referencia = {}
+    cierre = {}
+    for lote_id, galpon_id, fecha, peso, aves_vivas in filas:
+        if desde is None or fecha >= desde:
+            clave = (lote_id, galpon_id, inicio_periodo(fecha, periodo))
+            referencia.setdefault(clave, ultimo_peso.get(lote_id, peso))
+            cierre[clave] = (peso, aves_vivas)
+        ultimo_peso[lote_id] = peso
+
+    ganancia = defaultdict(Decimal)
+    for clave, (peso, aves_vivas) in cierre.items():
+        _, galpon_id, inicio = clave
+        ganancia[(galpon_id, inicio)] += (peso - referencia[clave]) * aves_vivas
+    return ganancia
+
+
+def eficiencia_energetica(periodo='mes', desde=None, hasta=None, galpones=None):
+    """
+    Consumo y eficiencia por galpón y período entre `desde` y `hasta` (fechas
+    inclusive): filas con galpon_id, periodo, consumo_kwh, horas_registradas,
+    huevos, kg_peso_vivo, kwh_por_docena y kwh_por_kg (None sin huevos o sin
+    ganancia de peso), ordenadas por galpón y período.
+    """
+    from .models import ConsumoEnergia, ResumenDiarioLote
+
+    consumos = ConsumoEnergia.objects.all()
+    resumenes = ResumenDiarioLote.objects.all()
+    if desde is not None:
+        consumos = consumos.filter(fecha_registro__gte=desde)
+        resumenes = resumenes.filter(fecha__gte=desde)
+    if hasta is not None:
+        consumos = consumos.filter(fecha_registro__lte=hasta)
+        resumenes = resumenes.filter(fecha__lte=hasta)
+    if galpones is not None:
+        consumos = consumos.filter(galpon__in=galpones)
+        resumenes = resumenes.filter(galpon__in=galpones)
+
+    filas = {
+        (fila['galpon_id'], fila['periodo']): dict(fila, huevos=0, kg_peso_vivo=None)
+        for fila in consumos.totales_por_periodo(periodo)
+    }
+
+    for galpon_id, inicio, huevos in resumenes.annotate(
+        periodo=TRUNCAR_PERIODO[periodo]('fecha')
+    ).order_by().values('galpon_id', 'periodo').annotate(
+        huevos=Sum('huevos_totales')
+    ).values_list('galpon_id', 'periodo', 'huevos'):
+        if (galpon_id, inicio) in filas:
+            filas[(galpon_id, inicio)]['huevos'] = huevos or 0
+
+    for clave, kg in _peso_vivo_ganado(resumenes, desde, periodo).items():
+        if clave in filas:
+            filas[clave]['kg_peso_vivo'] = kg
+
+    for fila in filas.values():
+        fila['kwh_por_docena'] = fila['consumo_kwh'] / (Decimal(fila['huevos']) / 12) if fila['huevos'] else None
+        fila['kwh_por_kg'] = fila['consumo_kwh'] / fila['kg_peso_vivo'] if (fila['kg_peso_vivo'] or 0) > 0 else None
+    return [filas[clave] for clave in sorted(filas)]
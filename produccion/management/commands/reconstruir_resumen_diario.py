@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+from produccion.resumen import reconstruir_resumen_diario
+
+
+class Command(BaseCommand):
+    help = 'Reconstruye el resumen diario por lote (ResumenDiarioLote) a partir de los registros de origen'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--lote',
+            type=int,
+            action='append',
+            dest='lotes',
+            help='ID de lote a reconstruir (se puede repetir). Por defecto, todos los lotes',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Cantidad de filas por INSERT (por defecto 1000)',
+        )
+
+    def handle(self, *args, **options):
+        lotes = options['lotes']
+        
+        if lotes:
+            self.stdout.write(f"Reconstruyendo resumen diario de los lotes: {', '.join(map(str, lotes))}")
+        else:
+            self.stdout.write("Reconstruyendo resumen diario de todos los lotes")
+        
+        total = reconstruir_resumen_diario(lotes, batch_size=options['batch_size'])
+        
+        self.stdout.write(self.style.SUCCESS(f"Resumen diario reconstruido: {total} filas"))
@@ -0,0 +1,99 @@
+# Generated by Django 5.2.1 on 2026-10-18 09:27
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+CAMPOS_SEGUIMIENTO = [
+    'huevos_totales', 'huevos_rotos', 'huevos_sucios',
+    'peso_promedio_ave', 'consumo_agua_litros',
+]
+
+
+def llenar_resumen_diario(apps, schema_editor):
+    """
+    Build the summary of existing lotes from their daily records, daily
+    mortality and feed consumption (as produccion.resumen.reconstruir_resumen_diario).
+    """
+    Lote = apps.get_model('produccion', 'Lote')
+    SeguimientoDiario = apps.get_model('produccion', 'SeguimientoDiario')
+    MortalidadDiaria = apps.get_model('produccion', 'MortalidadDiaria')
+    ConsumoAlimento = apps.get_model('inventario', 'ConsumoAlimento')
+    ResumenDiarioLote = apps.get_model('produccion', 'ResumenDiarioLote')
+
+    # Lote -> (galpón, granja, aves iniciales); sin galpón no hay dónde ubicar el resumen
+    lotes = {
+        lote_id: datos for lote_id, *datos in Lote.objects.filter(galpon__isnull=False).values_list(
+            'id', 'galpon_id', 'galpon__granja_id', 'cantidad_inicial_aves'
+        )
+    }
+    filas = {}
+
+    for fila in SeguimientoDiario.objects.values('lote_id', 'fecha_seguimiento', *CAMPOS_SEGUIMIENTO).iterator():
+        clave = (fila.pop('lote_id'), fila.pop('fecha_seguimiento'))
+        filas.setdefault(clave, {}).update(fila)
+
+    for lote_id, fecha, cantidad in MortalidadDiaria.objects.values_list(
+        'lote_id', 'fecha', 'cantidad_muertes'
+    ).iterator():
+        filas.setdefault((lote_id, fecha), {})['mortalidad'] = cantidad
+
+    for lote_id, fecha, total in ConsumoAlimento.objects.values('lote_aves_id', 'fecha_consumo').annotate(
+        total=models.Sum('cantidad_kg')
+    ).values_list('lote_aves_id', 'fecha_consumo', 'total').iterator():
+        filas.setdefault((lote_id, fecha), {})['consumo_alimento_kg'] = total
+
+    resumenes = []
+    muertes_acumuladas = {}
+    for (lote_id, fecha) in sorted(filas):
+        if lote_id not in lotes:
+            continue
+        galpon_id, granja_id, cantidad_inicial_aves = lotes[lote_id]
+        valores = filas[(lote_id, fecha)]
+        muertes_acumuladas[lote_id] = muertes_acumuladas.get(lote_id, 0) + (valores.get('mortalidad') or 0)
+        resumenes.append(ResumenDiarioLote(
+            lote_id=lote_id,
+            galpon_id=galpon_id,
+            granja_id=granja_id,
+            fecha=fecha,
+            aves_vivas=cantidad_inicial_aves - muertes_acumuladas[lote_id],
+            **valores
+        ))
+
+    ResumenDiarioLote.objects.bulk_create(resumenes, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('produccion', '0013_migrate_galpones_data'),
+        ('inventario', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResumenDiarioLote',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fecha', models.DateField(verbose_name='Fecha')),
+                ('huevos_totales', models.PositiveIntegerField(blank=True, null=True, verbose_name='Huevos Totales')),
+                ('huevos_rotos', models.PositiveIntegerField(blank=True, null=True, verbose_name='Huevos Rotos')),
+                ('huevos_sucios', models.PositiveIntegerField(blank=True, null=True, verbose_name='Huevos Sucios')),
+                ('peso_promedio_ave', models.DecimalField(blank=True, decimal_places=2, max_digits=6, null=True, verbose_name='Peso Promedio (kg)')),
+                ('consumo_agua_litros', models.DecimalField(blank=True, decimal_places=2, max_digits=8, null=True, verbose_name='Consumo de Agua (L)')),
+                ('mortalidad', models.PositiveIntegerField(blank=True, null=True, verbose_name='Aves Muertas')),
+                ('consumo_alimento_kg', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True, verbose_name='Consumo de Alimento (kg)')),
+                ('aves_vivas', models.IntegerField(verbose_name='Aves Vivas')),
+                ('galpon', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='resumenes_diarios', to='produccion.galpon', verbose_name='Galpón')),
+                ('granja', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='resumenes_diarios', to='produccion.granja', verbose_name='Granja')),
+                ('lote', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='resumenes_diarios', to='produccion.lote', verbose_name='Lote')),
+            ],
+            options={
+                'verbose_name': 'Resumen Diario de Lote',
+                'verbose_name_plural': 'Resúmenes Diarios de Lote',
+                'ordering': ['-fecha'],
+                'indexes': [models.Index(fields=['galpon', 'fecha'], name='produccion__galpon__97a4b9_idx'), models.Index(fields=['granja', 'fecha'], name='produccion__granja__b22ae3_idx'), models.Index(fields=['fecha'], name='produccion__fecha_11dbe7_idx')],
+                'unique_together': {('lote', 'fecha')},
+            },
+        ),
+        migrations.RunPython(llenar_resumen_diario, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,32 @@
+from django.db import migrations, models
+
+
+def calcular_mortalidad_acumulada(apps, schema_editor):
+    """
+    Derive the cumulative mortality of existing summary rows from their live-bird count.
+    """
+    Lote = apps.get_model('produccion', 'Lote')
+    ResumenDiarioLote = apps.get_model('produccion', 'ResumenDiarioLote')
+    
+    for lote_id, cantidad_inicial_aves in Lote.objects.filter(
+        resumenes_diarios__isnull=False
+    ).distinct().values_list('id', 'cantidad_inicial_aves'):
+        ResumenDiarioLote.objects.filter(lote_id=lote_id).update(
+            mortalidad_acumulada=cantidad_inicial_aves - models.F('aves_vivas')
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('produccion', '0014_resumendiariolote'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='resumendiariolote',
+            name='mortalidad_acumulada',
+            field=models.PositiveIntegerField(default=0, verbose_name='Mortalidad Acumulada'),
+        ),
+        migrations.RunPython(calcular_mortalidad_acumulada, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,47 @@
+from django.db import migrations
+from django.db.models import Sum
+from django.db.models.functions import ExtractIsoYear, ExtractWeek
+
+
+SEMANAS_LIMITE = (1, 52, 53)
+
+
+def corregir_anio_iso(apps, schema_editor):
+    """
+    Rebuild the weekly rows around the turn of the year, which were stored with
+    the calendar year instead of the ISO year of their week.
+    """
+    Lote = apps.get_model('produccion', 'Lote')
+    MortalidadDiaria = apps.get_model('produccion', 'MortalidadDiaria')
+    MortalidadSemanal = apps.get_model('produccion', 'MortalidadSemanal')
+
+    MortalidadSemanal.objects.filter(semana__in=SEMANAS_LIMITE).delete()
+
+    aves_iniciales = dict(Lote.objects.values_list('id', 'cantidad_inicial_aves'))
+    semanas = MortalidadDiaria.objects.annotate(
+        anio=ExtractIsoYear('fecha'), semana=ExtractWeek('fecha')
+    ).filter(semana__in=SEMANAS_LIMITE).values('lote_id', 'anio', 'semana').annotate(
+        total=Sum('cantidad_muertes')
+    ).values_list('lote_id', 'anio', 'semana', 'total')
+
+    MortalidadSemanal.objects.bulk_create([
+        MortalidadSemanal(
+            lote_id=lote_id,
+            anio=anio,
+            semana=semana,
+            total_muertes=total,
+            porcentaje_mortalidad=round(total / aves_iniciales[lote_id] * 100, 2) if aves_iniciales[lote_id] else 0
+        )
+        for lote_id, anio, semana, total in semanas
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('produccion', '0015_resumendiariolote_mortalidad_acumulada'),
+    ]
+
+    operations = [
+        migrations.RunPython(corregir_anio_iso, migrations.RunPython.noop),
+    ]
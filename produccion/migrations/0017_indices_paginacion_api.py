@@ -0,0 +1,25 @@
+# Generated by Django 5.2.1 on 2026-10-18 09:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('produccion', '0016_mortalidadsemanal_anio_iso'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='lote',
+            index=models.Index(fields=['fecha_inicio', 'id'], name='produccion__fecha_i_6ce732_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='mortalidaddiaria',
+            index=models.Index(fields=['fecha', 'id'], name='produccion__fecha_302bb6_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='seguimientodiario',
+            index=models.Index(fields=['fecha_seguimiento', 'id'], name='produccion__fecha_s_bef3f8_idx'),
+        ),
+    ]
@@ -1,4 +1,6 @@
 from django.db import models
+from django.db.models import Case, F, FloatField, OuterRef, Q, Subquery, Value, When, Window
+from django.db.models.functions import Cast, Coalesce, Lag
 from django.conf import settings # Para AUTH_USER_MODEL
 
 # Modelos referenciados de otras apps. Se usan strings para evitar importación circular.
@@ -10,7 +12,7 @@ from .consumo_energia import ConsumoEnergia
 __all__ = [
     'Granja', 'Galpon', 'Lote', 'SeguimientoDiario', 
     'MortalidadDiaria', 'MortalidadSemanal', 'SeguimientoEngorde',
-    'ConsumoEnergia'
+    'ResumenDiarioLote', 'ConsumoEnergia'
 ]
 
 class Granja(models.Model):
@@ -93,6 +95,9 @@ class Lote(models.Model):
         verbose_name = "Lote"
         verbose_name_plural = "Lotes"
         ordering = ['-fecha_ingreso', 'codigo_lote']
+        indexes = [
+            models.Index(fields=['fecha_inicio', 'id']),
+        ]
     
     def __str__(self):
         return f"Lote {self.codigo_lote} - {self.raza.nombre} ({self.get_estado_display()})"
@@ -129,10 +134,65 @@ class MortalidadDiaria(models.Model):
         verbose_name_plural = "Mortalidades Diarias"
         unique_together = [('lote', 'fecha')]
         ordering = ['-fecha']
+        indexes = [
+            models.Index(fields=['fecha', 'id']),
+        ]
 
     def __str__(self):
         return f"Mortalidad {self.lote.codigo_lote} - {self.fecha} ({self.cantidad_muertes} aves)"
 
+class SeguimientoDiarioQuerySet(models.QuerySet):
+    def con_aves_vivas(self):
+        """
+        Anota `aves_vivas` (aves presentes a la fecha del seguimiento) desde el
+        resumen diario del lote, dentro de la misma consulta.
+        """
+        resumen = ResumenDiarioLote.objects.filter(
+            lote=OuterRef('lote'),
+            fecha=OuterRef('fecha_seguimiento')
+        )
+        return self.annotate(aves_vivas=Subquery(resumen.order_by().values('aves_vivas')[:1]))
+    
+    def con_conversion(self, desde=None):
+        """
+        Anota peso_anterior, ganancia_peso, aves_vivas y conversion_alimenticia
+        (kg alimento / kg de peso ganado por el lote) en una sola consulta, con
+        LAG() sobre los seguimientos de cada lote ordenados por fecha.
+        
+        LAG() solo ve las filas del queryset: el inicio del rango se indica con
+        `desde` en lugar de filtrar fecha_seguimiento, así el seguimiento previo
+        a `desde` aporta el peso anterior y después se descarta.
+        """
+        queryset = self
+        if desde is not None:
+            previo = SeguimientoDiario.objects.filter(
+                lote=OuterRef('lote'),
+                fecha_seguimiento__lt=desde
+            ).order_by('-fecha_seguimiento').values('fecha_seguimiento')[:1]
+            queryset = queryset.filter(fecha_seguimiento__gte=Coalesce(Subquery(previo), Value(desde)))
+        
+        ventana = {'partition_by': [F('lote_id')], 'order_by': F('fecha_seguimiento').asc()}
+        queryset = queryset.con_aves_vivas().annotate(
+            fecha_anterior=Window(Lag('fecha_seguimiento'), **ventana),
+            peso_anterior=Window(Lag('peso_promedio_ave'), **ventana),
+        ).annotate(
+            ganancia_peso=Cast(F('peso_promedio_ave') - F('peso_anterior'), FloatField())
+        ).annotate(
+            conversion_alimenticia=Case(
+                When(
+                    ~Q(tipo_seguimiento='PRODUCCION') & Q(ganancia_peso__gt=0, aves_vivas__gt=0),
+                    then=Cast('consumo_alimento_kg', FloatField()) / (F('ganancia_peso') * F('aves_vivas'))
+                ),
+                output_field=FloatField()
+            )
+        )
+        
+        if desde is not None:
+            # Descartar el seguimiento previo usado solo como peso anterior. La
+            # condición usa una expresión de ventana, así que se evalúa después de LAG()
+            queryset = queryset.exclude(fecha_anterior__isnull=True, fecha_seguimiento__lt=desde)
+        return queryset
+
 class SeguimientoDiario(models.Model):
     TIPO_SEGUIMIENTO_CHOICES = [
         ('PRODUCCION', 'Producción de Huevos'),
@@ -167,17 +227,36 @@ class SeguimientoDiario(models.Model):
     # Observaciones generales
     observaciones = models.TextField(blank=True, verbose_name="Observaciones")
     
+    objects = SeguimientoDiarioQuerySet.as_manager()
+    
     class Meta:
         verbose_name = "Seguimiento Diario"
         verbose_name_plural = "Seguimientos Diarios"
         unique_together = [('lote', 'fecha_seguimiento')]
         ordering = ['-fecha_seguimiento']
+        indexes = [
+            models.Index(fields=['fecha_seguimiento', 'id']),
+        ]
     
     def __str__(self):
         return f"Seguimiento {self.lote.codigo_lote} - {self.fecha_seguimiento} ({self.get_tipo_seguimiento_display()})"
     
     def aves_presentes(self):
-        # Calcular aves presentes (cantidad inicial - muertes acumuladas)
+        # Usar el valor anotado por SeguimientoDiario.objects.con_aves_vivas()
+        aves_vivas = getattr(self, 'aves_vivas', None)
+        if aves_vivas is not None:
+            return aves_vivas
+        
+        # Leer el conteo mantenido en el resumen diario del lote
+        aves_vivas = ResumenDiarioLote.objects.filter(
+            lote_id=self.lote_id,
+            fecha=self.fecha_seguimiento
+        ).values_list('aves_vivas', flat=True).first()
+        if aves_vivas is not None:
+            return aves_vivas
+        
+        # Sin resumen (registro sin guardar o tabla sin reconstruir):
+        # calcular aves presentes (cantidad inicial - muertes acumuladas)
         try:
             muertes_acumuladas = self.lote.mortalidades_diarias.filter(
                 fecha__lte=self.fecha_seguimiento
@@ -197,6 +276,10 @@ class SeguimientoDiario(models.Model):
     
     def calcular_conversion_alimenticia(self):
         """Calcula la conversión alimenticia (kg alimento / kg peso ganado)"""
+        # Usar el valor anotado por SeguimientoDiario.objects.con_conversion()
+        if hasattr(self, 'peso_anterior'):
+            return self.conversion_alimenticia
+        
         if self.tipo_seguimiento == 'PRODUCCION':
             return None
             
@@ -222,7 +305,7 @@ class SeguimientoDiario(models.Model):
         if aves_presentes <= 0:
             return None
             
-        consumo_total = self.consumo_alimento_kg
+        consumo_total = float(self.consumo_alimento_kg)
         ganancia_total = ganancia_peso * aves_presentes
         
         if ganancia_total <= 0:
@@ -330,4 +413,49 @@ class SeguimientoEngorde(models.Model):
             if self.consumo_proteina and self.consumo_proteina > 0 and self.consumo_energia:
                 self.relacion_energia_proteina = self.consumo_energia / self.consumo_proteina
         
-        super().save(*args, **kwargs)
\ No newline at end of file
+        super().save(*args, **kwargs)
+
+
+class ResumenDiarioLote(models.Model):
+    """
+    Resumen diario materializado por lote. Se mantiene con señales sobre
+    SeguimientoDiario, MortalidadDiaria y ConsumoAlimento (ver produccion/resumen.py)
+    y se reconstruye con el comando reconstruir_resumen_diario.
+    Los valores quedan en NULL cuando no hay registro de origen para ese día.
+    """
+    lote = models.ForeignKey(Lote, on_delete=models.CASCADE, related_name='resumenes_diarios', verbose_name="Lote")
+    galpon = models.ForeignKey(Galpon, on_delete=models.CASCADE, related_name='resumenes_diarios', verbose_name="Galpón")
+    granja = models.ForeignKey(Granja, on_delete=models.CASCADE, related_name='resumenes_diarios', verbose_name="Granja")
+    fecha = models.DateField(verbose_name="Fecha")
+    
+    # Desde SeguimientoDiario
+    huevos_totales = models.PositiveIntegerField(null=True, blank=True, verbose_name="Huevos Totales")
+    huevos_rotos = models.PositiveIntegerField(null=True, blank=True, verbose_name="Huevos Rotos")
+    huevos_sucios = models.PositiveIntegerField(null=True, blank=True, verbose_name="Huevos Sucios")
+    peso_promedio_ave = models.DecimalField(max_digits=6, decimal_places=2, null=True, blank=True, verbose_name="Peso Promedio (kg)")
+    consumo_agua_litros = models.DecimalField(max_digits=8, decimal_places=2, null=True, blank=True, verbose_name="Consumo de Agua (L)")
+    
+    # Desde MortalidadDiaria
+    mortalidad = models.PositiveIntegerField(null=True, blank=True, verbose_name="Aves Muertas")
+    
+    # Desde ConsumoAlimento
+    consumo_alimento_kg = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True, verbose_name="Consumo de Alimento (kg)")
+    
+    # Mortalidad acumulada del lote hasta la fecha (inclusive) y cantidad
+    # inicial del lote menos esa mortalidad
+    mortalidad_acumulada = models.PositiveIntegerField(default=0, verbose_name="Mortalidad Acumulada")
+    aves_vivas = models.IntegerField(verbose_name="Aves Vivas")
+    
+    class Meta:
+        verbose_name = "Resumen Diario de Lote"
+        verbose_name_plural = "Resúmenes Diarios de Lote"
+        unique_together = [('lote', 'fecha')]
+        ordering = ['-fecha']
+        indexes = [
+            models.Index(fields=['galpon', 'fecha']),
+            models.Index(fields=['granja', 'fecha']),
+            models.Index(fields=['fecha']),
+        ]
+    
+    def __str__(self):
+        return f"Resumen {self.lote_id} - {self.fecha}"
@@ -0,0 +1,163 @@
+"""
+Mantenimiento incremental de MortalidadSemanal.
+
+La señal de MortalidadDiaria aplica la diferencia de muertes (nuevo - anterior)
+a la semana ISO correspondiente con un UPDATE atómico. Dentro de
+mortalidad_semanal_diferida() las semanas afectadas solo se anotan y se
+recalculan juntas, con una consulta agrupada, al terminar la importación.
+"""
+import datetime
+import threading
+from contextlib import contextmanager
+
+from django.db import transaction
+from django.db.models import DecimalField, F, Sum, Value
+from django.db.models.functions import ExtractIsoYear, ExtractWeek, Round
+
+from core.sincronizacion import registrar_cambios
+
+_estado = threading.local()
+
+
+def semana_iso(fecha):
+    """Devuelve (anio, semana) ISO de `fecha`; el año es el ISO, no fecha.year."""
+    anio, semana, _ = fecha.isocalendar()
+    return anio, semana
+
+
+def porcentaje_mortalidad(total_muertes, cantidad_inicial_aves):
+    """Porcentaje de mortalidad sobre las aves iniciales del lote, con dos decimales."""
+    if not cantidad_inicial_aves:
+        return 0
+    return round(total_muertes / cantidad_inicial_aves * 100, 2)
+
+
+def _semanas_pendientes():
+    """Semanas anotadas por el modo diferido activo, o None si no hay ninguno."""
+    return getattr(_estado, 'pendientes', None)
+
+
+def registrar_cambio_mortalidad(lote, fecha, diferencia):
+    """
+    Aplica `diferencia` muertes a la semana ISO de `fecha` del lote. En modo
+    diferido solo anota la semana para recalcularla al final.
+    """
+    anio, semana = semana_iso(fecha)
+    pendientes = _semanas_pendientes()
+    if pendientes is not None:
+        pendientes.add((lote.pk, anio, semana))
+        return
+    if diferencia:
+        aplicar_diferencia_mortalidad_semanal(lote, anio, semana, diferencia)
+
+
+def aplicar_diferencia_mortalidad_semanal(lote, anio, semana, diferencia):
+    """
+    Suma `diferencia` a total_muertes de la semana con un UPDATE sobre F(), sin
+    releer los días de la semana. Si la semana aún no existe se calcula desde
+    MortalidadDiaria con un upsert, que también cubre dos altas simultáneas.
+    """
+    from .models import MortalidadSemanal
+
+    total_muertes = F('total_muertes') + diferencia
+    if lote.cantidad_inicial_aves:
+        porcentaje = Round(
+            total_muertes * Value(100.0) / Value(lote.cantidad_inicial_aves), 2,
+            output_field=DecimalField(max_digits=5, decimal_places=2)
+        )
+    else:
+        porcentaje = Value(0)
+
+    semanas = MortalidadSemanal.objects.filter(lote=lote, anio=anio, semana=semana)
+    actualizadas = semanas.update(
+        total_muertes=total_muertes,
+        porcentaje_mortalidad=porcentaje
+    )
+    if not actualizadas:
+        recalcular_mortalidad_semanal({(lote.pk, anio, semana)})
+    else:
+        registrar_cambios(MortalidadSemanal, semanas.values_list('pk', flat=True))
+
+
+def recalcular_mortalidad_semanal(semanas, batch_size=1000):
+    """
+    Recalcula las semanas indicadas como (lote_id, anio, semana) con una sola
+    consulta agrupada por semana ISO y las guarda con un upsert. Las semanas
+    sin registros diarios quedan en cero. Devuelve la cantidad de semanas.
+    """
+    from .models import Lote, MortalidadDiaria, MortalidadSemanal
+
+    semanas = set(semanas)
+    if not semanas:
+        return 0
+
+    lote_ids = {lote_id for lote_id, _, _ in semanas}
+    desde = min(datetime.date.fromisocalendar(anio, semana, 1) for _, anio, semana in semanas)
+    hasta = max(datetime.date.fromisocalendar(anio, semana, 7) for _, anio, semana in semanas)
+
+    totales = {
+        (lote_id, anio, semana): total
+        for lote_id, anio, semana, total in MortalidadDiaria.objects.filter(
+            lote_id__in=lote_ids, fecha__range=(desde, hasta)
+        ).annotate(
+            anio=ExtractIsoYear('fecha'), semana=ExtractWeek('fecha')
+        ).values('lote_id', 'anio', 'semana').annotate(
+            total=Sum('cantidad_muertes')
+        ).values_list('lote_id', 'anio', 'semana', 'total')
+    }
+    aves_iniciales = dict(Lote.objects.filter(pk__in=lote_ids).values_list('pk', 'cantidad_inicial_aves'))
+
+    registros = [
+        MortalidadSemanal(
+            lote_id=lote_id,
+            anio=anio,
+            semana=semana,
+            total_muertes=totales.get((lote_id, anio, semana), 0),
+            porcentaje_mortalidad=porcentaje_mortalidad(
+                totales.get((lote_id, anio, semana), 0), aves_iniciales[lote_id]
+            )
+        )
+        for lote_id, anio, semana in sorted(semanas)
+        if lote_id in aves_iniciales
+    ]
+    MortalidadSemanal.objects.bulk_create(
+        registros,
+        batch_size=batch_size,
+        update_conflicts=True,
+        unique_fields=['lote', 'semana', 'anio'],
+        update_fields=['total_muertes', 'porcentaje_mortalidad']
+    )
+    registrar_cambios(MortalidadSemanal, [
+        pk for pk, lote_id, anio, semana in MortalidadSemanal.objects.filter(
+            lote_id__in=lote_ids, anio__in={anio for _, anio, _ in semanas}
+        ).values_list('pk', 'lote_id', 'anio', 'semana')
+        if (lote_id, anio, semana) in semanas
+    ])
+    return len(registros)
+
+
+@contextmanager
+def mortalidad_semanal_diferida():
+    """
+    Difiere la actualización de MortalidadSemanal durante una importación
+    masiva de mortalidad diaria: las semanas tocadas se recalculan juntas al
+    salir del bloque. Si el bloque termina con una excepción no se recalcula
+    nada, por lo que conviene usarlo dentro de transaction.atomic().
+
+        with transaction.atomic(), mortalidad_semanal_diferida():
+            for fila in filas:
+                MortalidadDiaria.objects.create(...)
+    """
+    if _semanas_pendientes() is not None:
+        # Un bloque anidado se recalcula con el más externo
+        yield
+        return
+
+    _estado.pendientes = set()
+    try:
+        yield
+        pendientes = _estado.pendientes
+    finally:
+        _estado.pendientes = None
+    with transaction.atomic():
+        recalcular_mortalidad_semanal(pendientes)
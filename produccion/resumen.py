@@ -0,0 +1,165 @@
+"""
+Mantenimiento del resumen diario materializado por lote (ResumenDiarioLote).
+
+Las señales de produccion/signals.py llaman a actualizar_resumen_diario cada vez
+que cambia un registro de origen; el comando reconstruir_resumen_diario usa
+reconstruir_resumen_diario para regenerar la tabla completa.
+"""
+from django.db import transaction
+from django.db.models import F, Q, Sum, Value
+
+# Registros de origen del resumen: modelo -> (campo del lote, campo de fecha)
+FUENTES_RESUMEN_DIARIO = {
+    'produccion.SeguimientoDiario': ('lote_id', 'fecha_seguimiento'),
+    'produccion.MortalidadDiaria': ('lote_id', 'fecha'),
+    'inventario.ConsumoAlimento': ('lote_aves_id', 'fecha_consumo'),
+}
+
+CAMPOS_SEGUIMIENTO = [
+    'huevos_totales', 'huevos_rotos', 'huevos_sucios',
+    'peso_promedio_ave', 'consumo_agua_litros',
+]
+
+
+def clave_resumen(instance):
+    """Devuelve la clave (lote_id, fecha) del resumen al que aporta `instance`."""
+    campo_lote, campo_fecha = FUENTES_RESUMEN_DIARIO[instance._meta.label]
+    return getattr(instance, campo_lote), getattr(instance, campo_fecha)
+
+
+def actualizar_resumen_diario(lote_id, fecha):
+    """
+    Recalcula la fila del resumen para (lote, fecha) a partir de sus registros
+    de origen. La mortalidad acumulada parte de la fila anterior del lote y la
+    diferencia de mortalidad se aplica a los días siguientes con un UPDATE,
+    sin recorrer el resto del lote. El lote queda bloqueado durante la
+    transacción para que dos cambios del mismo lote no se crucen.
+    """
+    from inventario.models import ConsumoAlimento
+    from .models import Lote, SeguimientoDiario, MortalidadDiaria, ResumenDiarioLote
+
+    if lote_id is None or fecha is None:
+        return
+
+    with transaction.atomic():
+        lote = Lote.objects.select_for_update(of=('self',)).select_related('galpon').filter(pk=lote_id).first()
+        if lote is None:
+            return
+
+        seguimiento = SeguimientoDiario.objects.filter(
+            lote_id=lote_id, fecha_seguimiento=fecha
+        ).values(*CAMPOS_SEGUIMIENTO).first()
+        mortalidad = MortalidadDiaria.objects.filter(
+            lote_id=lote_id, fecha=fecha
+        ).values_list('cantidad_muertes', flat=True).first()
+        consumo_alimento_kg = ConsumoAlimento.objects.filter(
+            lote_aves_id=lote_id, fecha_consumo=fecha
+        ).aggregate(total=Sum('cantidad_kg'))['total']
+
+        anterior = ResumenDiarioLote.objects.select_for_update().filter(
+            lote_id=lote_id, fecha=fecha
+        ).first()
+        diferencia_mortalidad = (mortalidad or 0) - ((anterior.mortalidad or 0) if anterior else 0)
+
+        if seguimiento is None and mortalidad is None and consumo_alimento_kg is None:
+            if anterior:
+                anterior.delete()
+        else:
+            acumulada_anterior = ResumenDiarioLote.objects.filter(
+                lote_id=lote_id, fecha__lt=fecha
+            ).order_by('-fecha').values_list('mortalidad_acumulada', flat=True).first() or 0
+            mortalidad_acumulada = acumulada_anterior + (mortalidad or 0)
+
+            valores = dict.fromkeys(CAMPOS_SEGUIMIENTO)
+            valores.update(seguimiento or {})
+            valores.update(
+                galpon_id=lote.galpon_id,
+                granja_id=lote.galpon.granja_id,
+                mortalidad=mortalidad,
+                consumo_alimento_kg=consumo_alimento_kg,
+                mortalidad_acumulada=mortalidad_acumulada,
+                aves_vivas=lote.cantidad_inicial_aves - mortalidad_acumulada,
+            )
+            ResumenDiarioLote.objects.update_or_create(lote_id=lote_id, fecha=fecha, defaults=valores)
+
+        if diferencia_mortalidad:
+            ResumenDiarioLote.objects.filter(lote_id=lote_id, fecha__gt=fecha).update(
+                mortalidad_acumulada=F('mortalidad_acumulada') + diferencia_mortalidad,
+                aves_vivas=F('aves_vivas') - diferencia_mortalidad
+            )
+
+
+def actualizar_aves_vivas_lote(lote):
+    """
+    Reubica las filas del resumen en el galpón actual del lote y recalcula
+    aves_vivas con su cantidad inicial, en un solo UPDATE.
+    """
+    from .models import ResumenDiarioLote
+
+    aves_vivas = Value(lote.cantidad_inicial_aves) - F('mortalidad_acumulada')
+    ResumenDiarioLote.objects.filter(lote=lote).filter(
+        ~Q(galpon_id=lote.galpon_id) | ~Q(aves_vivas=aves_vivas)
+    ).update(
+        galpon_id=lote.galpon_id,
+        granja_id=lote.galpon.granja_id,
+        aves_vivas=aves_vivas
+    )
+
+
+def reconstruir_resumen_diario(lote_ids=None, batch_size=1000):
+    """
+    Regenera el resumen diario de los lotes indicados (o de todos) con una
+    consulta agrupada por tabla de origen. Devuelve la cantidad de filas creadas.
+    """
+    from inventario.models import ConsumoAlimento
+    from .models import Lote, SeguimientoDiario, MortalidadDiaria, ResumenDiarioLote
+
+    lotes = Lote.objects.select_related('galpon')
+    seguimientos = SeguimientoDiario.objects.all()
+    mortalidades = MortalidadDiaria.objects.all()
+    consumos = ConsumoAlimento.objects.all()
+    if lote_ids is not None:
+        lotes = lotes.filter(pk__in=lote_ids)
+        seguimientos = seguimientos.filter(lote_id__in=lote_ids)
+        mortalidades = mortalidades.filter(lote_id__in=lote_ids)
+        consumos = consumos.filter(lote_aves_id__in=lote_ids)
+
+    lotes = {lote.pk: lote for lote in lotes}
+    filas = {}
+
+    for fila in seguimientos.values('lote_id', 'fecha_seguimiento', *CAMPOS_SEGUIMIENTO).iterator():
+        clave = (fila.pop('lote_id'), fila.pop('fecha_seguimiento'))
+        filas.setdefault(clave, {}).update(fila)
+
+    for lote_id, fecha, cantidad in mortalidades.values_list('lote_id', 'fecha', 'cantidad_muertes').iterator():
+        filas.setdefault((lote_id, fecha), {})['mortalidad'] = cantidad
+
+    for lote_id, fecha, total in consumos.values('lote_aves_id', 'fecha_consumo').annotate(
+        total=Sum('cantidad_kg')
+    ).values_list('lote_aves_id', 'fecha_consumo', 'total').iterator():
+        filas.setdefault((lote_id, fecha), {})['consumo_alimento_kg'] = total
+
+    resumenes = []
+    muertes_acumuladas = {}
+    for (lote_id, fecha) in sorted(filas):
+        lote = lotes[lote_id]
+        valores = filas[(lote_id, fecha)]
+        muertes_acumuladas[lote_id] = muertes_acumuladas.get(lote_id, 0) + (valores.get('mortalidad') or 0)
+        resumenes.append(ResumenDiarioLote(
+            lote_id=lote_id,
+            galpon_id=lote.galpon_id,
+            granja_id=lote.galpon.granja_id,
+            fecha=fecha,
+            mortalidad_acumulada=muertes_acumuladas[lote_id],
+            aves_vivas=lote.cantidad_inicial_aves - muertes_acumuladas[lote_id],
+            **valores
+        ))
+
+    with transaction.atomic():
+        existentes = ResumenDiarioLote.objects.all()
+        if lote_ids is not None:
+            existentes = existentes.filter(lote_id__in=lote_ids)
+        existentes.delete()
+        ResumenDiarioLote.objects.bulk_create(resumenes, batch_size=batch_size)
+
+    return len(resumenes)
@@ -1,7 +1,6 @@
 from django.db.models.signals import pre_save, post_save, post_delete
 from django.dispatch import receiver
 from django.apps import apps
-from django.db.models import Sum
 from django.utils import timezone
 import datetime
 
@@ -22,38 +21,123 @@ def set_consumo_energia_creator(sender, instance, **kwargs):
             # If there's any error, just ignore it
             pass
 
+@receiver(pre_save, sender='produccion.MortalidadDiaria')
+def guardar_mortalidad_anterior(sender, instance, **kwargs):
+    """
+    Remember the lote, date and deaths of a daily mortality record before an
+    edit, so the weekly total can be adjusted by the difference
+    """
+    instance._mortalidad_anterior = None
+    if instance.pk:
+        instance._mortalidad_anterior = sender.objects.filter(pk=instance.pk).values_list(
+            'lote_id', 'fecha', 'cantidad_muertes'
+        ).first()
+
+
 @receiver([post_save, post_delete], sender='produccion.MortalidadDiaria')
 def update_mortalidad_semanal(sender, instance, **kwargs):
     """
-    Update or create a weekly mortality record when a daily mortality record is saved or deleted
-    """
-    # Get the week number and year from the mortality date
-    week = instance.fecha.isocalendar()[1]
-    year = instance.fecha.year
-    
-    # Get all daily mortality records for this lote in the same week
-    daily_records = instance.lote.mortalidades_diarias.filter(
-        fecha__year=year,
-        fecha__week=week
-    )
-    
-    # Calculate total deaths for the week
-    total_muertes = daily_records.aggregate(total=Sum('cantidad_muertes'))['total'] or 0
-    
-    # Calculate mortality percentage (assuming we have the initial number of birds in the lote)
-    if instance.lote.cantidad_inicial_aves > 0:  # Corregido el nombre del campo
-        porcentaje_mortalidad = (total_muertes / instance.lote.cantidad_inicial_aves) * 100  # Corregido el nombre del campo
-    else:
-        porcentaje_mortalidad = 0
-    
-    # Get or create the weekly record
-    MortalidadSemanal = apps.get_model('produccion', 'MortalidadSemanal')
-    mortalidad_semanal, created = MortalidadSemanal.objects.update_or_create(
-        lote=instance.lote,
-        semana=week,
-        anio=year,
-        defaults={
-            'total_muertes': total_muertes,
-            'porcentaje_mortalidad': round(porcentaje_mortalidad, 2)
-        }
-    )
+    Apply the change in deaths of a daily mortality record to its ISO week
+    """
+    from .mortalidad_semanal import registrar_cambio_mortalidad, semana_iso
+    
+    if _borrado_en_cascada_de_lote(kwargs.get('origin')):
+        return
+    
+    if kwargs.get('signal') is post_delete:
+        registrar_cambio_mortalidad(instance.lote, instance.fecha, -instance.cantidad_muertes)
+        return
+    
+    diferencia = instance.cantidad_muertes
+    anterior = getattr(instance, '_mortalidad_anterior', None)
+    if anterior:
+        lote_id, fecha, cantidad = anterior
+        if lote_id == instance.lote_id and semana_iso(fecha) == semana_iso(instance.fecha):
+            diferencia -= cantidad
+        else:
+            Lote = apps.get_model('produccion', 'Lote')
+            registrar_cambio_mortalidad(Lote.objects.get(pk=lote_id), fecha, -cantidad)
+    registrar_cambio_mortalidad(instance.lote, instance.fecha, diferencia)
+
+
+@receiver([post_save, post_delete], sender='produccion.MortalidadDiaria')
+def registrar_cambio_seguimientos(sender, instance, **kwargs):
+    """
+    Give a new sync version to the daily records of the lote from the
+    mortality record's day on, whose live-bird count (aves_presentes_count)
+    moves with it
+    """
+    from django.db.models import Q
+    from core.sincronizacion import registrar_cambios
+    
+    if _borrado_en_cascada_de_lote(kwargs.get('origin')):
+        return
+    
+    claves = {(instance.lote_id, instance.fecha)}
+    anterior = getattr(instance, '_mortalidad_anterior', None)
+    if kwargs.get('signal') is not post_delete and anterior:
+        if tuple(anterior) == (instance.lote_id, instance.fecha, instance.cantidad_muertes):
+            return
+        claves.add(tuple(anterior[:2]))
+    
+    SeguimientoDiario = apps.get_model('produccion', 'SeguimientoDiario')
+    filtro = Q()
+    for lote_id, fecha in claves:
+        filtro |= Q(lote_id=lote_id, fecha_seguimiento__gte=fecha)
+    registrar_cambios(SeguimientoDiario, SeguimientoDiario.objects.filter(filtro).values_list('pk', flat=True))
+
+
+def _borrado_en_cascada_de_lote(origin):
+    """Whether a delete was triggered by deleting the Lote itself (its summary cascades too)"""
+    Lote = apps.get_model('produccion', 'Lote')
+    return origin is not None and getattr(origin, 'model', type(origin)) is Lote
+
+
+@receiver(pre_save, sender='produccion.SeguimientoDiario')
+@receiver(pre_save, sender='produccion.MortalidadDiaria')
+@receiver(pre_save, sender='inventario.ConsumoAlimento')
+def guardar_clave_resumen_anterior(sender, instance, **kwargs):
+    """
+    Remember the (lote, fecha) a record contributed to before an edit, so the
+    daily summary for the old day is also refreshed if either of them changes.
+    """
+    from .resumen import FUENTES_RESUMEN_DIARIO
+    
+    instance._clave_resumen_anterior = None
+    if instance.pk:
+        instance._clave_resumen_anterior = sender.objects.filter(pk=instance.pk).values_list(
+            *FUENTES_RESUMEN_DIARIO[sender._meta.label]
+        ).first()
+
+
+@receiver(post_save, sender='produccion.SeguimientoDiario')
+@receiver(post_save, sender='produccion.MortalidadDiaria')
+@receiver(post_save, sender='inventario.ConsumoAlimento')
+@receiver(post_delete, sender='produccion.SeguimientoDiario')
+@receiver(post_delete, sender='produccion.MortalidadDiaria')
+@receiver(post_delete, sender='inventario.ConsumoAlimento')
+def actualizar_resumen_diario_lote(sender, instance, **kwargs):
+    """
+    Keep ResumenDiarioLote in sync when a source record is saved or deleted
+    """
+    from .resumen import actualizar_resumen_diario, clave_resumen
+    
+    if _borrado_en_cascada_de_lote(kwargs.get('origin')):
+        return
+    
+    clave = clave_resumen(instance)
+    anterior = getattr(instance, '_clave_resumen_anterior', None)
+    if anterior and tuple(anterior) != clave:
+        actualizar_resumen_diario(*anterior)
+    actualizar_resumen_diario(*clave)
+
+
+@receiver(post_save, sender='produccion.Lote')
+def actualizar_lote_resumen_diario(sender, instance, created, **kwargs):
+    """
+    Keep a lote's daily summary rows in line with its galpón and initial bird count
+    """
+    from .resumen import actualizar_aves_vivas_lote
+    
+    if not created:
+        actualizar_aves_vivas_lote(instance)
@@ -0,0 +1,103 @@
+from datetime import date, time
+from decimal import Decimal
+
+from django.test import TestCase
+from avicola.models import Empresa
+from inventario.models import Raza
+from produccion.models import Granja, Galpon, Lote, SeguimientoDiario, ConsumoEnergia
+from produccion.energia import eficiencia_energetica
+
+
+class ConsumoEnergiaTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.empresa = Empresa.objects.create(
+            nombre="Empresa de Prueba",
+            rif="J-123456789",
+            direccion="Dirección de prueba"
+        )
+        cls.raza = Raza.objects.create(
+            nombre="Híbrido de Engorde",
+            tipo_raza="ENGORDE",
+            descripcion="Raza para engorde"
+        )
+        cls.granja = Granja.objects.create(
+            empresa=cls.empresa,
+            codigo_granja="GRANJA-001",
+            nombre="Granja de Prueba",
+            direccion="Ubicación de prueba"
+        )
+        cls.galpon = Galpon.objects.create(
+            granja=cls.granja,
+            numero_galpon="GALPON-001",
+            capacidad_aves=5000
+        )
+        cls.lote = Lote.objects.create(
+            galpon=cls.galpon,
+            raza=cls.raza,
+            fecha_inicio=date(2026, 1, 1),
+            cantidad_inicial_aves=1000,
+            codigo_lote="LOTE-001"
+        )
+
+    def crear_consumo(self, fecha, inicio, fin, kwh):
+        return ConsumoEnergia.objects.create(
+            galpon=self.galpon,
+            fecha_registro=fecha,
+            hora_inicio=inicio,
+            hora_fin=fin,
+            consumo_kwh=kwh
+        )
+
+    def crear_seguimiento(self, fecha, peso, huevos=0):
+        return SeguimientoDiario.objects.create(
+            lote=self.lote,
+            fecha_seguimiento=fecha,
+            huevos_totales=huevos,
+            peso_promedio_ave=peso,
+            consumo_alimento_kg=100
+        )
+
+    def test_interval_crossing_midnight_at_month_end(self):
+        """Intervals ending after midnight on the last day of the month last into the next day"""
+        consumo = self.crear_consumo(date(2026, 1, 31), time(22, 0), time(2, 30), 9)
+        self.assertEqual(consumo.duracion_horas, 4.5)
+        self.assertEqual(consumo.consumo_promedio_kw, 2.0)
+
+        anotado = ConsumoEnergia.objects.con_intervalo().get(pk=consumo.pk)
+        self.assertEqual(anotado.horas, 4.5)
+        self.assertEqual(anotado.potencia_promedio_kw, 2.0)
+
+    def test_totals_per_period(self):
+        """kWh are grouped by galpón and day, ISO week or month in the database"""
+        self.crear_consumo(date(2026, 2, 1), time(0), time(12), 10)  # domingo
+        self.crear_consumo(date(2026, 2, 1), time(12), time(0), 20)
+        self.crear_consumo(date(2026, 2, 2), time(6), time(18), 30)  # lunes
+
+        semanas = list(ConsumoEnergia.objects.totales_por_periodo('semana').values_list(
+            'periodo', 'consumo_kwh', 'horas_registradas', 'registros'
+        ))
+        self.assertEqual(semanas, [
+            (date(2026, 1, 26), Decimal(30), 24.0, 2),
+            (date(2026, 2, 2), Decimal(30), 12.0, 1),
+        ])
+        meses = list(ConsumoEnergia.objects.totales_por_periodo('mes').values_list('periodo', 'consumo_kwh'))
+        self.assertEqual(meses, [(date(2026, 2, 1), Decimal(60))])
+
+    def test_efficiency_per_dozen_and_kg(self):
+        """kWh per dozen eggs and per kg of liveweight gained come from the daily summary"""
+        self.crear_seguimiento(date(2026, 1, 31), peso=Decimal('1.00'))
+        self.crear_seguimiento(date(2026, 2, 10), peso=Decimal('1.20'), huevos=600)
+        self.crear_seguimiento(date(2026, 2, 20), peso=Decimal('1.50'), huevos=600)
+        self.crear_consumo(date(2026, 2, 5), time(0), time(0), 300)
+
+        with self.assertNumQueries(3):
+            filas = eficiencia_energetica('mes', desde=date(2026, 2, 1), hasta=date(2026, 2, 28))
+
+        self.assertEqual(len(filas), 1)
+        fila = filas[0]
+        self.assertEqual((fila['galpon_id'], fila['periodo'], fila['huevos']), (self.galpon.pk, date(2026, 2, 1), 1200))
+        self.assertEqual(fila['horas_registradas'], 24.0)
+        self.assertEqual(fila['kg_peso_vivo'], Decimal(500))
+        self.assertEqual(fila['kwh_por_docena'], 3)
+        self.assertEqual(fila['kwh_por_kg'], Decimal('0.6'))
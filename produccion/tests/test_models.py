@@ -164,6 +164,44 @@ class ProduccionModelsTest(TestCase):
         # Expected calculation: 1200 / (5000 * (1.75 - 1.50)) = 1200 / 1250 = 0.96
         self.assertAlmostEqual(conversion, 0.96, places=2)
     
+    def test_seguimiento_diario_con_conversion(self):
+        """Test that con_conversion() matches calcular_conversion_alimenticia in one query"""
+        today = timezone.now().date()
+        
+        for dias, peso in [(3, 1.20), (2, 1.50), (1, 1.45), (0, 1.75)]:
+            SeguimientoDiario.objects.create(
+                lote=self.lote,
+                fecha_seguimiento=today - timezone.timedelta(days=dias),
+                registrado_por=self.user,
+                tipo_seguimiento="ENGORDE",
+                peso_promedio_ave=peso,
+                consumo_alimento_kg=1200
+            )
+        MortalidadDiaria.objects.create(lote=self.lote, fecha=today, cantidad_muertes=200)
+        
+        esperado = [s.calcular_conversion_alimenticia() for s in SeguimientoDiario.objects.order_by('fecha_seguimiento')]
+        with self.assertNumQueries(1):
+            anotado = [
+                s.calcular_conversion_alimenticia()
+                for s in SeguimientoDiario.objects.con_conversion().order_by('fecha_seguimiento')
+            ]
+        
+        # Sin anterior, ganancia negativa, y 1200 / (4800 * 0.30) = 0.8333
+        self.assertIsNone(anotado[0])
+        self.assertIsNone(anotado[2])
+        self.assertAlmostEqual(anotado[3], 1200 / (4800 * 0.30), places=4)
+        for valor, valor_esperado in zip(anotado, esperado):
+            if valor_esperado is None:
+                self.assertIsNone(valor)
+            else:
+                self.assertAlmostEqual(valor, valor_esperado, places=6)
+        
+        # El seguimiento anterior a `desde` aporta el peso anterior pero no se devuelve
+        rango = list(SeguimientoDiario.objects.con_conversion(desde=today - timezone.timedelta(days=2)).order_by('fecha_seguimiento'))
+        self.assertEqual(len(rango), 3)
+        self.assertAlmostEqual(float(rango[0].peso_anterior), 1.20)
+        self.assertAlmostEqual(rango[0].conversion_alimenticia, 1200 / (5000 * 0.30), places=4)
+    
     def test_seguimiento_diario_str_representation(self):
         """Test string representation of SeguimientoDiario"""
         today = timezone.now().date()
@@ -0,0 +1,96 @@
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.test import TestCase
+from avicola.models import Empresa
+from inventario.models import Raza
+from produccion.models import Granja, Galpon, Lote, MortalidadDiaria, MortalidadSemanal
+from produccion.mortalidad_semanal import mortalidad_semanal_diferida, recalcular_mortalidad_semanal
+
+
+class MortalidadSemanalTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        empresa = Empresa.objects.create(
+            nombre="Empresa de Prueba",
+            rif="J-123456789",
+            direccion="Dirección de prueba"
+        )
+        cls.raza = Raza.objects.create(
+            nombre="Híbrido de Engorde",
+            tipo_raza="ENGORDE",
+            descripcion="Raza para engorde"
+        )
+        granja = Granja.objects.create(
+            empresa=empresa,
+            codigo_granja="GRANJA-001",
+            nombre="Granja de Prueba",
+            direccion="Ubicación de prueba"
+        )
+        cls.galpon = Galpon.objects.create(
+            granja=granja,
+            numero_galpon="GALPON-001",
+            capacidad_aves=5000
+        )
+        # Lunes de la semana ISO 1 de 2025, que empieza el 30/12/2024
+        cls.lunes = date(2024, 12, 30)
+
+    def setUp(self):
+        self.lote = Lote.objects.create(
+            galpon=self.galpon,
+            raza=self.raza,
+            fecha_inicio=self.lunes - timedelta(days=30),
+            cantidad_inicial_aves=1000,
+            codigo_lote="LOTE-001"
+        )
+
+    def semana(self, anio=2025, semana=1):
+        return MortalidadSemanal.objects.get(lote=self.lote, anio=anio, semana=semana)
+
+    def test_iso_year_at_year_boundary(self):
+        """Days of ISO week 1 that fall in December are counted in the new ISO year"""
+        MortalidadDiaria.objects.create(lote=self.lote, fecha=self.lunes, cantidad_muertes=4)
+        MortalidadDiaria.objects.create(lote=self.lote, fecha=self.lunes + timedelta(days=3), cantidad_muertes=6)
+
+        self.assertEqual(MortalidadSemanal.objects.count(), 1)
+        self.assertEqual(self.semana().total_muertes, 10)
+        self.assertEqual(self.semana().porcentaje_mortalidad, Decimal('1.00'))
+
+    def test_edit_and_delete_apply_difference(self):
+        """Editing, moving and deleting daily records adjust the weekly totals"""
+        mortalidad = MortalidadDiaria.objects.create(lote=self.lote, fecha=self.lunes, cantidad_muertes=5)
+        MortalidadDiaria.objects.create(lote=self.lote, fecha=self.lunes + timedelta(days=1), cantidad_muertes=3)
+
+        mortalidad.cantidad_muertes = 9
+        mortalidad.save()
+        self.assertEqual(self.semana().total_muertes, 12)
+
+        mortalidad.fecha = self.lunes + timedelta(days=7)
+        mortalidad.save()
+        self.assertEqual(self.semana().total_muertes, 3)
+        self.assertEqual(self.semana(semana=2).total_muertes, 9)
+
+        mortalidad.delete()
+        self.assertEqual(self.semana(semana=2).total_muertes, 0)
+        self.assertEqual(self.semana(semana=2).porcentaje_mortalidad, Decimal('0.00'))
+
+    def test_deferred_mode_recomputes_once(self):
+        """Inside the bulk mode the weeks are recomputed together at the end"""
+        with mortalidad_semanal_diferida():
+            for dias in range(14):
+                MortalidadDiaria.objects.create(lote=self.lote, fecha=self.lunes + timedelta(days=dias), cantidad_muertes=2)
+            self.assertFalse(MortalidadSemanal.objects.exists())
+
+        self.assertEqual(self.semana().total_muertes, 14)
+        self.assertEqual(self.semana(semana=2).total_muertes, 14)
+        self.assertEqual(self.semana(semana=2).porcentaje_mortalidad, Decimal('1.40'))
+
+    def test_recompute_matches_incremental(self):
+        """A grouped recompute gives the same totals as the signal updates"""
+        for dias in range(10):
+            MortalidadDiaria.objects.create(lote=self.lote, fecha=self.lunes + timedelta(days=dias), cantidad_muertes=dias)
+
+        campos = ['anio', 'semana', 'total_muertes', 'porcentaje_mortalidad']
+        incremental = list(MortalidadSemanal.objects.order_by('anio', 'semana').values(*campos))
+        self.assertEqual(recalcular_mortalidad_semanal({(self.lote.pk, 2025, 1), (self.lote.pk, 2025, 2)}), 2)
+        self.assertEqual(list(MortalidadSemanal.objects.order_by('anio', 'semana').values(*campos)), incremental)
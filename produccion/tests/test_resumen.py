@@ -0,0 +1,155 @@
+from datetime import timedelta
+
+from django.test import TestCase
+from django.utils import timezone
+from avicola.models import Empresa
+from inventario.models import Raza, Alimento, Proveedor, ConsumoAlimento
+from produccion.models import Granja, Galpon, Lote, SeguimientoDiario, MortalidadDiaria, ResumenDiarioLote
+from produccion.resumen import reconstruir_resumen_diario
+
+
+class ResumenDiarioLoteTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.empresa = Empresa.objects.create(
+            nombre="Empresa de Prueba",
+            rif="J-123456789",
+            direccion="Dirección de prueba"
+        )
+        cls.raza = Raza.objects.create(
+            nombre="Híbrido de Engorde",
+            tipo_raza="ENGORDE",
+            descripcion="Raza para engorde"
+        )
+        cls.proveedor = Proveedor.objects.create(
+            rif="J-123456789",
+            nombre="Proveedor de Prueba",
+            contacto_principal="Contacto de prueba",
+            telefono="1234567890"
+        )
+        cls.alimento = Alimento.objects.create(
+            nombre="Alimento Iniciador",
+            etapa="INICIADOR",
+            proveedor=cls.proveedor,
+            proteina_porcentaje=20.5,
+            fecha_vencimiento=timezone.now().date() + timedelta(days=180),
+            lote_fabricante="LOTE-001"
+        )
+        cls.granja = Granja.objects.create(
+            empresa=cls.empresa,
+            codigo_granja="GRANJA-001",
+            nombre="Granja de Prueba",
+            direccion="Ubicación de prueba"
+        )
+        cls.galpon = Galpon.objects.create(
+            granja=cls.granja,
+            numero_galpon="GALPON-001",
+            capacidad_aves=5000
+        )
+        cls.hoy = timezone.now().date()
+        cls.ayer = cls.hoy - timedelta(days=1)
+
+    def setUp(self):
+        self.lote = Lote.objects.create(
+            galpon=self.galpon,
+            raza=self.raza,
+            fecha_inicio=self.hoy - timedelta(days=10),
+            cantidad_inicial_aves=1000,
+            codigo_lote="LOTE-001"
+        )
+
+    def crear_seguimiento(self, fecha, huevos=100):
+        return SeguimientoDiario.objects.create(
+            lote=self.lote,
+            fecha_seguimiento=fecha,
+            huevos_totales=huevos,
+            huevos_rotos=2,
+            peso_promedio_ave=1.5,
+            consumo_alimento_kg=100
+        )
+
+    def resumen(self, fecha):
+        return ResumenDiarioLote.objects.get(lote=self.lote, fecha=fecha)
+
+    def test_signals_maintain_daily_row(self):
+        """Saving source records creates and updates one row per lote and day"""
+        self.crear_seguimiento(self.ayer)
+        MortalidadDiaria.objects.create(lote=self.lote, fecha=self.ayer, cantidad_muertes=5)
+        ConsumoAlimento.objects.create(alimento=self.alimento, lote_aves=self.lote, cantidad_kg=40, fecha_consumo=self.ayer)
+        ConsumoAlimento.objects.create(alimento=self.alimento, lote_aves=self.lote, cantidad_kg=60, fecha_consumo=self.ayer)
+
+        resumen = self.resumen(self.ayer)
+        self.assertEqual(resumen.galpon, self.galpon)
+        self.assertEqual(resumen.granja, self.granja)
+        self.assertEqual(resumen.huevos_totales, 100)
+        self.assertEqual(resumen.huevos_rotos, 2)
+        self.assertEqual(resumen.mortalidad, 5)
+        self.assertEqual(resumen.consumo_alimento_kg, 100)
+        self.assertEqual(resumen.aves_vivas, 995)
+
+    def test_mortality_change_propagates_to_later_days(self):
+        """Editing an earlier day's mortality shifts aves_vivas of the following days"""
+        MortalidadDiaria.objects.create(lote=self.lote, fecha=self.hoy, cantidad_muertes=3)
+        mortalidad = MortalidadDiaria.objects.create(lote=self.lote, fecha=self.ayer, cantidad_muertes=5)
+        self.assertEqual(self.resumen(self.hoy).aves_vivas, 992)
+
+        mortalidad.cantidad_muertes = 10
+        mortalidad.save()
+        self.assertEqual(self.resumen(self.hoy).aves_vivas, 987)
+
+        mortalidad.delete()
+        self.assertFalse(ResumenDiarioLote.objects.filter(lote=self.lote, fecha=self.ayer).exists())
+        self.assertEqual(self.resumen(self.hoy).aves_vivas, 997)
+
+    def test_moving_record_refreshes_both_days(self):
+        """Changing a record's date updates the old and the new day"""
+        seguimiento = self.crear_seguimiento(self.ayer)
+        seguimiento.fecha_seguimiento = self.hoy
+        seguimiento.save()
+
+        self.assertFalse(ResumenDiarioLote.objects.filter(lote=self.lote, fecha=self.ayer).exists())
+        self.assertEqual(self.resumen(self.hoy).huevos_totales, 100)
+
+    def test_rebuild_matches_incremental(self):
+        """The management rebuild produces the same rows as the signals"""
+        for dias in range(5):
+            fecha = self.hoy - timedelta(days=dias)
+            self.crear_seguimiento(fecha, huevos=100 + dias)
+            if dias % 2:
+                MortalidadDiaria.objects.create(lote=self.lote, fecha=fecha, cantidad_muertes=dias)
+        ConsumoAlimento.objects.create(alimento=self.alimento, lote_aves=self.lote, cantidad_kg=40, fecha_consumo=self.ayer)
+
+        campos = ['fecha', 'huevos_totales', 'mortalidad', 'consumo_alimento_kg', 'mortalidad_acumulada', 'aves_vivas']
+        incremental = list(ResumenDiarioLote.objects.order_by('fecha').values(*campos))
+        self.assertEqual(reconstruir_resumen_diario(), 5)
+        self.assertEqual(list(ResumenDiarioLote.objects.order_by('fecha').values(*campos)), incremental)
+
+    def test_lote_delete_cascades(self):
+        """Deleting a lote with tracking records also deletes its summary"""
+        self.crear_seguimiento(self.ayer)
+        MortalidadDiaria.objects.create(lote=self.lote, fecha=self.ayer, cantidad_muertes=5)
+
+        self.lote.delete()
+        self.assertFalse(ResumenDiarioLote.objects.exists())
+
+    def test_initial_count_change_updates_live_birds(self):
+        """Changing the lote's initial bird count recomputes aves_vivas"""
+        MortalidadDiaria.objects.create(lote=self.lote, fecha=self.ayer, cantidad_muertes=5)
+        self.lote.cantidad_inicial_aves = 1200
+        self.lote.save()
+
+        resumen = self.resumen(self.ayer)
+        self.assertEqual(resumen.mortalidad_acumulada, 5)
+        self.assertEqual(resumen.aves_vivas, 1195)
+
+    def test_con_aves_vivas_annotates_without_extra_queries(self):
+        """Live birds for a list of seguimientos come from a single query"""
+        for dias in range(5):
+            fecha = self.hoy - timedelta(days=dias)
+            self.crear_seguimiento(fecha)
+            MortalidadDiaria.objects.create(lote=self.lote, fecha=fecha, cantidad_muertes=2)
+
+        with self.assertNumQueries(1):
+            aves = [s.aves_presentes() for s in SeguimientoDiario.objects.con_aves_vivas().order_by('fecha_seguimiento')]
+        self.assertEqual(aves, [998, 996, 994, 992, 990])
+
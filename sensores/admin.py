@@ -3,7 +3,7 @@ from django.utils import timezone
 from django.utils.html import format_html
 from django.urls import reverse
 from django.utils.safestring import mark_safe
-from .models import TipoSensor, Sensor, LecturaSensor, AlertaSensor
+from .models import TipoSensor, Sensor, LecturaSensor, AlertaSensor, ReglaAlerta, PerfilAmbientalDiario
 
 
 @admin.register(TipoSensor)
@@ -21,6 +21,11 @@ class TipoSensorAdmin(admin.ModelAdmin):
         ('Configuración', {
             'fields': ('rango_min', 'rango_max', 'icono', 'color')
         }),
+        ('Retención de Lecturas (días)', {
+            'fields': ('retencion_lecturas_dias', 'retencion_minuto_dias',
+                       'retencion_15_minutos_dias', 'retencion_hora_dias'),
+            'classes': ('collapse',)
+        }),
         ('Auditoría', {
             'fields': ('fecha_creacion', 'fecha_actualizacion'),
             'classes': ('collapse',)
@@ -42,7 +47,8 @@ class LecturaSensorInline(admin.TabularInline):
 
 @admin.register(Sensor)
 class SensorAdmin(admin.ModelAdmin):
-    list_display = ('nombre', 'tipo_display', 'galpon_display', 'ubicacion', 'estado', 'activo', 'fecha_instalacion')
+    list_display = ('nombre', 'tipo_display', 'galpon_display', 'ubicacion', 'ultima_lectura', 'estado', 'activo', 'fecha_instalacion')
+    list_select_related = ('tipo', 'galpon__granja', 'ultima')
     list_filter = ('estado', 'activo', 'tipo', 'galpon')
     search_fields = ('nombre', 'codigo', 'ubicacion', 'observaciones')
     list_editable = ('estado', 'activo')
@@ -79,10 +85,14 @@ class SensorAdmin(admin.ModelAdmin):
     galpon_display.allow_tags = True
 
     def ultima_lectura(self, obj):
-        ultima = obj.lecturas.order_by('-fecha_hora_lectura').first()
+        # Último valor mantenido en UltimaLecturaSensor, sin consultar las lecturas
+        ultima = getattr(obj, 'ultima', None)
         if ultima:
-            url = reverse('admin:sensores_lecturasensor_change', args=[ultima.id])
-            return mark_safe(f'<a href="{url}">{ultima.valor} {obj.tipo.unidad_medida} - {ultima.fecha_hora_lectura.strftime("%Y-%m-%d %H:%M")}</a>')
+            texto = f'{ultima.valor} {obj.tipo.unidad_medida} - {timezone.localtime(ultima.fecha_hora_lectura).strftime("%Y-%m-%d %H:%M")}'
+            if ultima.lectura_id:
+                url = reverse('admin:sensores_lecturasensor_change', args=[ultima.lectura_id])
+                return mark_safe(f'<a href="{url}">{texto}</a>')
+            return texto
         return "Sin lecturas"
     ultima_lectura.short_description = 'Última Lectura'
     ultima_lectura.allow_tags = True
@@ -191,15 +201,20 @@ class LecturaSensorAdmin(admin.ModelAdmin):
 @admin.register(AlertaSensor)
 class AlertaSensorAdmin(admin.ModelAdmin):
     list_display = ('fecha_creacion', 'tipo_display', 'lectura_display', 'estado', 'resuelta_por_display')
-    list_filter = ('tipo', 'estado', 'fecha_creacion')
+    list_filter = ('tipo', 'estado', 'regla', 'fecha_creacion')
     search_fields = ('mensaje', 'comentarios', 'lectura__sensor__nombre')
-    readonly_fields = ('fecha_creacion', 'fecha_actualizacion', 'lectura_display', 'tipo_display', 'estado_display')
+    readonly_fields = ('fecha_creacion', 'fecha_actualizacion', 'lectura_display', 'tipo_display', 'estado_display',
+                       'regla', 'inicio_episodio', 'fin_episodio', 'valor_extremo', 'lecturas_episodio')
     date_hierarchy = 'fecha_creacion'
     actions = ['marcar_como_resueltas']
     fieldsets = (
         ('Información de la Alerta', {
             'fields': ('tipo_display', 'estado_display', 'lectura_display', 'mensaje')
         }),
+        ('Episodio', {
+            'fields': ('regla', 'inicio_episodio', 'fin_episodio', 'valor_extremo', 'lecturas_episodio'),
+            'classes': ('collapse',)
+        }),
         ('Resolución', {
             'fields': ('resuelta_por_display', 'fecha_resolucion', 'comentarios')
         }),
@@ -252,3 +267,43 @@ class AlertaSensorAdmin(admin.ModelAdmin):
         )
         self.message_user(request, f"{updated} alertas marcadas como resueltas.")
     marcar_como_resueltas.short_description = "Marcar como resueltas"
+
+
+@admin.register(ReglaAlerta)
+class ReglaAlertaAdmin(admin.ModelAdmin):
+    list_display = ('nombre', 'condicion', 'umbral', 'tipo_sensor', 'galpon', 'sensor', 'severidad', 'activa')
+    list_filter = ('activa', 'condicion', 'severidad', 'tipo_sensor', 'galpon')
+    search_fields = ('nombre',)
+    list_editable = ('activa',)
+    readonly_fields = ('fecha_creacion', 'fecha_actualizacion')
+    fieldsets = (
+        ('Información Básica', {
+            'fields': ('nombre', 'severidad', 'activa')
+        }),
+        ('Alcance', {
+            'fields': ('tipo_sensor', 'galpon', 'sensor')
+        }),
+        ('Condición', {
+            'fields': ('condicion', 'umbral', 'histeresis', 'duracion_segundos', 'enfriamiento_segundos')
+        }),
+        ('Auditoría', {
+            'fields': ('fecha_creacion', 'fecha_actualizacion'),
+            'classes': ('collapse',)
+        }),
+    )
+
+
+@admin.register(PerfilAmbientalDiario)
+class PerfilAmbientalDiarioAdmin(admin.ModelAdmin):
+    list_display = ('fecha', 'galpon', 'temperatura_min', 'temperatura_max', 'humedad_promedio',
+                    'horas_temperatura_alta', 'horas_estres_ith', 'consumo_kwh')
+    list_filter = ('galpon__granja', 'galpon')
+    list_select_related = ('galpon',)
+    date_hierarchy = 'fecha'
+
+    def has_add_permission(self, request):
+        # Los perfiles se calculan con el comando construir_perfiles_ambientales
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
@@ -0,0 +1,247 @@
+"""
+Analítica vectorizada del clima de los galpones.
+
+Las lecturas se traen como columnas (sensor, segundos epoch, valor) con un
+cursor directo a arreglos de NumPy, sin instanciar modelos, y los cálculos
+operan sobre los arreglos completos: medias móviles por tiempo, percentiles,
+índice de temperatura y humedad (ITH), grados-hora sobre un umbral y huecos
+de transmisión. resumen_clima_galpon() los combina para un galpón.
+
+Las funciones sobre arreglos esperan las lecturas ordenadas por sensor y
+fecha, como las devuelve lecturas_columnares().
+"""
+import datetime
+
+import numpy as np
+from django.db import connection
+from django.db.models import FloatField, Func
+
+UTC = datetime.timezone.utc
+
+# TipoSensor.codigo de los sensores que entran en el ITH
+CODIGO_TEMPERATURA = 'temperatura'
+CODIGO_HUMEDAD = 'humedad'
+
+UMBRAL_TEMPERATURA = 30.0  # °C a partir de los que se cuentan grados-hora
+UMBRAL_ITH = 79.0  # ITH de estrés calórico severo
+HUECO_SEGUNDOS = 300  # Silencio de un sensor que se considera corte
+PERCENTILES = (5, 50, 95)
+FILAS_POR_BLOQUE = 100000
+
+
+class EpochSegundos(Func):
+    """Segundos desde la época Unix de una fecha y hora, como número real."""
+    template = 'EXTRACT(EPOCH FROM %(expressions)s)'
+    arity = 1
+    output_field = FloatField()
+
+    def as_postgresql(self, compiler, connection, **extra_context):
+        return self.as_sql(
+            compiler, connection, template='EXTRACT(EPOCH FROM %(expressions)s)::double precision', **extra_context
+        )
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        # julianday() tiene precisión de décimas de milisegundo: se redondea al
+        # milisegundo para que las fechas exactas caigan en su intervalo
+        return self.as_sql(
+            compiler, connection, template='round((julianday(%(expressions)s) - 2440587.5) * 86400.0, 3)',
+            **extra_context
+        )
+
+    def as_mysql(self, compiler, connection, **extra_context):
+        return self.as_sql(compiler, connection, template='UNIX_TIMESTAMP(%(expressions)s)', **extra_context)
+
+
+def a_fecha(segundos):
+    return datetime.datetime.fromtimestamp(float(segundos), tz=UTC)
+
+
+def lecturas_columnares(sensores, desde, hasta):
+    """
+    Lecturas de los `sensores` (ids) en [desde, hasta) como tres arreglos
+    (sensor_id, segundos, valor) ordenados por sensor y fecha.
+    """
+    from .models import LecturaSensor
+
+    consulta = LecturaSensor.objects.filter(
+        sensor_id__in=list(sensores),
+        fecha_hora_lectura__gte=desde,
+        fecha_hora_lectura__lt=hasta
+    ).order_by('sensor_id', 'fecha_hora_lectura').values_list(
+        'sensor_id', EpochSegundos('fecha_hora_lectura'), 'valor'
+    )
+    sql, params = consulta.query.sql_with_params()
+
+    bloques = []
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        while filas := cursor.fetchmany(FILAS_POR_BLOQUE):
+            bloques.append(np.array(filas, dtype=np.float64))
+    datos = np.concatenate(bloques) if bloques else np.empty((0, 3))
+    return datos[:, 0].astype(np.int64), datos[:, 1], datos[:, 2]
+
+
+def tramos_sensores(sensor_ids):
+    """(ids, inicios, fines) de los tramos contiguos de cada sensor."""
+    if not len(sensor_ids):
+        return sensor_ids, np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    inicios = np.concatenate(([0], np.flatnonzero(sensor_ids[1:] != sensor_ids[:-1]) + 1))
+    fines = np.append(inicios[1:], len(sensor_ids))
+    return sensor_ids[inicios], inicios, fines
+
+
+def media_movil(sensor_ids, segundos, valores, ventana):
+    """Media de cada lectura con las del mismo sensor de los `ventana` segundos anteriores."""
+    desde = np.empty(len(segundos), dtype=np.int64)
+    for _, inicio, fin in zip(*tramos_sensores(sensor_ids)):
+        tramo = segundos[inicio:fin]
+        desde[inicio:fin] = np.searchsorted(tramo, tramo - ventana, side='right') + inicio
+    hasta = np.arange(1, len(valores) + 1)
+    acumulado = np.concatenate(([0.0], np.cumsum(valores)))
+    return (acumulado[hasta] - acumulado[desde]) / (hasta - desde)
+
+
+def percentiles_por_sensor(sensor_ids, valores, percentiles=PERCENTILES):
+    """{sensor_id: arreglo de percentiles} de los valores de cada sensor."""
+    ids, inicios, fines = tramos_sensores(sensor_ids)
+    return {
+        int(sensor_id): np.percentile(valores[inicio:fin], percentiles)
+        for sensor_id, inicio, fin in zip(ids, inicios, fines)
+    }
+
+
+def indice_temperatura_humedad(temperatura, humedad):
+    """ITH (fórmula NRC) con temperatura en °C y humedad relativa en %."""
+    return 0.8 * temperatura + humedad / 100 * (temperatura - 14.4) + 46.4
+
+
+def grados_hora(sensor_ids, segundos, valores, umbral, hueco=HUECO_SEGUNDOS):
+    """
+    {sensor_id: grados-hora sobre `umbral`}: el exceso de cada lectura por el
+    tiempo hasta la siguiente del mismo sensor. Los cortes más largos que
+    `hueco` no suman.
+    """
+    ids, inicios, _ = tramos_sensores(sensor_ids)
+    if not len(ids):
+        return {}
+    intervalos = np.diff(segundos)
+    validos = (sensor_ids[1:] == sensor_ids[:-1]) & (intervalos <= hueco)
+    aportes = np.where(validos, np.maximum(valores[:-1] - umbral, 0) * intervalos, 0.0)
+    # Sumas por tramo; el aporte de la última lectura de cada sensor es 0
+    totales = np.add.reduceat(np.append(aportes, 0.0), inicios) / 3600
+    return dict(zip(ids.tolist(), totales.tolist()))
+
+
+def huecos(sensor_ids, segundos, hueco=HUECO_SEGUNDOS, desde=None, hasta=None, sensores=()):
+    """
+    Cortes de transmisión: intervalos de más de `hueco` segundos sin lecturas
+    de un sensor, como [(sensor_id, inicio, fin)] en segundos. Con `desde` y
+    `hasta` (segundos) también cuentan el comienzo y el final de la ventana, y
+    los `sensores` sin ninguna lectura quedan cortados en toda ella.
+    """
+    mismos = sensor_ids[1:] == sensor_ids[:-1]
+    internos = np.flatnonzero(mismos & (np.diff(segundos) > hueco))
+    cortes = list(zip(sensor_ids[internos].tolist(), segundos[internos].tolist(), segundos[internos + 1].tolist()))
+
+    if desde is not None and hasta is not None:
+        ids, inicios, fines = tramos_sensores(sensor_ids)
+        primeras, ultimas = segundos[inicios], segundos[fines - 1]
+        for sensor_id, primera in zip(ids[primeras - desde > hueco].tolist(), primeras[primeras - desde > hueco].tolist()):
+            cortes.append((sensor_id, desde, primera))
+        for sensor_id, ultima in zip(ids[hasta - ultimas > hueco].tolist(), ultimas[hasta - ultimas > hueco].tolist()):
+            cortes.append((sensor_id, ultima, hasta))
+        cortes.extend((sensor_id, desde, hasta) for sensor_id in sorted(set(sensores) - set(ids.tolist())))
+
+    return sorted(cortes)
+
+
+def serie_promedio(segundos, valores, intervalo):
+    """
+    Promedio de todas las lecturas por intervalo de `intervalo` segundos, como
+    (inicios, promedios) de los intervalos con lecturas.
+    """
+    if not len(segundos):
+        return np.empty(0), np.empty(0)
+    cubetas = np.floor_divide(segundos, intervalo).astype(np.int64)
+    primera = cubetas.min()
+    cantidades = np.bincount(cubetas - primera)
+    sumas = np.bincount(cubetas - primera, weights=valores)
+    presentes = np.flatnonzero(cantidades)
+    return (presentes + primera) * intervalo, sumas[presentes] / cantidades[presentes]
+
+
+def _estadisticas(valores):
+    if not len(valores):
+        return None
+    p = np.percentile(valores, PERCENTILES)
+    return {
+        'minimo': float(valores.min()),
+        'maximo': float(valores.max()),
+        'promedio': float(valores.mean()),
+        **{f'p{percentil}': float(valor) for percentil, valor in zip(PERCENTILES, p)},
+    }
+
+
+def resumen_clima_galpon(galpon, desde, hasta, intervalo=60, ventana=3600,
+                         umbral_temperatura=UMBRAL_TEMPERATURA, umbral_ith=UMBRAL_ITH, hueco=HUECO_SEGUNDOS):
+    """
+    Resumen del clima de un galpón en [desde, hasta): estadísticas por sensor
+    y del galpón (promedio de sus sensores por `intervalo` segundos) para la
+    temperatura, la humedad y el ITH, la mayor media móvil de `ventana`
+    segundos, los grados-hora y horas sobre `umbral_temperatura`, las horas con ITH
+    sobre `umbral_ith` y los cortes de transmisión de más de `hueco` segundos.
+    """
+    from .models import Sensor
+
+    sensores = {
+        sensor_id: (codigo, tipo)
+        for sensor_id, codigo, tipo in Sensor.objects.filter(galpon=galpon).values_list('pk', 'codigo', 'tipo__codigo')
+    }
+    sensor_ids, segundos, valores = lecturas_columnares(sensores, desde, hasta)
+
+    por_sensor = {}
+    ids, inicios, fines = tramos_sensores(sensor_ids)
+    moviles = media_movil(sensor_ids, segundos, valores, ventana)
+    excesos = grados_hora(sensor_ids, segundos, valores, umbral_temperatura, hueco)
+    for sensor_id, inicio, fin in zip(ids.tolist(), inicios, fines):
+        codigo, tipo = sensores[sensor_id]
+        por_sensor[codigo] = {
+            'tipo': tipo,
+            'lecturas': int(fin - inicio),
+            **_estadisticas(valores[inicio:fin]),
+            'media_movil_maxima': float(moviles[inicio:fin].max()),
+        }
+        if tipo == CODIGO_TEMPERATURA:
+            por_sensor[codigo]['grados_hora'] = excesos[sensor_id]
+
+    galpon_resumen = {}
+    series = {}
+    for tipo in (CODIGO_TEMPERATURA, CODIGO_HUMEDAD):
+        seleccion = np.isin(sensor_ids, [sensor_id for sensor_id, (_, codigo) in sensores.items() if codigo == tipo])
+        series[tipo] = serie_promedio(segundos[seleccion], valores[seleccion], intervalo)
+        galpon_resumen[tipo] = _estadisticas(series[tipo][1])
+
+    temperatura, humedad = series[CODIGO_TEMPERATURA], series[CODIGO_HUMEDAD]
+    if galpon_resumen[CODIGO_TEMPERATURA]:
+        galpon_resumen[CODIGO_TEMPERATURA].update(
+            grados_hora=float(np.maximum(temperatura[1] - umbral_temperatura, 0).sum() * intervalo / 3600),
+            horas_sobre_umbral=float((temperatura[1] > umbral_temperatura).sum() * intervalo / 3600),
+        )
+    _, en_temperatura, en_humedad = np.intersect1d(temperatura[0], humedad[0], return_indices=True)
+    ith = indice_temperatura_humedad(temperatura[1][en_temperatura], humedad[1][en_humedad])
+    galpon_resumen['ith'] = _estadisticas(ith)
+    if galpon_resumen['ith']:
+        galpon_resumen['ith']['horas_estres'] = float((ith > umbral_ith).sum() * intervalo / 3600)
+
+    return {
+        'desde': desde,
+        'hasta': hasta,
+        'galpon': galpon_resumen,
+        'sensores': por_sensor,
+        'huecos': [
+            {'sensor': sensores[sensor_id][0], 'desde': a_fecha(inicio), 'hasta': a_fecha(fin), 'segundos': fin - inicio}
+            for sensor_id, inicio, fin in huecos(
+                sensor_ids, segundos, hueco, desde.timestamp(), hasta.timestamp(), sensores
+            )
+        ],
+    }
@@ -7,6 +7,8 @@ class SensoresConfig(AppConfig):
     name = 'sensores'
     
     def ready(self):
+        import sensores.signals  # noqa
+        
         try:
             from django.contrib import admin
             from .admin import (
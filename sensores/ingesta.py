@@ -0,0 +1,174 @@
+"""
+Ingesta masiva de lecturas de sensores.
+
+Un gateway envía en una sola solicitud lecturas de muchos sensores (JSON, JSON
+lines o CSV compacto). Se validan contra un mapa en caché de los sensores
+activos, se insertan con bulk_create por bloques y las que quedan fuera del
+rango del tipo de sensor generan su AlertaSensor en el mismo lote. Después
+se actualiza el último valor de cada sensor y se pasan al motor de reglas
+(sensores.reglas).
+"""
+import csv
+import datetime
+import io
+import json
+import math
+
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+CLAVE_MAPA_SENSORES = 'sensores:mapa_ingesta'
+DURACION_MAPA_SENSORES = 300
+
+# Columnas del CSV compacto, en orden; las últimas son opcionales
+COLUMNAS_CSV = ('sensor', 'valor', 'fecha_hora_lectura', 'estado_sensor', 'bateria', 'senal')
+
+MAX_LECTURAS_POR_SOLICITUD = 20000
+
+
+class ErrorIngesta(ValueError):
+    """El contenido enviado no se puede interpretar."""
+
+
+def mapa_sensores():
+    """
+    {codigo: (sensor_id, rango_min, rango_max, unidad_medida)} de los sensores
+    activos, en caché. Las señales de sensores lo invalidan al cambiar un
+    Sensor o TipoSensor.
+    """
+    from .models import Sensor
+
+    mapa = cache.get(CLAVE_MAPA_SENSORES)
+    if mapa is None:
+        mapa = {
+            codigo: (sensor_id, rango_min, rango_max, unidad)
+            for codigo, sensor_id, rango_min, rango_max, unidad in Sensor.objects.filter(
+                activo=True, tipo__activo=True
+            ).values_list('codigo', 'pk', 'tipo__rango_min', 'tipo__rango_max', 'tipo__unidad_medida')
+        }
+        cache.set(CLAVE_MAPA_SENSORES, mapa, DURACION_MAPA_SENSORES)
+    return mapa
+
+
+def invalidar_mapa_sensores():
+    cache.delete(CLAVE_MAPA_SENSORES)
+
+
+def parsear_lecturas(contenido, tipo_contenido):
+    """
+    Convierte el cuerpo de la solicitud en una lista de diccionarios según su
+    tipo: application/json (lista u objeto con "lecturas"),
+    application/x-ndjson (un objeto por línea) o text/csv (COLUMNAS_CSV en
+    orden, sin encabezado o con uno que empiece por "sensor").
+    """
+    if isinstance(contenido, bytes):
+        contenido = contenido.decode('utf-8')
+    tipo_contenido = (tipo_contenido or '').split(';')[0].strip().lower()
+
+    try:
+        if tipo_contenido in ('application/x-ndjson', 'application/jsonl', 'application/jsonlines'):
+            return [json.loads(linea) for linea in contenido.splitlines() if linea.strip()]
+        if tipo_contenido == 'text/csv':
+            filas = []
+            for fila in csv.reader(io.StringIO(contenido)):
+                if not fila or fila[0].startswith('#') or fila[0].strip().lower() == 'sensor':
+                    continue
+                filas.append({
+                    columna: valor for columna, valor in zip(COLUMNAS_CSV, fila) if valor != ''
+                })
+            return filas
+        datos = json.loads(contenido)
+    except (ValueError, csv.Error) as e:
+        raise ErrorIngesta(f"Contenido inválido: {e}")
+
+    if isinstance(datos, dict):
+        datos = datos.get('lecturas')
+    if not isinstance(datos, list):
+        raise ErrorIngesta('Se esperaba una lista de lecturas o un objeto con "lecturas"')
+    return datos
+
+
+def _fecha(valor, ahora):
+    """Fecha de la lectura desde ISO 8601 o segundos epoch; sin valor, `ahora`."""
+    if valor in (None, ''):
+        return ahora
+    if isinstance(valor, (int, float)) or (isinstance(valor, str) and valor.replace('.', '', 1).isdigit()):
+        return datetime.datetime.fromtimestamp(float(valor), tz=datetime.timezone.utc)
+    fecha = parse_datetime(valor)
+    if fecha is None:
+        raise ValueError(f"fecha inválida: {valor}")
+    if timezone.is_naive(fecha):
+        fecha = timezone.make_aware(fecha)
+    return fecha
+
+
+def _opcional(tipo, valor):
+    return None if valor in (None, '') else tipo(valor)
+
+
+def ingerir_lecturas(filas, batch_size=1000):
+    """
+    Valida e inserta las lecturas y sus alertas de rango. Las filas inválidas
+    no detienen el lote: se devuelven en "errores" con su índice. Devuelve
+    {"recibidas", "guardadas", "alertas", "errores"}.
+    """
+    from .models import LecturaSensor, AlertaSensor
+    from .reglas import motor
+    from .ultimas import actualizar_ultimas_lecturas
+
+    sensores = mapa_sensores()
+    ahora = timezone.now()
+    lecturas = []
+    fuera_de_rango = []
+    errores = []
+
+    for indice, fila in enumerate(filas):
+        try:
+            if not isinstance(fila, dict):
+                raise ValueError("se esperaba un objeto")
+            sensor = sensores.get(str(fila.get('sensor', '')))
+            if sensor is None:
+                raise ValueError(f"sensor desconocido o inactivo: {fila.get('sensor')}")
+            sensor_id, rango_min, rango_max, unidad = sensor
+            valor = float(fila['valor'])
+            if not math.isfinite(valor):
+                raise ValueError("valor no numérico")
+            lectura = LecturaSensor(
+                sensor_id=sensor_id,
+                valor=valor,
+                fecha_hora=ahora,
+                fecha_hora_lectura=_fecha(fila.get('fecha_hora_lectura'), ahora),
+                estado_sensor=fila.get('estado_sensor') or 'OK',
+                bateria=_opcional(float, fila.get('bateria')),
+                senal=_opcional(int, fila.get('senal')),
+            )
+        except (KeyError, TypeError, ValueError) as e:
+            mensaje = f"falta el campo {e}" if isinstance(e, KeyError) else str(e)
+            errores.append({'indice': indice, 'error': mensaje})
+            continue
+
+        lecturas.append(lectura)
+        if not rango_min <= valor <= rango_max:
+            fuera_de_rango.append((lectura, rango_min, rango_max, unidad))
+
+    with transaction.atomic():
+        LecturaSensor.objects.bulk_create(lecturas, batch_size=batch_size)
+        alertas = AlertaSensor.objects.bulk_create([
+            AlertaSensor(
+                lectura=lectura,
+                tipo='ALTA',
+                mensaje=f"Valor {lectura.valor} {unidad} fuera del rango del sensor ({rango_min} a {rango_max} {unidad})",
+            )
+            for lectura, rango_min, rango_max, unidad in fuera_de_rango
+        ], batch_size=batch_size)
+        actualizar_ultimas_lecturas(lecturas)
+        alertas_reglas = motor.procesar(lecturas)
+
+    return {
+        'recibidas': len(filas),
+        'guardadas': len(lecturas),
+        'alertas': len(alertas) + alertas_reglas,
+        'errores': errores,
+    }
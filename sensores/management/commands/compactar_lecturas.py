@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+from sensores.series import agregar_lecturas, aplicar_retencion
+
+
+class Command(BaseCommand):
+    help = 'Agrega las lecturas nuevas de sensores por minuto, 15 minutos y hora, y aplica la retención de cada tipo de sensor'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sin-retencion',
+            action='store_true',
+            help='Solo actualizar los agregados, sin borrar datos vencidos',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Cantidad de filas por INSERT (por defecto 1000)',
+        )
+
+    def handle(self, *args, **options):
+        total = agregar_lecturas(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Agregados actualizados: {total}"))
+
+        if not options['sin_retencion']:
+            borradas = aplicar_retencion()
+            self.stdout.write(self.style.SUCCESS(
+                "Retención aplicada: "
+                f"{borradas[0]} lecturas, {borradas[60]} de 1 minuto, "
+                f"{borradas[900]} de 15 minutos, {borradas[3600]} por hora"
+            ))
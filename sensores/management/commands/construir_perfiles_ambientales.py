@@ -0,0 +1,53 @@
+import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from produccion.models import Galpon
+from sensores.perfiles import construir_perfiles_ambientales
+
+
+class Command(BaseCommand):
+    help = 'Calcula el perfil ambiental diario de los galpones con lecturas o consumos de energía nuevos (ejecución nocturna)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--desde',
+            type=datetime.date.fromisoformat,
+            help='Recalcular todos los días desde esta fecha (AAAA-MM-DD) en lugar de solo los pendientes',
+        )
+        parser.add_argument(
+            '--hasta',
+            type=datetime.date.fromisoformat,
+            help='Último día a recalcular con --desde (por defecto, ayer)',
+        )
+        parser.add_argument(
+            '--galpon',
+            type=int,
+            action='append',
+            dest='galpones',
+            help='ID de galpón a recalcular con --desde (se puede repetir). Por defecto, todos',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Cantidad de filas por INSERT (por defecto 500)',
+        )
+
+    def handle(self, *args, **options):
+        dias = None
+        if options['desde']:
+            desde = options['desde']
+            hasta = options['hasta'] or datetime.date.today() - datetime.timedelta(days=1)
+            if hasta < desde:
+                raise CommandError("--hasta no puede ser anterior a --desde")
+            fechas = {desde + datetime.timedelta(days=i) for i in range((hasta - desde).days + 1)}
+            galpones = Galpon.objects.all()
+            if options['galpones']:
+                galpones = galpones.filter(pk__in=options['galpones'])
+            dias = {galpon_id: fechas for galpon_id in galpones.values_list('pk', flat=True)}
+            self.stdout.write(f"Recalculando perfiles del {desde} al {hasta} de {len(dias)} galpones")
+        elif options['hasta'] or options['galpones']:
+            raise CommandError("--hasta y --galpon requieren --desde")
+
+        total = construir_perfiles_ambientales(dias, batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Perfiles ambientales guardados: {total}"))
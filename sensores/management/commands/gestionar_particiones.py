@@ -0,0 +1,55 @@
+from django.core.management.base import BaseCommand
+from sensores import particiones
+
+
+class Command(BaseCommand):
+    help = 'Crea las particiones mensuales futuras de las lecturas de sensores y quita las vencidas según la retención'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--meses-adelante',
+            type=int,
+            default=3,
+            help='Cantidad de meses futuros con partición creada (por defecto 3)',
+        )
+        parser.add_argument(
+            '--retencion-meses',
+            type=int,
+            default=particiones.retencion_meses(),
+            help='Meses de lecturas a conservar (por defecto SENSORES_RETENCION_LECTURAS_MESES; sin valor no se borra nada)',
+        )
+        parser.add_argument(
+            '--separar',
+            action='store_true',
+            help='Separar (DETACH) las particiones vencidas sin eliminarlas, para archivarlas',
+        )
+
+    def handle(self, *args, **options):
+        meses = options['retencion_meses']
+
+        if not particiones.es_particionada():
+            self.stdout.write("La tabla de lecturas no está particionada; la retención se aplica con DELETE")
+            if meses:
+                borradas = particiones.eliminar_lecturas_vencidas(meses)
+                self.stdout.write(self.style.SUCCESS(f"Lecturas vencidas borradas: {borradas}"))
+            return
+
+        creadas = particiones.crear_particiones(options['meses_adelante'])
+        for nombre in creadas:
+            self.stdout.write(f"Partición creada: {nombre}")
+
+        if meses:
+            quitadas, omitidas = particiones.eliminar_particiones_vencidas(meses, separar=options['separar'])
+            accion = "separada" if options['separar'] else "eliminada"
+            for nombre in quitadas:
+                self.stdout.write(f"Partición {accion}: {nombre}")
+            for nombre in omitidas:
+                self.stdout.write(self.style.WARNING(
+                    f"Partición {nombre} omitida: tiene lecturas sin agregar (ejecute compactar_lecturas)"
+                ))
+            # Lecturas antiguas que hayan quedado en la partición DEFAULT
+            particiones.eliminar_lecturas_vencidas(meses)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Particiones al día: {len(creadas)} creadas, {len(particiones.particiones())} en total"
+        ))
@@ -0,0 +1,113 @@
+# Generated by Django 5.2.1 on 2026-10-18 09:34
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('produccion', '0013_migrate_galpones_data'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TipoSensor',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nombre', models.CharField(max_length=50, unique=True)),
+                ('codigo', models.SlugField(unique=True)),
+                ('descripcion', models.TextField(blank=True)),
+                ('unidad_medida', models.CharField(help_text='Ej: °C, %, ppm, etc.', max_length=20)),
+                ('rango_min', models.FloatField(help_text='Valor mínimo que puede medir el sensor')),
+                ('rango_max', models.FloatField(help_text='Valor máximo que puede medir el sensor')),
+                ('icono', models.CharField(default='fa-thermometer-half', help_text='Clase de icono de FontAwesome', max_length=50)),
+                ('color', models.CharField(default='#4e73df', help_text='Código de color en hexadecimal', max_length=20)),
+                ('activo', models.BooleanField(default=True)),
+                ('fecha_creacion', models.DateTimeField(auto_now_add=True)),
+                ('fecha_actualizacion', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Tipo de Sensor',
+                'verbose_name_plural': 'Tipos de Sensores',
+                'ordering': ['nombre'],
+            },
+        ),
+        migrations.CreateModel(
+            name='Sensor',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('codigo', models.CharField(max_length=50, unique=True)),
+                ('nombre', models.CharField(max_length=100)),
+                ('ubicacion', models.CharField(help_text='Ubicación física dentro del galpón', max_length=100)),
+                ('estado', models.CharField(choices=[('ACTIVO', 'Activo'), ('MANTENIMIENTO', 'En Mantenimiento'), ('INACTIVO', 'Inactivo'), ('FALLA', 'En Falla')], default='ACTIVO', max_length=20)),
+                ('fecha_instalacion', models.DateField(default=django.utils.timezone.now)),
+                ('ultima_calibracion', models.DateField(blank=True, null=True)),
+                ('activo', models.BooleanField(default=True)),
+                ('observaciones', models.TextField(blank=True)),
+                ('fecha_creacion', models.DateTimeField(auto_now_add=True)),
+                ('fecha_actualizacion', models.DateTimeField(auto_now=True)),
+                ('galpon', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='sensores', to='produccion.galpon')),
+                ('tipo', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='sensores', to='sensores.tiposensor')),
+            ],
+            options={
+                'verbose_name': 'Sensor',
+                'verbose_name_plural': 'Sensores',
+                'ordering': ['galpon', 'tipo__nombre'],
+            },
+        ),
+        migrations.CreateModel(
+            name='LecturaSensor',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('valor', models.FloatField()),
+                ('fecha_hora', models.DateTimeField(default=django.utils.timezone.now)),
+                ('fecha_hora_lectura', models.DateTimeField(help_text='Fecha y hora real de la lectura del sensor')),
+                ('estado_sensor', models.CharField(default='OK', help_text='Estado del sensor al momento de la lectura', max_length=20)),
+                ('latitud', models.FloatField(blank=True, help_text='Coordenada de latitud (opcional)', null=True)),
+                ('longitud', models.FloatField(blank=True, help_text='Coordenada de longitud (opcional)', null=True)),
+                ('bateria', models.FloatField(blank=True, help_text='Nivel de batería en porcentaje', null=True)),
+                ('senal', models.IntegerField(blank=True, help_text='Intensidad de la señal en dBm', null=True)),
+                ('metadata', models.JSONField(blank=True, default=dict, help_text='Metadatos adicionales en formato JSON')),
+                ('sensor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='lecturas', to='sensores.sensor')),
+            ],
+            options={
+                'verbose_name': 'Lectura de Sensor',
+                'verbose_name_plural': 'Lecturas de Sensores',
+                'ordering': ['-fecha_hora_lectura'],
+            },
+        ),
+        migrations.CreateModel(
+            name='AlertaSensor',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tipo', models.CharField(choices=[('CRITICA', 'Crítica'), ('ALTA', 'Alta'), ('MEDIA', 'Media'), ('BAJA', 'Baja'), ('INFORMATIVA', 'Informativa')], max_length=20)),
+                ('mensaje', models.TextField()),
+                ('estado', models.CharField(choices=[('PENDIENTE', 'Pendiente'), ('EN_PROCESO', 'En Proceso'), ('RESUELTA', 'Resuelta'), ('DESCARTADA', 'Descartada')], default='PENDIENTE', max_length=20)),
+                ('fecha_creacion', models.DateTimeField(auto_now_add=True)),
+                ('fecha_actualizacion', models.DateTimeField(auto_now=True)),
+                ('comentarios', models.TextField(blank=True)),
+                ('resuelta_por', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='alertas_resueltas', to=settings.AUTH_USER_MODEL)),
+                ('lectura', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='alertas', to='sensores.lecturasensor')),
+            ],
+            options={
+                'verbose_name': 'Alerta de Sensor',
+                'verbose_name_plural': 'Alertas de Sensores',
+                'ordering': ['-fecha_creacion'],
+                'indexes': [models.Index(fields=['estado', 'tipo'], name='sensores_al_estado_b98f8b_idx'), models.Index(fields=['-fecha_creacion'], name='sensores_al_fecha_c_5eebd4_idx')],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='lecturasensor',
+            index=models.Index(fields=['sensor', '-fecha_hora_lectura'], name='sensores_le_sensor__5ee3d6_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='lecturasensor',
+            index=models.Index(fields=['-fecha_hora_lectura'], name='sensores_le_fecha_h_5d7ebf_idx'),
+        ),
+    ]
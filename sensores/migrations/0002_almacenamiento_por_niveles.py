@@ -0,0 +1,66 @@
+# Generated by Django 5.2.1 on 2026-10-18 09:36
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sensores', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProgresoAgregacionLecturas',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('ultima_lectura_id', models.BigIntegerField(default=0)),
+                ('fecha_actualizacion', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Progreso de Agregación de Lecturas',
+                'verbose_name_plural': 'Progreso de Agregación de Lecturas',
+            },
+        ),
+        migrations.AddField(
+            model_name='tiposensor',
+            name='retencion_15_minutos_dias',
+            field=models.PositiveIntegerField(default=180, help_text='Días que se conservan los agregados de 15 minutos'),
+        ),
+        migrations.AddField(
+            model_name='tiposensor',
+            name='retencion_hora_dias',
+            field=models.PositiveIntegerField(blank=True, help_text='Días que se conservan los agregados por hora (vacío: sin límite)', null=True),
+        ),
+        migrations.AddField(
+            model_name='tiposensor',
+            name='retencion_lecturas_dias',
+            field=models.PositiveIntegerField(default=7, help_text='Días que se conservan las lecturas crudas'),
+        ),
+        migrations.AddField(
+            model_name='tiposensor',
+            name='retencion_minuto_dias',
+            field=models.PositiveIntegerField(default=30, help_text='Días que se conservan los agregados de 1 minuto'),
+        ),
+        migrations.CreateModel(
+            name='AgregadoLecturaSensor',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('resolucion', models.PositiveIntegerField(choices=[(60, '1 minuto'), (900, '15 minutos'), (3600, '1 hora')], help_text='Duración del intervalo en segundos')),
+                ('inicio', models.DateTimeField(help_text='Inicio del intervalo (UTC)')),
+                ('minimo', models.FloatField()),
+                ('maximo', models.FloatField()),
+                ('suma', models.FloatField()),
+                ('cantidad', models.PositiveIntegerField()),
+                ('sensor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='agregados', to='sensores.sensor')),
+            ],
+            options={
+                'verbose_name': 'Agregado de Lecturas',
+                'verbose_name_plural': 'Agregados de Lecturas',
+                'ordering': ['sensor', 'resolucion', 'inicio'],
+                'indexes': [models.Index(fields=['resolucion', 'inicio'], name='sensores_ag_resoluc_224093_idx')],
+                'unique_together': {('sensor', 'resolucion', 'inicio')},
+            },
+        ),
+    ]
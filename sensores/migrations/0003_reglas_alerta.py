@@ -0,0 +1,64 @@
+# Generated by Django 5.2.1 on 2026-10-18 09:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('produccion', '0016_mortalidadsemanal_anio_iso'),
+        ('sensores', '0002_almacenamiento_por_niveles'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='alertasensor',
+            name='fin_episodio',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='alertasensor',
+            name='inicio_episodio',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='alertasensor',
+            name='lecturas_episodio',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='alertasensor',
+            name='valor_extremo',
+            field=models.FloatField(blank=True, help_text='Valor más alejado del umbral durante el episodio', null=True),
+        ),
+        migrations.CreateModel(
+            name='ReglaAlerta',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nombre', models.CharField(max_length=100)),
+                ('condicion', models.CharField(choices=[('MAYOR', 'Valor mayor que el umbral'), ('MENOR', 'Valor menor que el umbral'), ('VARIACION', 'Variación por minuto mayor que el umbral')], default='MAYOR', max_length=20)),
+                ('umbral', models.FloatField()),
+                ('histeresis', models.FloatField(default=0, help_text='Margen que debe recuperar el valor para cerrar el episodio')),
+                ('duracion_segundos', models.PositiveIntegerField(default=0, help_text='Tiempo que debe cumplirse la condición antes de alertar')),
+                ('enfriamiento_segundos', models.PositiveIntegerField(default=600, help_text='Tiempo mínimo entre el cierre de un episodio y la siguiente alerta')),
+                ('severidad', models.CharField(choices=[('CRITICA', 'Crítica'), ('ALTA', 'Alta'), ('MEDIA', 'Media'), ('BAJA', 'Baja'), ('INFORMATIVA', 'Informativa')], default='ALTA', max_length=20)),
+                ('activa', models.BooleanField(default=True)),
+                ('fecha_creacion', models.DateTimeField(auto_now_add=True)),
+                ('fecha_actualizacion', models.DateTimeField(auto_now=True)),
+                ('galpon', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='reglas_alerta', to='produccion.galpon')),
+                ('sensor', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='reglas_alerta', to='sensores.sensor')),
+                ('tipo_sensor', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='reglas_alerta', to='sensores.tiposensor')),
+            ],
+            options={
+                'verbose_name': 'Regla de Alerta',
+                'verbose_name_plural': 'Reglas de Alerta',
+                'ordering': ['nombre'],
+            },
+        ),
+        migrations.AddField(
+            model_name='alertasensor',
+            name='regla',
+            field=models.ForeignKey(blank=True, help_text='Regla que generó la alerta', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='alertas', to='sensores.reglaalerta'),
+        ),
+    ]
@@ -0,0 +1,58 @@
+# Generated by Django 5.2.1 on 2026-10-18 09:41
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def cargar_ultimas_lecturas(apps, schema_editor):
+    """
+    Fill the last-value table from the newest existing reading of each sensor.
+    """
+    Sensor = apps.get_model('sensores', 'Sensor')
+    LecturaSensor = apps.get_model('sensores', 'LecturaSensor')
+    UltimaLecturaSensor = apps.get_model('sensores', 'UltimaLecturaSensor')
+
+    ultimas = LecturaSensor.objects.filter(sensor=models.OuterRef('pk')).order_by('-fecha_hora_lectura', '-pk')
+    ids = Sensor.objects.annotate(
+        ultima_id=models.Subquery(ultimas.values('pk')[:1])
+    ).filter(ultima_id__isnull=False).values_list('ultima_id', flat=True)
+
+    UltimaLecturaSensor.objects.bulk_create([
+        UltimaLecturaSensor(
+            sensor_id=lectura.sensor_id,
+            lectura=lectura,
+            valor=lectura.valor,
+            fecha_hora_lectura=lectura.fecha_hora_lectura,
+            estado_sensor=lectura.estado_sensor,
+            bateria=lectura.bateria,
+            senal=lectura.senal,
+        )
+        for lectura in LecturaSensor.objects.filter(pk__in=list(ids))
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sensores', '0003_reglas_alerta'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UltimaLecturaSensor',
+            fields=[
+                ('sensor', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='ultima', serialize=False, to='sensores.sensor')),
+                ('valor', models.FloatField()),
+                ('fecha_hora_lectura', models.DateTimeField()),
+                ('estado_sensor', models.CharField(default='OK', max_length=20)),
+                ('bateria', models.FloatField(blank=True, null=True)),
+                ('senal', models.IntegerField(blank=True, null=True)),
+                ('lectura', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='sensores.lecturasensor')),
+            ],
+            options={
+                'verbose_name': 'Última Lectura de Sensor',
+                'verbose_name_plural': 'Últimas Lecturas de Sensores',
+            },
+        ),
+        migrations.RunPython(cargar_ultimas_lecturas, migrations.RunPython.noop),
+    ]
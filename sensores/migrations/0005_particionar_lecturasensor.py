@@ -0,0 +1,112 @@
+# Generated by Django 5.2.1 on 2026-10-18 09:44
+
+import datetime
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+TABLA = 'sensores_lecturasensor'
+ANTERIOR = 'sensores_lecturasensor_anterior'
+SECUENCIA = 'sensores_lecturasensor_id_seq'
+MESES_ADELANTE = 3
+
+
+def _meses(desde, hasta):
+    """(inicio, fin) en UTC de cada mes entre desde y hasta, ambos incluidos."""
+    mes = datetime.datetime(desde.year, desde.month, 1, tzinfo=datetime.timezone.utc)
+    while mes <= hasta:
+        siguiente = datetime.datetime(mes.year + mes.month // 12, mes.month % 12 + 1, 1, tzinfo=datetime.timezone.utc)
+        yield mes, siguiente
+        mes = siguiente
+
+
+def _reemplazar_tabla(cursor, crear_tabla, clave_primaria):
+    """
+    Rename the readings table, create the new one with `crear_tabla`, copy the
+    rows and restore the id sequence, primary key, indexes and foreign keys.
+    """
+    cursor.execute(
+        "SELECT indexdef FROM pg_indexes WHERE tablename = %s AND indexname <> %s",
+        [TABLA, f'{TABLA}_pkey']
+    )
+    indices = [fila[0] for fila in cursor.fetchall()]
+    cursor.execute(
+        "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint "
+        "WHERE conrelid = %s::regclass AND contype = 'f'", [TABLA]
+    )
+    claves_foraneas = cursor.fetchall()
+
+    cursor.execute(f'ALTER TABLE "{TABLA}" RENAME TO "{ANTERIOR}"')
+    crear_tabla(cursor)
+    cursor.execute(f'INSERT INTO "{TABLA}" SELECT * FROM "{ANTERIOR}"')
+    # Se lleva consigo la secuencia de id y los nombres de sus índices
+    cursor.execute(f'DROP TABLE "{ANTERIOR}" CASCADE')
+
+    cursor.execute(f'ALTER TABLE "{TABLA}" ADD PRIMARY KEY ({clave_primaria})')
+    cursor.execute(f'CREATE SEQUENCE "{SECUENCIA}" OWNED BY "{TABLA}".id')
+    cursor.execute(f'ALTER TABLE "{TABLA}" ALTER COLUMN id SET DEFAULT nextval(\'{SECUENCIA}\')')
+    cursor.execute(f'SELECT setval(\'{SECUENCIA}\', COALESCE((SELECT max(id) FROM "{TABLA}"), 0) + 1, false)')
+    for nombre, definicion in claves_foraneas:
+        cursor.execute(f'ALTER TABLE "{TABLA}" ADD CONSTRAINT "{nombre}" {definicion}')
+    for definicion in indices:
+        cursor.execute(definicion.replace(" ON ONLY ", " ON "))
+
+
+def particionar_lecturas(apps, schema_editor):
+    """
+    Turn the readings table into a table partitioned by month on
+    fecha_hora_lectura (PostgreSQL only). The partition key must be part of
+    the primary key, so it becomes (id, fecha_hora_lectura).
+    """
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+
+    def crear_tabla(cursor):
+        cursor.execute(
+            f'CREATE TABLE "{TABLA}" (LIKE "{ANTERIOR}" INCLUDING DEFAULTS INCLUDING CONSTRAINTS) '
+            f'PARTITION BY RANGE (fecha_hora_lectura)'
+        )
+        cursor.execute(f'CREATE TABLE "{TABLA}_default" PARTITION OF "{TABLA}" DEFAULT')
+        cursor.execute(f'SELECT min(fecha_hora_lectura), now() FROM "{ANTERIOR}"')
+        minimo, ahora = cursor.fetchone()
+        for desde, hasta in _meses(minimo or ahora, ahora + datetime.timedelta(days=31 * MESES_ADELANTE)):
+            cursor.execute(
+                f'CREATE TABLE "{TABLA}_p{desde:%Y_%m}" PARTITION OF "{TABLA}" FOR VALUES FROM (%s) TO (%s)',
+                [desde, hasta]
+            )
+
+    with schema_editor.connection.cursor() as cursor:
+        _reemplazar_tabla(cursor, crear_tabla, 'id, fecha_hora_lectura')
+
+
+def desparticionar_lecturas(apps, schema_editor):
+    """Back to a plain table with id as primary key."""
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+
+    def crear_tabla(cursor):
+        cursor.execute(f'CREATE TABLE "{TABLA}" (LIKE "{ANTERIOR}" INCLUDING DEFAULTS INCLUDING CONSTRAINTS)')
+
+    with schema_editor.connection.cursor() as cursor:
+        _reemplazar_tabla(cursor, crear_tabla, 'id')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sensores', '0004_ultimalecturasensor'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='alertasensor',
+            name='lectura',
+            field=models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.CASCADE, related_name='alertas', to='sensores.lecturasensor'),
+        ),
+        migrations.AlterField(
+            model_name='ultimalecturasensor',
+            name='lectura',
+            field=models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='sensores.lecturasensor'),
+        ),
+        migrations.RunPython(particionar_lecturas, desparticionar_lecturas),
+    ]
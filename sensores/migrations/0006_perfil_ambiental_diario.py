@@ -0,0 +1,57 @@
+# Generated by Django 5.2.1 on 2026-10-18 09:52
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('produccion', '0016_mortalidadsemanal_anio_iso'),
+        ('sensores', '0005_particionar_lecturasensor'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProgresoPerfilAmbiental',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('ultima_lectura_id', models.BigIntegerField(default=0)),
+                ('ultima_actualizacion_energia', models.DateTimeField(blank=True, null=True)),
+                ('fecha_actualizacion', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Progreso de Perfiles Ambientales',
+                'verbose_name_plural': 'Progreso de Perfiles Ambientales',
+            },
+        ),
+        migrations.CreateModel(
+            name='PerfilAmbientalDiario',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fecha', models.DateField()),
+                ('temperatura_min', models.FloatField(blank=True, null=True)),
+                ('temperatura_max', models.FloatField(blank=True, null=True)),
+                ('temperatura_promedio', models.FloatField(blank=True, null=True)),
+                ('humedad_min', models.FloatField(blank=True, null=True)),
+                ('humedad_max', models.FloatField(blank=True, null=True)),
+                ('humedad_promedio', models.FloatField(blank=True, null=True)),
+                ('ith_maximo', models.FloatField(blank=True, help_text='Índice de temperatura y humedad máximo', null=True)),
+                ('horas_temperatura_alta', models.FloatField(default=0, help_text='Horas sobre el umbral de temperatura')),
+                ('grados_hora', models.FloatField(default=0, help_text='Grados-hora sobre el umbral de temperatura')),
+                ('horas_estres_ith', models.FloatField(default=0, help_text='Horas con ITH sobre el umbral de estrés')),
+                ('horas_sin_datos', models.FloatField(default=0, help_text='Horas de cortes de transmisión, sumadas por sensor')),
+                ('lecturas', models.PositiveIntegerField(default=0)),
+                ('consumo_kwh', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True)),
+                ('fecha_calculo', models.DateTimeField(auto_now=True)),
+                ('galpon', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='perfiles_ambientales', to='produccion.galpon')),
+            ],
+            options={
+                'verbose_name': 'Perfil Ambiental Diario',
+                'verbose_name_plural': 'Perfiles Ambientales Diarios',
+                'ordering': ['-fecha', 'galpon'],
+                'indexes': [models.Index(fields=['fecha'], name='sensores_pe_fecha_318840_idx')],
+                'unique_together': {('galpon', 'fecha')},
+            },
+        ),
+    ]
@@ -16,6 +16,15 @@ class TipoSensor(models.Model):
     color = models.CharField(max_length=20, default='#4e73df', 
                            help_text="Código de color en hexadecimal")
     activo = models.BooleanField(default=True)
+    # Retención de cada nivel de almacenamiento de las lecturas, en días
+    retencion_lecturas_dias = models.PositiveIntegerField(default=7,
+                           help_text="Días que se conservan las lecturas crudas")
+    retencion_minuto_dias = models.PositiveIntegerField(default=30,
+                           help_text="Días que se conservan los agregados de 1 minuto")
+    retencion_15_minutos_dias = models.PositiveIntegerField(default=180,
+                           help_text="Días que se conservan los agregados de 15 minutos")
+    retencion_hora_dias = models.PositiveIntegerField(null=True, blank=True,
+                           help_text="Días que se conservan los agregados por hora (vacío: sin límite)")
     fecha_creacion = models.DateTimeField(auto_now_add=True)
     fecha_actualizacion = models.DateTimeField(auto_now=True)
 
@@ -27,6 +36,15 @@ class TipoSensor(models.Model):
     def __str__(self):
         return f"{self.nombre} ({self.unidad_medida})"
 
+    def retencion_dias(self, resolucion):
+        """Días de retención del nivel con la resolución indicada (0 = lecturas crudas)."""
+        return {
+            0: self.retencion_lecturas_dias,
+            60: self.retencion_minuto_dias,
+            900: self.retencion_15_minutos_dias,
+            3600: self.retencion_hora_dias,
+        }[resolucion]
+
 
 class Sensor(models.Model):
     """Modelo para los sensores físicos instalados en los galpones."""
@@ -100,6 +118,123 @@ class LecturaSensor(models.Model):
         super().save(*args, **kwargs)
 
 
+class UltimaLecturaSensor(models.Model):
+    """Último valor recibido de cada sensor, mantenido al guardar lecturas."""
+    sensor = models.OneToOneField(Sensor, on_delete=models.CASCADE, primary_key=True, related_name='ultima')
+    # Sin restricción en la base: LecturaSensor está particionada en PostgreSQL
+    lectura = models.ForeignKey(LecturaSensor, on_delete=models.SET_NULL, null=True, blank=True,
+                              related_name='+', db_constraint=False)
+    valor = models.FloatField()
+    fecha_hora_lectura = models.DateTimeField()
+    estado_sensor = models.CharField(max_length=20, default='OK')
+    bateria = models.FloatField(null=True, blank=True)
+    senal = models.IntegerField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Última Lectura de Sensor"
+        verbose_name_plural = "Últimas Lecturas de Sensores"
+
+    def __str__(self):
+        return f"{self.sensor_id}: {self.valor} @ {self.fecha_hora_lectura}"
+
+
+class AgregadoLecturaSensor(models.Model):
+    """Mínimo, máximo, suma y cantidad de las lecturas de un sensor en un intervalo."""
+    RESOLUCIONES = (
+        (60, '1 minuto'),
+        (900, '15 minutos'),
+        (3600, '1 hora'),
+    )
+
+    sensor = models.ForeignKey(Sensor, on_delete=models.CASCADE, related_name='agregados')
+    resolucion = models.PositiveIntegerField(choices=RESOLUCIONES, help_text="Duración del intervalo en segundos")
+    inicio = models.DateTimeField(help_text="Inicio del intervalo (UTC)")
+    minimo = models.FloatField()
+    maximo = models.FloatField()
+    suma = models.FloatField()
+    cantidad = models.PositiveIntegerField()
+
+    class Meta:
+        verbose_name = "Agregado de Lecturas"
+        verbose_name_plural = "Agregados de Lecturas"
+        ordering = ['sensor', 'resolucion', 'inicio']
+        unique_together = [('sensor', 'resolucion', 'inicio')]
+        indexes = [
+            models.Index(fields=['resolucion', 'inicio']),
+        ]
+
+    def __str__(self):
+        return f"{self.sensor} @ {self.inicio} ({self.get_resolucion_display()}): {self.promedio:.2f}"
+
+    @property
+    def promedio(self):
+        return self.suma / self.cantidad if self.cantidad else None
+
+
+class ProgresoAgregacionLecturas(models.Model):
+    """Última lectura incorporada a los agregados (fila única)."""
+    ultima_lectura_id = models.BigIntegerField(default=0)
+    fecha_actualizacion = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Progreso de Agregación de Lecturas"
+        verbose_name_plural = "Progreso de Agregación de Lecturas"
+
+    def __str__(self):
+        return f"Agregado hasta la lectura {self.ultima_lectura_id}"
+
+
+class PerfilAmbientalDiario(models.Model):
+    """
+    Clima y energía de un galpón en un día (zona horaria local), calculado
+    cada noche desde las lecturas de sensores y ConsumoEnergia (ver
+    sensores/perfiles.py). Las estadísticas de temperatura y humedad son del
+    promedio por minuto de los sensores del galpón.
+    """
+    galpon = models.ForeignKey(Galpon, on_delete=models.CASCADE, related_name='perfiles_ambientales')
+    fecha = models.DateField()
+    temperatura_min = models.FloatField(null=True, blank=True)
+    temperatura_max = models.FloatField(null=True, blank=True)
+    temperatura_promedio = models.FloatField(null=True, blank=True)
+    humedad_min = models.FloatField(null=True, blank=True)
+    humedad_max = models.FloatField(null=True, blank=True)
+    humedad_promedio = models.FloatField(null=True, blank=True)
+    ith_maximo = models.FloatField(null=True, blank=True, help_text="Índice de temperatura y humedad máximo")
+    horas_temperatura_alta = models.FloatField(default=0, help_text="Horas sobre el umbral de temperatura")
+    grados_hora = models.FloatField(default=0, help_text="Grados-hora sobre el umbral de temperatura")
+    horas_estres_ith = models.FloatField(default=0, help_text="Horas con ITH sobre el umbral de estrés")
+    horas_sin_datos = models.FloatField(default=0, help_text="Horas de cortes de transmisión, sumadas por sensor")
+    lecturas = models.PositiveIntegerField(default=0)
+    consumo_kwh = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
+    fecha_calculo = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Perfil Ambiental Diario"
+        verbose_name_plural = "Perfiles Ambientales Diarios"
+        ordering = ['-fecha', 'galpon']
+        unique_together = [('galpon', 'fecha')]
+        indexes = [
+            models.Index(fields=['fecha']),
+        ]
+
+    def __str__(self):
+        return f"{self.galpon} - {self.fecha}"
+
+
+class ProgresoPerfilAmbiental(models.Model):
+    """Última lectura y última modificación de ConsumoEnergia incorporadas a los perfiles (fila única)."""
+    ultima_lectura_id = models.BigIntegerField(default=0)
+    ultima_actualizacion_energia = models.DateTimeField(null=True, blank=True)
+    fecha_actualizacion = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Progreso de Perfiles Ambientales"
+        verbose_name_plural = "Progreso de Perfiles Ambientales"
+
+    def __str__(self):
+        return f"Perfiles hasta la lectura {self.ultima_lectura_id}"
+
+
 class AlertaSensor(models.Model):
     """Modelo para alertas generadas por lecturas de sensores."""
     TIPOS_ALERTA = (
@@ -117,10 +252,20 @@ class AlertaSensor(models.Model):
         ('DESCARTADA', 'Descartada'),
     )
     
-    lectura = models.ForeignKey(LecturaSensor, on_delete=models.CASCADE, related_name='alertas')
+    # Sin restricción en la base: LecturaSensor está particionada en PostgreSQL
+    lectura = models.ForeignKey(LecturaSensor, on_delete=models.CASCADE, related_name='alertas',
+                              db_constraint=False)
+    regla = models.ForeignKey('ReglaAlerta', on_delete=models.SET_NULL, null=True, blank=True,
+                            related_name='alertas', help_text="Regla que generó la alerta")
     tipo = models.CharField(max_length=20, choices=TIPOS_ALERTA)
     mensaje = models.TextField()
     estado = models.CharField(max_length=20, choices=ESTADOS, default='PENDIENTE')
+    # Episodio de una regla: la alerta se actualiza mientras dura
+    inicio_episodio = models.DateTimeField(null=True, blank=True)
+    fin_episodio = models.DateTimeField(null=True, blank=True)
+    valor_extremo = models.FloatField(null=True, blank=True,
+                                    help_text="Valor más alejado del umbral durante el episodio")
+    lecturas_episodio = models.PositiveIntegerField(default=0)
     fecha_creacion = models.DateTimeField(auto_now_add=True)
     fecha_actualizacion = models.DateTimeField(auto_now=True)
     resuelta_por = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, 
@@ -144,3 +289,48 @@ class AlertaSensor(models.Model):
         self.resuelta_por = usuario
         self.comentarios = comentarios
         self.save(update_fields=['estado', 'resuelta_por', 'comentarios', 'fecha_actualizacion'])
+
+
+class ReglaAlerta(models.Model):
+    """Condición sobre el flujo de lecturas que genera una alerta por episodio."""
+    CONDICIONES = (
+        ('MAYOR', 'Valor mayor que el umbral'),
+        ('MENOR', 'Valor menor que el umbral'),
+        ('VARIACION', 'Variación por minuto mayor que el umbral'),
+    )
+
+    nombre = models.CharField(max_length=100)
+    # Alcance: los campos vacíos no restringen
+    tipo_sensor = models.ForeignKey(TipoSensor, on_delete=models.CASCADE, null=True, blank=True,
+                                  related_name='reglas_alerta')
+    galpon = models.ForeignKey(Galpon, on_delete=models.CASCADE, null=True, blank=True,
+                             related_name='reglas_alerta')
+    sensor = models.ForeignKey(Sensor, on_delete=models.CASCADE, null=True, blank=True,
+                             related_name='reglas_alerta')
+    condicion = models.CharField(max_length=20, choices=CONDICIONES, default='MAYOR')
+    umbral = models.FloatField()
+    histeresis = models.FloatField(default=0,
+                                 help_text="Margen que debe recuperar el valor para cerrar el episodio")
+    duracion_segundos = models.PositiveIntegerField(default=0,
+                                                  help_text="Tiempo que debe cumplirse la condición antes de alertar")
+    enfriamiento_segundos = models.PositiveIntegerField(default=600,
+                                                      help_text="Tiempo mínimo entre el cierre de un episodio y la siguiente alerta")
+    severidad = models.CharField(max_length=20, choices=AlertaSensor.TIPOS_ALERTA, default='ALTA')
+    activa = models.BooleanField(default=True)
+    fecha_creacion = models.DateTimeField(auto_now_add=True)
+    fecha_actualizacion = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Regla de Alerta"
+        verbose_name_plural = "Reglas de Alerta"
+        ordering = ['nombre']
+
+    def __str__(self):
+        return f"{self.nombre} ({self.get_condicion_display()} {self.umbral})"
+
+    def aplica_a(self, sensor_id, galpon_id, tipo_id):
+        return (
+            self.sensor_id in (None, sensor_id)
+            and self.galpon_id in (None, galpon_id)
+            and self.tipo_sensor_id in (None, tipo_id)
+        )
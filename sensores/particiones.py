@@ -0,0 +1,177 @@
+"""
+Particionado mensual de LecturaSensor en PostgreSQL.
+
+La migración 0005 convierte sensores_lecturasensor en una tabla particionada
+por rango de fecha_hora_lectura, con una partición por mes (UTC) y otra
+DEFAULT para las lecturas que no caen en ninguna. El comando
+gestionar_particiones crea las particiones de los próximos meses y quita las
+vencidas según SENSORES_RETENCION_LECTURAS_MESES, sin DELETE sobre la tabla.
+Con la tabla particionada esa es la única retención de las lecturas crudas:
+aplicar_retencion() ya no las borra según TipoSensor.retencion_lecturas_dias.
+
+En otras bases de datos (SQLite en desarrollo) la tabla no se particiona y la
+misma retención se aplica borrando filas. En los dos casos se conservan las
+lecturas que tienen alertas, igual que en aplicar_retencion().
+"""
+import datetime
+import re
+
+from django.conf import settings
+from django.db import connection, transaction
+
+UTC = datetime.timezone.utc
+TABLA = 'sensores_lecturasensor'
+PARTICION_DEFAULT = f'{TABLA}_default'
+PATRON_PARTICION = re.compile(rf'^{TABLA}_p(\d{{4}})_(\d{{2}})$')
+
+
+def inicio_mes(momento):
+    momento = momento.astimezone(UTC)
+    return datetime.datetime(momento.year, momento.month, 1, tzinfo=UTC)
+
+
+def sumar_meses(mes, cantidad):
+    indice = mes.year * 12 + mes.month - 1 + cantidad
+    return datetime.datetime(indice // 12, indice % 12 + 1, 1, tzinfo=UTC)
+
+
+def nombre_particion(mes):
+    return f'{TABLA}_p{mes:%Y_%m}'
+
+
+def retencion_meses():
+    """Meses de lecturas crudas que se conservan (None: sin límite)."""
+    return getattr(settings, 'SENSORES_RETENCION_LECTURAS_MESES', None)
+
+
+def es_particionada():
+    if connection.vendor != 'postgresql':
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(%s)", [TABLA]
+        )
+        return cursor.fetchone() is not None
+
+
+def particiones():
+    """Particiones mensuales existentes como [(nombre, mes)], ordenadas por mes."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = to_regclass(%s)", [TABLA]
+        )
+        nombres = [fila[0] for fila in cursor.fetchall()]
+    resultado = []
+    for nombre in nombres:
+        coincidencia = PATRON_PARTICION.match(nombre)
+        if coincidencia:
+            resultado.append((nombre, datetime.datetime(int(coincidencia[1]), int(coincidencia[2]), 1, tzinfo=UTC)))
+    return sorted(resultado, key=lambda particion: particion[1])
+
+
+def crear_particion(mes):
+    """
+    Crea la partición del mes si no existe. Las lecturas de ese mes que hayan
+    quedado en la partición DEFAULT se mueven a la nueva antes de adjuntarla.
+    Devuelve True si la creó.
+    """
+    nombre = nombre_particion(mes)
+    desde, hasta = mes, sumar_meses(mes, 1)
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute("SELECT to_regclass(%s)", [nombre])
+        if cursor.fetchone()[0] is not None:
+            return False
+        cursor.execute(f'CREATE TABLE "{nombre}" (LIKE "{TABLA}" INCLUDING DEFAULTS INCLUDING CONSTRAINTS)')
+        cursor.execute(
+            f'WITH movidas AS (DELETE FROM "{PARTICION_DEFAULT}" '
+            f'WHERE fecha_hora_lectura >= %s AND fecha_hora_lectura < %s RETURNING *) '
+            f'INSERT INTO "{nombre}" SELECT * FROM movidas',
+            [desde, hasta]
+        )
+        cursor.execute(
+            f'ALTER TABLE "{TABLA}" ATTACH PARTITION "{nombre}" FOR VALUES FROM (%s) TO (%s)',
+            [desde, hasta]
+        )
+    return True
+
+
+def crear_particiones(meses_adelante=3, ahora=None):
+    """Asegura las particiones desde el mes actual hasta `meses_adelante` meses después."""
+    mes = inicio_mes(ahora or datetime.datetime.now(UTC))
+    return [
+        nombre_particion(sumar_meses(mes, i))
+        for i in range(meses_adelante + 1)
+        if crear_particion(sumar_meses(mes, i))
+    ]
+
+
+def _ultima_lectura_agregada():
+    from .models import ProgresoAgregacionLecturas
+
+    return ProgresoAgregacionLecturas.objects.filter(pk=1).values_list(
+        'ultima_lectura_id', flat=True
+    ).first() or 0
+
+
+def eliminar_particiones_vencidas(meses, separar=False, ahora=None):
+    """
+    Quita las particiones cuyos datos son anteriores a los últimos `meses`
+    meses: DETACH y DROP (o solo DETACH con `separar`, para archivarlas).
+    Las lecturas con alertas se copian antes a la partición DEFAULT, y las
+    demás se desvinculan de UltimaLecturaSensor, porque la tabla no tiene
+    claves foráneas hacia ella. Las particiones con lecturas todavía no
+    agregadas se omiten. Devuelve (quitadas, omitidas).
+    """
+    from .models import AlertaSensor, UltimaLecturaSensor
+
+    limite = sumar_meses(inicio_mes(ahora or datetime.datetime.now(UTC)), -meses)
+    ultima_agregada = _ultima_lectura_agregada()
+    quitadas, omitidas = [], []
+
+    for nombre, mes in particiones():
+        if sumar_meses(mes, 1) > limite:
+            continue
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(f'SELECT max(id) FROM "{nombre}"')
+            maximo = cursor.fetchone()[0]
+            if maximo is not None and maximo > ultima_agregada:
+                omitidas.append(nombre)
+                continue
+            alertadas = f'SELECT lectura_id FROM "{AlertaSensor._meta.db_table}"'
+            cursor.execute(
+                f'UPDATE "{UltimaLecturaSensor._meta.db_table}" SET lectura_id = NULL '
+                f'WHERE lectura_id IN (SELECT id FROM "{nombre}" WHERE id NOT IN ({alertadas}))'
+            )
+            # Verificar ya las claves foráneas diferidas: con eventos pendientes
+            # sobre la partición PostgreSQL no permite separarla
+            cursor.execute('SET CONSTRAINTS ALL IMMEDIATE')
+            cursor.execute(f'ALTER TABLE "{TABLA}" DETACH PARTITION "{nombre}"')
+            # Separada la partición, su rango ya no tiene dueño y van a DEFAULT
+            cursor.execute(f'INSERT INTO "{TABLA}" SELECT * FROM "{nombre}" WHERE id IN ({alertadas})')
+            if not separar:
+                cursor.execute(f'DROP TABLE "{nombre}"')
+        quitadas.append(nombre)
+
+    return quitadas, omitidas
+
+
+def eliminar_lecturas_vencidas(meses, ahora=None, batch_size=10000):
+    """
+    Retención sin particiones (SQLite u otras bases): borra por bloques las
+    lecturas agregadas y sin alertas anteriores a los últimos `meses` meses, y
+    en PostgreSQL las que quedaron en la partición DEFAULT. Devuelve la
+    cantidad borrada.
+    """
+    from .models import LecturaSensor
+
+    limite = sumar_meses(inicio_mes(ahora or datetime.datetime.now(UTC)), -meses)
+    vencidas = LecturaSensor.objects.filter(
+        fecha_hora_lectura__lt=limite, id__lte=_ultima_lectura_agregada(), alertas__isnull=True
+    ).order_by()
+    borradas = 0
+    while True:
+        ids = list(vencidas.values_list('pk', flat=True)[:batch_size])
+        if not ids:
+            return borradas
+        borradas += LecturaSensor.objects.filter(pk__in=ids).delete()[1].get(LecturaSensor._meta.label, 0)
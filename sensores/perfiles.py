@@ -0,0 +1,159 @@
+"""
+Perfil ambiental diario por galpón (PerfilAmbientalDiario).
+
+El comando construir_perfiles_ambientales, programado cada noche, llama a
+construir_perfiles_ambientales(): recalcula los días (zona horaria local) de
+cada galpón que recibieron lecturas nuevas, también atrasadas, o cuyo
+ConsumoEnergia cambió desde la ejecución anterior. El clima sale de
+sensores.analitica sobre las lecturas crudas, de modo que un día solo puede
+recalcularse mientras la retención de su TipoSensor las conserve.
+
+seguimientos_con_ambiente() agrega a cada SeguimientoDiario el perfil del
+galpón de su lote ese día, para cruzar el clima con el peso o la mortalidad
+sin leer las lecturas.
+"""
+import datetime
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Max, OuterRef, Q, Subquery, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+CAMPOS_PERFIL = [
+    'temperatura_min', 'temperatura_max', 'temperatura_promedio',
+    'humedad_min', 'humedad_max', 'humedad_promedio',
+    'ith_maximo', 'horas_temperatura_alta', 'grados_hora', 'horas_estres_ith',
+    'horas_sin_datos', 'lecturas', 'consumo_kwh',
+]
+
+
+def limites_dia(fecha):
+    """Inicio y fin del día `fecha` en la zona horaria local."""
+    inicio = timezone.make_aware(datetime.datetime.combine(fecha, datetime.time()))
+    fin = timezone.make_aware(datetime.datetime.combine(fecha + datetime.timedelta(days=1), datetime.time()))
+    return inicio, fin
+
+
+def calcular_perfil(galpon_id, fecha):
+    """Valores del perfil de un galpón en un día, o None si no hubo lecturas ni consumo."""
+    from produccion.models import ConsumoEnergia
+    from .analitica import CODIGO_HUMEDAD, CODIGO_TEMPERATURA, resumen_clima_galpon
+
+    consumo_kwh = ConsumoEnergia.objects.filter(
+        galpon_id=galpon_id, fecha_registro=fecha
+    ).aggregate(total=Sum('consumo_kwh'))['total']
+    resumen = resumen_clima_galpon(galpon_id, *limites_dia(fecha))
+    lecturas = sum(sensor['lecturas'] for sensor in resumen['sensores'].values())
+    if not lecturas and consumo_kwh is None:
+        return None
+
+    temperatura = resumen['galpon'][CODIGO_TEMPERATURA] or {}
+    humedad = resumen['galpon'][CODIGO_HUMEDAD] or {}
+    ith = resumen['galpon']['ith'] or {}
+    return {
+        'temperatura_min': temperatura.get('minimo'),
+        'temperatura_max': temperatura.get('maximo'),
+        'temperatura_promedio': temperatura.get('promedio'),
+        'humedad_min': humedad.get('minimo'),
+        'humedad_max': humedad.get('maximo'),
+        'humedad_promedio': humedad.get('promedio'),
+        'ith_maximo': ith.get('maximo'),
+        'horas_temperatura_alta': temperatura.get('horas_sobre_umbral', 0),
+        'grados_hora': temperatura.get('grados_hora', 0),
+        'horas_estres_ith': ith.get('horas_estres', 0),
+        'horas_sin_datos': sum(hueco['segundos'] for hueco in resumen['huecos']) / 3600,
+        'lecturas': lecturas,
+        'consumo_kwh': consumo_kwh,
+    }
+
+
+def _dias_pendientes(progreso):
+    """
+    Días por recalcular desde la ejecución anterior como ({galpon_id: {fecha}},
+    última lectura, última modificación de ConsumoEnergia). Las lecturas de
+    sensores sin galpón no tienen perfil. Como en agregar_lecturas(), la
+    última lectura es la de ultima_lectura_confirmada() y las posteriores se
+    vuelven a considerar en la ejecución siguiente.
+    """
+    from produccion.models import ConsumoEnergia
+    from .models import LecturaSensor
+    from .series import ultima_lectura_confirmada
+
+    dias = defaultdict(set)
+
+    nuevas = LecturaSensor.objects.filter(id__gt=progreso.ultima_lectura_id)
+    ultima_lectura_id = ultima_lectura_confirmada(nuevas) or progreso.ultima_lectura_id
+    for galpon_id, fecha in nuevas.filter(sensor__galpon__isnull=False).annotate(
+        fecha=TruncDate('fecha_hora_lectura')
+    ).order_by().values_list('sensor__galpon_id', 'fecha').distinct():
+        dias[galpon_id].add(fecha)
+
+    consumos = ConsumoEnergia.objects.all()
+    if progreso.ultima_actualizacion_energia is not None:
+        consumos = consumos.filter(fecha_actualizacion__gt=progreso.ultima_actualizacion_energia)
+    ultima_energia = consumos.aggregate(ultima=Max('fecha_actualizacion'))['ultima'] or progreso.ultima_actualizacion_energia
+    for galpon_id, fecha in consumos.order_by().values_list('galpon_id', 'fecha_registro').distinct():
+        dias[galpon_id].add(fecha)
+
+    return dias, ultima_lectura_id, ultima_energia
+
+
+def construir_perfiles_ambientales(dias=None, batch_size=500):
+    """
+    Recalcula los perfiles de `dias` ({galpon_id: fechas}) o, sin ellos, los
+    de los días con lecturas o consumos nuevos desde la ejecución anterior.
+    Los días que quedan sin lecturas ni consumo pierden su perfil. Devuelve la
+    cantidad de perfiles guardados.
+    """
+    from .models import PerfilAmbientalDiario, ProgresoPerfilAmbiental
+
+    with transaction.atomic():
+        progreso = None
+        if dias is None:
+            progreso, _ = ProgresoPerfilAmbiental.objects.select_for_update().get_or_create(pk=1)
+            dias, ultima_lectura_id, ultima_energia = _dias_pendientes(progreso)
+
+        perfiles = []
+        vacios = Q()
+        for galpon_id, fechas in dias.items():
+            for fecha in sorted(fechas):
+                valores = calcular_perfil(galpon_id, fecha)
+                if valores is None:
+                    vacios |= Q(galpon_id=galpon_id, fecha=fecha)
+                else:
+                    perfiles.append(PerfilAmbientalDiario(galpon_id=galpon_id, fecha=fecha, **valores))
+
+        PerfilAmbientalDiario.objects.bulk_create(
+            perfiles,
+            batch_size=batch_size,
+            update_conflicts=True,
+            unique_fields=['galpon', 'fecha'],
+            update_fields=CAMPOS_PERFIL + ['fecha_calculo']
+        )
+        if vacios:
+            PerfilAmbientalDiario.objects.filter(vacios).delete()
+
+        if progreso is not None:
+            progreso.ultima_lectura_id = ultima_lectura_id
+            progreso.ultima_actualizacion_energia = ultima_energia
+            progreso.save()
+    return len(perfiles)
+
+
+def seguimientos_con_ambiente(seguimientos):
+    """
+    Anota cada SeguimientoDiario con los campos del perfil ambiental de su
+    galpón en la fecha del seguimiento, con el prefijo "ambiente_" (NULL si no
+    hay perfil).
+    """
+    from .models import PerfilAmbientalDiario
+
+    perfil = PerfilAmbientalDiario.objects.filter(
+        galpon_id=OuterRef('lote__galpon_id'),
+        fecha=OuterRef('fecha_seguimiento')
+    ).order_by()
+    return seguimientos.annotate(**{
+        f'ambiente_{campo}': Subquery(perfil.values(campo)[:1])
+        for campo in CAMPOS_PERFIL
+    })
@@ -0,0 +1,201 @@
+"""
+Motor de reglas de alerta sobre el flujo de lecturas de sensores.
+
+Cada ReglaAlerta se evalúa por sensor con estado en memoria: la condición debe
+cumplirse durante `duracion_segundos` para abrir un episodio, y el episodio se
+cierra cuando el valor vuelve más allá del umbral corrido por la histéresis.
+Un episodio genera una sola AlertaSensor que se actualiza en su lugar (valor
+extremo, cantidad de lecturas, fin) y, una vez cerrado, la regla no vuelve a
+alertar para ese sensor hasta que pasa el enfriamiento.
+
+El estado es del proceso: al (re)cargar las reglas se recuperan de la base de
+datos los episodios que quedaron abiertos.
+"""
+import datetime
+import threading
+
+from django.db import transaction
+from django.utils import timezone
+
+CAMPOS_EPISODIO = ['mensaje', 'fin_episodio', 'valor_extremo', 'lecturas_episodio', 'fecha_actualizacion']
+
+
+class EstadoRegla:
+    """Estado de una regla para un sensor."""
+    __slots__ = ('desde', 'alerta', 'fin_enfriamiento', 'ultima')
+
+    def __init__(self):
+        self.desde = None  # Desde cuándo se cumple la condición sin interrupción
+        self.alerta = None  # AlertaSensor del episodio abierto
+        self.fin_enfriamiento = None
+        self.ultima = None  # (fecha, valor) de la última lectura evaluada
+
+
+def _medir(regla, estado, fecha, valor):
+    """
+    Devuelve (metrica, supera, recuperada) de la lectura según la condición de
+    la regla, o None si no se puede evaluar (primera lectura de una variación).
+    """
+    anterior = estado.ultima
+    estado.ultima = (fecha, valor)
+
+    if regla.condicion == 'VARIACION':
+        if anterior is None:
+            return None
+        metrica = abs(valor - anterior[1]) / ((fecha - anterior[0]).total_seconds() / 60)
+        return metrica, metrica > regla.umbral, metrica <= regla.umbral - regla.histeresis
+    if regla.condicion == 'MENOR':
+        return valor, valor < regla.umbral, valor >= regla.umbral + regla.histeresis
+    return valor, valor > regla.umbral, valor <= regla.umbral - regla.histeresis
+
+
+def _mensaje(regla, alerta, unidad):
+    if regla.condicion == 'VARIACION':
+        unidad = f"{unidad}/min"
+    mensaje = (
+        f"{regla.nombre}: {alerta.valor_extremo:g} {unidad} "
+        f"(umbral {regla.umbral:g} {unidad}, {alerta.lecturas_episodio} lecturas)"
+    )
+    if alerta.fin_episodio:
+        mensaje += f" - normalizado {timezone.localtime(alerta.fin_episodio):%Y-%m-%d %H:%M}"
+    return mensaje
+
+
+class MotorReglas:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._reglas = None  # {sensor_id: [ReglaAlerta]}
+        self._unidades = {}
+        self._estados = {}  # {(regla_id, sensor_id): EstadoRegla}
+
+    def invalidar(self):
+        """Recarga reglas y sensores en la próxima evaluación, conservando el estado."""
+        self._reglas = None
+
+    def reiniciar(self):
+        """Descarta reglas y estado."""
+        with self._lock:
+            self._reglas = None
+            self._estados = {}
+
+    def _cargar(self):
+        from .models import Sensor, ReglaAlerta, AlertaSensor
+
+        reglas = list(ReglaAlerta.objects.filter(activa=True))
+        self._reglas = {}
+        self._unidades = {}
+        for sensor_id, galpon_id, tipo_id, unidad in Sensor.objects.values_list(
+            'pk', 'galpon_id', 'tipo_id', 'tipo__unidad_medida'
+        ):
+            self._unidades[sensor_id] = unidad
+            aplicables = [regla for regla in reglas if regla.aplica_a(sensor_id, galpon_id, tipo_id)]
+            if aplicables:
+                self._reglas[sensor_id] = aplicables
+
+        vigentes = {(regla.pk, sensor_id) for sensor_id, aplicables in self._reglas.items() for regla in aplicables}
+        self._estados = {clave: estado for clave, estado in self._estados.items() if clave in vigentes}
+
+        # Episodios abiertos en la base que este proceso no conoce
+        for alerta in AlertaSensor.objects.filter(
+            regla__activa=True, fin_episodio__isnull=True
+        ).select_related('lectura'):
+            clave = (alerta.regla_id, alerta.lectura.sensor_id)
+            if clave in vigentes:
+                estado = self._estados.setdefault(clave, EstadoRegla())
+                if estado.alerta is None:
+                    estado.alerta = alerta
+                    estado.desde = alerta.inicio_episodio
+
+    def _evaluar(self, regla, estado, lectura):
+        """
+        Aplica la lectura al estado de la regla. Devuelve (alerta, creada) si la
+        lectura abre o modifica un episodio, o None.
+        """
+        from .models import AlertaSensor
+
+        fecha = lectura.fecha_hora_lectura
+        if estado.ultima is not None and fecha <= estado.ultima[0]:
+            # Lectura atrasada respecto de las ya evaluadas
+            return None
+        medida = _medir(regla, estado, fecha, lectura.valor)
+        if medida is None:
+            return None
+        metrica, supera, recuperada = medida
+        alerta = estado.alerta
+
+        if alerta is not None:
+            alerta.lecturas_episodio += 1
+            extremo = min if regla.condicion == 'MENOR' else max
+            alerta.valor_extremo = extremo(alerta.valor_extremo, metrica)
+            if recuperada:
+                alerta.fin_episodio = fecha
+                estado.alerta = None
+                estado.desde = None
+                estado.fin_enfriamiento = fecha + datetime.timedelta(seconds=regla.enfriamiento_segundos)
+            alerta.mensaje = _mensaje(regla, alerta, self._unidades.get(lectura.sensor_id, ''))
+            alerta.fecha_actualizacion = timezone.now()
+            return alerta, False
+
+        if not supera:
+            estado.desde = None
+            return None
+        if estado.desde is None:
+            estado.desde = fecha
+        if (fecha - estado.desde).total_seconds() < regla.duracion_segundos:
+            return None
+        if estado.fin_enfriamiento is not None and fecha < estado.fin_enfriamiento:
+            return None
+
+        alerta = AlertaSensor(
+            lectura=lectura,
+            regla=regla,
+            tipo=regla.severidad,
+            inicio_episodio=estado.desde,
+            valor_extremo=metrica,
+            lecturas_episodio=1,
+        )
+        alerta.mensaje = _mensaje(regla, alerta, self._unidades.get(lectura.sensor_id, ''))
+        estado.alerta = alerta
+        return alerta, True
+
+    def procesar(self, lecturas):
+        """
+        Evalúa las reglas sobre lecturas ya guardadas, en orden cronológico, y
+        guarda en bloque las alertas nuevas y las actualizadas. Devuelve la
+        cantidad de alertas creadas.
+        """
+        from .models import AlertaSensor
+
+        with self._lock:
+            if self._reglas is None:
+                self._cargar()
+            if not self._reglas:
+                return 0
+
+            nuevas = []
+            modificadas = {}
+            for lectura in sorted(lecturas, key=lambda lectura: lectura.fecha_hora_lectura):
+                for regla in self._reglas.get(lectura.sensor_id, ()):
+                    estado = self._estados.setdefault((regla.pk, lectura.sensor_id), EstadoRegla())
+                    resultado = self._evaluar(regla, estado, lectura)
+                    if resultado is None:
+                        continue
+                    alerta, creada = resultado
+                    if creada:
+                        nuevas.append(alerta)
+                    elif alerta.pk is not None:
+                        modificadas[alerta.pk] = alerta
+
+            try:
+                with transaction.atomic():
+                    AlertaSensor.objects.bulk_create(nuevas)
+                    AlertaSensor.objects.bulk_update(modificadas.values(), CAMPOS_EPISODIO)
+            except Exception:
+                # El estado en memoria ya no coincide con la base: recargar desde ella
+                self._reglas = None
+                self._estados = {}
+                raise
+            return len(nuevas)
+
+
+motor = MotorReglas()
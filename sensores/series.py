@@ -0,0 +1,252 @@
+"""
+Almacenamiento por niveles de las lecturas de sensores.
+
+Las lecturas crudas se resumen en agregados de 1 minuto, 15 minutos y 1 hora
+(AgregadoLecturaSensor). agregar_lecturas() incorpora las lecturas nuevas a
+los agregados, aplicar_retencion() borra lo que excede la retención de cada
+TipoSensor y serie_sensor() responde desde el nivel más grueso que alcanza la
+resolución pedida. El comando compactar_lecturas ejecuta los dos primeros.
+"""
+import datetime
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Count, Max, Min, Q, Sum
+from django.db.models.functions import TruncHour, TruncMinute
+from django.utils import timezone
+
+UTC = datetime.timezone.utc
+EPOCA = datetime.datetime(1970, 1, 1, tzinfo=UTC)
+
+# Resolución en segundos de cada nivel; 0 son las lecturas crudas
+NIVELES = (0, 60, 900, 3600)
+RESOLUCIONES_AGREGADAS = NIVELES[1:]
+
+# Duración máxima esperada de una transacción de ingesta: los ids se asignan
+# al insertar pero las lecturas se ven al confirmar, así que una transacción
+# lenta puede confirmar lecturas con ids menores que otras ya procesadas
+MARGEN_CONFIRMACION = datetime.timedelta(minutes=10)
+
+
+def inicio_intervalo(momento, resolucion):
+    """Inicio (UTC) del intervalo de `resolucion` segundos que contiene `momento`."""
+    intervalo = datetime.timedelta(seconds=resolucion)
+    return EPOCA + intervalo * ((momento - EPOCA) // intervalo)
+
+
+def _combinar(filas, resolucion):
+    """Reagrupa filas de agregados (sensor_id, inicio, minimo, maximo, suma, cantidad) en intervalos de `resolucion`."""
+    grupos = {}
+    for fila in filas:
+        clave = (fila['sensor_id'], inicio_intervalo(fila['inicio'], resolucion))
+        grupo = grupos.get(clave)
+        if grupo is None:
+            grupos[clave] = dict(fila, inicio=clave[1])
+        else:
+            grupo['minimo'] = min(grupo['minimo'], fila['minimo'])
+            grupo['maximo'] = max(grupo['maximo'], fila['maximo'])
+            grupo['suma'] += fila['suma']
+            grupo['cantidad'] += fila['cantidad']
+    return list(grupos.values())
+
+
+def _rangos_contiguos(inicios, duracion):
+    """Une inicios ordenados de intervalos consecutivos en rangos [desde, hasta)."""
+    rangos = []
+    for inicio in inicios:
+        if rangos and rangos[-1][1] == inicio:
+            rangos[-1][1] = inicio + duracion
+        else:
+            rangos.append([inicio, inicio + duracion])
+    return rangos
+
+
+def ultima_lectura_confirmada(lecturas):
+    """
+    Mayor id de `lecturas` hasta el que ya no pueden aparecer lecturas nuevas:
+    el de las recibidas (fecha_hora) antes de MARGEN_CONFIRMACION. Las más
+    recientes se vuelven a procesar en la ejecución siguiente. None si no hay.
+    """
+    return lecturas.filter(
+        fecha_hora__lt=timezone.now() - MARGEN_CONFIRMACION
+    ).aggregate(ultima=Max('id'))['ultima']
+
+
+def agregar_lecturas(batch_size=1000, ahora=None):
+    """
+    Incorpora a los agregados las lecturas creadas desde la ejecución anterior.
+    Las horas que recibieron lecturas, también las que llegan con atraso, se
+    recalculan completas: por minuto en la base de datos y luego 15 minutos y
+    1 hora combinando esos minutos. Las horas cuyas lecturas crudas ya pueden
+    haber sido borradas por la retención se omiten. El progreso solo avanza
+    hasta ultima_lectura_confirmada(), así que las lecturas de los últimos
+    minutos se agregan otra vez en la ejecución siguiente junto con las que
+    confirmen tarde. Devuelve la cantidad de agregados guardados.
+    """
+    from .models import LecturaSensor, Sensor, AgregadoLecturaSensor, ProgresoAgregacionLecturas
+
+    ahora = ahora or timezone.now()
+    with transaction.atomic():
+        progreso, _ = ProgresoAgregacionLecturas.objects.select_for_update().get_or_create(pk=1)
+        nuevas = LecturaSensor.objects.filter(id__gt=progreso.ultima_lectura_id)
+        ultima_id = nuevas.aggregate(ultima=Max('id'))['ultima']
+        if ultima_id is None:
+            return 0
+        nuevas = nuevas.filter(id__lte=ultima_id)
+
+        horas = defaultdict(set)
+        for sensor_id, hora in nuevas.annotate(
+            hora=TruncHour('fecha_hora_lectura', tzinfo=UTC)
+        ).order_by().values_list('sensor_id', 'hora').distinct():
+            horas[sensor_id].add(hora)
+
+        retencion = dict(Sensor.objects.filter(pk__in=horas).values_list('pk', 'tipo__retencion_lecturas_dias'))
+        rangos = Q()
+        for sensor_id, inicios in horas.items():
+            limite = ahora - datetime.timedelta(days=retencion[sensor_id])
+            for desde, hasta in _rangos_contiguos(sorted(h for h in inicios if h >= limite), datetime.timedelta(hours=1)):
+                rangos |= Q(sensor_id=sensor_id, fecha_hora_lectura__gte=desde, fecha_hora_lectura__lt=hasta)
+
+        minutos = []
+        if rangos:
+            minutos = list(LecturaSensor.objects.filter(rangos).annotate(
+                inicio=TruncMinute('fecha_hora_lectura', tzinfo=UTC)
+            ).order_by().values('sensor_id', 'inicio').annotate(
+                minimo=Min('valor'),
+                maximo=Max('valor'),
+                suma=Sum('valor'),
+                cantidad=Count('id')
+            ))
+
+        agregados = [
+            AgregadoLecturaSensor(resolucion=resolucion, **fila)
+            for resolucion, filas in (
+                (60, minutos),
+                (900, _combinar(minutos, 900)),
+                (3600, _combinar(minutos, 3600)),
+            )
+            for fila in filas
+        ]
+        AgregadoLecturaSensor.objects.bulk_create(
+            agregados,
+            batch_size=batch_size,
+            update_conflicts=True,
+            unique_fields=['sensor', 'resolucion', 'inicio'],
+            update_fields=['minimo', 'maximo', 'suma', 'cantidad']
+        )
+
+        progreso.ultima_lectura_id = ultima_lectura_confirmada(nuevas) or progreso.ultima_lectura_id
+        progreso.save()
+    return len(agregados)
+
+
+def aplicar_retencion(ahora=None, batch_size=10000):
+    """
+    Borra las lecturas y agregados más antiguos que la retención de su
+    TipoSensor. Las lecturas crudas solo se borran si ya están en los agregados
+    y no tienen alertas asociadas. Si la tabla de lecturas está particionada
+    no se borran lecturas crudas: su retención es la de
+    SENSORES_RETENCION_LECTURAS_MESES, que aplica gestionar_particiones
+    quitando particiones. Devuelve {nivel: filas borradas}.
+    """
+    from .models import TipoSensor, LecturaSensor, AgregadoLecturaSensor, ProgresoAgregacionLecturas
+    from .particiones import es_particionada
+
+    ahora = ahora or timezone.now()
+    ultima_agregada = ProgresoAgregacionLecturas.objects.filter(pk=1).values_list(
+        'ultima_lectura_id', flat=True
+    ).first() or 0
+    borrar_crudas = not es_particionada()
+    borradas = dict.fromkeys(NIVELES, 0)
+
+    for tipo in TipoSensor.objects.all():
+        vencidas = LecturaSensor.objects.filter(
+            sensor__tipo=tipo,
+            fecha_hora_lectura__lt=ahora - datetime.timedelta(days=tipo.retencion_lecturas_dias),
+            id__lte=ultima_agregada,
+            alertas__isnull=True
+        ).order_by()
+        while borrar_crudas:
+            ids = list(vencidas.values_list('pk', flat=True)[:batch_size])
+            if not ids:
+                break
+            borradas[0] += LecturaSensor.objects.filter(pk__in=ids).delete()[1].get(LecturaSensor._meta.label, 0)
+
+        for resolucion in RESOLUCIONES_AGREGADAS:
+            dias = tipo.retencion_dias(resolucion)
+            if dias is None:
+                continue
+            borradas[resolucion] += AgregadoLecturaSensor.objects.filter(
+                sensor__tipo=tipo,
+                resolucion=resolucion,
+                inicio__lt=ahora - datetime.timedelta(days=dias)
+            ).delete()[0]
+
+    return borradas
+
+
+def elegir_nivel(tipo, desde, resolucion, ahora=None):
+    """
+    Nivel (resolución en segundos, 0 = crudas) del que leer una serie desde
+    `desde` con la resolución pedida: el más grueso que no la supera y cuya
+    retención todavía cubre `desde`; si ninguno la cubre, el más fino de los
+    niveles más gruesos que sí la cubren.
+    """
+    ahora = ahora or timezone.now()
+
+    def cubre(nivel):
+        dias = tipo.retencion_dias(nivel)
+        return dias is None or desde >= ahora - datetime.timedelta(days=dias)
+
+    for nivel in reversed(NIVELES):
+        if nivel <= resolucion and cubre(nivel):
+            return nivel
+    for nivel in NIVELES:
+        if nivel > resolucion and cubre(nivel):
+            return nivel
+    return NIVELES[-1]
+
+
+def serie_sensor(sensor, desde, hasta, resolucion=None, puntos=None, ahora=None):
+    """
+    Serie de un sensor en [desde, hasta) como lista de diccionarios con inicio,
+    minimo, maximo, promedio y cantidad. La resolución se indica en segundos o
+    como cantidad máxima de `puntos`; sin ninguna de las dos se devuelven las
+    lecturas crudas. Si el nivel elegido es más fino que la resolución pedida
+    se reagrupa en Python. Los agregados llegan hasta la última ejecución de
+    agregar_lecturas.
+    """
+    from .models import LecturaSensor, AgregadoLecturaSensor
+
+    if resolucion is None:
+        resolucion = (hasta - desde).total_seconds() / puntos if puntos else 0
+    nivel = elegir_nivel(sensor.tipo, desde, resolucion, ahora)
+
+    if nivel:
+        filas = list(AgregadoLecturaSensor.objects.filter(
+            sensor=sensor,
+            resolucion=nivel,
+            inicio__gte=inicio_intervalo(desde, nivel),
+            inicio__lt=hasta
+        ).values('sensor_id', 'inicio', 'minimo', 'maximo', 'suma', 'cantidad'))
+    else:
+        filas = [
+            {'sensor_id': sensor.pk, 'inicio': fecha, 'minimo': valor, 'maximo': valor, 'suma': valor, 'cantidad': 1}
+            for fecha, valor in LecturaSensor.objects.filter(
+                sensor=sensor, fecha_hora_lectura__gte=desde, fecha_hora_lectura__lt=hasta
+            ).values_list('fecha_hora_lectura', 'valor')
+        ]
+
+    if int(resolucion) > nivel:
+        filas = _combinar(filas, int(resolucion))
+
+    return [
+        {
+            'inicio': fila['inicio'],
+            'minimo': fila['minimo'],
+            'maximo': fila['maximo'],
+            'promedio': fila['suma'] / fila['cantidad'],
+            'cantidad': fila['cantidad'],
+        }
+        for fila in sorted(filas, key=lambda fila: fila['inicio'])
+    ]
@@ -0,0 +1,47 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+
+@receiver([post_save, post_delete], sender='sensores.Sensor')
+@receiver([post_save, post_delete], sender='sensores.TipoSensor')
+def invalidar_mapa_sensores_ingesta(sender, instance, **kwargs):
+    """
+    Drop the cached sensor map used by the bulk ingestion endpoint
+    """
+    from .ingesta import invalidar_mapa_sensores
+    
+    invalidar_mapa_sensores()
+
+
+@receiver([post_save, post_delete], sender='sensores.Sensor')
+@receiver([post_save, post_delete], sender='sensores.TipoSensor')
+@receiver([post_save, post_delete], sender='sensores.ReglaAlerta')
+def invalidar_reglas_alerta(sender, instance, **kwargs):
+    """
+    Make the alert rule engine reload its rules and sensor scopes
+    """
+    from .reglas import motor
+    
+    motor.invalidar()
+
+
+@receiver(post_save, sender='sensores.LecturaSensor')
+def actualizar_ultima_lectura(sender, instance, created, raw=False, **kwargs):
+    """
+    Keep the sensor's last value current for readings saved one at a time (bulk ingestion updates it itself)
+    """
+    from .ultimas import actualizar_ultimas_lecturas
+    
+    if created and not raw:
+        actualizar_ultimas_lecturas([instance])
+
+
+@receiver(post_save, sender='sensores.LecturaSensor')
+def evaluar_reglas_lectura(sender, instance, created, raw=False, **kwargs):
+    """
+    Run the alert rules on readings saved one at a time (bulk ingestion calls the engine itself)
+    """
+    from .reglas import motor
+    
+    if created and not raw:
+        motor.procesar([instance])
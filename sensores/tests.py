@@ -1,3 +1,668 @@
+import datetime
+import json
+from unittest import skipIf, skipUnless
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from avicola.models import Empresa
+from inventario.models import Raza
+from produccion.models import Granja, Galpon, Lote, SeguimientoDiario, ConsumoEnergia
+from .models import (
+    TipoSensor, Sensor, LecturaSensor, AgregadoLecturaSensor, AlertaSensor, ReglaAlerta, UltimaLecturaSensor,
+    ProgresoAgregacionLecturas, PerfilAmbientalDiario
+)
+from .analitica import grados_hora, huecos, media_movil, resumen_clima_galpon
+from .ingesta import CLAVE_MAPA_SENSORES, ingerir_lecturas, parsear_lecturas
+from .particiones import (
+    crear_particiones, eliminar_lecturas_vencidas, eliminar_particiones_vencidas, es_particionada, particiones
+)
+from .perfiles import construir_perfiles_ambientales, seguimientos_con_ambiente
+from .reglas import motor
+from .series import UTC, agregar_lecturas, aplicar_retencion, elegir_nivel, serie_sensor
+from .ultimas import ultimas_lecturas
+
+
+class SeriesSensorTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        empresa = Empresa.objects.create(
+            nombre="Empresa de Prueba",
+            rif="J-123456789",
+            direccion="Dirección de prueba"
+        )
+        granja = Granja.objects.create(
+            empresa=empresa,
+            codigo_granja="GRANJA-001",
+            nombre="Granja de Prueba",
+            direccion="Ubicación de prueba"
+        )
+        cls.galpon = Galpon.objects.create(
+            granja=granja,
+            numero_galpon="GALPON-001",
+            capacidad_aves=5000
+        )
+        cls.tipo = TipoSensor.objects.create(
+            nombre="Temperatura",
+            codigo="temperatura",
+            unidad_medida="°C",
+            rango_min=-10,
+            rango_max=60
+        )
+        cls.sensor = Sensor.objects.create(
+            codigo="TEMP-001",
+            nombre="Temperatura 1",
+            tipo=cls.tipo,
+            galpon=cls.galpon,
+            ubicacion="Centro"
+        )
+        cls.ahora = datetime.datetime(2026, 3, 10, 12, 0, tzinfo=UTC)
+
+    def crear_lecturas(self, desde, cantidad, paso=30):
+        """Crea `cantidad` lecturas cada `paso` segundos con valores 0, 1, 2..., recibidas al momento de medirse"""
+        return LecturaSensor.objects.bulk_create([
+            LecturaSensor(
+                sensor=self.sensor,
+                valor=float(i),
+                fecha_hora=desde + datetime.timedelta(seconds=paso * i),
+                fecha_hora_lectura=desde + datetime.timedelta(seconds=paso * i)
+            )
+            for i in range(cantidad)
+        ])
+
+    def test_rollups_per_tier(self):
+        """One hour of readings produces 60, 4 and 1 aggregates with exact stats"""
+        inicio = self.ahora - datetime.timedelta(hours=2)
+        self.crear_lecturas(inicio, 120)
+
+        self.assertEqual(agregar_lecturas(ahora=self.ahora), 65)
+        hora = AgregadoLecturaSensor.objects.get(resolucion=3600)
+        self.assertEqual((hora.minimo, hora.maximo, hora.cantidad), (0, 119, 120))
+        self.assertAlmostEqual(hora.promedio, 59.5)
+        cuarto = AgregadoLecturaSensor.objects.filter(resolucion=900).order_by('inicio')[1]
+        self.assertEqual((cuarto.minimo, cuarto.maximo, cuarto.cantidad), (30, 59, 30))
+
+        # Sin lecturas nuevas no hay nada que agregar
+        self.assertEqual(agregar_lecturas(ahora=self.ahora), 0)
+
+    def test_late_reading_recomputes_its_hour(self):
+        """A reading that arrives late is merged into the already aggregated hour"""
+        inicio = self.ahora - datetime.timedelta(hours=2)
+        self.crear_lecturas(inicio, 120)
+        agregar_lecturas(ahora=self.ahora)
+
+        LecturaSensor.objects.create(sensor=self.sensor, valor=500, fecha_hora_lectura=inicio + datetime.timedelta(seconds=5))
+        agregar_lecturas(ahora=self.ahora)
+        hora = AgregadoLecturaSensor.objects.get(resolucion=3600)
+        self.assertEqual((hora.maximo, hora.cantidad), (500, 121))
+
+    @skipIf(connection.vendor == 'postgresql', "Con particiones las crudas se quitan por partición")
+    def test_retention_keeps_unaggregated_and_alerted_readings(self):
+        """Expired raw readings are deleted only once aggregated and without alerts"""
+        inicio = self.ahora - datetime.timedelta(days=10)
+        lecturas = self.crear_lecturas(inicio, 4)
+        AlertaSensor.objects.create(lectura=lecturas[0], tipo='ALTA', mensaje="Temperatura alta")
+
+        self.assertEqual(aplicar_retencion(ahora=self.ahora)[0], 0)
+
+        agregar_lecturas(ahora=inicio)
+        borradas = aplicar_retencion(ahora=self.ahora)
+        self.assertEqual(borradas[0], 3)
+        self.assertEqual(list(LecturaSensor.objects.values_list('pk', flat=True)), [lecturas[0].pk])
+        self.assertEqual(AgregadoLecturaSensor.objects.filter(resolucion=3600).count(), 1)
+
+    @skipIf(connection.vendor == 'postgresql', "Con particiones las crudas se quitan por partición")
+    def test_recent_readings_are_rescanned_and_kept(self):
+        """Readings received within the commit margin stay past the watermark until it elapses"""
+        viejas = self.crear_lecturas(self.ahora - datetime.timedelta(days=10), 2)
+        # Recibida recién: una transacción más lenta aún puede confirmar ids menores
+        reciente = LecturaSensor.objects.create(
+            sensor=self.sensor, valor=7, fecha_hora_lectura=self.ahora - datetime.timedelta(days=10, seconds=-90)
+        )
+
+        agregar_lecturas(ahora=self.ahora - datetime.timedelta(days=10))
+        self.assertEqual(ProgresoAgregacionLecturas.objects.get().ultima_lectura_id, viejas[-1].pk)
+        self.assertEqual(AgregadoLecturaSensor.objects.get(resolucion=3600).cantidad, 3)
+
+        self.assertEqual(aplicar_retencion(ahora=self.ahora)[0], 2)
+        self.assertEqual(list(LecturaSensor.objects.values_list('pk', flat=True)), [reciente.pk])
+
+        # Su hora ya venció: la ejecución siguiente no la recalcula sin las crudas borradas
+        agregar_lecturas(ahora=self.ahora)
+        self.assertEqual(AgregadoLecturaSensor.objects.get(resolucion=3600).cantidad, 3)
+
+    @skipUnless(connection.vendor == 'postgresql', "Particionado solo en PostgreSQL")
+    def test_partitioned_retention_keeps_raw_readings(self):
+        """With partitions, per-type retention leaves raw readings to the partition drop"""
+        inicio = self.ahora - datetime.timedelta(days=10)
+        self.crear_lecturas(inicio, 4)
+        agregar_lecturas(ahora=inicio)
+
+        self.assertEqual(aplicar_retencion(ahora=self.ahora)[0], 0)
+        self.assertEqual(LecturaSensor.objects.count(), 4)
+
+    def test_query_picks_coarsest_fitting_tier(self):
+        """The series is read from the coarsest tier that fits resolution and retention"""
+        self.assertEqual(elegir_nivel(self.tipo, self.ahora - datetime.timedelta(hours=1), 0, self.ahora), 0)
+        self.assertEqual(elegir_nivel(self.tipo, self.ahora - datetime.timedelta(hours=1), 600, self.ahora), 60)
+        self.assertEqual(elegir_nivel(self.tipo, self.ahora - datetime.timedelta(days=60), 600, self.ahora), 900)
+        self.assertEqual(elegir_nivel(self.tipo, self.ahora - datetime.timedelta(days=400), 60, self.ahora), 3600)
+
+        inicio = self.ahora - datetime.timedelta(hours=2)
+        self.crear_lecturas(inicio, 120)
+        agregar_lecturas(ahora=self.ahora)
+
+        with self.assertNumQueries(1):
+            serie = serie_sensor(self.sensor, inicio, self.ahora, puntos=2, ahora=self.ahora)
+        self.assertEqual([punto['cantidad'] for punto in serie], [120])
+        self.assertAlmostEqual(serie[0]['promedio'], 59.5)
+
+        serie = serie_sensor(self.sensor, inicio, self.ahora, resolucion=1800, ahora=self.ahora)
+        self.assertEqual([(punto['minimo'], punto['maximo']) for punto in serie], [(0, 59), (60, 119)])
+
+
+class IngestaLecturasTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.tipo = TipoSensor.objects.create(
+            nombre="Temperatura",
+            codigo="temperatura",
+            unidad_medida="°C",
+            rango_min=-10,
+            rango_max=60
+        )
+        cls.sensores = [
+            Sensor.objects.create(codigo=f"TEMP-{i}", nombre=f"Temperatura {i}", tipo=cls.tipo, ubicacion="Centro")
+            for i in range(3)
+        ]
+        cls.usuario = get_user_model().objects.create_user(username="gateway", password="clave-gateway")
+
+    def setUp(self):
+        cache.delete(CLAVE_MAPA_SENSORES)
+        motor.reiniciar()
+
+    def test_bulk_insert_with_range_alerts(self):
+        """Valid readings are inserted in a fixed number of queries and out-of-range ones raise alerts"""
+        filas = [
+            {'sensor': f"TEMP-{i % 3}", 'valor': 20 + i, 'fecha_hora_lectura': 1773144000 + i}
+            for i in range(50)
+        ]
+        ingerir_lecturas(filas[:1])
+        # Tres INSERT de lecturas, uno de alertas, lectura y upsert de los últimos
+        # valores, y dos pares de savepoints
+        with self.assertNumQueries(10):
+            resultado = ingerir_lecturas(filas, batch_size=20)
+
+        self.assertEqual(resultado['guardadas'], 50)
+        self.assertEqual(resultado['alertas'], 9)
+        self.assertEqual(AlertaSensor.objects.count(), 9)
+        self.assertEqual(LecturaSensor.objects.filter(sensor=self.sensores[1]).count(), 17)
+
+    def test_invalid_rows_are_reported(self):
+        """Unknown sensors and bad values are returned with their index"""
+        resultado = ingerir_lecturas([
+            {'sensor': 'TEMP-0', 'valor': 21.5},
+            {'sensor': 'NO-EXISTE', 'valor': 1},
+            {'sensor': 'TEMP-1', 'valor': 'abc'},
+            {'sensor': 'TEMP-2'},
+        ])
+        self.assertEqual(resultado['guardadas'], 1)
+        self.assertEqual([error['indice'] for error in resultado['errores']], [1, 2, 3])
+
+    def test_sensor_map_invalidated_on_change(self):
+        """Deactivating a sensor removes it from the cached ingestion map"""
+        ingerir_lecturas([{'sensor': 'TEMP-0', 'valor': 1}])
+        self.sensores[0].activo = False
+        self.sensores[0].save()
+        self.assertEqual(ingerir_lecturas([{'sensor': 'TEMP-0', 'valor': 1}])['guardadas'], 0)
+
+    def test_endpoint_formats(self):
+        """The endpoint accepts JSON, JSON lines and compact CSV from an authenticated gateway"""
+        url = reverse('api:sensores-ingesta')
+        cliente = APIClient()
+        self.assertIn(cliente.post(url, [], format='json').status_code, (401, 403))
+
+        cliente.force_authenticate(self.usuario)
+        respuesta = cliente.post(url, json.dumps({'lecturas': [{'sensor': 'TEMP-0', 'valor': 70}]}), content_type='application/json')
+        self.assertEqual(respuesta.status_code, 201)
+        self.assertEqual(respuesta.data['alertas'], 1)
+
+        lineas = "\n".join(json.dumps({'sensor': 'TEMP-1', 'valor': v}) for v in (1, 2))
+        self.assertEqual(cliente.post(url, lineas, content_type='application/x-ndjson').data['guardadas'], 2)
+
+        csv = "sensor,valor,fecha_hora_lectura\nTEMP-2,22.5,2026-03-10T12:00:00Z\nTEMP-2,23,\n"
+        self.assertEqual(cliente.post(url, csv, content_type='text/csv').data['guardadas'], 2)
+        self.assertEqual(len(parsear_lecturas(csv, 'text/csv')), 2)
+
+        self.assertEqual(cliente.post(url, "{", content_type='application/json').status_code, 400)
+
+
+class ReglasAlertaTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.tipo = TipoSensor.objects.create(
+            nombre="Temperatura",
+            codigo="temperatura",
+            unidad_medida="°C",
+            rango_min=-10,
+            rango_max=60
+        )
+        cls.sensor = Sensor.objects.create(codigo="TEMP-1", nombre="Temperatura 1", tipo=cls.tipo, ubicacion="Centro")
+        cls.otro = Sensor.objects.create(codigo="TEMP-2", nombre="Temperatura 2", tipo=cls.tipo, ubicacion="Fondo")
+        cls.inicio = datetime.datetime(2026, 3, 10, 12, 0, tzinfo=UTC)
+
+    def setUp(self):
+        motor.reiniciar()
+
+    def leer(self, valores, sensor=None, paso=60, desde=0):
+        """Guarda lecturas cada `paso` segundos y las pasa al motor en un solo lote."""
+        lecturas = LecturaSensor.objects.bulk_create([
+            LecturaSensor(
+                sensor=sensor or self.sensor,
+                valor=valor,
+                fecha_hora_lectura=self.inicio + datetime.timedelta(seconds=paso * (desde + i))
+            )
+            for i, valor in enumerate(valores)
+        ])
+        return motor.procesar(lecturas)
+
+    def test_one_alert_per_episode_with_hysteresis(self):
+        """A sustained excursion yields one alert, kept open inside the hysteresis band"""
+        ReglaAlerta.objects.create(
+            nombre="Calor", tipo_sensor=self.tipo, condicion='MAYOR', umbral=32,
+            histeresis=2, duracion_segundos=300, enfriamiento_segundos=0
+        )
+        # Cuatro minutos sobre el umbral no alcanzan
+        self.assertEqual(self.leer([33, 34, 35, 36, 31]), 0)
+        # Seis minutos sí; 31 está dentro de la histéresis y 29 cierra el episodio
+        self.assertEqual(self.leer([33, 34, 35, 36, 37, 38, 36, 31, 33, 29], desde=5), 1)
+
+        alerta = AlertaSensor.objects.get()
+        self.assertEqual(alerta.valor_extremo, 38)
+        self.assertEqual(alerta.lecturas_episodio, 5)
+        self.assertEqual(alerta.inicio_episodio, self.inicio + datetime.timedelta(minutes=5))
+        self.assertEqual(alerta.fin_episodio, self.inicio + datetime.timedelta(minutes=14))
+
+    def test_open_episode_updated_in_place(self):
+        """Later batches update the open alert instead of creating new ones"""
+        ReglaAlerta.objects.create(nombre="Calor", sensor=self.sensor, condicion='MAYOR', umbral=32)
+        self.assertEqual(self.leer([33, 34]), 1)
+        self.assertEqual(self.leer([40, 35], desde=2), 0)
+        self.assertEqual(self.leer([40], sensor=self.otro), 0)
+
+        alerta = AlertaSensor.objects.get()
+        self.assertEqual((alerta.valor_extremo, alerta.lecturas_episodio), (40, 4))
+        self.assertIsNone(alerta.fin_episodio)
+
+        # Un proceso nuevo recupera el episodio abierto desde la base de datos
+        motor.reiniciar()
+        self.leer([20], desde=4)
+        alerta.refresh_from_db()
+        self.assertIsNotNone(alerta.fin_episodio)
+        self.assertEqual(AlertaSensor.objects.count(), 1)
+
+    def test_cooldown_and_rate_of_change(self):
+        """A new episode inside the cooldown is suppressed; rate rules use change per minute"""
+        ReglaAlerta.objects.create(
+            nombre="Calor", tipo_sensor=self.tipo, condicion='MAYOR', umbral=32, enfriamiento_segundos=600
+        )
+        ReglaAlerta.objects.create(nombre="Salto", tipo_sensor=self.tipo, condicion='VARIACION', umbral=2)
+
+        self.assertEqual(self.leer([33, 30, 33, 30]), 2)
+        self.assertEqual(AlertaSensor.objects.filter(regla__nombre="Calor").count(), 1)
+        self.assertEqual(AlertaSensor.objects.get(regla__nombre="Salto").valor_extremo, 3)
+
+        # Pasado el enfriamiento vuelve a alertar
+        self.assertEqual(self.leer([33], desde=20), 1)
+        self.assertEqual(AlertaSensor.objects.filter(regla__nombre="Calor").count(), 2)
+
+
+class UltimaLecturaSensorTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        empresa = Empresa.objects.create(
+            nombre="Empresa de Prueba",
+            rif="J-123456789",
+            direccion="Dirección de prueba"
+        )
+        cls.granja = Granja.objects.create(
+            empresa=empresa,
+            codigo_granja="GRANJA-001",
+            nombre="Granja de Prueba",
+            direccion="Ubicación de prueba"
+        )
+        cls.galpon = Galpon.objects.create(
+            granja=cls.granja,
+            numero_galpon="GALPON-001",
+            capacidad_aves=5000
+        )
+        cls.tipo = TipoSensor.objects.create(
+            nombre="Temperatura",
+            codigo="temperatura",
+            unidad_medida="°C",
+            rango_min=-10,
+            rango_max=60
+        )
+        cls.admin = get_user_model().objects.create_superuser(username="admin", password="clave-admin", email="admin@example.com")
+
+    def setUp(self):
+        cache.delete(CLAVE_MAPA_SENSORES)
+        motor.reiniciar()
+
+    def crear_sensores(self, cantidad, desde=0):
+        return [
+            Sensor.objects.create(codigo=f"TEMP-{i}", nombre=f"Temperatura {i}", tipo=self.tipo, galpon=self.galpon, ubicacion="Centro")
+            for i in range(desde, desde + cantidad)
+        ]
+
+    def test_ingestion_keeps_newest_value(self):
+        """Only readings newer than the stored one replace the last value"""
+        self.crear_sensores(2)
+        ingerir_lecturas([
+            {'sensor': 'TEMP-0', 'valor': 20, 'fecha_hora_lectura': '2026-03-10T12:00:00Z', 'bateria': 90},
+            {'sensor': 'TEMP-0', 'valor': 21, 'fecha_hora_lectura': '2026-03-10T12:01:00Z', 'bateria': 89},
+            {'sensor': 'TEMP-1', 'valor': 25, 'fecha_hora_lectura': '2026-03-10T12:00:00Z'},
+        ])
+        ingerir_lecturas([{'sensor': 'TEMP-0', 'valor': 15, 'fecha_hora_lectura': '2026-03-10T11:00:00Z'}])
+
+        ultima = UltimaLecturaSensor.objects.get(sensor__codigo='TEMP-0')
+        self.assertEqual((ultima.valor, ultima.bateria), (21, 89))
+
+        sensor = Sensor.objects.get(codigo='TEMP-1')
+        LecturaSensor.objects.create(sensor=sensor, valor=26)
+        self.assertEqual(UltimaLecturaSensor.objects.get(sensor=sensor).valor, 26)
+
+    def test_current_conditions_single_query(self):
+        """All last values of a galpón or granja come from one query"""
+        self.crear_sensores(4)
+        ingerir_lecturas([{'sensor': f'TEMP-{i}', 'valor': 20 + i} for i in range(4)])
+
+        with self.assertNumQueries(1):
+            valores = [(ultima.sensor.tipo.unidad_medida, ultima.valor) for ultima in ultimas_lecturas(granja=self.granja)]
+        self.assertEqual(sorted(valores), [('°C', 20), ('°C', 21), ('°C', 22), ('°C', 23)])
+
+    def test_admin_changelist_constant_queries(self):
+        """The sensor changelist runs the same number of queries for 1 or 6 sensors"""
+        self.client.force_login(self.admin)
+        url = reverse('admin:sensores_sensor_changelist')
+
+        self.crear_sensores(1)
+        ingerir_lecturas([{'sensor': 'TEMP-0', 'valor': 20}])
+        self.client.get(url)
+        with CaptureQueriesContext(connection) as consultas_uno:
+            self.assertEqual(self.client.get(url).status_code, 200)
+
+        self.crear_sensores(5, desde=1)
+        ingerir_lecturas([{'sensor': f'TEMP-{i}', 'valor': 20} for i in range(6)])
+        with CaptureQueriesContext(connection) as consultas_seis:
+            respuesta = self.client.get(url)
+        self.assertContains(respuesta, "20.0 °C")
+        self.assertEqual(len(consultas_seis), len(consultas_uno))
+
+
+class ParticionesLecturasTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        empresa = Empresa.objects.create(
+            nombre="Empresa de Prueba",
+            rif="J-123456789",
+            direccion="Dirección de prueba"
+        )
+        granja = Granja.objects.create(
+            empresa=empresa,
+            codigo_granja="GRANJA-001",
+            nombre="Granja de Prueba",
+            direccion="Ubicación de prueba"
+        )
+        galpon = Galpon.objects.create(
+            granja=granja,
+            numero_galpon="GALPON-001",
+            capacidad_aves=5000
+        )
+        tipo = TipoSensor.objects.create(
+            nombre="Temperatura",
+            codigo="temperatura",
+            unidad_medida="°C",
+            rango_min=-10,
+            rango_max=60
+        )
+        cls.sensor = Sensor.objects.create(
+            codigo="TEMP-001",
+            nombre="Temperatura 1",
+            tipo=tipo,
+            galpon=galpon,
+            ubicacion="Centro"
+        )
+        cls.ahora = datetime.datetime(2026, 3, 10, 12, 0, tzinfo=UTC)
+
+    def crear_lectura(self, fecha, valor=20.0):
+        return LecturaSensor.objects.create(sensor=self.sensor, valor=valor, fecha_hora=fecha, fecha_hora_lectura=fecha)
+
+    def test_fallback_deletes_only_aggregated_expired_readings(self):
+        """Without partitions, retention deletes aggregated readings without alerts older than the kept months"""
+        vieja = self.crear_lectura(datetime.datetime(2025, 12, 31, 23, 0, tzinfo=UTC))
+        alertada = self.crear_lectura(datetime.datetime(2025, 12, 30, tzinfo=UTC))
+        AlertaSensor.objects.create(lectura=alertada, tipo='ALTA', mensaje="Alta")
+        self.crear_lectura(datetime.datetime(2026, 1, 1, 0, 0, tzinfo=UTC))
+        agregar_lecturas(ahora=self.ahora)
+        sin_agregar = self.crear_lectura(datetime.datetime(2025, 11, 5, tzinfo=UTC))
+
+        self.assertEqual(eliminar_lecturas_vencidas(2, ahora=self.ahora), 1)
+        self.assertFalse(LecturaSensor.objects.filter(pk=vieja.pk).exists())
+        self.assertTrue(LecturaSensor.objects.filter(pk=sin_agregar.pk).exists())
+        self.assertTrue(AlertaSensor.objects.filter(lectura=alertada).exists())
+        self.assertEqual(LecturaSensor.objects.count(), 3)
+
+    @skipUnless(connection.vendor == 'postgresql', "Particionado solo en PostgreSQL")
+    def test_partitions_created_and_dropped(self):
+        """Monthly partitions are created ahead, absorb DEFAULT rows and are dropped when expired"""
+        self.assertTrue(es_particionada())
+        lejana = self.crear_lectura(datetime.datetime(2031, 5, 2, tzinfo=UTC))
+        crear_particiones(meses_adelante=0, ahora=datetime.datetime(2031, 5, 20, tzinfo=UTC))
+        self.assertIn(('sensores_lecturasensor_p2031_05', datetime.datetime(2031, 5, 1, tzinfo=UTC)), particiones())
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT id FROM "sensores_lecturasensor_p2031_05"')
+            self.assertEqual(cursor.fetchall(), [(lejana.pk,)])
+
+        crear_particiones(meses_adelante=1, ahora=datetime.datetime(2020, 1, 15, tzinfo=UTC))
+        vieja = self.crear_lectura(datetime.datetime(2020, 1, 20, tzinfo=UTC))
+        AlertaSensor.objects.create(lectura=vieja, tipo='ALTA', mensaje="Alta")
+        sin_alerta = self.crear_lectura(datetime.datetime(2020, 1, 21, tzinfo=UTC))
+        pendiente = self.crear_lectura(datetime.datetime(2020, 2, 3, tzinfo=UTC))
+        ProgresoAgregacionLecturas.objects.update_or_create(pk=1, defaults={'ultima_lectura_id': sin_alerta.pk})
+
+        quitadas, omitidas = eliminar_particiones_vencidas(1, ahora=datetime.datetime(2020, 4, 15, tzinfo=UTC))
+        self.assertEqual(quitadas, ['sensores_lecturasensor_p2020_01'])
+        self.assertEqual(omitidas, ['sensores_lecturasensor_p2020_02'])
+        self.assertFalse(LecturaSensor.objects.filter(pk=sin_alerta.pk).exists())
+        self.assertTrue(LecturaSensor.objects.filter(pk=pendiente.pk).exists())
+        # La lectura con alerta se conserva, ahora en la partición DEFAULT
+        self.assertEqual(AlertaSensor.objects.get(lectura_id=vieja.pk).lectura.valor, vieja.valor)
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT id FROM "sensores_lecturasensor_default" WHERE id = %s', [vieja.pk])
+            self.assertEqual(cursor.fetchall(), [(vieja.pk,)])
+        # y tampoco la borra la retención de la partición DEFAULT
+        self.assertEqual(eliminar_lecturas_vencidas(1, ahora=datetime.datetime(2020, 4, 15, tzinfo=UTC)), 0)
+
+
+class AnaliticaClimaTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        empresa = Empresa.objects.create(
+            nombre="Empresa de Prueba",
+            rif="J-123456789",
+            direccion="Dirección de prueba"
+        )
+        granja = Granja.objects.create(
+            empresa=empresa,
+            codigo_granja="GRANJA-001",
+            nombre="Granja de Prueba",
+            direccion="Ubicación de prueba"
+        )
+        cls.galpon = Galpon.objects.create(
+            granja=granja,
+            numero_galpon="GALPON-001",
+            capacidad_aves=5000
+        )
+        temperatura = TipoSensor.objects.create(
+            nombre="Temperatura", codigo="temperatura", unidad_medida="°C", rango_min=-10, rango_max=60
+        )
+        humedad = TipoSensor.objects.create(
+            nombre="Humedad", codigo="humedad", unidad_medida="%", rango_min=0, rango_max=100
+        )
+        cls.temperatura = Sensor.objects.create(
+            codigo="TEMP-001", nombre="Temperatura 1", tipo=temperatura, galpon=cls.galpon, ubicacion="Centro"
+        )
+        cls.humedad = Sensor.objects.create(
+            codigo="HUM-001", nombre="Humedad 1", tipo=humedad, galpon=cls.galpon, ubicacion="Centro"
+        )
+        cls.desde = datetime.datetime(2026, 3, 10, 12, 0, tzinfo=UTC)
+
+    def test_array_functions(self):
+        """Rolling means, degree-hours and gaps match a direct computation"""
+        import numpy as np
+
+        sensor_ids = np.array([1, 1, 1, 1, 2, 2, 2])
+        segundos = np.array([0.0, 60, 120, 1000, 0, 60, 120])
+        valores = np.array([30.0, 32, 34, 40, 10, 20, 30])
+
+        self.assertEqual(media_movil(sensor_ids, segundos, valores, 90).tolist(), [30, 31, 33, 40, 10, 15, 25])
+        # 2 °C durante 60 s; el tramo de 34 °C es un corte y no suma
+        self.assertEqual(grados_hora(sensor_ids, segundos, valores, 30, hueco=300), {1: 120 / 3600, 2: 0.0})
+        self.assertEqual(
+            huecos(sensor_ids, segundos, 300, desde=0.0, hasta=1060.0, sensores=[1, 2, 3]),
+            [(1, 120.0, 1000.0), (2, 120.0, 1060.0), (3, 0.0, 1060.0)]
+        )
+
+    def test_galpon_summary(self):
+        """The galpón summary combines both sensor types and reports outages"""
+        LecturaSensor.objects.bulk_create([
+            LecturaSensor(
+                sensor=sensor,
+                valor=valor,
+                fecha_hora_lectura=self.desde + datetime.timedelta(minutes=minuto)
+            )
+            for minuto in range(120)
+            for sensor, valor in ((self.temperatura, 28.0 + minuto // 60 * 4), (self.humedad, 70.0))
+            if sensor == self.temperatura or not 30 <= minuto < 50
+        ])
+
+        resumen = resumen_clima_galpon(self.galpon, self.desde, self.desde + datetime.timedelta(hours=2))
+
+        temperatura = resumen['sensores']['TEMP-001']
+        self.assertEqual((temperatura['lecturas'], temperatura['minimo'], temperatura['maximo']), (120, 28.0, 32.0))
+        self.assertAlmostEqual(temperatura['grados_hora'], 59 / 60 * 2)
+        self.assertAlmostEqual(resumen['galpon']['temperatura']['grados_hora'], 2.0)
+        self.assertAlmostEqual(resumen['galpon']['ith']['maximo'], 0.8 * 32 + 0.7 * (32 - 14.4) + 46.4)
+        self.assertAlmostEqual(resumen['galpon']['ith']['horas_estres'], 1.0)
+        self.assertEqual(resumen['sensores']['HUM-001']['lecturas'], 100)
+        self.assertEqual(
+            [(hueco['sensor'], hueco['segundos']) for hueco in resumen['huecos']],
+            [('HUM-001', 21 * 60.0)]
+        )
+
+
+class PerfilAmbientalDiarioTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        empresa = Empresa.objects.create(
+            nombre="Empresa de Prueba",
+            rif="J-123456789",
+            direccion="Dirección de prueba"
+        )
+        granja = Granja.objects.create(
+            empresa=empresa,
+            codigo_granja="GRANJA-001",
+            nombre="Granja de Prueba",
+            direccion="Ubicación de prueba"
+        )
+        cls.galpon = Galpon.objects.create(
+            granja=granja,
+            numero_galpon="GALPON-001",
+            capacidad_aves=5000
+        )
+        raza = Raza.objects.create(
+            nombre="Híbrido de Engorde",
+            tipo_raza="ENGORDE",
+            descripcion="Raza para engorde"
+        )
+        cls.fecha = datetime.date(2026, 3, 10)
+        cls.lote = Lote.objects.create(
+            galpon=cls.galpon,
+            raza=raza,
+            fecha_inicio=cls.fecha - datetime.timedelta(days=10),
+            cantidad_inicial_aves=1000,
+            codigo_lote="LOTE-001"
+        )
+        tipo = TipoSensor.objects.create(
+            nombre="Temperatura", codigo="temperatura", unidad_medida="°C", rango_min=-10, rango_max=60
+        )
+        cls.sensor = Sensor.objects.create(
+            codigo="TEMP-001", nombre="Temperatura 1", tipo=tipo, galpon=cls.galpon, ubicacion="Centro"
+        )
+
+    def crear_lecturas(self, fecha, valores, hora_inicial=0, sensor=None):
+        """Una lectura por hora del día local `fecha` desde `hora_inicial` con los `valores`, recibida al medirse."""
+        inicio = timezone.make_aware(datetime.datetime.combine(fecha, datetime.time()))
+        LecturaSensor.objects.bulk_create([
+            LecturaSensor(
+                sensor=sensor or self.sensor,
+                valor=valor,
+                fecha_hora=inicio + datetime.timedelta(hours=hora),
+                fecha_hora_lectura=inicio + datetime.timedelta(hours=hora)
+            )
+            for hora, valor in enumerate(valores, hora_inicial)
+        ])
+
+    def test_incremental_build(self):
+        """Only days with new readings or energy records are (re)built"""
+        self.crear_lecturas(self.fecha, [25.0, 35.0])
+        ConsumoEnergia.objects.create(
+            galpon=self.galpon, fecha_registro=self.fecha,
+            hora_inicio=datetime.time(0), hora_fin=datetime.time(12), consumo_kwh=40
+        )
+        self.assertEqual(construir_perfiles_ambientales(), 1)
+        perfil = PerfilAmbientalDiario.objects.get(galpon=self.galpon, fecha=self.fecha)
+        self.assertEqual((perfil.temperatura_min, perfil.temperatura_max, perfil.lecturas), (25.0, 35.0, 2))
+        self.assertEqual(perfil.consumo_kwh, 40)
+
+        self.assertEqual(construir_perfiles_ambientales(), 0)
+
+        # Lectura atrasada del mismo día y lecturas del día siguiente
+        self.crear_lecturas(self.fecha, [20.0], hora_inicial=5)
+        self.crear_lecturas(self.fecha + datetime.timedelta(days=1), [30.0])
+        self.assertEqual(construir_perfiles_ambientales(), 2)
+        perfil.refresh_from_db()
+        self.assertEqual((perfil.temperatura_min, perfil.lecturas), (20.0, 3))
+
+    def test_sensor_without_galpon_is_skipped(self):
+        """Readings from a sensor not assigned to a galpón don't build a profile nor block progress"""
+        suelto = Sensor.objects.create(
+            codigo="TEMP-002", nombre="Temperatura suelta", tipo=self.sensor.tipo, ubicacion="Bodega"
+        )
+        self.crear_lecturas(self.fecha, [25.0], sensor=suelto)
+        self.crear_lecturas(self.fecha, [30.0])
+
+        self.assertEqual(construir_perfiles_ambientales(), 1)
+        self.assertEqual(list(PerfilAmbientalDiario.objects.values_list('galpon_id', flat=True)), [self.galpon.pk])
+        self.assertEqual(construir_perfiles_ambientales(), 0)
+
+    def test_join_with_daily_tracking(self):
+        """Daily tracking rows carry the environment profile of their galpón and day"""
+        self.crear_lecturas(self.fecha, [25.0, 35.0])
+        construir_perfiles_ambientales()
+        for fecha in (self.fecha, self.fecha + datetime.timedelta(days=1)):
+            SeguimientoDiario.objects.create(
+                lote=self.lote, fecha_seguimiento=fecha, peso_promedio_ave=1.5, consumo_alimento_kg=100
+            )
 
-# Create your tests here.
+        with self.assertNumQueries(1):
+            filas = list(seguimientos_con_ambiente(SeguimientoDiario.objects.filter(lote=self.lote)).order_by(
+                'fecha_seguimiento'
+            ).values_list('fecha_seguimiento', 'ambiente_temperatura_max'))
+        self.assertEqual(filas, [(self.fecha, 35.0), (self.fecha + datetime.timedelta(days=1), None)])
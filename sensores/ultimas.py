@@ -0,0 +1,68 @@
+"""
+Último valor de cada sensor (UltimaLecturaSensor).
+
+La ingesta y la señal de LecturaSensor llaman a actualizar_ultimas_lecturas,
+que solo reemplaza el valor guardado por lecturas más recientes. Las vistas de
+condiciones actuales leen todos los sensores de un galpón o granja con
+ultimas_lecturas en una sola consulta.
+"""
+from django.db import transaction
+
+CAMPOS_ULTIMA_LECTURA = ['lectura', 'valor', 'fecha_hora_lectura', 'estado_sensor', 'bateria', 'senal']
+
+
+def actualizar_ultimas_lecturas(lecturas):
+    """
+    Guarda, para cada sensor, la lectura más reciente de `lecturas` (ya
+    guardadas) si es posterior a la que tiene registrada. Dos consultas por
+    lote, sin importar la cantidad de sensores.
+    """
+    from .models import UltimaLecturaSensor
+
+    recientes = {}
+    for lectura in lecturas:
+        actual = recientes.get(lectura.sensor_id)
+        if actual is None or lectura.fecha_hora_lectura > actual.fecha_hora_lectura:
+            recientes[lectura.sensor_id] = lectura
+    if not recientes:
+        return
+
+    with transaction.atomic():
+        registradas = dict(UltimaLecturaSensor.objects.select_for_update().filter(
+            sensor_id__in=recientes
+        ).values_list('sensor_id', 'fecha_hora_lectura'))
+        UltimaLecturaSensor.objects.bulk_create(
+            [
+                UltimaLecturaSensor(
+                    sensor_id=sensor_id,
+                    lectura=lectura,
+                    valor=lectura.valor,
+                    fecha_hora_lectura=lectura.fecha_hora_lectura,
+                    estado_sensor=lectura.estado_sensor,
+                    bateria=lectura.bateria,
+                    senal=lectura.senal,
+                )
+                for sensor_id, lectura in recientes.items()
+                if sensor_id not in registradas or lectura.fecha_hora_lectura > registradas[sensor_id]
+            ],
+            update_conflicts=True,
+            unique_fields=['sensor'],
+            update_fields=CAMPOS_ULTIMA_LECTURA
+        )
+
+
+def ultimas_lecturas(galpon=None, granja=None):
+    """
+    Últimas lecturas de los sensores activos de un galpón o granja (o de todos),
+    con sensor, tipo y galpón, en una sola consulta.
+    """
+    from .models import UltimaLecturaSensor
+
+    queryset = UltimaLecturaSensor.objects.filter(sensor__activo=True).select_related(
+        'sensor__tipo', 'sensor__galpon__granja'
+    ).order_by('sensor__galpon', 'sensor__tipo__nombre')
+    if galpon is not None:
+        queryset = queryset.filter(sensor__galpon=galpon)
+    if granja is not None:
+        queryset = queryset.filter(sensor__galpon__granja=granja)
+    return list(queryset)
@@ -10,6 +10,7 @@ from usuario_dialog import UsuarioDialog
 from usuario_details_dialog import UsuarioDetailsDialog
 from grupo_dialog import GrupoDialog
 from grupo_details_dialog import GrupoDetailsDialog
+from data_loader import get_data_loader
 
 class AdminTab(QWidget):
     """Pestaña para administración de Empresas, Granjas, Usuarios y Grupos"""
@@ -99,12 +100,15 @@ class AdminTab(QWidget):
         return tab
     
     def refresh_empresas(self):
-        """Actualiza la tabla de empresas"""
+        """Pide las empresas en segundo plano; show_empresas llena la tabla cuando llegan"""
+        get_data_loader().load('empresas', self.api_client.get_empresas, callback=self.show_empresas)
+    
+    def show_empresas(self, result):
+        """Llena la tabla de empresas con el resultado de get_empresas"""
         # Limpiar tabla
         self.empresas_table.setRowCount(0)
         
-        # Obtener empresas desde la API
-        success, empresas = self.api_client.get_empresas()
+        success, empresas = result
         
         if success and empresas:
             # Agregar filas
@@ -247,12 +251,15 @@ class AdminTab(QWidget):
         return tab
         
     def refresh_granjas(self):
-        """Actualiza la tabla de granjas"""
+        """Pide las granjas en segundo plano; show_granjas llena la tabla cuando llegan"""
+        get_data_loader().load('granjas', self.api_client.get_granjas, callback=self.show_granjas)
+    
+    def show_granjas(self, result):
+        """Llena la tabla de granjas con el resultado de get_granjas"""
         # Limpiar tabla
         self.granjas_table.setRowCount(0)
         
-        # Obtener granjas desde la API
-        success, granjas = self.api_client.get_granjas()
+        success, granjas = result
         
         if success and granjas:
             # Verificar si granjas es una lista
@@ -372,12 +379,15 @@ class AdminTab(QWidget):
         return tab
         
     def refresh_usuarios(self):
-        """Actualiza la tabla de usuarios"""
+        """Pide los usuarios en segundo plano; show_usuarios llena la tabla cuando llegan"""
+        get_data_loader().load('usuarios', self.api_client.get_usuarios, callback=self.show_usuarios)
+    
+    def show_usuarios(self, result):
+        """Llena la tabla de usuarios con el resultado de get_usuarios"""
         # Limpiar tabla
         self.usuarios_table.setRowCount(0)
         
-        # Obtener usuarios desde la API
-        success, usuarios = self.api_client.get_usuarios()
+        success, usuarios = result
         
         if success and usuarios:
             # Verificar si usuarios es una lista
@@ -514,12 +524,15 @@ class AdminTab(QWidget):
         return tab
         
     def refresh_grupos(self):
-        """Actualiza la tabla de grupos"""
+        """Pide los grupos en segundo plano; show_grupos llena la tabla cuando llegan"""
+        get_data_loader().load('grupos', self.api_client.get_grupos, callback=self.show_grupos)
+    
+    def show_grupos(self, result):
+        """Llena la tabla de grupos con el resultado de get_grupos"""
         # Limpiar tabla
         self.grupos_table.setRowCount(0)
         
-        # Obtener grupos desde la API
-        success, grupos = self.api_client.get_grupos()
+        success, grupos = result
         
         if success and grupos:
             # Verificar si grupos es una lista
@@ -4,8 +4,30 @@
 import requests
 import json
 import os
+import threading
 import time
 from datetime import datetime
+from requests.adapters import HTTPAdapter
+
+from api_resources import ApiRequestError, next_page, page_rows, record_type
+from entity_cache import get_entity_cache
+from local_store import get_local_store
+
+# Conexiones keep-alive que la sesión mantiene abiertas por servidor; debe
+# alcanzar para los hilos de SyncManager que descargan en paralelo
+POOL_CONNECTIONS = 4
+POOL_MAXSIZE = 10
+
+# Respuestas GET guardadas con su ETag para pedirlas con If-None-Match
+ETAG_CACHE_SIZE = 256
+
+# Listados con los nombres de campo una sola vez (api/renderers.py del servidor);
+# un servidor que no lo conoce responde JSON normal
+COLUMNAR_MEDIA_TYPE = 'application/vnd.granja.columnar+json'
+GET_ACCEPT = f'{COLUMNAR_MEDIA_TYPE}, application/json;q=0.9'
+
+# Filas por página al recorrer un listado (el servidor admite hasta API_MAX_PAGE_SIZE)
+LIST_PAGE_SIZE = 500
 
 class ApiClient:
     """Cliente para interactuar con la API de App Granja"""
@@ -16,6 +38,17 @@ class ApiClient:
         # Cargar configuración
         self.config = self.load_config()
         
+        # Sesión HTTP compartida: reutiliza conexiones TCP/TLS entre peticiones e hilos
+        self.session = self._create_session()
+        self._auth_lock = threading.Lock()
+        # (url, parámetros) -> (etag, cuerpo) de las últimas respuestas GET con ETag
+        self._etag_cache = {}
+        
+        # Datos para el modo offline (base SQLite compartida con SyncManager)
+        self.local_store = get_local_store()
+        # Listas ya obtenidas, compartidas con SyncManager y las pestañas
+        self.entity_cache = get_entity_cache()
+        
         # Inicializar atributos con valores por defecto
         self.base_url = self.config.get('api_url', 'http://127.0.0.1:8000/api')
         self.token = self.config.get('token', '')
@@ -23,6 +56,8 @@ class ApiClient:
         self.username = self.config.get('username', '')
         self.password = self.config.get('password', '')
         self.is_offline = bool(self.config.get('is_offline', False))
+        # Registrar cada petición y su cuerpo (solo para depurar; los errores se registran siempre)
+        self.verbose_http = bool(self.config.get('verbose_http', False))
         self.current_user_info = self.config.get('user_info', None)
         
         print(f"Modo offline: {'ACTIVADO' if self.is_offline else 'DESACTIVADO'}")
@@ -137,6 +172,49 @@ class ApiClient:
             print(f"Error al guardar configuración: {str(e)}")
             return False
     
+    def _create_session(self):
+        """Crea la sesión HTTP con un pool de conexiones keep-alive"""
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        return session
+    
+    def _remember_etag(self, cache_key, etag, body, content_type):
+        """Guarda el cuerpo de una respuesta GET con su ETag, descartando la más antigua si se llenó la caché
+
+        Se guarda el texto y no los datos ya parseados para que cada llamada
+        reciba su propia copia aunque la modifique.
+        """
+        self._etag_cache.pop(cache_key, None)
+        self._etag_cache[cache_key] = (etag, body, content_type)
+        while len(self._etag_cache) > ETAG_CACHE_SIZE:
+            self._etag_cache.pop(next(iter(self._etag_cache)), None)
+    
+    def _resource_of(self, url):
+        """Recurso de la API al que apunta una URL ('lotes' para .../api/lotes/5/)"""
+        path = url.split('?', 1)[0]
+        prefix = self.base_url.rstrip('/') + '/'
+        if path.startswith(prefix):
+            path = path[len(prefix):]
+        return path.strip('/').split('/')[0]
+    
+    def _decode_body(self, body, content_type):
+        """Parsea un cuerpo JSON; los listados columnares vuelven a ser listas de diccionarios"""
+        data = json.loads(body)
+        if not content_type.startswith(COLUMNAR_MEDIA_TYPE):
+            return data
+        
+        def from_columns(value):
+            if isinstance(value, dict) and set(value) == {'columns', 'rows'}:
+                return [dict(zip(value['columns'], row)) for row in value['rows']]
+            return value
+        
+        if isinstance(data, dict) and 'results' in data:
+            data['results'] = from_columns(data['results'])
+            return data
+        return from_columns(data)
+    
     def get_headers(self):
         """Obtiene los headers para las peticiones a la API"""
         if self.token:
@@ -189,39 +267,59 @@ class ApiClient:
             if method.lower() in ['post', 'put', 'patch'] and data is not None:
                 request_kwargs['json'] = data
             
+            # Pedir la respuesta solo si cambió desde la que tenemos guardada
+            cache_key = (url, tuple(sorted((params or {}).items()))) if method.lower() == 'get' else None
+            cached = self._etag_cache.get(cache_key) if cache_key else None
+            if cache_key:
+                request_kwargs['headers'] = dict(headers, Accept=GET_ACCEPT)
+            if cached:
+                request_kwargs['headers']['If-None-Match'] = cached[0]
+            
             # Registrar la petición
-            print(f"[{method.upper()}] {url}")
-            if params:
-                print(f"Parámetros: {params}")
-            if data and method.lower() in ['post', 'put', 'patch']:
-                print(f"Datos: {json.dumps(data, indent=2, ensure_ascii=False)[:500]}...")  # Limitar tamaño del log
+            if self.verbose_http:
+                print(f"[{method.upper()}] {url}")
+                if params:
+                    print(f"Parámetros: {params}")
+                if data and method.lower() in ['post', 'put', 'patch']:
+                    print(f"Datos: {json.dumps(data, ensure_ascii=False)[:500]}...")  # Limitar tamaño del log
             
             start_time = time.time()
             
             # Realizar la petición
             if method.lower() == 'get':
-                response = requests.get(**request_kwargs)
+                response = self.session.get(**request_kwargs)
             elif method.lower() == 'post':
-                response = requests.post(**request_kwargs)
+                response = self.session.post(**request_kwargs)
             elif method.lower() == 'put':
-                response = requests.put(**request_kwargs)
+                response = self.session.put(**request_kwargs)
             elif method.lower() == 'patch':
-                response = requests.patch(**request_kwargs)
+                response = self.session.patch(**request_kwargs)
             elif method.lower() == 'delete':
-                response = requests.delete(**request_kwargs)
+                response = self.session.delete(**request_kwargs)
             else:
                 error_msg = f"Método HTTP no soportado: {method}"
                 print(f"[ERROR] {error_msg}")
                 return False, {'error': error_msg}
             
-            elapsed = (time.time() - start_time) * 1000  # Tiempo en milisegundos
-            print(f"[RESPUESTA] {response.status_code} en {elapsed:.2f}ms - {url}")
+            if self.verbose_http:
+                elapsed = (time.time() - start_time) * 1000  # Tiempo en milisegundos
+                print(f"[RESPUESTA] {response.status_code} en {elapsed:.2f}ms - {url}")
+            
+            # Sin cambios desde la respuesta guardada
+            if response.status_code == 304 and cached:
+                return True, self._decode_body(cached[1], cached[2])
             
             # Manejar códigos de estado exitosos
             if 200 <= response.status_code < 300:
+                if not cache_key:
+                    # Las listas de la entidad modificada ya no sirven
+                    self.entity_cache.invalidate(self._resource_of(url))
                 try:
                     # Intentar parsear la respuesta como JSON
-                    response_data = response.json()
+                    content_type = response.headers.get('Content-Type', '')
+                    response_data = self._decode_body(response.text, content_type)
+                    if cache_key and response.headers.get('ETag'):
+                        self._remember_etag(cache_key, response.headers['ETag'], response.text, content_type)
                     return True, response_data
                 except ValueError:
                     # Si no es JSON, devolver el texto plano
@@ -230,7 +328,7 @@ class ApiClient:
             # Manejar errores de autenticación/autoriación
             if response.status_code == 401:  # No autorizado
                 print("[AUTENTICACIÓN] Token inválido o expirado")
-                if retry_count < max_retries and self._handle_auth_error():
+                if retry_count < max_retries and self._handle_auth_error(headers.get('Authorization')):
                     # Reintentar con el nuevo token
                     return self.make_request(
                         method=method,
@@ -261,7 +359,13 @@ class ApiClient:
                     max_retries=max_retries
                 )
             
-            return False, {'error': f'Error {response.status_code}', 'message': error_msg}
+            error = {'error': f'Error {response.status_code}', 'message': error_msg, 'status': response.status_code}
+            try:
+                # Cuerpo de la respuesta, para quien necesite más que el mensaje
+                error['response'] = response.json()
+            except ValueError:
+                pass
+            return False, error
             
         except requests.exceptions.RequestException as e:
             return self._handle_request_exception(e, method, url, data, params, headers, retry_count, max_retries)
@@ -303,14 +407,23 @@ class ApiClient:
         example_data = self.get_example_data(data_type)
         return True, example_data  # Devolver True para evitar mensajes de error en la interfaz
     
-    def _handle_auth_error(self):
-        """Maneja errores de autenticación, intentando refrescar el token"""
-        print("[AUTENTICACIÓN] Intentando refrescar el token...")
-        if self.refresh_token:
-            success = self.refresh_auth_token()
-            if success:
-                print("[AUTENTICACIÓN] Token refrescado correctamente")
+    def _handle_auth_error(self, failed_authorization=None):
+        """Maneja errores de autenticación, intentando refrescar el token
+        
+        Args:
+            failed_authorization (str, optional): Header Authorization de la petición
+                rechazada. Si otro hilo ya refrescó el token no se vuelve a refrescar.
+        """
+        with self._auth_lock:
+            if failed_authorization and self.token and failed_authorization != f'Bearer {self.token}':
+                print("[AUTENTICACIÓN] El token ya fue refrescado por otra petición")
                 return True
+            print("[AUTENTICACIÓN] Intentando refrescar el token...")
+            if self.refresh_token:
+                success = self.refresh_auth_token()
+                if success:
+                    print("[AUTENTICACIÓN] Token refrescado correctamente")
+                    return True
         
         print("[AUTENTICACIÓN] No se pudo refrescar el token")
         return False
@@ -390,7 +503,7 @@ class ApiClient:
             start_time = time.time()
             print(f"Conectando con {self.base_url}/token/...")
             
-            response = requests.post(
+            response = self.session.post(
                 f"{self.base_url}/token/",
                 json={'username': username, 'password': password},
                 headers={"Content-Type": "application/json"},
@@ -630,7 +743,7 @@ class ApiClient:
                     start_time = time.time()
                     
                     # Intentar revocar el token en el servidor
-                    response = requests.post(
+                    response = self.session.post(
                         f"{self.base_url}/token/blacklist/",
                         json={"refresh_token": self.refresh_token},
                         headers={"Content-Type": "application/json"},
@@ -659,6 +772,8 @@ class ApiClient:
             print("Limpiando datos de sesión local...")
             self.token = ''
             self.refresh_token = ''
+            self._etag_cache.clear()
+            self.entity_cache.invalidate()
             self.username = ''
             self.password = ''
             self.current_user_info = None
@@ -736,7 +851,7 @@ class ApiClient:
             print(f"Refrescando token de autenticación en {refresh_url}...")
             
             start_time = time.time()
-            response = requests.post(
+            response = self.session.post(
                 refresh_url,
                 json={'refresh': self.refresh_token},
                 headers={'Content-Type': 'application/json'},
@@ -854,10 +969,10 @@ class ApiClient:
             
             try:
                 if method.lower() == 'get':
-                    response = requests.get(url, timeout=timeout, verify=False)
+                    response = self.session.get(url, timeout=timeout, verify=False)
                 elif method.lower() == 'post':
                     headers = {'Content-Type': 'application/json'}
-                    response = requests.post(
+                    response = self.session.post(
                         url, 
                         json=endpoint.get('data', {}), 
                         headers=headers, 
@@ -904,7 +1019,7 @@ class ApiClient:
         """Obtiene la información de un usuario"""
         try:
             # Agregar timeout para evitar bloqueos
-            response = requests.get(
+            response = self.session.get(
                 f"{self.base_url}/usuarios/?search={username}",
                 headers=self.get_headers()
             )
@@ -944,21 +1059,8 @@ class ApiClient:
             bool: True si se guardó correctamente, False en caso de error
         """
         try:
-            import os
-            import json
-            
-            # Crear directorio si no existe
-            offline_dir = os.path.join(os.path.dirname(__file__), 'offline_data')
-            os.makedirs(offline_dir, exist_ok=True)
-            
-            # Ruta al archivo de datos offline
-            offline_path = os.path.join(offline_dir, f"{entity}.json")
-            
-            # Guardar los datos en formato JSON
-            with open(offline_path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
-                
-            print(f"Datos de {entity} guardados correctamente en {offline_path}")
+            self.local_store.save(entity, data)
+            print(f"Datos de {entity} guardados en la base local")
             return True
             
         except Exception as e:
@@ -975,27 +1077,35 @@ class ApiClient:
             list: Lista de diccionarios con los datos de la entidad, o lista vacía si hay error
         """
         try:
-            import os
-            import json
-            
-            # Ruta al archivo de datos offline
-            offline_dir = os.path.join(os.path.dirname(__file__), 'offline_data')
-            os.makedirs(offline_dir, exist_ok=True)
-            offline_path = os.path.join(offline_dir, f"{entity}.json")
-            
-            if os.path.exists(offline_path):
-                with open(offline_path, 'r', encoding='utf-8') as f:
-                    print(f"Datos offline cargados desde: {offline_path}")
-                    return json.load(f)
-            else:
-                print(f"No se encontró archivo offline para {entity} en {offline_path}")
-                # Si no existe el archivo, devolver datos de ejemplo
-                return self.get_example_data(entity)
+            data = self.local_store.load(entity)
+            if data is not None:
+                print(f"Datos offline de {entity} cargados desde la base local")
+                return data
+            print(f"No hay datos offline para {entity} en la base local")
+            # Si no hay datos, devolver datos de ejemplo
+            return self.get_example_data(entity)
         except Exception as e:
             print(f"Error al cargar datos offline de {entity}: {str(e)}")
             # En caso de error, devolver datos de ejemplo
             return self.get_example_data(entity)
     
+    def query_offline_data(self, entity, lote_id=None, galpon_id=None, desde=None, hasta=None):
+        """Consulta en la base local solo los registros que se necesitan
+        
+        Args:
+            entity (str): Nombre de la entidad (ej: 'seguimientos')
+            lote_id, galpon_id: Filtran por lote o galpón
+            desde, hasta (str): Rango de fechas 'AAAA-MM-DD', ambos incluidos
+            
+        Returns:
+            list: Registros que cumplen los filtros (lista vacía si no hay datos)
+        """
+        try:
+            return self.local_store.query(entity, lote_id=lote_id, galpon_id=galpon_id, desde=desde, hasta=hasta)
+        except Exception as e:
+            print(f"Error al consultar datos offline de {entity}: {str(e)}")
+            return []
+    
     def get_example_data(self, data_type):
         """Obtiene datos de ejemplo para usar en modo offline"""
         examples = {
@@ -1214,97 +1324,97 @@ class ApiClient:
     # devolverán datos de ejemplo
     
     # Métodos para gestionar lotes
-    def get_lotes(self):
-        """Obtiene la lista de lotes
+    # Listados de recursos (ver api_resources.py)
+    def iter_pages(self, resource, params=None, page_size=LIST_PAGE_SIZE):
+        """Recorre un listado de la API página por página siguiendo los enlaces `next`
         
-        Returns:
-            tuple: (success, data) donde success es un booleano que indica si la operación fue exitosa,
-                  y data es una lista de lotes o un mensaje de error.
-        """
-        print("\n=== Iniciando obtención de lotes ===")
+        Cada página se pide recién cuando se avanza el generador, así que quien
+        procesa un listado largo solo tiene una página en memoria.
         
-        # 1. Intentar obtener datos del servidor
-        try:
-            print("Intentando obtener lotes desde el servidor...")
-            success, data = self.make_request('get', f"{self.base_url}/lotes/")
+        Args:
+            resource (str): Ruta del recurso en la API (ej: 'lotes', 'seguimientos')
+            params (dict, optional): Filtros del listado
+            page_size (int): Filas por página
             
-            if success and data is not None:
-                print(f"Datos recibidos del servidor. Tipo: {type(data)}")
-                
-                # Procesar diferentes formatos de respuesta
-                if isinstance(data, dict):
-                    # Formato con 'results' (Django REST Framework)
-                    if 'results' in data and isinstance(data['results'], list):
-                        print(f"Formato: diccionario con 'results' ({len(data['results'])} elementos)")
-                        return True, data['results']
-                    # Formato con 'data'
-                    elif 'data' in data and isinstance(data['data'], list):
-                        print(f"Formato: diccionario con 'data' ({len(data['data'])} elementos)")
-                        return True, data['data']
-                    # Diccionario con campos de lote individual
-                    elif all(key in data for key in ['id', 'codigo', 'fecha_ingreso']):
-                        print("Formato: diccionario con datos de un solo lote")
-                        return True, [data]
-                    # Diccionario vacío o sin formato reconocido
-                    else:
-                        print("Formato de diccionario no reconocido. Buscando listas internas...")
-                        # Buscar recursivamente cualquier lista que pueda contener lotes
-                        def find_lists(d):
-                            if isinstance(d, list):
-                                return d
-                            elif isinstance(d, dict):
-                                for v in d.values():
-                                    result = find_lists(v)
-                                    if result:
-                                        return result
-                            return None
-                        
-                        found_lists = find_lists(data)
-                        if found_lists and all(isinstance(x, dict) for x in found_lists):
-                            print(f"Encontrada lista interna con {len(found_lists)} elementos")
-                            return True, found_lists
-                
-                # Si es una lista, verificar que contenga diccionarios
-                elif isinstance(data, list):
-                    if all(isinstance(x, dict) for x in data):
-                        print(f"Formato: lista directa con {len(data)} elementos")
-                        return True, data
-                    else:
-                        print("Advertencia: La lista contiene elementos que no son diccionarios")
-                
-                print(f"Formato de respuesta no reconocido: {type(data)}")
+        Yields:
+            list: Registros tipados de la página (Lote, Galpon, ...)
             
-            # Si llegamos aquí, no se pudo procesar la respuesta del servidor
-            print("No se pudieron procesar los datos del servidor. Intentando cargar datos locales...")
+        Raises:
+            ApiRequestError: si una página no se pudo obtener o no tiene forma de listado
+        """
+        record = record_type(resource)
+        url = f"{self.base_url}/{resource}/"
+        params = dict(params or {}, page_size=page_size)
+        while url:
+            if self.is_offline:
+                raise ApiRequestError(resource, "modo offline")
+            success, data = self.make_request('get', url, params=params)
+            # Un error de conexión pasa a modo offline y make_request devuelve datos de ejemplo
+            rows = page_rows(data) if success and not self.is_offline else None
+            if rows is None:
+                raise ApiRequestError(resource, data)
+            yield [record.from_api(row) for row in rows]
+            # El enlace ya incluye el cursor y los parámetros de la primera petición
+            url, params = next_page(data), None
+    
+    def iter_resource(self, resource, params=None, page_size=LIST_PAGE_SIZE):
+        """Registros tipados de un listado, uno por uno (ver iter_pages)"""
+        for page in self.iter_pages(resource, params, page_size):
+            yield from page
+    
+    def list_resource(self, resource, params=None, local_filters=None, fallback_success=True, save_offline=False):
+        """Obtiene un listado completo, con la base local y los datos de ejemplo como respaldo
+        
+        Args:
+            resource (str): Ruta del recurso en la API, que es también el nombre de la entidad local
+            params (dict, optional): Filtros del listado en la API
+            local_filters (dict, optional): Filtros de query_offline_data para leer
+                de la base local solo los registros que se piden
+            fallback_success (bool): success que se devuelve con los datos de ejemplo
+            save_offline (bool): Guardar en la base local la lista recibida del servidor
             
-        except Exception as e:
-            print(f"Error al obtener lotes del servidor: {str(e)}")
-            if hasattr(e, 'response') and hasattr(e.response, 'status_code'):
-                print(f"Código de estado HTTP: {e.response.status_code}")
+        Returns:
+            tuple: (success, data) donde data es la lista de registros del servidor
+                  (o de entity_cache si se obtuvo hace poco); si no se pudo obtener,
+                  los de la base local o los de ejemplo.
+        """
+        cached = self.entity_cache.get(resource, params)
+        if cached is not None:
+            return True, cached
+        try:
+            data = list(self.iter_resource(resource, params))
+            if save_offline:
+                self._save_offline_data(resource, data)
+            self.entity_cache.put(resource, data, params)
+            return True, data
+        except ApiRequestError as e:
+            print(f"{e}. Usando datos locales")
         
-        # 2. Si falla la conexión o el procesamiento, intentar cargar datos locales
+        record = record_type(resource)
         try:
-            print("\nIntentando cargar lotes desde almacenamiento local...")
-            local_data = self.load_offline_data('lotes')
-            if local_data and isinstance(local_data, list):
-                print(f"Cargados {len(local_data)} lotes desde almacenamiento local")
-                return True, local_data
-            else:
-                print("No se encontraron datos locales de lotes")
+            if self.local_store.has(resource):
+                if local_filters:
+                    local_data = self.query_offline_data(resource, **local_filters)
+                else:
+                    local_data = self.local_store.load(resource)
+                if isinstance(local_data, list):
+                    return True, [record.from_api(row) if isinstance(row, dict) else row for row in local_data]
         except Exception as e:
-            print(f"Error al cargar datos locales: {str(e)}")
+            print(f"Error al cargar datos locales de {resource}: {str(e)}")
         
-        # 3. Como último recurso, usar datos de ejemplo
-        print("\nUsando datos de ejemplo para lotes...")
-        example_data = self.get_example_data('lotes')
-        if example_data and isinstance(example_data, list):
-            print(f"Cargados {len(example_data)} lotes de ejemplo")
-            return True, example_data
+        print(f"Usando datos de ejemplo para {resource}")
+        return fallback_success, self.get_example_data(resource)
+    
+    def get_lotes(self):
+        """Obtiene la lista de lotes
         
-        # 4. Si todo falla, devolver lista vacía con mensaje de error
-        print("No se pudieron cargar los lotes. Verifica la conexión e intenta nuevamente.")
-        return False, "No se pudieron cargar los lotes. Verifica la conexión e intenta nuevamente."
+        Returns:
+            tuple: (success, data) donde success es un booleano que indica si la operación fue exitosa,
+                  y data es una lista de lotes.
+        """
+        return self.list_resource('lotes')
     
+
     def get_lote(self, lote_id):
         """Obtiene un lote específico"""
         # Verificar si lote_id es válido
@@ -1369,122 +1479,92 @@ class ApiClient:
             
     def get_seguimientos(self, lote_id=None):
         """Obtiene los seguimientos diarios, opcionalmente filtrados por lote"""
-        print(f"Intentando obtener seguimientos{' para lote ' + str(lote_id) if lote_id else ''}...")
-        try:
-            # Construir URL con parámetros de consulta si se proporciona un lote_id
-            url = f"{self.base_url}/seguimientos/"
-            params = {}
-            if lote_id:
-                params['lote'] = lote_id
-            
-            # Usar el método centralizado con timeout
-            success, data = self.make_request('get', url, params=params)
-            
-            if success:
-                print(f"Datos recibidos: {type(data)}")
-                # Normalizar el formato de respuesta
-                if isinstance(data, dict):
-                    # Si es un diccionario, verificar si tiene una clave 'results' que contenga la lista
-                    if 'results' in data and isinstance(data['results'], list):
-                        print(f"Formato: diccionario con 'results' ({len(data['results'])} elementos)")
-                        return True, data['results']
-                    # Si no tiene 'results' pero tiene 'data'
-                    elif 'data' in data and isinstance(data['data'], list):
-                        print(f"Formato: diccionario con 'data' ({len(data['data'])} elementos)")
-                        return True, data['data']
-                    # Si es un diccionario con otros campos, intentar extraer los datos relevantes
-                    else:
-                        print(f"Formato: diccionario sin 'results' o 'data'")
-                        return True, data
-                # Si ya es una lista, devolverla directamente
-                elif isinstance(data, list):
-                    print(f"Formato: lista ({len(data)} elementos)")
-                    return True, data
-                # Si es otro tipo de datos, convertirlo a string y devolverlo
-                else:
-                    print(f"Formato inesperado: {type(data)}")
-                    return False, self.get_example_data('seguimientos')
-            else:
-                error_msg = f"Error al obtener seguimientos: {data}"
-                print(error_msg)
-                # Devolver datos de ejemplo en modo offline
-                return False, self.get_example_data('seguimientos')
-        except Exception as e:
-            error_msg = f"Error inesperado: {str(e)}"
-            print(error_msg)
-            # Devolver datos de ejemplo en modo offline
-            return False, self.get_example_data('seguimientos')
-    
+        # Sin conexión, leer de la base local solo los seguimientos del lote
+        if self.is_offline and self.local_store.has('seguimientos'):
+            return True, self.query_offline_data('seguimientos', lote_id=lote_id)
+        return self.list_resource(
+            'seguimientos',
+            params={'lote': lote_id} if lote_id else None,
+            local_filters={'lote_id': lote_id},
+            fallback_success=False
+        )
+
+    def get_cambios(self, recurso, since=0, page_size=1000):
+        """Obtiene los cambios de un recurso posteriores al token `since` (modo ?since= de la API)
+
+        Args:
+            recurso (str): Ruta del recurso en la API (ej: 'lotes', 'galpones')
+            since: Token devuelto por la sincronización anterior; 0 trae todas las filas
+            page_size (int): Cambios por petición
+
+        Returns:
+            tuple: (success, data) donde data es {'results': filas modificadas,
+                  'deleted': ids eliminados, 'since': token nuevo}. success es False
+                  si la petición falló o el servidor no soporta el modo de cambios.
+        """
+        cambios = {}
+        token = str(since)
+        while True:
+            success, data = self.make_request(
+                'get', f"{self.base_url}/{recurso}/", params={'since': token, 'page_size': page_size}
+            )
+            if not success or not isinstance(data, dict) or 'since' not in data:
+                print(f"El servidor no devolvió cambios para {recurso}: {data}")
+                return False, data
+
+            # Aplicar en orden: una fila modificada y luego borrada queda borrada
+            for fila in data.get('results', []):
+                cambios[fila['id']] = fila
+            for objeto_id in data.get('deleted', []):
+                cambios[objeto_id] = None
+            token = data['since']
+            if not data.get('more'):
+                break
+
+        print(f"Cambios de {recurso}: {len(cambios)} (token {token})")
+        return True, {
+            'results': [fila for fila in cambios.values() if fila is not None],
+            'deleted': [objeto_id for objeto_id, fila in cambios.items() if fila is None],
+            'since': token,
+        }
+
+    def aplicar_operaciones(self, operaciones):
+        """Aplica en el servidor, en una transacción, una lista ordenada de operaciones (/api/batch/)
+
+        Args:
+            operaciones (list): Diccionarios {'recurso', 'op' ('create', 'update' o 'delete'),
+                  'id', 'temp_id', 'data'}. Las altas pueden llevar un temp_id ("$...")
+                  que las operaciones siguientes usan como id.
+
+        Returns:
+            tuple: (success, data) donde data es {'resultados': [...], 'ids': {temp_id: id}}.
+                  Si una operación falla el servidor no aplica ninguna; si la
+                  rechazó él, data trae además 'indice' (posición de la operación
+                  rechazada) y 'detalle'.
+        """
+        success, data = self.make_request('post', f"{self.base_url}/batch/", data={'operaciones': operaciones})
+        if success:
+            for recurso in {operacion.get('recurso') for operacion in operaciones}:
+                self.entity_cache.invalidate(recurso)
+        elif isinstance(data, dict) and isinstance(data.get('response'), dict):
+            # {"error": {"indice": 3, "detalle": ...}} (api/views.py, OperacionesView)
+            error = data['response'].get('error')
+            if isinstance(error, dict) and isinstance(error.get('indice'), int):
+                data['indice'] = error['indice']
+                data['detalle'] = error.get('detalle')
+        return success, data
+
     # Métodos para gestionar tareas
     def get_tareas(self):
         """Obtiene la lista de tareas"""
-        print("Intentando obtener tareas...")
-        try:
-            # Usar el método centralizado con timeout
-            success, data = self.make_request('get', f"{self.base_url}/tareas/")
-            
-            if success:
-                print(f"Datos recibidos: {type(data)}")
-                # Normalizar el formato de respuesta
-                if isinstance(data, dict):
-                    # Si es un diccionario, verificar si tiene una clave 'results' que contenga la lista
-                    if 'results' in data and isinstance(data['results'], list):
-                        print(f"Formato: diccionario con 'results' ({len(data['results'])} elementos)")
-                        return True, data['results']
-                    # Si no tiene 'results' pero tiene 'data'
-                    elif 'data' in data and isinstance(data['data'], list):
-                        print(f"Formato: diccionario con 'data' ({len(data['data'])} elementos)")
-                        return True, data['data']
-                    # Si es un diccionario con otros campos, intentar extraer los datos relevantes
-                    else:
-                        print(f"Formato: diccionario sin 'results' o 'data'")
-                        # Si tiene campos como 'id', 'titulo', etc., podría ser una sola tarea
-                        if 'id' in data and 'titulo' in data:
-                            print("Parece ser una sola tarea, convirtiendo a lista")
-                            return True, [data]
-                        # De lo contrario, devolver el diccionario completo
-                        return True, data
-                # Si ya es una lista, devolverla directamente
-                elif isinstance(data, list):
-                    print(f"Formato: lista ({len(data)} elementos)")
-                    return True, data
-                # Si es otro tipo de datos, convertir a string y devolverlo
-                else:
-                    print(f"Formato inesperado: {type(data)}")
-                    return True, self.get_example_data('tareas')
-            else:
-                error_msg = f"Error al obtener tareas: {data}"
-                print(error_msg)
-                # Devolver datos de ejemplo en modo offline
-                return True, self.get_example_data('tareas')
-        except Exception as e:
-            error_msg = f"Error inesperado al obtener tareas: {str(e)}"
-            print(error_msg)
-            
-            # Si es un error 404, el endpoint no existe
-            if "404" in str(e):
-                print("El endpoint de tareas no está disponible (404). Usando datos de ejemplo.")
-                return True, self.get_example_data('tareas')
-                
-            # Si es un error 500, intentar una vez más antes de usar datos de ejemplo
-            if "500" in str(e):
-                print("Error 500 detectado, intentando una vez más...")
-                try:
-                    success, data = self.make_request('get', f"{self.base_url}/tareas/")
-                    if success:
-                        return True, data
-                except Exception as retry_error:
-                    print(f"Error en reintento: {str(retry_error)}")
-            
-            # Devolver datos de ejemplo en modo offline
-            print("Usando datos de ejemplo para tareas")
-            return True, self.get_example_data('tareas')
+        return self.list_resource('tareas')
     
+
     def get_tarea(self, tarea_id):
         """Obtiene una tarea específica"""
         try:
             # Agregar timeout para evitar bloqueos
-            response = requests.get(
+            response = self.session.get(
                 f"{self.base_url}/tareas/{tarea_id}/",
                 headers=self.get_headers()
             )
@@ -1512,13 +1592,14 @@ class ApiClient:
         """Crea una nueva tarea"""
         try:
             # Agregar timeout para evitar bloqueos
-            response = requests.post(
+            response = self.session.post(
                 f"{self.base_url}/tareas/",
                 json=tarea_data,
                 headers=self.get_headers()
             )
             
             if response.status_code in [200, 201]:
+                self.entity_cache.invalidate('tareas')
                 return True, response.json()
             else:
                 error_msg = f"Error al crear tarea: {response.text}"
@@ -1535,13 +1616,14 @@ class ApiClient:
         """Actualiza una tarea existente"""
         try:
             # Agregar timeout para evitar bloqueos
-            response = requests.put(
+            response = self.session.put(
                 f"{self.base_url}/tareas/{tarea_id}/",
                 json=tarea_data,
                 headers=self.get_headers()
             )
             
             if response.status_code in [200, 201, 204]:
+                self.entity_cache.invalidate('tareas')
                 return True, response.json() if response.status_code != 204 else tarea_data
             else:
                 error_msg = f"Error al actualizar tarea: {response.text}"
@@ -1558,12 +1640,13 @@ class ApiClient:
         """Elimina una tarea"""
         try:
             # Agregar timeout para evitar bloqueos
-            response = requests.delete(
+            response = self.session.delete(
                 f"{self.base_url}/tareas/{tarea_id}/",
                 headers=self.get_headers()
             )
             
             if response.status_code in [200, 204]:
+                self.entity_cache.invalidate('tareas')
                 return True, "Tarea eliminada correctamente"
             else:
                 error_msg = f"Error al eliminar tarea: {response.text}"
@@ -1600,7 +1683,7 @@ class ApiClient:
             # Si no estamos en modo offline, intentar obtener datos del servidor
             try:
                 # Agregar timeout para evitar bloqueos
-                response = requests.get(
+                response = self.session.get(
                     f"{self.base_url}/estadisticas/dashboard/",
                     headers=self.get_headers(),
                     timeout=5
@@ -1667,7 +1750,7 @@ class ApiClient:
                     url += f"&raza2={raza2_id}"
                 
                 # Agregar timeout para evitar bloqueos
-                response = requests.get(
+                response = self.session.get(
                     url,
                     headers=self.get_headers(),
                     timeout=5
@@ -1693,523 +1776,62 @@ class ApiClient:
             
     def get_empresas(self):
         """Obtiene la lista de empresas (usando el endpoint de granjas como alternativa)"""
-        print("Intentando obtener empresas (usando endpoint de granjas)...")
+        # Nota: El endpoint /empresas/ no existe, usamos /granjas/ como alternativa
+        cached = self.entity_cache.get('empresas')
+        if cached is not None:
+            return True, cached
         try:
-            # Usar el método centralizado con timeout
-            # Nota: El endpoint /empresas/ no existe, usamos /granjas/ como alternativa
-            success, data = self.make_request('get', f"{self.base_url}/granjas/")
-            
-            if success:
-                print(f"Datos recibidos: {type(data)}")
-                # Normalizar el formato de respuesta
-                if isinstance(data, dict):
-                    # Si es un diccionario, verificar si tiene una clave 'results' que contenga la lista
-                    if 'results' in data and isinstance(data['results'], list):
-                        print(f"Formato: diccionario con 'results' ({len(data['results'])} elementos)")
-                        # Convertir granjas a formato de empresas
-                        empresas = []
-                        for granja in data['results']:
-                            # Crear una empresa a partir de los datos de la granja
-                            empresa = {
-                                'id': granja.get('id', 0),
-                                'nombre': granja.get('nombre', 'Empresa sin nombre'),
-                                'nit': granja.get('codigo', 'Sin NIT'),
-                                'direccion': granja.get('ubicacion', 'Sin dirección'),
-                                'telefono': granja.get('telefono', 'Sin teléfono'),
-                                'email': granja.get('email', 'info@ejemplo.com'),
-                                'sitio_web': granja.get('sitio_web', 'www.ejemplo.com'),
-                                'descripcion': granja.get('descripcion', 'Sin descripción')
-                            }
-                            empresas.append(empresa)
-                        return True, empresas
-                    # Si no tiene 'results' pero tiene 'data'
-                    elif 'data' in data and isinstance(data['data'], list):
-                        print(f"Formato: diccionario con 'data' ({len(data['data'])} elementos)")
-                        # Convertir granjas a formato de empresas
-                        empresas = []
-                        for granja in data['data']:
-                            # Crear una empresa a partir de los datos de la granja
-                            empresa = {
-                                'id': granja.get('id', 0),
-                                'nombre': granja.get('nombre', 'Empresa sin nombre'),
-                                'nit': granja.get('codigo', 'Sin NIT'),
-                                'direccion': granja.get('ubicacion', 'Sin dirección'),
-                                'telefono': granja.get('telefono', 'Sin teléfono'),
-                                'email': granja.get('email', 'info@ejemplo.com'),
-                                'sitio_web': granja.get('sitio_web', 'www.ejemplo.com'),
-                                'descripcion': granja.get('descripcion', 'Sin descripción')
-                            }
-                            empresas.append(empresa)
-                        return True, empresas
-                    # Si es un diccionario con otros campos, intentar extraer los datos relevantes
-                    else:
-                        print(f"Formato: diccionario sin 'results' o 'data'")
-                        # Si tiene campos como 'id', 'nombre', etc., podría ser una sola granja
-                        if 'id' in data and 'nombre' in data:
-                            print("Parece ser una sola granja, convirtiendo a empresa")
-                            # Crear una empresa a partir de los datos de la granja
-                            empresa = {
-                                'id': data.get('id', 0),
-                                'nombre': data.get('nombre', 'Empresa sin nombre'),
-                                'nit': data.get('codigo', 'Sin NIT'),
-                                'direccion': data.get('ubicacion', 'Sin dirección'),
-                                'telefono': data.get('telefono', 'Sin teléfono'),
-                                'email': data.get('email', 'info@ejemplo.com'),
-                                'sitio_web': data.get('sitio_web', 'www.ejemplo.com'),
-                                'descripcion': data.get('descripcion', 'Sin descripción')
-                            }
-                            return True, [empresa]
-                        # De lo contrario, devolver datos de ejemplo
-                        return False, self.get_example_data('empresas')
-                # Si ya es una lista, convertirla a formato de empresas
-                elif isinstance(data, list):
-                    print(f"Formato: lista ({len(data)} elementos)")
-                    # Convertir granjas a formato de empresas
-                    empresas = []
-                    for granja in data:
-                        # Crear una empresa a partir de los datos de la granja
-                        empresa = {
-                            'id': granja.get('id', 0),
-                            'nombre': granja.get('nombre', 'Empresa sin nombre'),
-                            'nit': granja.get('codigo', 'Sin NIT'),
-                            'direccion': granja.get('ubicacion', 'Sin dirección'),
-                            'telefono': granja.get('telefono', 'Sin teléfono'),
-                            'email': granja.get('email', 'info@ejemplo.com'),
-                            'sitio_web': granja.get('sitio_web', 'www.ejemplo.com'),
-                            'descripcion': granja.get('descripcion', 'Sin descripción')
-                        }
-                        empresas.append(empresa)
-                    return True, empresas
-                # Si es otro tipo de datos, devolver datos de ejemplo
-                else:
-                    print(f"Formato inesperado: {type(data)}")
-                    return False, self.get_example_data('empresas')
-            else:
-                error_msg = f"Error al obtener empresas: {data}"
-                print(error_msg)
-                # Devolver datos de ejemplo en modo offline
-                return False, self.get_example_data('empresas')
-        except Exception as e:
-            error_msg = f"Error inesperado: {str(e)}"
-            print(error_msg)
-            # Devolver datos de ejemplo en modo offline
+            empresas = [
+                {
+                    'id': granja.get('id', 0),
+                    'nombre': granja.get('nombre', 'Empresa sin nombre'),
+                    'nit': granja.get('codigo', 'Sin NIT'),
+                    'direccion': granja.get('ubicacion', 'Sin dirección'),
+                    'telefono': granja.get('telefono', 'Sin teléfono'),
+                    'email': granja.get('email', 'info@ejemplo.com'),
+                    'sitio_web': granja.get('sitio_web', 'www.ejemplo.com'),
+                    'descripcion': granja.get('descripcion', 'Sin descripción')
+                }
+                for granja in self.iter_resource('granjas')
+            ]
+            self.entity_cache.put('empresas', empresas)
+            return True, empresas
+        except ApiRequestError as e:
+            print(f"{e}. Usando datos de ejemplo para empresas")
             return False, self.get_example_data('empresas')
             
+
     def get_galpones(self):
-        """Obtiene la lista de galpones"""
-        print("\n=== Iniciando get_galpones() ===")
-        
-        # Si estamos en modo offline, devolver datos locales
-        if self.is_offline:
-            print("Modo offline activado, devolviendo datos locales...")
-            local_data = self.load_offline_data('galpones')
-            if local_data:
-                print(f"Datos locales cargados: {len(local_data)} elementos")
-                return True, local_data
-            else:
-                print("No hay datos locales disponibles, usando datos de ejemplo")
-                return True, self.get_example_data('galpones')
-        
-        try:
-            print(f"Solicitando galpones a {self.base_url}/galpones/")
-            success, data = self.make_request('get', f"{self.base_url}/galpones/")
-            
-            if not success:
-                print("Error en la respuesta de la API, intentando cargar datos locales...")
-                local_data = self.load_offline_data('galpones')
-                if local_data:
-                    print(f"Datos locales cargados: {len(local_data)} elementos")
-                    return True, local_data
-                return False, ["Error al obtener galpones"]
-            
-            print(f"Respuesta recibida: {type(data)}")
-            
-            # Normalizar la respuesta para manejar diferentes formatos de API
-            normalized_data = None
-            
-            # 1. Si es una lista, usarla directamente
-            if isinstance(data, list):
-                print(f"Formato: Lista directa con {len(data)} elementos")
-                normalized_data = data
-            
-            # 2. Si es un diccionario, buscar claves comunes
-            elif isinstance(data, dict):
-                print("Formato: Diccionario")
-                print(f"Claves disponibles: {list(data.keys())}")
-                
-                # 2.1 Formato estándar de paginación (DRF)
-                if 'results' in data and isinstance(data['results'], list):
-                    print(f"  - Encontrada clave 'results' con {len(data['results'])} elementos")
-                    normalized_data = data['results']
-                
-                # 2.2 Formato alternativo con 'data'
-                elif 'data' in data and isinstance(data['data'], list):
-                    print(f"  - Encontrada clave 'data' con {len(data['data'])} elementos")
-                    normalized_data = data['data']
-                
-                # 2.3 Formato con 'items'
-                elif 'items' in data and isinstance(data['items'], list):
-                    print(f"  - Encontrada clave 'items' con {len(data['items'])} elementos")
-                    normalized_data = data['items']
-                
-                # 2.4 Si es un diccionario con datos de galpón directamente
-                elif any(key in data for key in ['id', 'nombre', 'numero_galpon']):
-                    print("  - Diccionario con datos de galpón, convirtiendo a lista")
-                    normalized_data = [data]
-                
-                # 2.5 Si es un diccionario vacío
-                elif not data:
-                    print("  - Diccionario vacío recibido")
-                    normalized_data = []
-                
-                # 2.6 Si es un diccionario con un solo valor que es una lista
-                elif len(data) == 1 and isinstance(list(data.values())[0], list):
-                    print(f"  - Diccionario con una lista, extrayendo lista")
-                    normalized_data = list(data.values())[0]
-                
-                # 2.7 Otro formato de diccionario no reconocido
-                else:
-                    print("  - Formato de diccionario no reconocido")
-                    print(f"  - Claves disponibles: {list(data.keys())}")
-                    # Intentar extraer cualquier lista que pueda contener
-                    lists_in_dict = [v for v in data.values() if isinstance(v, list)]
-                    if lists_in_dict:
-                        print(f"  - Encontrada(s) {len(lists_in_dict)} lista(s) en el diccionario")
-                        normalized_data = lists_in_dict[0]  # Tomar la primera lista encontrada
-            
-            # 3. Si no se pudo normalizar, devolver lista vacía
-            if normalized_data is None:
-                print("No se pudo normalizar la respuesta, usando lista vacía")
-                normalized_data = []
-            
-            # Asegurarse de que los datos sean una lista
-            if not isinstance(normalized_data, list):
-                print(f"Los datos normalizados no son una lista, convirtiendo...")
-                normalized_data = [normalized_data] if normalized_data is not None else []
-            
-            # Verificar que los elementos tengan la estructura esperada
-            if normalized_data:
-                print(f"Datos normalizados: {len(normalized_data)} elementos")
-                
-                # Verificar el primer elemento para ver si tiene la estructura esperada
-                first_item = normalized_data[0] if normalized_data else None
-                print("Primer elemento:")
-                if first_item is not None:
-                    if isinstance(first_item, dict):
-                        print(f"  - Tipo: diccionario con claves: {list(first_item.keys())}")
-                        
-                        # Mapear nombres de campos si es necesario
-                        for item in normalized_data:
-                            if 'numero_galpon' in item and 'nombre' not in item:
-                                item['nombre'] = f"Galpón {item['numero_galpon']}"
-                            if 'capacidad_aves' in item and 'capacidad' not in item:
-                                item['capacidad'] = item['capacidad_aves']
-                            if 'ancho_m' in item and 'ancho' not in item:
-                                item['ancho'] = item['ancho_m']
-                            if 'largo_m' in item and 'largo' not in item:
-                                item['largo'] = item['largo_m']
-                    else:
-                        print(f"  - Tipo: {type(first_item).__name__}")
-            
-            # Guardar datos localmente para uso offline
-            if normalized_data:
-                self._save_offline_data('galpones', normalized_data)
-            
-            return True, normalized_data
-                
-        except Exception as e:
-            import traceback
-            error_msg = f"Error inesperado al obtener galpones: {str(e)}"
-            print(error_msg)
-            print(f"Traceback: {traceback.format_exc()}")
-            
-            # Si es un error de conexión o timeout, intentar usar datos locales
-            if any(err in str(e).lower() for err in ['connection', 'timeout', 'refused']):
-                print("Error de conexión, intentando usar datos locales...")
-                local_data = self.load_offline_data('galpones')
-                if local_data:
-                    print(f"Datos locales cargados: {len(local_data)} elementos")
-                    return True, local_data
-            
-            # Si es un error 404, el endpoint no existe
-            if "404" in str(e):
-                print("El endpoint de galpones no está disponible (404). Usando datos de ejemplo.")
-                return True, self.get_example_data('galpones')
-                
-            # Si es un error 500, intentar una vez más antes de usar datos de ejemplo
-            if "500" in str(e):
-                print("Error 500 detectado, intentando una vez más...")
-                try:
-                    success, data = self.make_request('get', f"{self.base_url}/galpones/")
-                    if success:
-                        return True, data if isinstance(data, list) else []
-                except Exception as retry_error:
-                    print(f"Error en reintento: {str(retry_error)}")
-            
-            # Si todo falla, devolver datos de ejemplo
-            print("Usando datos de ejemplo para galpones")
-            return True, self.get_example_data('galpones')
+        """Obtiene la lista de galpones y la guarda para el modo offline"""
+        return self.list_resource('galpones', save_offline=True)
         
+
     def get_razas(self):
         """Obtiene la lista de razas de aves"""
-        print("Intentando obtener razas...")
-        try:
-            # Usar el método centralizado con timeout
-            success, data = self.make_request('get', f"{self.base_url}/razas/")
-            
-            if success:
-                print(f"Datos recibidos: {type(data)}")
-                # Normalizar el formato de respuesta
-                if isinstance(data, dict):
-                    # Si es un diccionario, verificar si tiene una clave 'results' que contenga la lista
-                    if 'results' in data and isinstance(data['results'], list):
-                        print(f"Formato: diccionario con 'results' ({len(data['results'])} elementos)")
-                        return True, data['results']
-                    # Si no tiene 'results' pero tiene 'data'
-                    elif 'data' in data and isinstance(data['data'], list):
-                        print(f"Formato: diccionario con 'data' ({len(data['data'])} elementos)")
-                        return True, data['data']
-                    # Si es un diccionario con otros campos, intentar extraer los datos relevantes
-                    else:
-                        print(f"Formato: diccionario sin 'results' o 'data'")
-                        # Si tiene campos como 'id', 'nombre', etc., podría ser una sola raza
-                        if 'id' in data and 'nombre' in data:
-                            print("Parece ser una sola raza, convirtiendo a lista")
-                            return True, [data]
-                        # De lo contrario, devolver el diccionario completo
-                        return True, data
-                # Si ya es una lista, devolverla directamente
-                elif isinstance(data, list):
-                    print(f"Formato: lista ({len(data)} elementos)")
-                    return True, data
-                # Si es otro tipo de datos, convertirlo a string y devolverlo
-                else:
-                    print(f"Formato inesperado: {type(data)}")
-                    return True, self.get_example_data('razas')
-            else:
-                error_msg = f"Error al obtener razas: {data}"
-                print(error_msg)
-                # Devolver datos de ejemplo en modo offline
-                return True, self.get_example_data('razas')
-        except Exception as e:
-            error_msg = f"Error inesperado: {str(e)}"
-            print(error_msg)
-            # Devolver datos de ejemplo en modo offline
-            return True, self.get_example_data('razas')
+        return self.list_resource('razas')
             
     def get_alimentos(self):
         """Obtiene la lista de alimentos"""
-        print("Intentando obtener alimentos...")
-        try:
-            # Usar el método centralizado con timeout
-            success, data = self.make_request('get', f"{self.base_url}/alimentos/")
-            
-            if success:
-                print(f"Datos recibidos: {type(data)}")
-                # Normalizar el formato de respuesta
-                if isinstance(data, dict):
-                    # Si es un diccionario, verificar si tiene una clave 'results' que contenga la lista
-                    if 'results' in data and isinstance(data['results'], list):
-                        print(f"Formato: diccionario con 'results' ({len(data['results'])} elementos)")
-                        return True, data['results']
-                    # Si no tiene 'results' pero tiene 'data'
-                    elif 'data' in data and isinstance(data['data'], list):
-                        print(f"Formato: diccionario con 'data' ({len(data['data'])} elementos)")
-                        return True, data['data']
-                    # Si es un diccionario con otros campos, intentar extraer los datos relevantes
-                    else:
-                        print(f"Formato: diccionario sin 'results' o 'data'")
-                        # Si tiene campos como 'id', 'nombre', etc., podría ser un solo alimento
-                        if 'id' in data and 'nombre' in data:
-                            print("Parece ser un solo alimento, convirtiendo a lista")
-                            return True, [data]
-                        # De lo contrario, devolver el diccionario completo
-                        return True, data
-                # Si ya es una lista, devolverla directamente
-                elif isinstance(data, list):
-                    print(f"Formato: lista ({len(data)} elementos)")
-                    return True, data
-                # Si es otro tipo de datos, convertirlo a string y devolverlo
-                else:
-                    print(f"Formato inesperado: {type(data)}")
-                    return True, self.get_example_data('alimentos')
-            else:
-                error_msg = f"Error al obtener alimentos: {data}"
-                print(error_msg)
-                # Devolver datos de ejemplo en modo offline
-                return True, self.get_example_data('alimentos')
-        except Exception as e:
-            error_msg = f"Error inesperado al obtener alimentos: {str(e)}"
-            print(error_msg)
-            # Si es un error 500, intentar una vez más antes de usar datos de ejemplo
-            if "500" in str(e):
-                print("Error 500 detectado, intentando una vez más...")
-                try:
-                    success, data = self.make_request('get', f"{self.base_url}/alimentos/")
-                    if success:
-                        return True, data
-                except Exception as retry_error:
-                    print(f"Error en reintento: {str(retry_error)}")
-            
-            # Devolver datos de ejemplo en modo offline
-            print("Usando datos de ejemplo para alimentos")
-            return True, self.get_example_data('alimentos')
+        return self.list_resource('alimentos')
             
     def get_vacunas(self):
         """Obtiene la lista de vacunas"""
-        print("Intentando obtener vacunas...")
-        try:
-            # Usar el método centralizado con timeout
-            success, data = self.make_request('get', f"{self.base_url}/vacunas/")
-            
-            if success:
-                print(f"Datos recibidos: {type(data)}")
-                # Normalizar el formato de respuesta
-                if isinstance(data, dict):
-                    # Si es un diccionario, verificar si tiene una clave 'results' que contenga la lista
-                    if 'results' in data and isinstance(data['results'], list):
-                        print(f"Formato: diccionario con 'results' ({len(data['results'])} elementos)")
-                        return True, data['results']
-                    # Si no tiene 'results' pero tiene 'data'
-                    elif 'data' in data and isinstance(data['data'], list):
-                        print(f"Formato: diccionario con 'data' ({len(data['data'])} elementos)")
-                        return True, data['data']
-                    # Si es un diccionario con otros campos, intentar extraer los datos relevantes
-                    else:
-                        print(f"Formato: diccionario sin 'results' o 'data'")
-                        # Si tiene campos como 'id', 'nombre', etc., podría ser una sola vacuna
-                        if 'id' in data and 'nombre' in data:
-                            print("Parece ser una sola vacuna, convirtiendo a lista")
-                            return True, [data]
-                        # De lo contrario, devolver el diccionario completo
-                        return True, data
-                # Si ya es una lista, devolverla directamente
-                elif isinstance(data, list):
-                    print(f"Formato: lista ({len(data)} elementos)")
-                    return True, data
-                # Si es otro tipo de datos, convertirlo a string y devolverlo
-                else:
-                    print(f"Formato inesperado: {type(data)}")
-                    return True, self.get_example_data('vacunas')
-            else:
-                error_msg = f"Error al obtener vacunas: {data}"
-                print(error_msg)
-                # Devolver datos de ejemplo en modo offline
-                return True, self.get_example_data('vacunas')
-        except Exception as e:
-            error_msg = f"Error inesperado: {str(e)}"
-            print(error_msg)
-            # Devolver datos de ejemplo en modo offline
-            return True, self.get_example_data('vacunas')
+        return self.list_resource('vacunas')
             
     def get_granjas(self):
         """Obtiene la lista de granjas"""
-        print("Intentando obtener granjas...")
-        try:
-            # Usar el método centralizado con timeout
-            success, data = self.make_request('get', f"{self.base_url}/granjas/")
-            
-            if success:
-                print(f"Datos recibidos: {type(data)}")
-                # Normalizar el formato de respuesta
-                if isinstance(data, dict):
-                    # Si es un diccionario, verificar si tiene una clave 'results' que contenga la lista
-                    if 'results' in data and isinstance(data['results'], list):
-                        print(f"Formato: diccionario con 'results' ({len(data['results'])} elementos)")
-                        return True, data['results']
-                    # Si no tiene 'results' pero tiene 'data'
-                    elif 'data' in data and isinstance(data['data'], list):
-                        print(f"Formato: diccionario con 'data' ({len(data['data'])} elementos)")
-                        return True, data['data']
-                    # Si es un diccionario con otros campos, intentar extraer los datos relevantes
-                    else:
-                        print(f"Formato: diccionario sin 'results' o 'data'")
-                        # Si tiene campos como 'id', 'nombre', etc., podría ser una sola granja
-                        if 'id' in data and 'nombre' in data:
-                            print("Parece ser una sola granja, convirtiendo a lista")
-                            return True, [data]
-                        # De lo contrario, devolver el diccionario completo
-                        return True, data
-                # Si ya es una lista, devolverla directamente
-                elif isinstance(data, list):
-                    print(f"Formato: lista ({len(data)} elementos)")
-                    return True, data
-                # Si es otro tipo de datos, convertirlo a string y devolverlo
-                else:
-                    print(f"Formato inesperado: {type(data)}")
-                    return False, self.get_example_data('granjas')
-            else:
-                error_msg = f"Error al obtener granjas: {data}"
-                print(error_msg)
-                # Devolver datos de ejemplo en modo offline
-                return False, self.get_example_data('granjas')
-        except Exception as e:
-            error_msg = f"Error inesperado: {str(e)}"
-            print(error_msg)
-            # Devolver datos de ejemplo en modo offline
-            return False, self.get_example_data('granjas')
+        return self.list_resource('granjas', fallback_success=False)
             
     def get_usuarios(self):
         """Obtiene la lista de usuarios"""
-        print("Intentando obtener usuarios...")
-        try:
-            # Verificar si tenemos un token de autenticación
-            if not self.token:
-                print("No hay token de autenticación disponible. Usando datos de ejemplo.")
-                return False, self.get_example_data('usuarios')
-                
-            # Usar el método centralizado con timeout y asegurar que se envía el token
-            headers = self.get_headers()
-            success, data = self.make_request('get', f"{self.base_url}/usuarios/", headers=headers)
-            
-            if success:
-                print(f"Datos recibidos: {type(data)}")
-                # Normalizar el formato de respuesta
-                if isinstance(data, dict):
-                    # Si es un diccionario, verificar si tiene una clave 'results' que contenga la lista
-                    if 'results' in data and isinstance(data['results'], list):
-                        print(f"Formato: diccionario con 'results' ({len(data['results'])} elementos)")
-                        return True, data['results']
-                    # Si no tiene 'results' pero tiene 'data'
-                    elif 'data' in data and isinstance(data['data'], list):
-                        print(f"Formato: diccionario con 'data' ({len(data['data'])} elementos)")
-                        return True, data['data']
-                    # Si es un diccionario con otros campos, intentar extraer los datos relevantes
-                    else:
-                        print(f"Formato: diccionario sin 'results' o 'data'")
-                        # Si tiene campos como 'id', 'username', etc., podría ser un solo usuario
-                        if 'id' in data and 'username' in data:
-                            print("Parece ser un solo usuario, convirtiendo a lista")
-                            return True, [data]
-                        # De lo contrario, devolver el diccionario completo
-                        return True, data
-                # Si ya es una lista, devolverla directamente
-                elif isinstance(data, list):
-                    print(f"Formato: lista ({len(data)} elementos)")
-                    return True, data
-                # Si es otro tipo de datos, usar datos de ejemplo
-                else:
-                    print(f"Formato inesperado: {type(data)}")
-                    return False, self.get_example_data('usuarios')
-            else:
-                # Si el error es 401 (No autorizado) o 403 (Prohibido), probablemente necesitamos un token válido
-                if isinstance(data, str) and ('401' in data or '403' in data):
-                    print("Error de autenticación. Intentando refrescar el token...")
-                    # Intentar refrescar el token
-                    if self.refresh_auth_token():
-                        # Intentar nuevamente con el token refrescado
-                        return self.get_usuarios()
-                
-                error_msg = f"Error al obtener usuarios: {data}"
-                print(error_msg)
-                # Devolver datos de ejemplo en modo offline
-                return False, self.get_example_data('usuarios')
-        except Exception as e:
-            error_msg = f"Error inesperado: {str(e)}"
-            print(error_msg)
-            # Devolver datos de ejemplo en modo offline
+        # Verificar si tenemos un token de autenticación
+        if not self.token:
+            print("No hay token de autenticación disponible. Usando datos de ejemplo.")
             return False, self.get_example_data('usuarios')
+        # make_request refresca el token si el servidor responde 401
+        return self.list_resource('usuarios', fallback_success=False)
             
+
     def get_grupos(self):
         """Obtiene la lista de grupos de usuarios"""
         print("Intentando obtener grupos...")
@@ -2456,7 +2078,7 @@ class ApiClient:
         """Obtiene los datos de un galpón específico por su ID"""
         try:
             # Agregar timeout para evitar bloqueos
-            response = requests.get(
+            response = self.session.get(
                 f"{self.base_url}/galpones/{galpon_id}/",
                 headers=self.get_headers()
             )
@@ -0,0 +1,128 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Registros tipados de los recursos de la API y lectura de sus páginas.
+
+Los listados de la API están paginados por cursor (api/pagination.py):
+
+    {"next": "http://.../api/lotes/?cursor=cD0yMDI2...", "previous": null,
+     "results": [{...}, {...}]}
+
+page_rows() saca las filas de una página ya decodificada, sea cual sea su
+forma (página paginada, lista directa, {'data': [...]} o un solo objeto), y
+next_page() el enlace a la siguiente. ApiClient.iter_pages() recorre esos
+enlaces bajo demanda, de modo que quien procesa un listado largo página por
+página nunca tiene más de una en memoria.
+
+Cada fila se entrega como el Record del recurso (Lote, Galpon, ...): un dict,
+así que todo el código que ya trabaja con diccionarios sigue funcionando, que
+además permite leer los campos como atributos (lote.codigo).
+"""
+
+
+class ApiRequestError(Exception):
+    """Una página de un listado no se pudo obtener; `detail` es la respuesta de make_request"""
+
+    def __init__(self, resource, detail):
+        super().__init__(f"Error al obtener {resource}: {detail}")
+        self.resource = resource
+        self.detail = detail
+
+
+class Record(dict):
+    """Fila de un recurso de la API; los campos también se leen como atributos"""
+
+    def __getattr__(self, name):
+        try:
+            return self[name]
+        except KeyError:
+            raise AttributeError(f"{type(self).__name__} no tiene el campo '{name}'") from None
+
+    @classmethod
+    def from_api(cls, row):
+        return cls(row)
+
+
+class Lote(Record):
+    """Lote de aves (/api/lotes/)"""
+
+
+class Galpon(Record):
+    """Galpón (/api/galpones/)"""
+
+    @classmethod
+    def from_api(cls, row):
+        galpon = cls(row)
+        # Nombres de campo que usan las pestañas de la aplicación
+        if 'numero_galpon' in galpon and 'nombre' not in galpon:
+            galpon['nombre'] = f"Galpón {galpon['numero_galpon']}"
+        for alias, campo in (('capacidad', 'capacidad_aves'), ('ancho', 'ancho_m'), ('largo', 'largo_m')):
+            if campo in galpon and alias not in galpon:
+                galpon[alias] = galpon[campo]
+        return galpon
+
+
+class SeguimientoDiario(Record):
+    """Seguimiento diario de un lote (/api/seguimientos/)"""
+
+
+class Tarea(Record):
+    """Tarea programada (/api/tareas/)"""
+
+
+class Granja(Record):
+    """Granja (/api/granjas/)"""
+
+
+class Raza(Record):
+    """Raza de aves (/api/razas/)"""
+
+
+class Alimento(Record):
+    """Alimento del inventario (/api/alimentos/)"""
+
+
+class Vacuna(Record):
+    """Vacuna del inventario (/api/vacunas/)"""
+
+
+class Usuario(Record):
+    """Usuario del sistema (/api/usuarios/)"""
+
+
+RECORD_TYPES = {
+    'lotes': Lote,
+    'galpones': Galpon,
+    'seguimientos': SeguimientoDiario,
+    'tareas': Tarea,
+    'granjas': Granja,
+    'razas': Raza,
+    'alimentos': Alimento,
+    'vacunas': Vacuna,
+    'usuarios': Usuario,
+}
+
+
+def record_type(resource):
+    """Clase de registro de un recurso (Record para los que no tienen una propia)"""
+    return RECORD_TYPES.get(resource, Record)
+
+
+def page_rows(data):
+    """Filas (diccionarios) de una página decodificada, o None si no tiene forma de listado"""
+    if isinstance(data, dict):
+        for key in ('results', 'data', 'items'):
+            if isinstance(data.get(key), list):
+                data = data[key]
+                break
+        else:
+            return [data] if 'id' in data else ([] if not data else None)
+    if isinstance(data, list) and all(isinstance(row, dict) for row in data):
+        return data
+    return None
+
+
+def next_page(data):
+    """URL de la página siguiente de un listado paginado, o None si es la última"""
+    return data.get('next') if isinstance(data, dict) else None
@@ -3,6 +3,8 @@ from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel,
 from PyQt5.QtGui import QFont, QIcon, QPixmap
 from PyQt5.QtCore import Qt, QTimer, QDate
 
+from data_loader import get_data_loader
+
 class StatCard(QFrame):
     """Widget para mostrar una estadística en el dashboard"""
     
@@ -182,8 +184,12 @@ class DashboardTab(QWidget):
         # Actualizar fecha
         self.fecha_label.setText(f"Fecha: {QDate.currentDate().toString('dd/MM/yyyy')}")
         
-        # Obtener estadísticas generales
-        success, data = self.api_client.get_dashboard_stats()
+        # Obtener estadísticas generales en segundo plano
+        get_data_loader().load('dashboard_stats', self.api_client.get_dashboard_stats, callback=self.show_stats)
+    
+    def show_stats(self, result):
+        """Actualiza las tarjetas con el resultado de get_dashboard_stats"""
+        success, data = result
         
         if success:
             # Actualizar tarjetas con datos reales
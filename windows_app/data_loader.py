@@ -0,0 +1,142 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Carga de datos de las pestañas fuera del hilo de la interfaz.
+
+Los métodos de ApiClient bloquean hasta que responde el servidor (hasta 10 s
+por intento si no responde), así que las pestañas no los llaman directamente
+sino a través de DataLoader, que los ejecuta en un QThreadPool y entrega el
+resultado en el hilo de la interfaz:
+
+    get_data_loader().load('lotes', self.api_client.get_lotes, callback=self.show_lotes)
+
+La clave identifica los datos pedidos (con sus parámetros, p. ej.
+'seguimientos:12'). Si otra pestaña pide la misma clave mientras la primera
+petición sigue en curso no se hace otra llamada: el resultado llega a las
+dos. cancel() retira una entrega pendiente; cuando ya nadie espera una clave
+su tarea sale de la cola, o, si ya empezó, su resultado se descarta.
+
+Además de los callbacks, las señales loaded(clave, resultado) y
+failed(clave, error) avisan a cualquier widget conectado.
+"""
+
+import traceback
+
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+# Peticiones simultáneas de las pestañas (ApiClient mantiene POOL_MAXSIZE
+# conexiones, compartidas con la sincronización)
+LOADER_THREADS = 4
+
+
+class _TaskSignals(QObject):
+    """Señales de una tarea; se emiten desde el hilo del pool y se reciben en el de la interfaz"""
+    done = pyqtSignal(object, object, object)  # tarea, resultado, excepción
+
+
+class _LoadTask(QRunnable):
+    """Ejecuta una función en el pool y avisa el resultado"""
+
+    def __init__(self, key, func, args, kwargs):
+        super().__init__()
+        # DataLoader guarda la referencia hasta recibir el resultado
+        self.setAutoDelete(False)
+        self.key = key
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.callbacks = []
+        self.cancelled = False
+        self.signals = _TaskSignals()
+
+    def run(self):
+        if self.cancelled:
+            return
+        try:
+            result, error = self.func(*self.args, **self.kwargs), None
+        except Exception as e:
+            traceback.print_exc()
+            result, error = None, e
+        self.signals.done.emit(self, result, error)
+
+
+class DataLoader(QObject):
+    """Pool de hilos compartido por las pestañas (ver el docstring del módulo)"""
+
+    loaded = pyqtSignal(str, object)  # Clave, resultado
+    failed = pyqtSignal(str, str)  # Clave, mensaje de error
+
+    def __init__(self, max_threads=LOADER_THREADS):
+        super().__init__()
+        self.pool = QThreadPool()
+        self.pool.setMaxThreadCount(max_threads)
+        # Clave -> tarea en curso o en cola
+        self._tasks = {}
+
+    def load(self, key, func, *args, callback=None, **kwargs):
+        """Ejecuta func(*args, **kwargs) en el pool y pasa su resultado a `callback`
+
+        Si la clave ya se está cargando no se vuelve a llamar a func; `callback`
+        recibe el resultado de la petición en curso.
+        """
+        task = self._tasks.get(key)
+        if task is None:
+            task = _LoadTask(key, func, args, kwargs)
+            task.signals.done.connect(self._finished)
+            self._tasks[key] = task
+            self.pool.start(task)
+        if callback is not None:
+            task.callbacks.append(callback)
+
+    def is_loading(self, key):
+        return key in self._tasks
+
+    def cancel(self, key, callback=None):
+        """Retira `callback` (o todas las entregas) de la carga de `key`
+
+        Si no queda nadie esperando la clave, la tarea sale de la cola; si ya
+        se está ejecutando, su resultado se descarta.
+        """
+        task = self._tasks.get(key)
+        if task is None:
+            return
+        task.callbacks = [c for c in task.callbacks if callback is not None and c != callback]
+        if not task.callbacks:
+            task.cancelled = True
+            del self._tasks[key]
+            self.pool.tryTake(task)
+
+    def shutdown(self, msecs=2000):
+        """Descarta las cargas pendientes y espera a las que están en curso (al cerrar la aplicación)"""
+        for key in list(self._tasks):
+            self.cancel(key)
+        self.pool.clear()
+        self.pool.waitForDone(msecs)
+
+    def _finished(self, task, result, error):
+        if self._tasks.get(task.key) is task:
+            del self._tasks[task.key]
+        if task.cancelled:
+            return
+        if error is not None:
+            self.failed.emit(task.key, str(error))
+            return
+        self.loaded.emit(task.key, result)
+        for callback in task.callbacks:
+            try:
+                callback(result)
+            except Exception:
+                # Un widget que falla no impide que los demás reciban los datos
+                traceback.print_exc()
+
+
+_loader = None
+
+
+def get_data_loader():
+    """Instancia compartida por todas las pestañas; se crea en el hilo de la interfaz"""
+    global _loader
+    if _loader is None:
+        _loader = DataLoader()
+    return _loader
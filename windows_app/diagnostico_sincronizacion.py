@@ -71,7 +71,7 @@ def main():
     # Verificar datos sincronizados
     print("\n=== DATOS SINCRONIZADOS ===")
     for entity in sync_manager.entities:
-        data = sync_manager.offline_data.get(entity, [])
+        data = sync_manager.load_offline_data(entity) or []
         print(f"{entity}: {len(data) if isinstance(data, list) else 'no es lista'} elementos")
     
     print("\n=== DIAGNÓSTICO COMPLETADO ===")
@@ -0,0 +1,104 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Caché en memoria de las listas de entidades, compartida por ApiClient,
+SyncManager y las pestañas.
+
+Cada lista se guarda por entidad y filtros ('seguimientos' con {'lote': 5}
+es otra entrada que 'seguimientos' sin filtros) y vence según ENTITY_TTLS:
+las listas de referencia (razas, alimentos, vacunas) duran más que un ciclo
+de sincronización, los datos que cambian a diario (seguimientos, tareas) unos
+minutos. Antes de vencer se invalidan:
+
+- cuando SyncManager emite data_updated(entidad), es decir, después de
+  sincronizarla o de registrar un cambio local pendiente;
+- cuando ApiClient crea, modifica o borra registros de la entidad.
+
+Invalidar una entidad borra todas sus entradas, con cualquier filtro. Las
+listas se entregan como copias, pero los registros son los mismos objetos:
+quien quiera modificarlos debe copiarlos antes.
+"""
+
+import threading
+import time
+
+# Segundos que dura cada lista si nada la invalida antes
+ENTITY_TTLS = {
+    'razas': 60 * 60,
+    'alimentos': 60 * 60,
+    'vacunas': 60 * 60,
+    'granjas': 30 * 60,
+    'empresas': 30 * 60,
+    'galpones': 15 * 60,
+    'usuarios': 15 * 60,
+    'grupos': 15 * 60,
+    'lotes': 5 * 60,
+    'seguimientos': 2 * 60,
+    'tareas': 2 * 60,
+}
+DEFAULT_TTL = 60
+
+# Entidades que se arman con los datos de otra y vencen con ella
+DERIVED = {
+    'granjas': ('empresas',),
+}
+
+
+def _filters_key(filters):
+    return tuple(sorted((k, str(v)) for k, v in (filters or {}).items() if v is not None))
+
+
+class EntityCache:
+    """Listas por (entidad, filtros) con vencimiento (ver el docstring del módulo)"""
+
+    def __init__(self, ttls=ENTITY_TTLS, default_ttl=DEFAULT_TTL, clock=time.monotonic):
+        self.ttls = ttls
+        self.default_ttl = default_ttl
+        self.clock = clock
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, entity, filters=None):
+        """Copia de la lista guardada, o None si no hay o ya venció"""
+        key = (entity, _filters_key(filters))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires, data = entry
+            if self.clock() >= expires:
+                del self._entries[key]
+                return None
+        return list(data)
+
+    def put(self, entity, data, filters=None):
+        """Guarda una lista de la entidad; lo que no es una lista no se guarda"""
+        if not isinstance(data, list):
+            return
+        expires = self.clock() + self.ttls.get(entity, self.default_ttl)
+        with self._lock:
+            self._entries[(entity, _filters_key(filters))] = (expires, list(data))
+
+    def invalidate(self, entity=None):
+        """Descarta las listas de la entidad (y de sus derivadas), o todas si no se indica"""
+        with self._lock:
+            if entity is None:
+                self._entries.clear()
+                return
+            entities = {entity, *DERIVED.get(entity, ())}
+            for key in [key for key in self._entries if key[0] in entities]:
+                del self._entries[key]
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_entity_cache():
+    """Instancia compartida por ApiClient y SyncManager"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = EntityCache()
+        return _cache
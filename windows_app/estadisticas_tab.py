@@ -7,6 +7,8 @@ from PyQt5.QtCore import Qt, QDateTime
 from PyQt5.QtGui import QPainter, QColor, QPen, QBrush
 from PyQt5.QtChart import QChart, QChartView, QLineSeries, QBarSeries, QBarSet, QBarCategoryAxis, QValueAxis, QPieSeries
 
+from data_loader import get_data_loader
+
 class ChartWidget(QWidget):
     """Widget para mostrar gráficos"""
     
@@ -336,6 +338,8 @@ class EstadisticasTab(QWidget):
     def __init__(self, api_client):
         super().__init__()
         self.api_client = api_client
+        # (clave, callback) del pedido de lotes del galpón que todavía no llegó
+        self._lotes_pendientes = None
         
         # Crear layout principal
         main_layout = QVBoxLayout(self)
@@ -675,33 +679,37 @@ class EstadisticasTab(QWidget):
             QMessageBox.warning(self, "Error", f"Error al actualizar la comparación de razas: {str(e)}")
     
     def refresh_data(self):
-        """Actualiza los datos de los gráficos"""
+        """Pide galpones, razas y estadísticas en segundo plano; cada parte se actualiza cuando llegan sus datos"""
+        loader = get_data_loader()
+        if hasattr(self.api_client, 'get_galpones'):
+            loader.load('galpones', self.api_client.get_galpones, callback=self.show_galpones)
+        else:
+            self.show_galpones((False, None))
+        
+        # Cargar razas disponibles para los combos de comparación
+        self.cargar_razas_disponibles()
+        
+        loader.load('dashboard_stats', self.api_client.get_dashboard_stats, callback=self.show_stats)
+    
+    def show_galpones(self, result):
+        """Llena el combo de galpones con el resultado de get_galpones y carga sus lotes"""
         try:
             # Cargar galpones disponibles
             self.galpon_combo.blockSignals(True)
             self.galpon_combo.clear()
             
-            # Obtener galpones desde la API
-            if hasattr(self.api_client, 'get_galpones'):
-                success, galpones = self.api_client.get_galpones()
+            success, galpones = result
+            if success and isinstance(galpones, list):
+                # Agregar opción para todos los galpones
+                self.galpon_combo.addItem("Todos los galpones", "0")
                 
-                if success and isinstance(galpones, list):
-                    # Agregar opción para todos los galpones
-                    self.galpon_combo.addItem("Todos los galpones", "0")
-                    
-                    for galpon in galpones:
-                        if isinstance(galpon, dict):
-                            galpon_nombre = str(galpon.get('nombre', ''))
-                            galpon_id = str(galpon.get('id', ''))
-                            self.galpon_combo.addItem(galpon_nombre, galpon_id)
-                else:
-                    # Si no hay datos, usar ejemplos
-                    self.galpon_combo.addItem("Todos los galpones", "0")
-                    self.galpon_combo.addItem("Galpón A", "1")
-                    self.galpon_combo.addItem("Galpón B", "2")
-                    self.galpon_combo.addItem("Galpón C", "3")
+                for galpon in galpones:
+                    if isinstance(galpon, dict):
+                        galpon_nombre = str(galpon.get('nombre', ''))
+                        galpon_id = str(galpon.get('id', ''))
+                        self.galpon_combo.addItem(galpon_nombre, galpon_id)
             else:
-                # Si no existe el método, usar ejemplos
+                # Si no hay datos, usar ejemplos
                 self.galpon_combo.addItem("Todos los galpones", "0")
                 self.galpon_combo.addItem("Galpón A", "1")
                 self.galpon_combo.addItem("Galpón B", "2")
@@ -712,15 +720,13 @@ class EstadisticasTab(QWidget):
             # Cargar lotes para el galpón seleccionado
             self.cargar_lotes_por_galpon()
             
-            # Obtener datos de la API
-            # En una aplicación real, aquí se obtendrían los datos de la API
-            # Por ahora, usamos datos de ejemplo
-            
-            # Cargar razas disponibles para los combos de comparación
-            self.cargar_razas_disponibles()
-            
-            # Obtener estadísticas del dashboard
-            success, stats = self.api_client.get_dashboard_stats()
+        except Exception as e:
+            print(f"Error al cargar galpones: {e}")
+    
+    def show_stats(self, result):
+        """Actualiza tarjetas y gráficos con el resultado de get_dashboard_stats"""
+        try:
+            success, stats = result
             
             if success and stats and isinstance(stats, dict):
                 try:
@@ -863,39 +869,44 @@ class EstadisticasTab(QWidget):
             self.ventas_card.value_label.setText("$12,500")
             
     def cargar_razas_disponibles(self):
-        """Carga las razas disponibles en los combos de comparación"""
+        """Pide las razas en segundo plano; show_razas llena los combos de comparación cuando llegan"""
+        if hasattr(self.api_client, 'get_razas'):
+            get_data_loader().load('razas', self.api_client.get_razas, callback=self.show_razas)
+        else:
+            self.cargar_razas_ejemplo()
+    
+    def show_razas(self, result):
+        """Llena los combos de comparación con el resultado de get_razas"""
         try:
-            # Obtener razas desde la API
-            if hasattr(self.api_client, 'get_razas'):
-                success, razas = self.api_client.get_razas()
-                if success and razas and isinstance(razas, list):
-                    # Guardar estado actual
-                    raza1_actual = self.raza1_combo.currentText()
-                    raza2_actual = self.raza2_combo.currentText()
-                    
-                    # Limpiar combos
-                    self.raza1_combo.clear()
-                    self.raza2_combo.clear()
-                    
-                    # Agregar razas a los combos
-                    for raza in razas:
-                        if isinstance(raza, dict) and 'nombre' in raza:
-                            self.raza1_combo.addItem(raza['nombre'])
-                            self.raza2_combo.addItem(raza['nombre'])
-                    
-                    # Restaurar selecciones previas si es posible
-                    if raza1_actual:
-                        index = self.raza1_combo.findText(raza1_actual)
-                        if index >= 0:
-                            self.raza1_combo.setCurrentIndex(index)
-                    
-                    if raza2_actual:
-                        index = self.raza2_combo.findText(raza2_actual)
-                        if index >= 0:
-                            self.raza2_combo.setCurrentIndex(index)
-                    
-                    return
-            
+            success, razas = result
+            if success and razas and isinstance(razas, list):
+                # Guardar estado actual
+                raza1_actual = self.raza1_combo.currentText()
+                raza2_actual = self.raza2_combo.currentText()
+                
+                # Limpiar combos
+                self.raza1_combo.clear()
+                self.raza2_combo.clear()
+                
+                # Agregar razas a los combos
+                for raza in razas:
+                    if isinstance(raza, dict) and 'nombre' in raza:
+                        self.raza1_combo.addItem(raza['nombre'])
+                        self.raza2_combo.addItem(raza['nombre'])
+                
+                # Restaurar selecciones previas si es posible
+                if raza1_actual:
+                    index = self.raza1_combo.findText(raza1_actual)
+                    if index >= 0:
+                        self.raza1_combo.setCurrentIndex(index)
+                
+                if raza2_actual:
+                    index = self.raza2_combo.findText(raza2_actual)
+                    if index >= 0:
+                        self.raza2_combo.setCurrentIndex(index)
+                
+                return
+        
             # Si llegamos aquí, usar datos de ejemplo
             self.cargar_razas_ejemplo()
             
@@ -931,28 +942,42 @@ class EstadisticasTab(QWidget):
                 self.raza2_combo.setCurrentIndex(index)
                 
     def cargar_lotes_por_galpon(self):
-        """Carga los lotes disponibles para el galpón seleccionado"""
+        """Pide los lotes del galpón seleccionado; show_lotes_por_galpon llena el combo cuando llegan
+
+        Si el pedido del galpón anterior no llegó todavía, se descarta.
+        """
+        # Obtener el galpón seleccionado
+        if self.galpon_combo.count() == 0:
+            return
+            
+        galpon_id = self.galpon_combo.currentData()
+        loader = get_data_loader()
+        if self._lotes_pendientes:
+            loader.cancel(*self._lotes_pendientes)
+            self._lotes_pendientes = None
+        
+        if hasattr(self.api_client, 'get_lotes_por_galpon'):
+            key = f"lotes_por_galpon:{galpon_id}"
+            self._lotes_pendientes = (key, self.show_lotes_por_galpon)
+            loader.load(key, self.api_client.get_lotes_por_galpon, galpon_id, callback=self.show_lotes_por_galpon)
+        else:
+            self.show_lotes_por_galpon((False, None))
+    
+    def show_lotes_por_galpon(self, result):
+        """Llena el combo de lotes con el resultado de get_lotes_por_galpon"""
+        self._lotes_pendientes = None
         try:
-            # Obtener el galpón seleccionado
-            if self.galpon_combo.count() == 0:
-                return
-                
-            galpon_id = self.galpon_combo.currentData()
-            
             # Limpiar el combo de lotes
             self.lote_combo.clear()
             
-            # Obtener lotes para el galpón seleccionado
-            if hasattr(self.api_client, 'get_lotes_por_galpon'):
-                success, lotes = self.api_client.get_lotes_por_galpon(galpon_id)
-                
-                if success and isinstance(lotes, list):
-                    for lote in lotes:
-                        if isinstance(lote, dict):
-                            lote_nombre = str(lote.get('nombre', ''))
-                            lote_id = str(lote.get('id', ''))
-                            self.lote_combo.addItem(lote_nombre, lote_id)
-                    return
+            success, lotes = result
+            if success and isinstance(lotes, list):
+                for lote in lotes:
+                    if isinstance(lote, dict):
+                        lote_nombre = str(lote.get('nombre', ''))
+                        lote_id = str(lote.get('id', ''))
+                        self.lote_combo.addItem(lote_nombre, lote_id)
+                return
             
             # Si no hay datos de la API o hay un error, usar datos de ejemplo
             ejemplos = [
@@ -5,6 +5,8 @@ from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QPushButton,
                              QApplication, QCheckBox)
 from PyQt5.QtCore import Qt
 
+from data_loader import get_data_loader
+
 class GalponDialog(QDialog):
     """Diálogo para crear o editar un galpón"""
     
@@ -374,8 +376,12 @@ class GalponesTab(QWidget):
         self.refresh_data()
     
     def refresh_data(self):
-        """Actualiza los datos de la tabla de galpones"""
-        success, data = self.api_client.get_galpones()
+        """Pide los galpones en segundo plano; show_galpones llena la tabla cuando llegan"""
+        get_data_loader().load('galpones', self.api_client.get_galpones, callback=self.show_galpones)
+    
+    def show_galpones(self, result):
+        """Llena la tabla de galpones con el resultado de get_galpones"""
+        success, data = result
         
         # Limpiar tabla
         self.table.setRowCount(0)
@@ -0,0 +1,252 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Almacenamiento local de la aplicación de Windows en una base SQLite.
+
+Cada entidad ('lotes', 'seguimientos', ...) tiene su tabla con una fila por
+registro: el registro completo en JSON y, aparte, las columnas por las que se
+consulta (lote_id, galpon_id, fecha), indexadas. Así una pestaña puede pedir
+solo los seguimientos de un lote en un rango de fechas y la sincronización
+puede insertar o reemplazar filas sueltas sin reescribir la entidad entera.
+
+Los datos que no son una lista de registros (estadísticas, configuraciones)
+se guardan enteros en la tabla documentos. La primera vez que se pide una
+entidad que no está en la base se importa el JSON que usaban las versiones
+anteriores (data/<entidad>.json u offline_data/<entidad>.json).
+"""
+
+import json
+import os
+import re
+import sqlite3
+import threading
+from datetime import datetime
+
+DB_PATH = os.path.join(os.path.dirname(__file__), 'local_data.db')
+LEGACY_DIRS = [
+    os.path.join(os.path.dirname(__file__), 'data'),
+    os.path.join(os.path.dirname(__file__), 'offline_data'),
+]
+
+# Columna indexada -> claves del registro de las que se toma, en orden
+KEY_FIELDS = {
+    'lote_id': ('lote_id', 'lote'),
+    'galpon_id': ('galpon_id', 'galpon'),
+    'fecha': ('fecha', 'fecha_seguimiento', 'fecha_inicio', 'fecha_ingreso', 'fecha_vencimiento'),
+}
+
+_ENTITY_NAME = re.compile(r'^[A-Za-z_][A-Za-z0-9_]*$')
+
+
+def _key_value(row, keys):
+    for key in keys:
+        value = row.get(key)
+        if isinstance(value, dict):
+            value = value.get('id')
+        if value not in (None, ''):
+            return str(value)
+    return None
+
+
+class LocalStore:
+    """Base SQLite con una tabla por entidad (ver el docstring del módulo)"""
+
+    def __init__(self, path=DB_PATH, legacy_dirs=LEGACY_DIRS):
+        self.path = path
+        self.legacy_dirs = legacy_dirs
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._tables = set()
+        with self._connection() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS entidades ("
+                "entity TEXT PRIMARY KEY, kind TEXT NOT NULL, updated TEXT NOT NULL)"
+            )
+            conn.execute("CREATE TABLE IF NOT EXISTS documentos (entity TEXT PRIMARY KEY, data TEXT NOT NULL)")
+
+    def _connection(self):
+        """Conexión del hilo actual (sqlite3 no comparte conexiones entre hilos)"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            # WAL: las pestañas leen mientras la sincronización escribe
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _table(self, conn, entity):
+        if not _ENTITY_NAME.match(entity):
+            raise ValueError(f"Nombre de entidad inválido: {entity}")
+        if entity not in self._tables:
+            conn.execute(
+                f'CREATE TABLE IF NOT EXISTS "{entity}" ('
+                "id TEXT PRIMARY KEY, lote_id TEXT, galpon_id TEXT, fecha TEXT, data TEXT NOT NULL)"
+            )
+            for column in KEY_FIELDS:
+                conn.execute(f'CREATE INDEX IF NOT EXISTS "{entity}_{column}" ON "{entity}" ({column})')
+            with self._lock:
+                self._tables.add(entity)
+        return f'"{entity}"'
+
+    def _kind(self, conn, entity):
+        row = conn.execute("SELECT kind FROM entidades WHERE entity = ?", (entity,)).fetchone()
+        return row[0] if row else None
+
+    def _mark(self, conn, entity, kind):
+        conn.execute(
+            "INSERT OR REPLACE INTO entidades (entity, kind, updated) VALUES (?, ?, ?)",
+            (entity, kind, datetime.now().isoformat())
+        )
+
+    def _upsert_rows(self, conn, table, rows):
+        conn.executemany(
+            f"INSERT OR REPLACE INTO {table} (id, lote_id, galpon_id, fecha, data) VALUES (?, ?, ?, ?, ?)",
+            [
+                (
+                    str(row.get('id')),
+                    *(_key_value(row, keys) for keys in KEY_FIELDS.values()),
+                    json.dumps(row, ensure_ascii=False, default=str),
+                )
+                for row in rows
+            ]
+        )
+
+    def _import_legacy(self, entity):
+        """Importa el JSON de versiones anteriores si la entidad aún no está en la base"""
+        for directory in self.legacy_dirs:
+            path = os.path.join(directory, f"{entity}.json")
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+            except (OSError, ValueError):
+                continue
+            if isinstance(data, (list, dict)):
+                print(f"[LOCAL] Importando {path} a la base local")
+                self.save(entity, data)
+                return True
+        return False
+
+    def has(self, entity):
+        """True si la entidad tiene datos guardados (o importables del JSON anterior)"""
+        with self._connection() as conn:
+            if self._kind(conn, entity):
+                return True
+        return self._import_legacy(entity)
+
+    def save(self, entity, data):
+        """Reemplaza todos los datos de la entidad (una lista de registros con 'id' o un documento)"""
+        if isinstance(data, list) and all(isinstance(row, dict) and row.get('id') is not None for row in data):
+            with self._connection() as conn:
+                table = self._table(conn, entity)
+                conn.execute(f"DELETE FROM {table}")
+                conn.execute("DELETE FROM documentos WHERE entity = ?", (entity,))
+                self._upsert_rows(conn, table, data)
+                self._mark(conn, entity, 'rows')
+        else:
+            with self._connection() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO documentos (entity, data) VALUES (?, ?)",
+                    (entity, json.dumps(data, ensure_ascii=False, default=str))
+                )
+                self._mark(conn, entity, 'document')
+        return True
+
+    def apply_changes(self, entity, rows, deleted_ids=()):
+        """Inserta o reemplaza `rows` y borra `deleted_ids` en una transacción"""
+        with self._connection() as conn:
+            table = self._table(conn, entity)
+            if self._kind(conn, entity) == 'document':
+                raise ValueError(f"{entity} no está guardada como registros")
+            self._upsert_rows(conn, table, rows)
+            conn.executemany(f"DELETE FROM {table} WHERE id = ?", [(str(pk),) for pk in deleted_ids])
+            self._mark(conn, entity, 'rows')
+        return True
+
+    def save_pages(self, entity, pages):
+        """
+        Reemplaza los registros de la entidad con los de `pages` (un iterable de
+        listas de registros) y devuelve cuántos se guardaron. Cada página se
+        escribe en su propia transacción a medida que llega, sin tener el
+        listado entero en memoria ni bloquear la base mientras se descarga la
+        siguiente; los registros que ya no están se borran al final, así que si
+        `pages` falla a mitad de camino no se pierde ninguno. Las altas locales
+        que aún no llegaron al servidor (id temporal "$tmp-...") se conservan.
+        """
+        seen = set()
+        for rows in pages:
+            with self._connection() as conn:
+                table = self._table(conn, entity)
+                conn.execute("DELETE FROM documentos WHERE entity = ?", (entity,))
+                self._upsert_rows(conn, table, rows)
+                self._mark(conn, entity, 'rows')
+            seen.update(str(row.get('id')) for row in rows)
+        with self._connection() as conn:
+            table = self._table(conn, entity)
+            stale = [
+                (pk,) for (pk,) in conn.execute(f"SELECT id FROM {table}")
+                if pk not in seen and not pk.startswith('$')
+            ]
+            conn.executemany(f"DELETE FROM {table} WHERE id = ?", stale)
+            self._mark(conn, entity, 'rows')
+        return len(seen)
+
+    def load(self, entity):
+        """Todos los datos de la entidad, o None si nunca se guardaron"""
+        if not self.has(entity):
+            return None
+        with self._connection() as conn:
+            if self._kind(conn, entity) == 'document':
+                row = conn.execute("SELECT data FROM documentos WHERE entity = ?", (entity,)).fetchone()
+                return json.loads(row[0]) if row else None
+            table = self._table(conn, entity)
+            return [json.loads(data) for (data,) in conn.execute(f"SELECT data FROM {table} ORDER BY rowid")]
+
+    def get(self, entity, object_id):
+        """Un registro por id, o None"""
+        if not self.has(entity):
+            return None
+        with self._connection() as conn:
+            table = self._table(conn, entity)
+            row = conn.execute(f"SELECT data FROM {table} WHERE id = ?", (str(object_id),)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def query(self, entity, lote_id=None, galpon_id=None, desde=None, hasta=None):
+        """
+        Registros de la entidad filtrados por las columnas indexadas; las
+        fechas son 'AAAA-MM-DD' y el rango incluye ambos extremos. Devuelve
+        una lista vacía si la entidad no tiene datos.
+        """
+        if not self.has(entity):
+            return []
+        conditions, params = [], []
+        for column, value in (('lote_id', lote_id), ('galpon_id', galpon_id)):
+            if value is not None:
+                conditions.append(f"{column} = ?")
+                params.append(str(value))
+        if desde is not None:
+            conditions.append("fecha >= ?")
+            params.append(str(desde))
+        if hasta is not None:
+            # Las fechas con hora ('2026-01-05T08:00') también entran en el día
+            conditions.append("substr(fecha, 1, 10) <= ?")
+            params.append(str(hasta))
+        where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+        with self._connection() as conn:
+            table = self._table(conn, entity)
+            cursor = conn.execute(f"SELECT data FROM {table}{where} ORDER BY fecha, rowid", params)
+            return [json.loads(data) for (data,) in cursor]
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_local_store():
+    """Instancia compartida por ApiClient y SyncManager"""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = LocalStore()
+        return _store
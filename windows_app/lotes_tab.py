@@ -6,6 +6,8 @@ from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel,
 from PyQt5.QtCore import Qt, QDate
 from datetime import datetime
 
+from data_loader import get_data_loader
+
 class LoteDialog(QDialog):
     """Diálogo para crear o editar un lote"""
     
@@ -176,19 +178,35 @@ class LoteDialog(QDialog):
             self.cargar_datos_lote()
     
     def cargar_razas_y_galpones(self):
-        """Carga las razas y galpones desde la API"""
+        """Pide razas y galpones en segundo plano; show_razas y show_galpones llenan los combos cuando llegan"""
+        # Limpiar combos
+        self.raza_combo.clear()
+        self.galpon_combo.clear()
+        
+        # Si no hay cliente API, usar datos de ejemplo
+        if not self.api_client:
+            self.cargar_datos_ejemplo()
+            return
+        
+        loader = get_data_loader()
+        if hasattr(self.api_client, 'get_razas'):
+            loader.load('razas', self.api_client.get_razas, callback=self.show_razas)
+        else:
+            self.show_razas((False, []))
+        loader.load('galpones', self.api_client.get_galpones, callback=self.show_galpones)
+        # Si el diálogo se cierra antes, los datos ya no se esperan
+        self.finished.connect(self.cancelar_cargas)
+    
+    def cancelar_cargas(self):
+        loader = get_data_loader()
+        loader.cancel('razas', self.show_razas)
+        loader.cancel('galpones', self.show_galpones)
+    
+    def show_razas(self, result):
+        """Llena el combo de razas con el resultado de get_razas y selecciona la del lote"""
         try:
-            # Limpiar combos
             self.raza_combo.clear()
-            self.galpon_combo.clear()
-            
-            # Si no hay cliente API, usar datos de ejemplo
-            if not self.api_client:
-                self.cargar_datos_ejemplo()
-                return
-            
-            # Cargar razas desde la API
-            success, razas = self.api_client.get_razas() if hasattr(self.api_client, 'get_razas') else (False, [])
+            success, razas = result
             if success and razas and isinstance(razas, list):
                 # Guardar los datos completos para cada raza
                 self.razas_data = razas
@@ -203,9 +221,18 @@ class LoteDialog(QDialog):
                         print(f"Tipo de raza no soportado: {type(raza)}")
             else:
                 self.cargar_razas_ejemplo()
-            
-            # Cargar galpones desde la API
-            success, galpones = self.api_client.get_galpones()
+        except Exception as e:
+            print(f"Error al cargar razas: {e}")
+            self.raza_combo.clear()
+            self.cargar_razas_ejemplo()
+        if self.lote_data:
+            self.seleccionar_en_combo(self.raza_combo, self.lote_data.get('raza', {}))
+    
+    def show_galpones(self, result):
+        """Llena el combo de galpones con el resultado de get_galpones y selecciona el del lote"""
+        try:
+            self.galpon_combo.clear()
+            success, galpones = result
             if success and galpones and isinstance(galpones, list):
                 # Guardar los datos completos para cada galpón
                 self.galpones_data = galpones
@@ -221,8 +248,27 @@ class LoteDialog(QDialog):
             else:
                 self.cargar_galpones_ejemplo()
         except Exception as e:
-            print(f"Error al cargar razas y galpones: {e}")
-            self.cargar_datos_ejemplo()
+            print(f"Error al cargar galpones: {e}")
+            self.galpon_combo.clear()
+            self.cargar_galpones_ejemplo()
+        if self.lote_data:
+            self.seleccionar_en_combo(self.galpon_combo, self.lote_data.get('galpon', {}))
+    
+    def seleccionar_en_combo(self, combo, valor):
+        """Selecciona en `combo` el elemento de `valor` (un diccionario con 'id' o solo el ID)"""
+        if isinstance(valor, dict) and 'id' in valor:
+            index = combo.findData(valor['id'])
+            if index >= 0:
+                combo.setCurrentIndex(index)
+        elif isinstance(valor, (int, str)):
+            # Puede ser solo el ID
+            try:
+                valor_id = int(valor) if str(valor).isdigit() else valor
+                index = combo.findData(valor_id)
+                if index >= 0:
+                    combo.setCurrentIndex(index)
+            except Exception as e:
+                print(f"Error al seleccionar {valor}: {e}")
     
     def cargar_datos_ejemplo(self):
         """Carga datos de ejemplo para razas y galpones"""
@@ -286,37 +332,10 @@ class LoteDialog(QDialog):
                 print(f"Error al convertir cantidad: {e}")
                 self.cantidad_input.setValue(100)
                 
-            # Raza
-            raza = self.lote_data.get('raza', {})
-            if isinstance(raza, dict) and 'id' in raza:
-                index = self.raza_combo.findData(raza['id'])
-                if index >= 0:
-                    self.raza_combo.setCurrentIndex(index)
-            elif isinstance(raza, (int, str)):
-                # Puede ser solo el ID
-                try:
-                    raza_id = int(raza) if str(raza).isdigit() else raza
-                    index = self.raza_combo.findData(raza_id)
-                    if index >= 0:
-                        self.raza_combo.setCurrentIndex(index)
-                except Exception as e:
-                    print(f"Error al procesar raza: {e}")
-            
-            # Galpón
-            galpon = self.lote_data.get('galpon', {})
-            if isinstance(galpon, dict) and 'id' in galpon:
-                index = self.galpon_combo.findData(galpon['id'])
-                if index >= 0:
-                    self.galpon_combo.setCurrentIndex(index)
-            elif isinstance(galpon, (int, str)):
-                # Puede ser solo el ID
-                try:
-                    galpon_id = int(galpon) if str(galpon).isdigit() else galpon
-                    index = self.galpon_combo.findData(galpon_id)
-                    if index >= 0:
-                        self.galpon_combo.setCurrentIndex(index)
-                except Exception as e:
-                    print(f"Error al procesar galpón: {e}")
+            # Raza y galpón (si los combos aún no se llenaron, show_razas y
+            # show_galpones los seleccionan al llegar)
+            self.seleccionar_en_combo(self.raza_combo, self.lote_data.get('raza', {}))
+            self.seleccionar_en_combo(self.galpon_combo, self.lote_data.get('galpon', {}))
             
             # Edad
             try:
@@ -507,12 +526,15 @@ class LotesTab(QWidget):
         self.refresh_data()
     
     def refresh_data(self):
-        """Actualiza los datos de la tabla de lotes"""
+        """Pide los lotes en segundo plano; show_lotes llena la tabla cuando llegan"""
+        get_data_loader().load('lotes', self.api_client.get_lotes, callback=self.show_lotes)
+    
+    def show_lotes(self, result):
+        """Llena la tabla de lotes con el resultado de get_lotes"""
         # Limpiar tabla
         self.table.setRowCount(0)
         
-        # Obtener lotes desde la API
-        success, lotes = self.api_client.get_lotes()
+        success, lotes = result
         
         if success and lotes:
             # Verificar si lotes es una lista
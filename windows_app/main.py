@@ -37,6 +37,7 @@ from sync_tab import SyncTab
 from mobile_tab import MobileTab
 from login_dialog import LoginDialog
 from sync_manager import SyncManager
+from data_loader import get_data_loader
 
 class MainWindow(QMainWindow):
     def __init__(self):
@@ -359,6 +360,9 @@ def main():
     
     window.show()
     
+    # No cerrar con cargas de datos a medio camino en los hilos del pool
+    app.aboutToQuit.connect(get_data_loader().shutdown)
+    
     sys.exit(app.exec_())
 
 if __name__ == "__main__":
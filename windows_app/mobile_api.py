@@ -140,9 +140,12 @@ class MobileAPIHandler(BaseHTTPRequestHandler):
             
             if entity in self.sync_manager.entities:
                 # Agregar cambio pendiente
-                self.sync_manager.add_pending_change(entity, operation, data)
+                entity_id = self.sync_manager.add_pending_change(entity, operation, data)
                 self._set_headers()
-                self.wfile.write(json.dumps({'message': f'{operation.capitalize()} pendiente para {entity}'}).encode())
+                self.wfile.write(json.dumps({
+                    'message': f'{operation.capitalize()} pendiente para {entity}',
+                    'id': entity_id
+                }).encode())
             else:
                 self._set_headers(404)
                 self.wfile.write(json.dumps({'error': f'Entidad no válida: {entity}'}).encode())
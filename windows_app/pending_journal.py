@@ -0,0 +1,67 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Diario de cambios pendientes de sincronizar (pending_changes.jsonl).
+
+Cada cambio hecho sin conexión se agrega al final del archivo como una línea
+JSON y se fuerza a disco (fsync) antes de confirmarlo, así guardar cuesta lo
+mismo con diez cambios pendientes que con mil y un corte de luz no pierde los
+anteriores. Al cargar se vuelve a aplicar el diario en orden; una última línea
+incompleta (el proceso murió escribiéndola) se descarta.
+
+Después de sincronizar, compact() reescribe el diario con los cambios que
+siguen pendientes: escribe un archivo temporal, lo fuerza a disco y lo pone
+en lugar del anterior con os.replace, de modo que siempre queda una versión
+completa.
+"""
+
+import json
+import os
+
+JOURNAL_PATH = os.path.join(os.path.dirname(__file__), 'pending_changes.jsonl')
+
+
+class PendingJournal:
+    """Archivo JSONL de solo agregado con los cambios pendientes"""
+
+    def __init__(self, path=JOURNAL_PATH):
+        self.path = path
+
+    def exists(self):
+        return os.path.exists(self.path)
+
+    def read(self):
+        """Entradas del diario en el orden en que se escribieron"""
+        entries = []
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        entries.append(json.loads(line))
+                    except ValueError:
+                        print(f"[JOURNAL] Se descarta una entrada incompleta de {self.path}")
+        except FileNotFoundError:
+            pass
+        return entries
+
+    def append(self, entry):
+        """Agrega una entrada y no vuelve hasta que está en disco"""
+        line = json.dumps(entry, ensure_ascii=False, default=str) + '\n'
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(line)
+            f.flush()
+            os.fsync(f.fileno())
+
+    def compact(self, entries):
+        """Reemplaza el diario por `entries` de forma atómica"""
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            for entry in entries:
+                f.write(json.dumps(entry, ensure_ascii=False, default=str) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.path)
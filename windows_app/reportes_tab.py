@@ -10,12 +10,16 @@ import datetime
 import csv
 import os
 
+from data_loader import get_data_loader
+
 class ReportesTab(QWidget):
     """Pestaña para generar reportes"""
     
     def __init__(self, api_client):
         super().__init__()
         self.api_client = api_client
+        # (clave, callback) del pedido de lotes del galpón que todavía no llegó
+        self._lotes_pendientes = None
         
         # Crear layout principal
         main_layout = QVBoxLayout(self)
@@ -187,57 +191,73 @@ class ReportesTab(QWidget):
         self.cargar_datos_iniciales()
         
     def cargar_datos_iniciales(self):
-        """Carga los datos iniciales para los filtros"""
+        """Pide galpones y razas en segundo plano; show_galpones y show_razas llenan los filtros cuando llegan"""
+        loader = get_data_loader()
+        if hasattr(self.api_client, 'get_galpones'):
+            loader.load('galpones', self.api_client.get_galpones, callback=self.show_galpones)
+        else:
+            # Si no existe el método, usar ejemplos
+            self.show_galpones((False, None))
+        
+        if hasattr(self.api_client, 'get_razas'):
+            loader.load('razas', self.api_client.get_razas, callback=self.show_razas)
+        else:
+            # Si no existe el método, usar ejemplos
+            self.show_razas((False, None))
+        
+        # Actualizar opciones según el tipo de reporte
+        self.actualizar_opciones_reporte()
+    
+    def show_galpones(self, result):
+        """Llena el combo de galpones con el resultado de get_galpones y carga sus lotes"""
         try:
-            # Cargar galpones
-            if hasattr(self.api_client, 'get_galpones'):
-                success, galpones = self.api_client.get_galpones()
+            self.galpon_combo.blockSignals(True)
+            self.galpon_combo.clear()
+            
+            success, galpones = result
+            if success and isinstance(galpones, list):
+                # Agregar opción para todos los galpones
+                self.galpon_combo.addItem("Todos los galpones", "0")
                 
-                if success and isinstance(galpones, list):
-                    # Agregar opción para todos los galpones
-                    self.galpon_combo.addItem("Todos los galpones", "0")
-                    
-                    for galpon in galpones:
-                        if isinstance(galpon, dict):
-                            galpon_nombre = str(galpon.get('nombre', ''))
-                            galpon_id = str(galpon.get('id', ''))
-                            self.galpon_combo.addItem(galpon_nombre, galpon_id)
-                else:
-                    # Si no hay datos, usar ejemplos
-                    self.galpon_combo.addItem("Todos los galpones", "0")
-                    self.galpon_combo.addItem("Galpón A", "1")
-                    self.galpon_combo.addItem("Galpón B", "2")
-                    self.galpon_combo.addItem("Galpón C", "3")
+                for galpon in galpones:
+                    if isinstance(galpon, dict):
+                        galpon_nombre = str(galpon.get('nombre', ''))
+                        galpon_id = str(galpon.get('id', ''))
+                        self.galpon_combo.addItem(galpon_nombre, galpon_id)
             else:
-                # Si no existe el método, usar ejemplos
+                # Si no hay datos, usar ejemplos
                 self.galpon_combo.addItem("Todos los galpones", "0")
                 self.galpon_combo.addItem("Galpón A", "1")
                 self.galpon_combo.addItem("Galpón B", "2")
                 self.galpon_combo.addItem("Galpón C", "3")
             
-            # Cargar razas
-            if hasattr(self.api_client, 'get_razas'):
-                success, razas = self.api_client.get_razas()
+            self.galpon_combo.blockSignals(False)
+            
+            # Cargar lotes para el galpón seleccionado
+            self.cargar_lotes_por_galpon()
+            
+        except Exception as e:
+            self.galpon_combo.blockSignals(False)
+            print(f"Error al cargar galpones: {e}")
+            QMessageBox.warning(self, "Error", f"Error al cargar datos iniciales: {e}")
+    
+    def show_razas(self, result):
+        """Llena el combo de razas con el resultado de get_razas"""
+        try:
+            self.raza_combo.clear()
+            
+            success, razas = result
+            if success and isinstance(razas, list):
+                # Agregar opción para todas las razas
+                self.raza_combo.addItem("Todas las razas", "0")
                 
-                if success and isinstance(razas, list):
-                    # Agregar opción para todas las razas
-                    self.raza_combo.addItem("Todas las razas", "0")
-                    
-                    for raza in razas:
-                        if isinstance(raza, dict):
-                            raza_nombre = str(raza.get('nombre', ''))
-                            raza_id = str(raza.get('id', ''))
-                            self.raza_combo.addItem(raza_nombre, raza_id)
-                else:
-                    # Si no hay datos, usar ejemplos
-                    self.raza_combo.addItem("Todas las razas", "0")
-                    self.raza_combo.addItem("Broiler", "1")
-                    self.raza_combo.addItem("Ponedora", "2")
-                    self.raza_combo.addItem("Reproductora", "3")
-                    self.raza_combo.addItem("Isa Brown", "4")
-                    self.raza_combo.addItem("Ross 308", "5")
+                for raza in razas:
+                    if isinstance(raza, dict):
+                        raza_nombre = str(raza.get('nombre', ''))
+                        raza_id = str(raza.get('id', ''))
+                        self.raza_combo.addItem(raza_nombre, raza_id)
             else:
-                # Si no existe el método, usar ejemplos
+                # Si no hay datos, usar ejemplos
                 self.raza_combo.addItem("Todas las razas", "0")
                 self.raza_combo.addItem("Broiler", "1")
                 self.raza_combo.addItem("Ponedora", "2")
@@ -245,42 +265,50 @@ class ReportesTab(QWidget):
                 self.raza_combo.addItem("Isa Brown", "4")
                 self.raza_combo.addItem("Ross 308", "5")
             
-            # Cargar lotes para el galpón seleccionado
-            self.cargar_lotes_por_galpon()
-            
-            # Actualizar opciones según el tipo de reporte
-            self.actualizar_opciones_reporte()
-            
         except Exception as e:
-            print(f"Error al cargar datos iniciales: {e}")
+            print(f"Error al cargar razas: {e}")
             QMessageBox.warning(self, "Error", f"Error al cargar datos iniciales: {e}")
     
     def cargar_lotes_por_galpon(self):
-        """Carga los lotes disponibles para el galpón seleccionado"""
-        try:
-            # Obtener el galpón seleccionado
-            if self.galpon_combo.count() == 0:
-                return
-                
-            galpon_id = self.galpon_combo.currentData()
+        """Pide los lotes del galpón seleccionado; show_lotes_por_galpon llena el combo cuando llegan
+
+        Si el pedido del galpón anterior no llegó todavía, se descarta.
+        """
+        # Obtener el galpón seleccionado
+        if self.galpon_combo.count() == 0:
+            return
             
+        galpon_id = self.galpon_combo.currentData()
+        loader = get_data_loader()
+        if self._lotes_pendientes:
+            loader.cancel(*self._lotes_pendientes)
+            self._lotes_pendientes = None
+        
+        if hasattr(self.api_client, 'get_lotes_por_galpon'):
+            key = f"lotes_por_galpon:{galpon_id}"
+            self._lotes_pendientes = (key, self.show_lotes_por_galpon)
+            loader.load(key, self.api_client.get_lotes_por_galpon, galpon_id, callback=self.show_lotes_por_galpon)
+        else:
+            self.show_lotes_por_galpon((False, None))
+    
+    def show_lotes_por_galpon(self, result):
+        """Llena el combo de lotes con el resultado de get_lotes_por_galpon"""
+        self._lotes_pendientes = None
+        try:
             # Limpiar el combo de lotes
             self.lote_combo.clear()
             
             # Agregar opción para todos los lotes
             self.lote_combo.addItem("Todos los lotes", "0")
             
-            # Obtener lotes para el galpón seleccionado
-            if hasattr(self.api_client, 'get_lotes_por_galpon'):
-                success, lotes = self.api_client.get_lotes_por_galpon(galpon_id)
-                
-                if success and isinstance(lotes, list):
-                    for lote in lotes:
-                        if isinstance(lote, dict):
-                            lote_nombre = str(lote.get('nombre', ''))
-                            lote_id = str(lote.get('id', ''))
-                            self.lote_combo.addItem(lote_nombre, lote_id)
-                    return
+            success, lotes = result
+            if success and isinstance(lotes, list):
+                for lote in lotes:
+                    if isinstance(lote, dict):
+                        lote_nombre = str(lote.get('nombre', ''))
+                        lote_id = str(lote.get('id', ''))
+                        self.lote_combo.addItem(lote_nombre, lote_id)
+                return
             
             # Si no hay datos de la API o hay un error, usar datos de ejemplo
             ejemplos = [
@@ -8,6 +8,8 @@ from PyQt5.QtGui import QPainter
 from PyQt5.QtChart import QChart, QChartView, QLineSeries, QDateTimeAxis, QValueAxis
 from datetime import datetime, timedelta
 
+from data_loader import get_data_loader
+
 class SeguimientoDialog(QDialog):
     """Diálogo para registrar seguimiento diario de un lote"""
     
@@ -163,6 +165,8 @@ class SeguimientoTab(QWidget):
     def __init__(self, api_client):
         super().__init__()
         self.api_client = api_client
+        # 'tabla' / 'grafico' -> (clave, callback) de la última carga de seguimientos pedida
+        self._seguimientos_pendientes = {}
         
         # Crear layout principal
         layout = QVBoxLayout(self)
@@ -299,10 +303,13 @@ class SeguimientoTab(QWidget):
         return tab
     
     def refresh_data(self):
-        """Actualiza los datos de las tablas y gráficos"""
+        """Pide los lotes en segundo plano; show_lotes actualiza los combos cuando llegan"""
+        get_data_loader().load('lotes', self.api_client.get_lotes, callback=self.show_lotes)
+    
+    def show_lotes(self, result):
+        """Actualiza los combos de lotes con el resultado de get_lotes y carga el lote seleccionado"""
         try:
-            # Obtener lista de lotes
-            success, lotes = self.api_client.get_lotes()
+            success, lotes = result
             
             # Limpiar comboboxes antes de agregar nuevos elementos
             self.lote_combo.blockSignals(True)  # Evitar que se disparen señales durante la actualización
@@ -365,32 +372,48 @@ class SeguimientoTab(QWidget):
                 self.mostrar_datos_ejemplo()
                 
         except Exception as e:
-            print(f"Error en refresh_data: {str(e)}")
+            print(f"Error en show_lotes: {str(e)}")
             # En caso de error, mostrar datos de ejemplo
             self.mostrar_datos_ejemplo()
     
+    def _load_seguimientos(self, destino, lote_id, callback):
+        """Pide en segundo plano los seguimientos de un lote para `destino` ('tabla' o 'grafico')
+
+        Si el pedido anterior del mismo destino no llegó todavía, se descarta:
+        al cambiar de lote solo se muestra el último seleccionado.
+        """
+        loader = get_data_loader()
+        anterior = self._seguimientos_pendientes.pop(destino, None)
+        if anterior:
+            loader.cancel(*anterior)
+        key = f"seguimientos:{lote_id}"
+        self._seguimientos_pendientes[destino] = (key, callback)
+        loader.load(key, self.api_client.get_seguimientos, lote_id, callback=callback)
+    
     def on_lote_changed(self):
-        """Actualiza la tabla de registros cuando cambia el lote seleccionado"""
-        try:
-            # Verificar si hay lotes en el combo
-            if self.lote_combo.count() == 0:
-                print("No hay lotes disponibles")
-                self.mostrar_datos_ejemplo()
-                return
-                
-            # Obtener ID del lote seleccionado
-            lote_id = self.lote_combo.currentData()
-            lote_nombre = self.lote_combo.currentText()
+        """Pide los seguimientos del lote seleccionado; show_seguimientos llena la tabla cuando llegan"""
+        # Verificar si hay lotes en el combo
+        if self.lote_combo.count() == 0:
+            print("No hay lotes disponibles")
+            self.mostrar_datos_ejemplo()
+            return
             
-            if not lote_id or lote_id == "--":
-                print(f"No se pudo obtener el ID del lote seleccionado: {lote_id}")
-                self.mostrar_datos_ejemplo()
-                return
-                
-            print(f"Cargando seguimientos para lote: {lote_nombre} (ID: {lote_id})")
-                
-            # Obtener seguimientos del lote
-            success, seguimientos = self.api_client.get_seguimientos(lote_id)
+        # Obtener ID del lote seleccionado
+        lote_id = self.lote_combo.currentData()
+        lote_nombre = self.lote_combo.currentText()
+        
+        if not lote_id or lote_id == "--":
+            print(f"No se pudo obtener el ID del lote seleccionado: {lote_id}")
+            self.mostrar_datos_ejemplo()
+            return
+            
+        print(f"Cargando seguimientos para lote: {lote_nombre} (ID: {lote_id})")
+        self._load_seguimientos('tabla', lote_id, lambda result: self.show_seguimientos(lote_id, lote_nombre, result))
+    
+    def show_seguimientos(self, lote_id, lote_nombre, result):
+        """Llena la tabla de registros con el resultado de get_seguimientos"""
+        try:
+            success, seguimientos = result
             
             if success:
                 # Verificar si seguimientos es una lista
@@ -460,7 +483,7 @@ class SeguimientoTab(QWidget):
                 print(f"Error al obtener seguimientos: {seguimientos}")
                 self.mostrar_datos_ejemplo()
         except Exception as e:
-            print(f"Error en on_lote_changed: {str(e)}")
+            print(f"Error en show_seguimientos: {str(e)}")
             # En caso de error, mostrar datos de ejemplo
             self.mostrar_datos_ejemplo()
     
@@ -527,94 +550,97 @@ class SeguimientoTab(QWidget):
         pass
     
     def update_grafico(self):
-        """Actualiza el gráfico según los criterios seleccionados"""
+        """Pide los seguimientos del lote del gráfico; show_grafico lo dibuja cuando llegan"""
+        # Obtener ID del lote seleccionado
+        lote_id = self.grafico_lote_combo.currentData()
+        
+        if not lote_id:
+            # Si no hay lote seleccionado, mostrar mensaje
+            chart = QChart()
+            chart.setTitle("Seleccione un lote para ver gráficos")
+            self.chart_view.setChart(chart)
+            return
+        self._load_seguimientos('grafico', lote_id, self.show_grafico)
+    
+    def show_grafico(self, result):
+        """Dibuja el gráfico con el resultado de get_seguimientos"""
         try:
-            # Obtener ID del lote seleccionado
-            lote_id = self.grafico_lote_combo.currentData()
+            success, seguimientos = result
             
-            if lote_id:
-                # Obtener seguimientos del lote
-                success, seguimientos = self.api_client.get_seguimientos(lote_id)
+            if success and seguimientos and isinstance(seguimientos, list):
+                # Crear series según el tipo de gráfico seleccionado
+                tipo_grafico = self.grafico_tipo_combo.currentText()
                 
-                if success and seguimientos and isinstance(seguimientos, list):
-                    # Crear series según el tipo de gráfico seleccionado
-                    tipo_grafico = self.grafico_tipo_combo.currentText()
+                if tipo_grafico == "Mortalidad y Producción":
+                    # Crear series para mortalidad y producción
+                    series_mortalidad = QLineSeries()
+                    series_mortalidad.setName("Mortalidad")
                     
-                    if tipo_grafico == "Mortalidad y Producción":
-                        # Crear series para mortalidad y producción
-                        series_mortalidad = QLineSeries()
-                        series_mortalidad.setName("Mortalidad")
-                        
-                        series_produccion = QLineSeries()
-                        series_produccion.setName("Producción")
+                    series_produccion = QLineSeries()
+                    series_produccion.setName("Producción")
+                    
+                    # Agregar puntos a las series
+                    for seguimiento in sorted(seguimientos, key=lambda x: x.get('fecha', '')):
+                        fecha_str = seguimiento.get('fecha', '')
+                        mortalidad = seguimiento.get('mortalidad', 0)
+                        produccion = seguimiento.get('produccion', 0)
                         
-                        # Agregar puntos a las series
-                        for seguimiento in sorted(seguimientos, key=lambda x: x.get('fecha', '')):
-                            fecha_str = seguimiento.get('fecha', '')
-                            mortalidad = seguimiento.get('mortalidad', 0)
-                            produccion = seguimiento.get('produccion', 0)
+                        try:
+                            # Convertir fecha a timestamp
+                            fecha = QDate.fromString(fecha_str, "yyyy-MM-dd")
+                            timestamp = fecha.startOfDay().toMSecsSinceEpoch()
                             
-                            try:
-                                # Convertir fecha a timestamp
-                                fecha = QDate.fromString(fecha_str, "yyyy-MM-dd")
-                                timestamp = fecha.startOfDay().toMSecsSinceEpoch()
-                                
-                                # Agregar puntos
-                                series_mortalidad.append(timestamp, mortalidad)
-                                series_produccion.append(timestamp, produccion)
-                            except ValueError:
-                                print(f"Error al convertir fecha: {fecha_str}")
+                            # Agregar puntos
+                            series_mortalidad.append(timestamp, mortalidad)
+                            series_produccion.append(timestamp, produccion)
+                        except ValueError:
+                            print(f"Error al convertir fecha: {fecha_str}")
+                    
+                    # Verificar que haya puntos en las series
+                    if series_mortalidad.count() > 0 and series_produccion.count() > 0:
+                        # Crear chart
+                        chart = QChart()
+                        chart.addSeries(series_mortalidad)
+                        chart.addSeries(series_produccion)
+                        chart.setTitle("Mortalidad y Producción")
                         
-                        # Verificar que haya puntos en las series
-                        if series_mortalidad.count() > 0 and series_produccion.count() > 0:
-                            # Crear chart
-                            chart = QChart()
-                            chart.addSeries(series_mortalidad)
-                            chart.addSeries(series_produccion)
-                            chart.setTitle("Mortalidad y Producción")
-                            
-                            # Crear ejes
-                            axis_x = QDateTimeAxis()
-                            axis_x.setFormat("dd/MM/yyyy")
-                            axis_x.setTitleText("Fecha")
-                            chart.addAxis(axis_x, Qt.AlignBottom)
-                            series_mortalidad.attachAxis(axis_x)
-                            series_produccion.attachAxis(axis_x)
-                            
-                            axis_y = QValueAxis()
-                            axis_y.setTitleText("Cantidad")
-                            chart.addAxis(axis_y, Qt.AlignLeft)
-                            series_mortalidad.attachAxis(axis_y)
-                            series_produccion.attachAxis(axis_y)
-                            
-                            # Ajustar chart
-                            chart.legend().setVisible(True)
-                            chart.legend().setAlignment(Qt.AlignBottom)
-                            
-                            # Mostrar chart
-                            self.chart_view.setChart(chart)
-                        else:
-                            # No hay suficientes puntos para graficar
-                            chart = QChart()
-                            chart.setTitle("No hay suficientes datos para mostrar el gráfico")
-                            self.chart_view.setChart(chart)
+                        # Crear ejes
+                        axis_x = QDateTimeAxis()
+                        axis_x.setFormat("dd/MM/yyyy")
+                        axis_x.setTitleText("Fecha")
+                        chart.addAxis(axis_x, Qt.AlignBottom)
+                        series_mortalidad.attachAxis(axis_x)
+                        series_produccion.attachAxis(axis_x)
+                        
+                        axis_y = QValueAxis()
+                        axis_y.setTitleText("Cantidad")
+                        chart.addAxis(axis_y, Qt.AlignLeft)
+                        series_mortalidad.attachAxis(axis_y)
+                        series_produccion.attachAxis(axis_y)
+                        
+                        # Ajustar chart
+                        chart.legend().setVisible(True)
+                        chart.legend().setAlignment(Qt.AlignBottom)
+                        
+                        # Mostrar chart
+                        self.chart_view.setChart(chart)
                     else:
-                        # Otros tipos de gráficos se implementarán más adelante
+                        # No hay suficientes puntos para graficar
                         chart = QChart()
-                        chart.setTitle(f"Gráfico de {tipo_grafico} en desarrollo")
+                        chart.setTitle("No hay suficientes datos para mostrar el gráfico")
                         self.chart_view.setChart(chart)
                 else:
-                    # Si no hay datos, mostrar mensaje
+                    # Otros tipos de gráficos se implementarán más adelante
                     chart = QChart()
-                    chart.setTitle("No hay datos disponibles")
+                    chart.setTitle(f"Gráfico de {tipo_grafico} en desarrollo")
                     self.chart_view.setChart(chart)
             else:
-                # Si no hay lote seleccionado, mostrar mensaje
+                # Si no hay datos, mostrar mensaje
                 chart = QChart()
-                chart.setTitle("Seleccione un lote para ver gráficos")
+                chart.setTitle("No hay datos disponibles")
                 self.chart_view.setChart(chart)
         except Exception as e:
-            print(f"Error en update_grafico: {str(e)}")
+            print(f"Error en show_grafico: {str(e)}")
             # En caso de error, mostrar un gráfico vacío
             chart = QChart()
             chart.setTitle(f"Error al cargar el gráfico: {str(e)}")
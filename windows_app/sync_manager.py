@@ -4,10 +4,16 @@
 import requests
 import json
 import os
-import time
 import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
-from PyQt5.QtCore import QObject, pyqtSignal, QTimer
+from PyQt5.QtCore import Qt, QObject, pyqtSignal, QTimer
+
+from api_resources import ApiRequestError
+from entity_cache import get_entity_cache
+from local_store import get_local_store
+from pending_journal import PendingJournal
 
 class SyncManager(QObject):
     """
@@ -31,11 +37,40 @@ class SyncManager(QObject):
             'lotes', 'galpones', 'alimentos', 'vacunas', 'razas', 
             'seguimientos', 'tareas', 'usuarios', 'empresas', 'granjas'
         ]
+        # Entidades que se descargan por cambios (?since=) -> recurso de la API
+        self.delta_resources = {
+            'lotes': 'lotes', 'galpones': 'galpones', 'alimentos': 'alimentos',
+            'vacunas': 'vacunas', 'razas': 'razas', 'seguimientos': 'seguimientos',
+            'usuarios': 'usuarios', 'granjas': 'granjas',
+        }
+        # Entidades que, sin modo de cambios, se descargan página por página a la base local -> recurso de la API
+        self.list_resources = {
+            'lotes': 'lotes', 'galpones': 'galpones', 'alimentos': 'alimentos',
+            'vacunas': 'vacunas', 'razas': 'razas', 'seguimientos': 'seguimientos',
+            'tareas': 'tareas', 'usuarios': 'usuarios', 'granjas': 'granjas',
+        }
+        # Entidades cuyos cambios pendientes se envían juntos a /api/batch/ -> recurso de la API
+        self.batch_resources = {'lotes': 'lotes', 'galpones': 'galpones', 'seguimientos': 'seguimientos'}
+        # Hilos que descargan entidades en paralelo; no más que las conexiones
+        # del pool de ApiClient (POOL_MAXSIZE) para que ninguno espere conexión
+        self.max_workers = 10
         self.pending_changes = {}
-        self.offline_data = {}
-        
-        # Cargar cambios pendientes
+        # Listas en memoria compartidas con ApiClient; data_updated las invalida
+        # en el hilo que lo emite, antes de que las pestañas reciban la señal
+        self.entity_cache = get_entity_cache()
+        self.data_updated.connect(self.entity_cache.invalidate, Qt.DirectConnection)
+        self.sync_tokens = {}
+        # Datos locales (base SQLite compartida con ApiClient)
+        self.local_store = get_local_store()
+        # Protege los archivos de estado que escriben los hilos de sincronización
+        self._state_lock = threading.Lock()
+        # Diario de cambios pendientes e ids de los que se están enviando
+        self.journal = PendingJournal()
+        self._in_flight = set()
+        
+        # Cargar cambios pendientes y tokens de sincronización
         self.load_pending_changes()
+        self.load_sync_tokens()
         
         # Configurar temporizador para sincronización automática
         self.sync_timer = QTimer()
@@ -43,47 +78,143 @@ class SyncManager(QObject):
         self.sync_timer.start(self.sync_interval * 1000)  # Convertir a milisegundos
     
     def load_pending_changes(self):
-        """Carga los cambios pendientes desde el archivo de cambios pendientes"""
-        pending_changes_path = os.path.join(os.path.dirname(__file__), 'pending_changes.json')
+        """Carga los cambios pendientes aplicando en orden el diario de cambios"""
+        self.pending_changes = {entity: [] for entity in self.entities}
+        self._next_change_id = 1
         try:
-            if os.path.exists(pending_changes_path):
-                with open(pending_changes_path, 'r') as f:
-                    self.pending_changes = json.load(f)
-            else:
-                self.pending_changes = {entity: [] for entity in self.entities}
-                self.save_pending_changes()
+            if not self.journal.exists():
+                self._import_pending_changes_json()
+                return
+            for change in self.journal.read():
+                self._apply_pending_change(change.pop('entity'), change)
+            # Reescribir ya combinado (y sin una posible línea incompleta al final)
+            self.save_pending_changes()
         except Exception as e:
             print(f"Error al cargar cambios pendientes: {str(e)}")
-            self.pending_changes = {entity: [] for entity in self.entities}
+    
+    def _import_pending_changes_json(self):
+        """Pasa al diario los cambios del pending_changes.json de versiones anteriores"""
+        legacy_path = os.path.join(os.path.dirname(__file__), 'pending_changes.json')
+        if not os.path.exists(legacy_path):
+            return
+        with open(legacy_path, 'r') as f:
+            legacy = json.load(f)
+        for entity, changes in legacy.items():
+            for change in changes:
+                change['id'] = self._next_change_id
+                self._apply_pending_change(entity, change)
+        if self.save_pending_changes():
+            os.remove(legacy_path)
+    
+    def _apply_pending_change(self, entity, change):
+        """
+        Agrega un cambio a pending_changes combinándolo con el que ya está
+        pendiente para el mismo registro: las modificaciones se funden en el
+        alta o la modificación anterior, y una baja reemplaza a los cambios
+        previos (o los anula si el registro nunca llegó al servidor). Los
+        cambios que se están enviando no se tocan.
+        """
+        self._next_change_id = max(self._next_change_id, change['id'] + 1)
+        changes = self.pending_changes.setdefault(entity, [])
+        object_id = change['data'].get('id')
+        if object_id is None or change['operation'] == 'create':
+            changes.append(change)
+            return
+        
+        same_record = [
+            c for c in changes
+            if str(c['data'].get('id')) == str(object_id) and c['id'] not in self._in_flight
+        ]
+        if not same_record or same_record[-1]['operation'] == 'delete':
+            changes.append(change)
+        elif change['operation'] == 'update':
+            references_new_ids = any(
+                isinstance(value, str) and value.startswith('$') and value != object_id
+                for value in change['data'].values()
+            )
+            if references_new_ids:
+                # Apunta a un alta más reciente: debe enviarse después de ella
+                changes.append(change)
+            else:
+                same_record[-1]['data'].update(change['data'])
+        else:
+            for previous in same_record:
+                changes.remove(previous)
+            never_sent = same_record[0]['operation'] == 'create' and not any(
+                str(c['data'].get('id')) == str(object_id) for c in changes
+            )
+            if not never_sent:
+                changes.append(change)
     
     def save_pending_changes(self):
-        """Guarda los cambios pendientes en el archivo de cambios pendientes"""
-        pending_changes_path = os.path.join(os.path.dirname(__file__), 'pending_changes.json')
+        """Compacta el diario dejando solo los cambios que siguen pendientes"""
         try:
-            with open(pending_changes_path, 'w') as f:
-                json.dump(self.pending_changes, f, indent=4)
+            with self._state_lock:
+                self.journal.compact([
+                    dict(change, entity=entity)
+                    for entity, changes in self.pending_changes.items()
+                    for change in changes
+                ])
             return True
         except Exception as e:
             print(f"Error al guardar cambios pendientes: {str(e)}")
             return False
     
+    def _remove_pending_changes(self, change_ids):
+        """Quita de pending_changes los cambios ya aplicados en el servidor"""
+        with self._state_lock:
+            for entity, changes in self.pending_changes.items():
+                changes[:] = [change for change in changes if change['id'] not in change_ids]
+            self._in_flight.difference_update(change_ids)
+    
+    def load_sync_tokens(self):
+        """Carga el último token de cambios recibido por cada entidad"""
+        tokens_path = os.path.join(os.path.dirname(__file__), 'sync_tokens.json')
+        try:
+            if os.path.exists(tokens_path):
+                with open(tokens_path, 'r') as f:
+                    self.sync_tokens = json.load(f)
+        except Exception as e:
+            print(f"Error al cargar tokens de sincronización: {str(e)}")
+            self.sync_tokens = {}
+    
+    def save_sync_tokens(self):
+        """Guarda los tokens de sincronización"""
+        tokens_path = os.path.join(os.path.dirname(__file__), 'sync_tokens.json')
+        try:
+            with self._state_lock, open(tokens_path, 'w') as f:
+                json.dump(self.sync_tokens, f, indent=4)
+            return True
+        except Exception as e:
+            print(f"Error al guardar tokens de sincronización: {str(e)}")
+            return False
+    
     def add_pending_change(self, entity, operation, data):
-        """Agrega un cambio pendiente para sincronizar más tarde"""
-        if entity not in self.pending_changes:
-            self.pending_changes[entity] = []
-        
-        # Agregar cambio con timestamp
-        change = {
-            'operation': operation,  # 'create', 'update', 'delete'
-            'data': data,
-            'timestamp': datetime.now().isoformat()
-        }
+        """Agrega un cambio pendiente para sincronizar más tarde.
         
-        self.pending_changes[entity].append(change)
-        self.save_pending_changes()
+        El cambio se escribe al final del diario antes de volver. Las altas
+        sin id de las entidades que se envían en bloque reciben un id
+        temporal ("$tmp-...") con el que los cambios siguientes pueden
+        referirse a ellas antes de sincronizar.
+        Devuelve el id del objeto afectado.
+        """
+        if operation == 'create' and entity in self.batch_resources and not data.get('id'):
+            data['id'] = f"$tmp-{uuid.uuid4().hex}"
+        
+        with self._state_lock:
+            # Agregar cambio con id y timestamp
+            change = {
+                'id': self._next_change_id,
+                'operation': operation,  # 'create', 'update', 'delete'
+                'data': data,
+                'timestamp': datetime.now().isoformat()
+            }
+            self.journal.append(dict(change, entity=entity, data=dict(data)))
+            self._apply_pending_change(entity, change)
         
         # Notificar que hay datos actualizados
         self.data_updated.emit(entity)
+        return data.get('id')
     
     def sync_now(self):
         """Inicia la sincronización de datos inmediatamente"""
@@ -110,27 +241,33 @@ class SyncManager(QObject):
                 self.sync_completed.emit(False, "No hay conexión con el servidor")
                 return
             
-            # Sincronizar entidades
+            # Enviar en una transacción los cambios pendientes de lotes, galpones y
+            # seguimientos antes de descargar cualquier entidad que dependa de ellos
+            self.sync_progress.emit(0, "Enviando cambios pendientes")
+            batch_ok, batch_error = self._sync_pending_batch()
+            
+            # Sincronizar entidades en paralelo: cada una envía sus cambios
+            # restantes y descarga sus datos sin depender de las demás
             total_entities = len(self.entities)
-            for i, entity in enumerate(self.entities):
-                # Actualizar progreso
-                progress = int((i / total_entities) * 100)
-                self.sync_progress.emit(progress, f"Sincronizando {entity}")
-                
-                # Enviar cambios pendientes
-                self._sync_entity_changes(entity)
-                
-                # Obtener datos actualizados
-                self._sync_entity_data(entity)
-                
-                # Breve pausa para no sobrecargar la API
-                time.sleep(0.5)
+            with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='sync') as executor:
+                futures = {executor.submit(self._sync_entity, entity): entity for entity in self.entities}
+                for done, future in enumerate(as_completed(futures), start=1):
+                    entity = futures[future]
+                    try:
+                        future.result()
+                    except Exception as e:
+                        print(f"[SYNC] Error al sincronizar {entity}: {str(e)}")
+                    progress = int((done / total_entities) * 100)
+                    self.sync_progress.emit(progress, f"{entity} sincronizado")
             
             # Actualizar timestamp de última sincronización
             self.last_sync = datetime.now()
             
-            # Notificar finalización exitosa
+            # Notificar la finalización; los cambios que no llegaron al servidor la hacen fallida
             self.is_syncing = False
+            if not batch_ok:
+                self.sync_completed.emit(False, batch_error)
+                return
             self.sync_completed.emit(True, f"Sincronización completada: {self.last_sync.strftime('%Y-%m-%d %H:%M:%S')}")
         
         except Exception as e:
@@ -139,14 +276,169 @@ class SyncManager(QObject):
             self.is_syncing = False
             self.sync_completed.emit(False, error_msg)
     
+    def _sync_entity(self, entity):
+        """Envía los cambios pendientes de una entidad y descarga sus datos (en un hilo del pool)"""
+        self._sync_entity_changes(entity)
+        return self._sync_entity_data(entity)
+    
+    def _sync_pending_batch(self):
+        """
+        Envía los cambios pendientes de las entidades de batch_resources en una
+        sola petición a /api/batch/, en el orden en que se hicieron. El servidor
+        los aplica todos o ninguno. Si rechaza uno (400, 404...), ese cambio y
+        los que usan el id temporal de su alta pasan a rejected_changes.json y
+        el resto se vuelve a enviar; si falla por otra causa (sin conexión,
+        error del servidor) quedan todos pendientes para la próxima
+        sincronización.
+        
+        Returns:
+            tuple: (success, message) donde success es True si no había cambios
+                  o se aplicaron todos, y message describe el fallo o los
+                  cambios rechazados
+        """
+        with self._state_lock:
+            pending = [
+                (change['timestamp'], entity, change, dict(change['data']))
+                for entity in self.batch_resources
+                for change in self.pending_changes.get(entity, [])
+            ]
+            self._in_flight.update(change['id'] for _, _, change, _ in pending)
+        if not pending:
+            return True, None
+        pending.sort(key=lambda item: item[0])
+        # Posición de cada cambio en el primer envío, la que se informa si se rechaza
+        positions = {change['id']: i for i, (_, _, change, _) in enumerate(pending)}
+        
+        rejected = []
+        while pending:
+            operations = [self._batch_operation(entity, change, data) for _, entity, change, data in pending]
+            print(f"[SYNC] Enviando {len(operations)} cambios pendientes en bloque...")
+            success, result = self.api_client.aplicar_operaciones(operations)
+            if success:
+                break
+            
+            indice = result.get('indice') if isinstance(result, dict) else None
+            if indice is None or not 0 <= indice < len(pending) or not 400 <= result.get('status', 0) < 500:
+                print(f"[SYNC] No se pudieron enviar los cambios en bloque: {result}")
+                with self._state_lock:
+                    self._in_flight.difference_update(change['id'] for _, _, change, _ in pending)
+                message = result.get('message') if isinstance(result, dict) else result
+                return False, "; ".join(filter(None, [
+                    self._rejected_message(rejected), f"No se pudieron enviar los cambios pendientes: {message}"
+                ]))
+            
+            _, entity, change, _ = pending[indice]
+            print(f"[SYNC] El servidor rechazó el cambio {positions[change['id']]} ({entity} {change['operation']}): {result.get('detalle')}")
+            dropped = self._dependent_changes(pending, indice)
+            rejected.append((positions[change['id']], entity, change, result.get('detalle')))
+            self._quarantine_changes(
+                [(entity, change) for _, entity, change, _ in (pending[i] for i in sorted(dropped))],
+                result.get('detalle')
+            )
+            pending = [item for i, item in enumerate(pending) if i not in dropped]
+        else:
+            self.save_pending_changes()
+            return False, self._rejected_message(rejected)
+        
+        self._remove_pending_changes({change['id'] for _, _, change, _ in pending})
+        # Cambios hechos mientras tanto que apuntan a objetos recién creados
+        temp_ids = result.get('ids', {})
+        with self._state_lock:
+            for entity, changes in self.pending_changes.items():
+                for change in changes:
+                    for key, value in change['data'].items():
+                        if isinstance(value, str) and value in temp_ids:
+                            change['data'][key] = temp_ids[value]
+        self.save_pending_changes()
+        # Las filas locales con id temporal ya tienen su registro en el servidor
+        # (save_pages no las borra)
+        for _, entity, _, data in pending:
+            if data.get('id') in temp_ids and self.local_store.has(entity):
+                try:
+                    self.local_store.apply_changes(entity, [], [data['id']])
+                except ValueError as e:
+                    print(f"[SYNC] No se pudo quitar {data['id']} de {entity}: {str(e)}")
+        if rejected:
+            return False, self._rejected_message(rejected)
+        return True, None
+    
+    def _batch_operation(self, entity, change, data):
+        """Operación de /api/batch/ de un cambio pendiente"""
+        data = dict(data)
+        object_id = data.pop('id', None)
+        if entity == 'seguimientos' and 'lote_id' in data:
+            data['lote'] = data.pop('lote_id')
+        operation = {'recurso': self.batch_resources[entity], 'op': change['operation']}
+        if change['operation'] == 'create':
+            if isinstance(object_id, str) and object_id.startswith('$'):
+                operation['temp_id'] = object_id
+        else:
+            operation['id'] = object_id
+        if change['operation'] != 'delete':
+            operation['data'] = data
+        return operation
+    
+    def _dependent_changes(self, pending, indice):
+        """
+        Posiciones en `pending` del cambio rechazado y de los posteriores que
+        usan el id temporal de un alta descartada (fallarían sin ella)
+        """
+        dropped = {indice}
+        temp_ids = set()
+        for i in range(indice, len(pending)):
+            _, _, change, data = pending[i]
+            uses_dropped = any(isinstance(value, str) and value in temp_ids for value in data.values())
+            if i in dropped or uses_dropped:
+                dropped.add(i)
+                object_id = data.get('id')
+                if change['operation'] == 'create' and isinstance(object_id, str) and object_id.startswith('$'):
+                    temp_ids.add(object_id)
+        return dropped
+    
+    def _quarantine_changes(self, changes, detalle):
+        """Saca de pending_changes los cambios rechazados y los agrega a rejected_changes.json"""
+        rejected_path = os.path.join(os.path.dirname(__file__), 'rejected_changes.json')
+        rejected_at = datetime.now().isoformat()
+        self._remove_pending_changes({change['id'] for _, change in changes})
+        try:
+            with self._state_lock:
+                rejected = []
+                if os.path.exists(rejected_path):
+                    with open(rejected_path, 'r') as f:
+                        rejected = json.load(f)
+                rejected.extend(
+                    dict(change, entity=entity, detalle=detalle, rejected_at=rejected_at)
+                    for entity, change in changes
+                )
+                with open(rejected_path, 'w') as f:
+                    json.dump(rejected, f, indent=4, ensure_ascii=False, default=str)
+        except Exception as e:
+            print(f"Error al guardar cambios rechazados: {str(e)}")
+    
+    def _rejected_message(self, rejected):
+        """Mensaje para sync_completed con los cambios que rechazó el servidor"""
+        if not rejected:
+            return None
+        return "; ".join(
+            f"El servidor rechazó el cambio {indice} ({entity} {change['operation']} "
+            f"{change['data'].get('id', '')}): {detalle}"
+            for indice, entity, change, detalle in rejected
+        )
+    
     def _sync_entity_changes(self, entity):
         """Sincroniza los cambios pendientes de una entidad específica"""
         if entity not in self.pending_changes or not self.pending_changes[entity]:
             return
+        if entity in self.batch_resources:
+            # Se envían con _sync_pending_batch
+            return
         
-        changes_to_remove = []
+        with self._state_lock:
+            changes = list(self.pending_changes[entity])
+            self._in_flight.update(change['id'] for change in changes)
+        applied_ids = set()
         
-        for i, change in enumerate(self.pending_changes[entity]):
+        for change in changes:
             operation = change['operation']
             data = change['data']
             
@@ -188,13 +480,14 @@ class SyncManager(QObject):
             
             # Si el cambio se aplicó correctamente, marcarlo para eliminación
             if success:
-                changes_to_remove.append(i)
+                applied_ids.add(change['id'])
         
-        # Eliminar cambios aplicados (de atrás hacia adelante para no afectar los índices)
-        for i in sorted(changes_to_remove, reverse=True):
-            del self.pending_changes[entity][i]
+        # Eliminar cambios aplicados; los que fallaron vuelven a admitir modificaciones
+        self._remove_pending_changes(applied_ids)
+        with self._state_lock:
+            self._in_flight.difference_update(change['id'] for change in changes)
         
-        # Guardar cambios pendientes actualizados
+        # Compactar el diario con los cambios que siguen pendientes
         self.save_pending_changes()
     
     def _save_local_data(self, entity, data):
@@ -213,54 +506,11 @@ class SyncManager(QObject):
             return False
             
         try:
-            # Verificar si los datos son serializables
-            try:
-                json.dumps(data)
-            except (TypeError, OverflowError, ValueError) as e:
-                print(f"[SYNC] Error: Los datos de {entity} no son serializables: {str(e)}")
-                return False
-                
-            # Crear directorio de datos si no existe
-            data_dir = os.path.join(os.path.dirname(__file__), 'data')
-            try:
-                os.makedirs(data_dir, exist_ok=True)
-            except OSError as e:
-                print(f"[SYNC] Error al crear directorio de datos: {str(e)}")
-                return False
-            
-            # Crear ruta de archivo temporal
-            temp_path = os.path.join(data_dir, f"{entity}.json.tmp")
-            file_path = os.path.join(data_dir, f"{entity}.json")
-            
-            # Escribir primero en un archivo temporal
-            try:
-                with open(temp_path, 'w', encoding='utf-8') as f:
-                    json.dump(data, f, ensure_ascii=False, indent=2, default=str)
-                
-                # Renombrar el archivo temporal al archivo final (operación atómica)
-                if os.path.exists(file_path):
-                    os.remove(file_path)
-                os.rename(temp_path, file_path)
-                
-                # Verificar que el archivo se haya guardado correctamente
-                if os.path.exists(file_path) and os.path.getsize(file_path) > 0:
-                    print(f"[SYNC] Datos de {entity} guardados correctamente en {file_path}")
-                    # Actualizar la caché en memoria
-                    self.offline_data[entity] = data
-                    return True
-                else:
-                    print(f"[SYNC] Error: No se pudo verificar el archivo guardado para {entity}")
-                    return False
-                    
-            except (IOError, OSError, json.JSONEncodeError) as e:
-                print(f"[SYNC] Error al escribir datos locales de {entity}: {str(e)}")
-                # Intentar eliminar el archivo temporal si existe
-                if os.path.exists(temp_path):
-                    try:
-                        os.remove(temp_path)
-                    except OSError:
-                        pass
-                return False
+            self.local_store.save(entity, data)
+            print(f"[SYNC] Datos de {entity} guardados en la base local")
+            # Actualizar la caché en memoria
+            self.entity_cache.put(entity, data)
+            return True
                 
         except Exception as e:
             import traceback
@@ -276,57 +526,30 @@ class SyncManager(QObject):
             entity (str): Nombre de la entidad a cargar (ej: 'lotes', 'galpones')
             
         Returns:
-            list or dict or None: Los datos cargados, o None si hay un error o el archivo no existe
+            list or dict or None: Los datos cargados, o None si hay un error o no hay datos
         """
         # Verificar si los datos están en caché
-        if entity in self.offline_data and self.offline_data[entity] is not None:
+        cached = self.entity_cache.get(entity)
+        if cached is not None:
             print(f"[SYNC] Usando datos en caché para {entity}")
-            return self.offline_data[entity]
-            
-        file_path = os.path.join(os.path.dirname(__file__), 'data', f"{entity}.json")
+            return cached
         
-        # Verificar si el archivo existe
-        if not os.path.exists(file_path):
-            print(f"[SYNC] No se encontró archivo local para {entity}")
-            return None
-            
-        # Verificar si el archivo está vacío o es muy pequeño
-        try:
-            if os.path.getsize(file_path) < 2:  # Un JSON válido debe tener al menos 2 caracteres: [] o {}
-                print(f"[SYNC] Advertencia: El archivo {entity}.json está vacío o es muy pequeño")
-                return None
-        except OSError as e:
-            print(f"[SYNC] Error al verificar el tamaño del archivo {entity}.json: {str(e)}")
-            return None
-        
-        # Intentar cargar el archivo
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                
-            # Validar que los datos tengan un formato esperado
-            if not isinstance(data, (list, dict)):
-                print(f"[SYNC] Advertencia: Formato de datos inesperado en {entity}.json")
-                return None
-                
-            # Actualizar la caché
-            self.offline_data[entity] = data
-            print(f"[SYNC] Datos de {entity} cargados correctamente desde {file_path}")
-            return data
-            
-        except json.JSONDecodeError as e:
-            print(f"[SYNC] Error de sintaxis JSON en {entity}.json: {str(e)}")
-            return None
-            
-        except UnicodeDecodeError as e:
-            print(f"[SYNC] Error de codificación en {entity}.json: {str(e)}")
-            return None
-            
+            data = self.local_store.load(entity)
         except Exception as e:
             import traceback
-            print(f"[SYNC] Error inesperado al cargar {entity}.json: {str(e)}")
+            print(f"[SYNC] Error inesperado al cargar {entity} de la base local: {str(e)}")
             print(f"[SYNC] Traceback: {traceback.format_exc()}")
             return None
+        
+        if data is None:
+            print(f"[SYNC] No hay datos locales para {entity}")
+            return None
+            
+        # Actualizar la caché
+        self.entity_cache.put(entity, data)
+        print(f"[SYNC] Datos de {entity} cargados de la base local")
+        return data
 
     def _sync_entity_data(self, entity):
         """
@@ -339,9 +562,8 @@ class SyncManager(QObject):
             bool: True si la sincronización fue exitosa, False en caso contrario
         """
         print(f"[SYNC] Iniciando sincronización de {entity}...")
-        
-        # Cargar datos locales como respaldo
-        local_data = self._load_local_data(entity)
+        # Lo que se descarga no debe salir de la caché
+        self.entity_cache.invalidate(entity)
         
         # Mapeo de entidades a métodos de la API y sus parámetros
         entity_map = {
@@ -367,8 +589,20 @@ class SyncManager(QObject):
             
         api_method, params = entity_map[entity]
         
+        # Descargar solo los cambios desde la sincronización anterior, sin leer los datos locales
+        is_offline = hasattr(self.api_client, 'is_offline') and self.api_client.is_offline
+        if entity in self.delta_resources and not is_offline:
+            result = self._sync_entity_delta(entity)
+            if result is not None:
+                return result
+        if entity in self.list_resources and not is_offline:
+            return self._sync_entity_pages(entity)
+        
+        # Cargar datos locales como respaldo
+        local_data = self._load_local_data(entity)
+        
         # Verificar modo offline
-        if hasattr(self.api_client, 'is_offline') and self.api_client.is_offline:
+        if is_offline:
             print(f"[SYNC] Modo offline. Usando datos locales para {entity}")
             if local_data:
                 print(f"[SYNC] Se encontraron {len(local_data) if isinstance(local_data, list) else 1} registros locales para {entity}")
@@ -449,6 +683,63 @@ class SyncManager(QObject):
                 
             return False
     
+    def _sync_entity_delta(self, entity):
+        """
+        Aplica en la base local los cambios de la entidad desde el último token.
+        
+        Returns:
+            bool: Resultado de la sincronización, o None si el servidor no
+                  soporta el modo de cambios y hay que descargar la lista completa.
+        """
+        token = self.sync_tokens.get(entity) if self.local_store.has(entity) else None
+        print(f"[SYNC] Solicitando cambios de {entity} desde el token {token or 0}...")
+        success, data = self.api_client.get_cambios(self.delta_resources[entity], token or 0)
+        if not success:
+            return None
+        
+        print(f"[SYNC] {entity}: {len(data['results'])} modificados, {len(data['deleted'])} eliminados")
+        try:
+            if token:
+                # Insertar o reemplazar solo las filas que cambiaron
+                self.local_store.apply_changes(entity, data['results'], data['deleted'])
+            else:
+                # Sin token se recibió la tabla completa
+                self.local_store.save(entity, data['results'])
+        except Exception as e:
+            print(f"[SYNC] Error al guardar cambios de {entity} en la base local: {str(e)}")
+            return False
+        self.entity_cache.invalidate(entity)
+        self.sync_tokens[entity] = data['since']
+        self.save_sync_tokens()
+        self.data_updated.emit(entity)
+        return True
+    
+    def _sync_entity_pages(self, entity):
+        """
+        Descarga el listado completo de la entidad y lo guarda en la base local
+        página por página, sin tenerlo entero en memoria.
+        
+        Returns:
+            bool: True si se guardó el listado o, si falló, hay datos locales de respaldo
+        """
+        print(f"[SYNC] Descargando {entity} por páginas...")
+        try:
+            total = self.local_store.save_pages(entity, self.api_client.iter_pages(self.list_resources[entity]))
+        except ApiRequestError as e:
+            print(f"[SYNC] {e}")
+            has_local = self.local_store.has(entity)
+            if has_local:
+                print(f"[SYNC] Usando los datos locales de {entity} como respaldo")
+                self.data_updated.emit(entity)
+            return has_local
+        except Exception as e:
+            print(f"[SYNC] Error al guardar {entity} en la base local: {str(e)}")
+            return False
+        self.entity_cache.invalidate(entity)
+        print(f"[SYNC] {total} registros de {entity} sincronizados")
+        self.data_updated.emit(entity)
+        return True
+    
     def _normalize_api_data(self, data, entity):
         """
         Normaliza los datos recibidos de la API a un formato consistente.
@@ -510,17 +801,8 @@ class SyncManager(QObject):
     
     def _save_offline_data(self, entity, data):
         """Guarda los datos de una entidad para uso offline"""
-        offline_dir = os.path.join(os.path.dirname(__file__), 'offline_data')
-        
-        # Crear directorio si no existe
-        if not os.path.exists(offline_dir):
-            os.makedirs(offline_dir)
-        
-        # Guardar datos
-        offline_path = os.path.join(offline_dir, f"{entity}.json")
         try:
-            with open(offline_path, 'w') as f:
-                json.dump(data, f, indent=4)
+            self.local_store.save(entity, data)
             return True
         except Exception as e:
             print(f"Error al guardar datos offline de {entity}: {str(e)}")
@@ -528,12 +810,9 @@ class SyncManager(QObject):
     
     def load_offline_data(self, entity):
         """Carga los datos offline de una entidad"""
-        offline_path = os.path.join(os.path.dirname(__file__), 'offline_data', f"{entity}.json")
         try:
-            if os.path.exists(offline_path):
-                with open(offline_path, 'r') as f:
-                    return json.load(f)
-            return []
+            data = self.local_store.load(entity)
+            return data if data is not None else []
         except Exception as e:
             print(f"Error al cargar datos offline de {entity}: {str(e)}")
             return []
@@ -586,18 +865,10 @@ class SyncManager(QObject):
             print(f"[SYNC] Error: Entidad '{entity}' no es válida")
             return False, []
         
-        # Si no se fuerza la actualización, verificar si hay datos en caché
+        # Si no se fuerza la actualización, usar la caché en memoria o la base local
         if not force_refresh:
-            # Verificar caché en memoria primero
-            if entity in self.offline_data and self.offline_data[entity] is not None:
-                print(f"[SYNC] Usando datos en caché para {entity}")
-                return True, self.offline_data[entity]
-                
-            # Si no hay en caché, intentar cargar desde archivo local
             local_data = self._load_local_data(entity)
             if local_data is not None:
-                print(f"[SYNC] Datos de {entity} cargados desde almacenamiento local")
-                self.offline_data[entity] = local_data
                 return True, local_data
         
         # Si se fuerza la actualización o no hay datos locales, sincronizar
@@ -612,15 +883,15 @@ class SyncManager(QObject):
             local_data = self._load_local_data(entity)
             if local_data is not None:
                 print(f"[SYNC] Usando datos locales como respaldo para {entity}")
-                self.offline_data[entity] = local_data
                 return True, local_data
                 
             print(f"[SYNC] No hay datos locales disponibles para {entity}")
             return False, []
         
         # Si la sincronización fue exitosa, devolver los datos actualizados
-        if entity in self.offline_data and self.offline_data[entity] is not None:
-            return True, self.offline_data[entity]
+        local_data = self._load_local_data(entity)
+        if local_data is not None:
+            return True, local_data
             
         # Si todo falla, devolver lista vacía
         print(f"[SYNC] No se encontraron datos para {entity} después de la sincronización")
@@ -8,6 +8,8 @@ from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel,
 from PyQt5.QtCore import Qt, QDate, pyqtSignal
 from PyQt5.QtGui import QIcon, QFont
 
+from data_loader import get_data_loader
+
 class TareasTab(QWidget):
     """Pestaña para gestionar tareas y asignaciones"""
     
@@ -95,12 +97,15 @@ class TareasTab(QWidget):
         self.cargar_tareas()
     
     def cargar_tareas(self):
-        """Carga las tareas desde la API"""
+        """Pide las tareas en segundo plano; show_tareas llena la tabla cuando llegan"""
+        get_data_loader().load('tareas', self.api_client.get_tareas, callback=self.show_tareas)
+    
+    def show_tareas(self, result):
+        """Llena la tabla de tareas con el resultado de get_tareas"""
         # Limpiar tabla
         self.tabla_tareas.setRowCount(0)
         
-        # Obtener tareas
-        success, tareas = self.api_client.get_tareas()
+        success, tareas = result
         
         if success:
             # Llenar tabla con datos
@@ -334,28 +339,12 @@ class DialogoTarea(QDialog):
         form_layout.addRow("Descripción:", self.descripcion_input)
         
         self.asignado_input = QComboBox()
-        # Cargar usuarios
-        success, usuarios = self.api_client.get_usuarios()
-        if success:
-            for usuario in usuarios:
-                self.asignado_input.addItem(usuario.get('username', ''))
-        else:
-            # Usuarios de ejemplo
-            self.asignado_input.addItems(["Juan Pérez", "María López", "Carlos Rodríguez"])
-        
-        # Seleccionar usuario actual si es nueva tarea
-        if not self.tarea:
-            user_info = self.api_client.get_current_user_info()
-            if user_info:
-                username = user_info.get('username', '')
-                index = self.asignado_input.findText(username)
-                if index >= 0:
-                    self.asignado_input.setCurrentIndex(index)
-        else:
-            # Seleccionar usuario asignado si es edición
-            index = self.asignado_input.findText(self.tarea.get('asignado_a', ''))
-            if index >= 0:
-                self.asignado_input.setCurrentIndex(index)
+        # Mientras llegan los usuarios, el asignado actual (para no perderlo si se guarda antes)
+        self.asignado_input.addItem(self.usuario_preseleccionado())
+        # Cargar usuarios en segundo plano; show_usuarios llena el combo cuando llegan
+        get_data_loader().load('usuarios', self.api_client.get_usuarios, callback=self.show_usuarios)
+        # Si el diálogo se cierra antes, los usuarios ya no se esperan
+        self.finished.connect(lambda: get_data_loader().cancel('usuarios', self.show_usuarios))
         
         form_layout.addRow("Asignado a:", self.asignado_input)
         
@@ -392,6 +381,28 @@ class DialogoTarea(QDialog):
         
         layout.addLayout(button_layout)
     
+    def show_usuarios(self, result):
+        """Llena el combo de asignados con el resultado de get_usuarios y selecciona el que corresponde"""
+        self.asignado_input.clear()
+        success, usuarios = result
+        if success and isinstance(usuarios, list):
+            for usuario in usuarios:
+                self.asignado_input.addItem(usuario.get('username', ''))
+        else:
+            # Usuarios de ejemplo
+            self.asignado_input.addItems(["Juan Pérez", "María López", "Carlos Rodríguez"])
+        
+        index = self.asignado_input.findText(self.usuario_preseleccionado())
+        if index >= 0:
+            self.asignado_input.setCurrentIndex(index)
+    
+    def usuario_preseleccionado(self):
+        """Usuario asignado si es edición; si es nueva tarea, el de la sesión"""
+        if self.tarea:
+            return self.tarea.get('asignado_a', '')
+        # Sin consultar la API: ApiClient lo tiene desde el inicio de sesión
+        return getattr(self.api_client, 'username', None) or ''
+    
     def guardar_tarea(self):
         """Guarda la tarea nueva o editada"""
         # Validar campos